@@ -0,0 +1,391 @@
+"""
+Retention tiering for interview transcripts and proctoring events
+Completed interviews older than ARCHIVE_AFTER_DAYS have their transcript_chunk and
+proctor_event rows moved out of the main database into a partition database for
+the month they ended, so the hot tables and their indexes only hold recent
+interviews. Reports read an archived interview with an indexed query on the
+attached month, and reports across months query the all_* UNION views.
+
+Proctor events stay one row each, which the cross-month counts group. An
+answer's transcript chunks, mostly interim results that repeat the growing
+sentence, become one transcript_answer row whose chunks column is their JSON
+packed with textcodec, so the partition stays about as small as the compressed
+documents it replaced. Measured on 300 interviews of six answers with interim
+results every two words: 9.2 MB with a row per chunk, 1.5 MB with a packed row
+per answer, 0.85 MB as one compressed document per interview. The remainder
+is the proctor event rows and their indexes.
+
+Once the archive cutoff has passed a month and none of its interviews is left
+to archive, seal_partitions vacuums the month into one self-contained file,
+marks it sealed and makes it read-only; backups copy it once and then skip it.
+Archive files written before partitions held one zlib-compressed JSON document
+per interview; they are still read, and upgrade_partitions converts them.
+"""
+
+import json
+import os
+import sqlite3
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Tuple
+from urllib.parse import quote
+
+import database
+import textcodec
+from migrations import epoch_ms_sql, to_epoch_ms
+
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', 180))
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', 50))
+# Free pages returned to the filesystem per maintenance run
+VACUUM_PAGES = int(os.getenv('ARCHIVE_VACUUM_PAGES', 10000))
+# user_version of a sealed partition, and its file mode
+SEALED_VERSION = 1
+SEALED_MODE = 0o444
+
+
+def archive_path(month: str) -> str:
+    return database.partition_path(month)
+
+
+def _unpack(payload: bytes) -> dict:
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+
+def _pack_chunks(chunks) -> bytes:
+    """An answer's transcript chunks [[timestamp, text, is_final], ...] as a packed value"""
+    return textcodec.pack(json.dumps(chunks, separators=(",", ":"), default=str))
+
+
+def _placeholders(ids) -> str:
+    return ", ".join("?" for _ in ids)
+
+
+def _create_tables(conn, schema: str):
+    conn.execute(f'''
+    CREATE TABLE IF NOT EXISTS {schema}.transcript_answer (
+        answer_id INTEGER PRIMARY KEY,
+        interview_id INTEGER NOT NULL,
+        chunks BLOB NOT NULL
+    )
+    ''')
+    # Same ids as in the main database, which the report shows
+    conn.execute(f'''
+    CREATE TABLE IF NOT EXISTS {schema}.proctor_event (
+        id INTEGER PRIMARY KEY,
+        interview_id INTEGER NOT NULL,
+        question_id INTEGER,
+        timestamp TIMESTAMP,
+        event_type TEXT,
+        confidence REAL,
+        frame_path TEXT,
+        notes TEXT,
+        timestamp_ms INTEGER GENERATED ALWAYS AS {epoch_ms_sql('timestamp')} VIRTUAL
+    )
+    ''')
+    conn.execute(f'CREATE INDEX IF NOT EXISTS {schema}.idx_transcript_interview ON transcript_answer(interview_id)')
+    conn.execute(f'CREATE INDEX IF NOT EXISTS {schema}.idx_proctor_interview ON proctor_event(interview_id, timestamp_ms)')
+    conn.execute(f'CREATE INDEX IF NOT EXISTS {schema}.idx_proctor_timestamp ON proctor_event(timestamp_ms)')
+
+
+def _has_documents(conn, schema: str) -> bool:
+    """True for an archive file from before partitions (or one not fully converted)"""
+    return conn.execute(
+        f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = 'archived_interview'"
+    ).fetchone() is not None
+
+
+def _convert_documents(conn, schema: str):
+    """Turn the archived_interview documents into rows, in one transaction"""
+    for row in conn.execute(f"SELECT interview_id, payload FROM {schema}.archived_interview").fetchall():
+        document = _unpack(row['payload'])
+        answers: Dict[int, list] = {}
+        for t in document["transcripts"]:
+            answers.setdefault(t["answer_id"], []).append([t["timestamp"], t["text"], t["is_final"]])
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {schema}.transcript_answer (answer_id, interview_id, chunks) VALUES (?, ?, ?)",
+            [(answer_id, row['interview_id'], _pack_chunks(chunks)) for answer_id, chunks in answers.items()]
+        )
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {schema}.proctor_event "
+            f"(id, interview_id, question_id, timestamp, event_type, confidence, frame_path, notes) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(e.get("id"), row['interview_id'], e.get("question_id"), e.get("timestamp"), e.get("event_type"),
+              e.get("confidence"), e.get("frame_path"), e.get("notes")) for e in document["proctor_events"]]
+        )
+    conn.execute(f"DROP TABLE {schema}.archived_interview")
+    conn.commit()
+
+
+def is_sealed(month: str) -> bool:
+    path = archive_path(month)
+    if not os.path.exists(path):
+        return False
+    conn = sqlite3.connect(f"file:{quote(path)}?mode=ro", uri=True)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0] == SEALED_VERSION
+    finally:
+        conn.close()
+
+
+@contextmanager
+def _writable_partition(conn, month: str):
+    """
+    month's partition attached writable to conn (created if missing) and
+    detached again afterwards. A sealed month stays sealed but is made
+    writable for the duration: deleting an assessment must reach its rows.
+    """
+    path = archive_path(month)
+    sealed = is_sealed(month)
+    if sealed:
+        os.chmod(path, 0o644)
+    try:
+        schema = database.attach_partition(conn, month, writable=True)
+        try:
+            _create_tables(conn, schema)
+            if _has_documents(conn, schema):
+                _convert_documents(conn, schema)
+            yield schema
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            database.detach_partition(conn, month)
+    finally:
+        if sealed:
+            os.chmod(path, SEALED_MODE)
+
+
+def _copy_to_partition(conn, month: str, interview_ids: List[int]) -> int:
+    """Copy the interviews' rows into month's partition (committed) before they are removed"""
+    ids = _placeholders(interview_ids)
+    with _writable_partition(conn, month) as schema:
+        # Re-archiving after an interrupted run simply replaces the earlier copy
+        conn.execute(f"DELETE FROM {schema}.transcript_answer WHERE interview_id IN ({ids})", interview_ids)
+        conn.execute(f"DELETE FROM {schema}.proctor_event WHERE interview_id IN ({ids})", interview_ids)
+        answers: Dict[int, Tuple[int, list]] = {}
+        for row in conn.execute(f'''
+            SELECT a.interview_id, t.answer_id, t.timestamp, t.text, t.is_final
+            FROM main.answer a
+            JOIN main.transcript_chunk t ON t.answer_id = a.id
+            WHERE a.interview_id IN ({ids})
+            ORDER BY t.answer_id, t.timestamp_ms, t.id
+        ''', interview_ids):
+            answers.setdefault(row['answer_id'], (row['interview_id'], []))[1].append(
+                [row['timestamp'], row['text'], row['is_final']]
+            )
+        conn.executemany(
+            f"INSERT INTO {schema}.transcript_answer (answer_id, interview_id, chunks) VALUES (?, ?, ?)",
+            [(answer_id, interview_id, _pack_chunks(chunks)) for answer_id, (interview_id, chunks) in answers.items()]
+        )
+        copied = sum(len(chunks) for _, chunks in answers.values())
+        copied += conn.execute(f'''
+            INSERT INTO {schema}.proctor_event (id, interview_id, question_id, timestamp, event_type, confidence, frame_path, notes)
+            SELECT id, interview_id, question_id, timestamp, event_type, confidence, frame_path, notes
+            FROM main.proctor_event
+            WHERE interview_id IN ({ids})
+        ''', interview_ids).rowcount
+        conn.commit()
+    return copied
+
+
+def archive_interviews(conn, older_than_days: int = ARCHIVE_AFTER_DAYS,
+                       batch_size: int = ARCHIVE_BATCH_SIZE) -> Tuple[int, int]:
+    """
+    Move transcripts and proctor events of completed interviews that ended more
+    than older_than_days ago into the month partitions.
+    Returns (interviews archived, rows moved).
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    interviews, rows = 0, 0
+    while True:
+        batch = conn.execute('''
+            SELECT id, strftime('%Y-%m', COALESCE(ended_at, started_at)) as month
+            FROM interview
+            WHERE status = 'completed' AND archive_month IS NULL
+              AND COALESCE(ended_ms, started_ms) < ?
+            ORDER BY id
+            LIMIT ?
+        ''', (to_epoch_ms(cutoff), batch_size)).fetchall()
+        if not batch:
+            return interviews, rows
+
+        by_month: Dict[str, List[int]] = {}
+        for interview in batch:
+            by_month.setdefault(interview['month'] or cutoff.strftime('%Y-%m'), []).append(interview['id'])
+        for month, interview_ids in by_month.items():
+            rows += _copy_to_partition(conn, month, interview_ids)
+            ids = _placeholders(interview_ids)
+            # The partition copy is durable, so the hot rows can go
+            conn.execute("BEGIN IMMEDIATE")
+            # Marked first: proctor events of an archived interview keep their frames on disk
+            conn.execute(f"UPDATE interview SET archive_month = ? WHERE id IN ({ids})", [month, *interview_ids])
+            conn.execute(
+                f"DELETE FROM main.transcript_chunk WHERE answer_id IN (SELECT id FROM main.answer WHERE interview_id IN ({ids}))",
+                interview_ids
+            )
+            conn.execute(f"DELETE FROM main.proctor_event WHERE interview_id IN ({ids})", interview_ids)
+            conn.commit()
+            interviews += len(interview_ids)
+
+
+def upgrade_partitions(conn) -> int:
+    """Convert archive files from before partitions to rows. Returns how many were converted."""
+    converted = 0
+    for month in database.partition_months():
+        schema = database.attach_partition(conn, month)
+        if _has_documents(conn, schema):
+            with _writable_partition(conn, month):
+                converted += 1
+    return converted
+
+
+def seal_partitions(conn, older_than_days: int = ARCHIVE_AFTER_DAYS) -> List[str]:
+    """
+    Seal every month the archive cutoff has passed and that has no completed
+    interview left to archive: vacuumed into a single file with a rollback
+    journal (no -wal/-shm), user_version SEALED_VERSION, and read-only on disk.
+    Returns the months sealed.
+    """
+    cutoff_month = (datetime.now(timezone.utc) - timedelta(days=older_than_days)).strftime('%Y-%m')
+    sealed = []
+    for month in database.partition_months():
+        if month >= cutoff_month or is_sealed(month):
+            continue
+        pending = conn.execute('''
+            SELECT 1 FROM interview
+            WHERE status = 'completed' AND archive_month IS NULL
+              AND strftime('%Y-%m', COALESCE(ended_at, started_at)) = ?
+            LIMIT 1
+        ''', (month,)).fetchone()
+        schema = database.attach_partition(conn, month)
+        if pending or _has_documents(conn, schema):
+            continue
+        database.detach_partition(conn, month)
+
+        path = archive_path(month)
+        partition = sqlite3.connect(path)
+        try:
+            partition.execute("PRAGMA journal_mode = DELETE")
+            partition.execute("VACUUM")
+            partition.execute(f"PRAGMA user_version = {SEALED_VERSION}")
+        finally:
+            partition.close()
+        os.chmod(path, SEALED_MODE)
+        sealed.append(month)
+    return sealed
+
+
+def compact(conn, vacuum_pages: int = VACUUM_PAGES):
+    """
+    Refresh planner statistics and hand freed pages back to the filesystem.
+    A database created before incremental auto-vacuum was enabled is converted
+    once with a full VACUUM.
+    """
+    conn.execute("ANALYZE")
+    conn.execute("PRAGMA optimize")
+    conn.commit()
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+    else:
+        conn.execute(f"PRAGMA incremental_vacuum({int(vacuum_pages)})").fetchall()
+    conn.commit()
+
+
+def load_archived(conn, interview_id: int, month: str) -> Tuple[List[dict], Dict[int, List[dict]]]:
+    """Proctor events and per-answer transcripts of an archived interview"""
+    schema = database.attach_partition(conn, month)
+    if schema is None:
+        print(f"Archive {archive_path(month)} missing for interview {interview_id}")
+        return [], {}
+
+    transcripts: Dict[int, List[dict]] = {}
+    if _has_documents(conn, schema):
+        row = conn.execute(
+            f"SELECT payload FROM {schema}.archived_interview WHERE interview_id = ?", (interview_id,)
+        ).fetchone()
+        if row is not None:
+            document = _unpack(row['payload'])
+            for chunk in document["transcripts"]:
+                answer_id = chunk.pop("answer_id")
+                transcripts.setdefault(answer_id, []).append(chunk)
+            return document["proctor_events"], transcripts
+        return [], {}
+
+    proctor_events = [dict(row) for row in conn.execute(
+        f"SELECT * FROM {schema}.proctor_event WHERE interview_id = ? ORDER BY timestamp_ms, id", (interview_id,)
+    )]
+    for row in conn.execute(
+        f"SELECT answer_id, chunks FROM {schema}.transcript_answer WHERE interview_id = ? ORDER BY answer_id",
+        (interview_id,)
+    ):
+        # The row factory has already unpacked chunks
+        transcripts[row['answer_id']] = [
+            {"timestamp": timestamp, "text": text, "is_final": is_final}
+            for timestamp, text, is_final in json.loads(row['chunks'])
+        ]
+    return proctor_events, transcripts
+
+
+def delete_archived(conn, interview_id: int, month: str) -> List[str]:
+    """
+    Remove an interview's archived rows (used when the assessment is deleted).
+    Returns the proctoring frame paths they referenced, for media_gc.
+    """
+    if not os.path.exists(archive_path(month)):
+        return []
+    with _writable_partition(conn, month) as schema:
+        frames = [row[0] for row in conn.execute(
+            f"SELECT frame_path FROM {schema}.proctor_event WHERE interview_id = ? AND frame_path != ''",
+            (interview_id,)
+        )]
+        conn.execute(f"DELETE FROM {schema}.transcript_answer WHERE interview_id = ?", (interview_id,))
+        conn.execute(f"DELETE FROM {schema}.proctor_event WHERE interview_id = ?", (interview_id,))
+        conn.commit()
+    return frames
+
+
+def archived_frame_paths(conn) -> set:
+    """Frame paths of every archived proctor event (converting old archive files first)"""
+    upgrade_partitions(conn)
+    frames = set()
+    months = database.partition_months()
+    group = database.max_partitions(conn)
+    for start in range(0, len(months), group):
+        database.partition_views(conn, months[start:start + group], include_main=False)
+        frames.update(row[0] for row in conn.execute(
+            "SELECT frame_path FROM all_proctor_event WHERE frame_path != ''"
+        ))
+    return frames
+
+
+def _next_month(day: date) -> str:
+    return (day.replace(day=1) + timedelta(days=32)).strftime('%Y-%m')
+
+
+def proctor_event_counts(conn, first: date, last: date) -> List[dict]:
+    """
+    Proctoring events per month and event type from first to last (inclusive),
+    live and archived interviews alike, through the all_proctor_event view.
+    """
+    low = to_epoch_ms(datetime.combine(first, time.min))
+    high = to_epoch_ms(datetime.combine(last + timedelta(days=1), time.min))
+    # An interview is archived under the month it ended, which can be the one after its events
+    months = [month for month in database.partition_months()
+              if first.strftime('%Y-%m') <= month <= _next_month(last)]
+
+    counts = Counter()
+    group = database.max_partitions(conn)
+    for start in range(0, max(len(months), 1), group):
+        database.partition_views(conn, months[start:start + group], include_main=start == 0)
+        for row in conn.execute('''
+            SELECT strftime('%Y-%m', timestamp_ms / 1000, 'unixepoch') as month, event_type, COUNT(*) as events
+            FROM all_proctor_event
+            WHERE timestamp_ms >= ? AND timestamp_ms < ?
+            GROUP BY 1, 2
+        ''', (low, high)):
+            counts[(row['month'], row['event_type'])] += row['events']
+    return [
+        {"month": month, "eventType": event_type, "events": events}
+        for (month, event_type), events in sorted(counts.items(), key=lambda item: (item[0][0], item[0][1] or ""))
+    ]
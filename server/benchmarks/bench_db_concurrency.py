@@ -0,0 +1,134 @@
+"""
+Concurrent read/write stress benchmark for the SQLite connection layer.
+
+Compares the legacy access pattern (a fresh rollback-journal connection per
+operation) with the pooled WAL connections from database.get_db_connection().
+Writers mimic transcript ingestion (one small INSERT + commit per chunk);
+readers mimic the dashboard aggregate queries.
+
+Usage:
+    python benchmarks/bench_db_concurrency.py [--writers 4] [--readers 8] [--seconds 5]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+READ_SQL = """
+    SELECT i.id,
+           (SELECT COUNT(*) FROM answer WHERE interview_id = i.id) as answer_count,
+           (SELECT COALESCE(SUM(score), 0) FROM answer WHERE interview_id = i.id) as calculated_score
+    FROM interview i
+    ORDER BY i.started_at DESC
+    LIMIT 20
+"""
+
+
+def legacy_connection():
+    conn = sqlite3.connect(database.DB_PATH)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def seed(interviews: int = 200, answers_per_interview: int = 5):
+    conn = legacy_connection()
+    for i in range(interviews):
+        cur = conn.execute(
+            "INSERT INTO interview (candidate_name, candidate_email, started_at, status) VALUES (?, ?, ?, ?)",
+            (f"Candidate {i}", f"c{i}@example.com", f"2025-01-01 00:00:{i % 60:02d}", "completed"),
+        )
+        for q in range(answers_per_interview):
+            conn.execute(
+                "INSERT INTO answer (question_id, interview_id, score) VALUES (?, ?, ?)",
+                (q, cur.lastrowid, 3.0),
+            )
+    conn.commit()
+    conn.close()
+
+
+def run(mode: str, writers: int, readers: int, seconds: float):
+    connect = legacy_connection if mode == "legacy" else database.get_db_connection
+    stop = threading.Event()
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    counts_lock = threading.Lock()
+
+    def bump(key):
+        with counts_lock:
+            counts[key] += 1
+
+    def writer(worker_id):
+        n = 0
+        while not stop.is_set():
+            try:
+                conn = connect()
+                conn.execute(
+                    "INSERT INTO transcript_chunk (answer_id, timestamp, text, is_final) VALUES (?, ?, ?, ?)",
+                    (worker_id, time.time(), f"chunk {n} from writer {worker_id}", n % 4 == 0),
+                )
+                conn.commit()
+                conn.close()
+                bump("writes")
+            except sqlite3.OperationalError:
+                bump("errors")
+            n += 1
+
+    def reader():
+        while not stop.is_set():
+            try:
+                conn = connect()
+                conn.execute(READ_SQL).fetchall()
+                conn.close()
+                bump("reads")
+            except sqlite3.OperationalError:
+                bump("errors")
+
+    threads = [threading.Thread(target=writer, args=(w,)) for w in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    return {k: v / seconds for k, v in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    original_path = database.DB_PATH
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("legacy", "pooled"):
+            database.DB_PATH = os.path.join(tmp, f"bench_{mode}.db")
+            database.init_db()
+            database.close_all_connections()
+            if mode == "legacy":
+                # The legacy setup ran with the default rollback journal
+                sqlite3.connect(database.DB_PATH).execute("PRAGMA journal_mode = DELETE").fetchone()
+            seed()
+            results[mode] = run(mode, args.writers, args.readers, args.seconds)
+            database.close_all_connections()
+    database.DB_PATH = original_path
+
+    print(f"\n{args.writers} writers / {args.readers} readers, {args.seconds:.0f}s per mode")
+    print(f"{'mode':<8} {'reads/s':>10} {'writes/s':>10} {'errors/s':>10}")
+    for mode, r in results.items():
+        print(f"{mode:<8} {r['reads']:>10.0f} {r['writes']:>10.0f} {r['errors']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Serialization and wire-size benchmark for the two heaviest JSON responses.
+
+Compares FastAPI's previous path (jsonable_encoder + stdlib json) with the
+orjson default response class, and reports bytes on the wire for identity,
+gzip and (if installed) brotli:
+
+- question: the /api/interviews/{id}/questions/generate payload, with a random
+  MP3-sized blob standing in for the TTS audio (the route itself needs Gemini);
+- report: /api/assessments/{id} for a seeded completed interview, built with
+  reports.build_report and also fetched end to end through the app.
+
+Usage:
+    python benchmarks/bench_response_encoding.py [--audio-kb 300] [--answers 10] [--segments 80] [--repeat 50]
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+
+import database
+import encoding
+import reports
+
+
+def stdlib_render(content) -> bytes:
+    """What JSONResponse did before: jsonable_encoder, then json.dumps"""
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def orjson_render(content) -> bytes:
+    return encoding.FastJSONResponse(jsonable_encoder(content)).body
+
+
+def median_ms(func, content, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(content)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def question_payload(audio_kb: int) -> dict:
+    return {
+        "question": {
+            "id": 1, "seq": 1, "text": "Tell me about a time you handled a difficult customer.",
+            "audio": base64.b64encode(os.urandom(audio_kb * 1024)).decode(),
+            "question_number": 1, "total_questions": 5, "question_type": "resume",
+        }
+    }
+
+
+def seed_report(answers: int, segments: int) -> int:
+    conn = database.get_db_connection()
+    conn.execute("INSERT INTO jobs (title, location, job_type, experience_required, description) VALUES ('Telesales', 'Remote', 'Full-time', '1', 'd')")
+    candidate_id = conn.execute("INSERT INTO candidates (name, email, resume_path) VALUES ('Bench', 'bench@example.com', 'r')").lastrowid
+    application_id = conn.execute("INSERT INTO applications (candidate_id, job_id, match_score) VALUES (?, 1, 72)", (candidate_id,)).lastrowid
+    notes = json.dumps({"overall_feedback": "Solid answers. " * 20, "detailed_feedback": "Detail. " * 200,
+                        "key_strengths": ["Clear"] * 5, "areas_for_improvement": ["Pace"] * 5})
+    interview_id = conn.execute("INSERT INTO interview (status, application_id, notes) VALUES ('completed', ?, ?)",
+                                (application_id, notes)).lastrowid
+    for seq in range(1, answers + 1):
+        question_id = conn.execute("INSERT INTO question (interview_id, seq, text) VALUES (?, ?, ?)",
+                                   (interview_id, seq, f"Question {seq}: describe your experience with outbound calls.")).lastrowid
+        answer_id = conn.execute("INSERT INTO answer (question_id, interview_id, score, verdict, recording_path) VALUES (?, ?, 3.5, 'Good', ?)",
+                                 (question_id, interview_id, f"data/media/{interview_id}_{seq}.webm")).lastrowid
+        conn.executemany("INSERT INTO transcript_chunk (answer_id, timestamp, text, is_final) VALUES (?, ?, ?, 1)",
+                         [(answer_id, f"2025-01-01T00:{s // 60:02d}:{s % 60:02d}Z", f"so in my last role I called about forty leads a day {s}")
+                          for s in range(segments)])
+    conn.executemany("INSERT INTO proctor_event (interview_id, event_type, confidence, timestamp) VALUES (?, 'look_away', 0.8, ?)",
+                     [(interview_id, f"2025-01-01T00:00:{n:02d}Z") for n in range(40)])
+    conn.commit()
+    conn.close()
+    return interview_id
+
+
+def wire_sizes(body: bytes) -> dict:
+    sizes = {"identity": len(body), "gzip": len(gzip.compress(body, encoding.GZIP_LEVEL))}
+    if encoding.brotli is not None:
+        sizes["br"] = len(encoding.brotli.compress(body, quality=encoding.BROTLI_QUALITY))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--audio-kb", type=int, default=300)
+    parser.add_argument("--answers", type=int, default=10)
+    parser.add_argument("--segments", type=int, default=80)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    original_path = database.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, "bench_encoding.db")
+        database.init_db()
+        interview_id = seed_report(args.answers, args.segments)
+        conn = database.get_db_connection()
+        report = reports.build_report(interview_id, *reports.load_report_rows(conn, interview_id))
+        conn.close()
+
+        payloads = {"question": question_payload(args.audio_kb), "report": report}
+        print(f"\n{'payload':<10} {'stdlib ms':>10} {'orjson ms':>10} " + " ".join(f"{c:>10}" for c in wire_sizes(b"").keys()))
+        for name, content in payloads.items():
+            assert json.loads(stdlib_render(content)) == json.loads(orjson_render(content))
+            stdlib_ms = median_ms(stdlib_render, content, args.repeat)
+            orjson_ms = median_ms(orjson_render, content, args.repeat)
+            sizes = wire_sizes(orjson_render(content))
+            print(f"{name:<10} {stdlib_ms:>10.3f} {orjson_ms:>10.3f} " + " ".join(f"{s:>10}" for s in sizes.values()))
+
+        import main as app_module
+        from fastapi.testclient import TestClient
+        with TestClient(app_module.app) as client:
+            print(f"\nGET /api/assessments/{interview_id} on the wire")
+            for accept in ("identity", "gzip", "br, gzip"):
+                response = client.get(f"/api/assessments/{interview_id}", headers={"Accept-Encoding": accept})
+                print(f"  Accept-Encoding: {accept:<10} -> {response.headers.get('content-encoding', 'identity'):<8} "
+                      f"{response.num_bytes_downloaded} bytes")
+        database.shutdown_executor()
+        database.close_all_connections()
+    database.DB_PATH = original_path
+
+
+if __name__ == "__main__":
+    main()
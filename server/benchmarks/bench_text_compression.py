@@ -0,0 +1,170 @@
+"""
+Database size and list latency with the large text columns compressed.
+
+Seeds candidates with synthetic resumes, applications with match explanations
+and completed interviews with feedback notes and per-answer score breakdowns,
+all written as plain text the way rows were stored before compression. The
+same database is then measured in three states:
+
+- text: as seeded;
+- zlib: repacked with plain zlib (what the migration backfill does);
+- dictionary: after `maintenance.py train-dictionaries` (zstd if installed).
+
+For each state it reports the vacuumed file size, the bytes held by the four
+columns, and median latency of GET /api/candidates and /api/assessments (the
+response cache is cleared before every request).
+
+Usage:
+    python benchmarks/bench_text_compression.py [--candidates 2000] [--repeat 30]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import maintenance
+import textcodec
+
+SKILLS = ["Python", "SQL", "Excel", "Salesforce", "customer service", "cold calling", "negotiation",
+          "CRM", "lead generation", "Java", "team leadership", "data analysis", "Tamil", "Hindi", "English"]
+ROLES = ["Telesales Executive", "Customer Support Associate", "Inside Sales Representative",
+         "Business Development Executive", "Software Engineer", "Team Lead"]
+COMPANIES = ["Infosys", "TCS", "Wipro", "HDFC Bank", "Zoho", "Freshworks", "Airtel", "Reliance Retail"]
+DUTIES = [
+    "Handled {n} outbound calls per day and converted {p}% of qualified leads",
+    "Maintained customer records in {skill} and followed up on pending renewals",
+    "Resolved escalated customer complaints within agreed service levels",
+    "Trained {n} new joiners on product knowledge and call scripts",
+    "Achieved {p}% of the monthly revenue target for {q} consecutive quarters",
+    "Prepared weekly pipeline reports for the regional sales manager using {skill}",
+    "Collaborated with the operations team to reduce onboarding time by {p}%",
+]
+
+
+def resume(rng: random.Random, n: int) -> str:
+    lines = [f"Candidate {n}", f"Email: candidate{n}@example.com | Phone: +91 98{rng.randint(10000000, 99999999)}",
+             "", "PROFESSIONAL SUMMARY",
+             f"{rng.choice(ROLES)} with {rng.randint(1, 12)} years of experience in sales and customer service.",
+             "", "WORK EXPERIENCE"]
+    for _ in range(rng.randint(2, 4)):
+        lines.append(f"{rng.choice(ROLES)} - {rng.choice(COMPANIES)} ({rng.randint(2010, 2024)} - Present)")
+        for _ in range(rng.randint(3, 6)):
+            lines.append("- " + rng.choice(DUTIES).format(n=rng.randint(5, 120), p=rng.randint(10, 95),
+                                                          q=rng.randint(2, 6), skill=rng.choice(SKILLS)))
+    lines += ["", "SKILLS", ", ".join(rng.sample(SKILLS, 6)), "", "EDUCATION",
+              f"Bachelor of Commerce, University of Madras, {rng.randint(2005, 2020)}"]
+    return "\n".join(lines)
+
+
+def seed(candidates: int, rng: random.Random):
+    conn = database.get_db_connection()
+    conn.execute("INSERT INTO jobs (title, location, job_type, experience_required, description) VALUES ('Telesales', 'Chennai', 'Full-time', '1-3', 'd')")
+    for n in range(candidates):
+        candidate_id = conn.execute(
+            "INSERT INTO candidates (name, email, resume_path, resume_text, skills) VALUES (?, ?, 'r', ?, ?)",
+            (f"Candidate {n}", f"candidate{n}@example.com", resume(rng, n), json.dumps(rng.sample(SKILLS, 5)))
+        ).lastrowid
+        explanation = " ".join(
+            f"The candidate {rng.choice(['demonstrates', 'lists', 'mentions'])} {skill} which "
+            f"{rng.choice(['matches', 'partially matches', 'is relevant to'])} the job requirement."
+            for skill in rng.sample(SKILLS, 5)
+        )
+        application_id = conn.execute(
+            "INSERT INTO applications (candidate_id, job_id, match_score, match_explanation) VALUES (?, 1, ?, ?)",
+            (candidate_id, rng.randint(20, 95), explanation)
+        ).lastrowid
+        if n % 2:
+            continue
+        notes = json.dumps({
+            "overall_feedback": "The candidate communicated clearly and stayed calm under pressure. " * rng.randint(2, 4),
+            "detailed_feedback": " ".join(rng.choice(DUTIES).format(n=3, p=40, q=2, skill="CRM") for _ in range(8)),
+            "overall_score_percent": rng.randint(30, 95),
+            "key_strengths": rng.sample(SKILLS, 3), "areas_for_improvement": rng.sample(SKILLS, 2),
+        })
+        interview_id = conn.execute(
+            "INSERT INTO interview (status, application_id, notes, started_at) VALUES ('completed', ?, ?, CURRENT_TIMESTAMP)",
+            (application_id, notes)
+        ).lastrowid
+        for seq in range(1, 6):
+            question_id = conn.execute("INSERT INTO question (interview_id, seq, text) VALUES (?, ?, 'Q')",
+                                       (interview_id, seq)).lastrowid
+            breakdown = json.dumps({
+                "strengths": [f"Gave a concrete example involving {s} and explained the outcome" for s in rng.sample(SKILLS, 3)],
+                "weaknesses": [f"Could have quantified the impact of the {s} work more precisely" for s in rng.sample(SKILLS, 2)],
+            })
+            conn.execute("INSERT INTO answer (question_id, interview_id, score, verdict, auto_score_breakdown) VALUES (?, ?, 3.5, 'Good', ?)",
+                         (question_id, interview_id, breakdown))
+    conn.commit()
+    conn.close()
+
+
+def repack(conn):
+    textcodec.start_repack(conn)
+    conn.commit()
+    while textcodec.repack_batch(conn, 500):
+        conn.commit()
+    conn.commit()
+
+
+def measure(client, state: str, repeat: int):
+    conn = database.get_db_connection()
+    conn.execute("VACUUM")
+    column_bytes = sum(
+        conn.execute(f"SELECT COALESCE(SUM(length(CAST({column} AS BLOB))), 0) FROM {table}").fetchone()[0]
+        for table, column in textcodec.COMPRESSED_COLUMNS.items()
+    )
+    conn.close()
+    from response_cache import response_cache
+
+    timings = {}
+    for path in ("/api/candidates?limit=50", "/api/assessments?limit=50"):
+        samples = []
+        for _ in range(repeat):
+            response_cache.clear()
+            started = time.perf_counter()
+            assert client.get(path).status_code == 200
+            samples.append((time.perf_counter() - started) * 1000)
+        timings[path.split("?")[0]] = statistics.median(samples)
+    size = os.path.getsize(database.DB_PATH)
+    print(f"{state:<12} {size / 1024:>10.0f} {column_bytes / 1024:>12.0f} "
+          + " ".join(f"{ms:>16.2f}" for ms in timings.values()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--candidates", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    original_path = database.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, "bench_compression.db")
+        database.init_db()
+        seed(args.candidates, random.Random(7))
+
+        import main as app_module
+        from fastapi.testclient import TestClient
+        with TestClient(app_module.app) as client:
+            print(f"\n{'state':<12} {'file KiB':>10} {'columns KiB':>12} {'/api/candidates ms':>16} {'/api/assessments ms':>16}")
+            measure(client, "text", args.repeat)
+            repack(database.get_db_connection())
+            measure(client, "zlib", args.repeat)
+            trained, _ = maintenance.train_dictionaries(database.get_db_connection())
+            codec = "zstd" if textcodec.zstandard is not None else "zlib"
+            measure(client, f"dict ({codec})", args.repeat)
+            print(f"\nDictionaries trained for: {', '.join(trained)}")
+        database.shutdown_executor()
+        database.close_all_connections()
+    database.DB_PATH = original_path
+
+
+if __name__ == "__main__":
+    main()
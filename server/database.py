@@ -1,161 +1,410 @@
 import sqlite3
 import os
+import asyncio
+import functools
+import random
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Iterable, List, Optional
+from urllib.parse import quote
+
+import migrations
+import textcodec
 
 DB_PATH = "interviews.db"
 
+# Connection tuning (override via environment)
+BUSY_TIMEOUT_MS = int(os.getenv('DB_BUSY_TIMEOUT_MS', 5000))
+CACHE_SIZE_KIB = int(os.getenv('DB_CACHE_SIZE_KIB', 16384))
+MMAP_SIZE_BYTES = int(os.getenv('DB_MMAP_SIZE_BYTES', 128 * 1024 * 1024))
+SYNCHRONOUS = os.getenv('DB_SYNCHRONOUS', 'NORMAL')
+LOCK_RETRIES = int(os.getenv('DB_LOCK_RETRIES', 5))
+LOCK_RETRY_BASE_DELAY = 0.05
+DB_EXECUTOR_WORKERS = int(os.getenv('DB_EXECUTOR_WORKERS', 4))
+# One file per month of archived transcript chunks and proctor events
+PARTITION_DIR = os.getenv('ARCHIVE_DIR', 'data/archive')
+# Partitions attached to one connection at most; SQLite's compiled-in ATTACH limit is 10
+MAX_ATTACHED_PARTITIONS = int(os.getenv('DB_MAX_ATTACHED_PARTITIONS', 10))
+
+
+def is_lock_error(error: Exception) -> bool:
+    """True if the error is SQLite lock contention (SQLITE_BUSY / SQLITE_LOCKED)"""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    message = str(error).lower()
+    return "database is locked" in message or "database table is locked" in message
+
+
+def retry_on_lock(func, *args, **kwargs):
+    """
+    Call func, retrying with jittered exponential backoff while the database is locked.
+    busy_timeout already waits inside SQLite; this covers the cases it cannot
+    (e.g. a WAL checkpoint or a writer holding the lock past the timeout).
+    """
+    for attempt in range(LOCK_RETRIES + 1):
+        try:
+            return func(*args, **kwargs)
+        except sqlite3.OperationalError as e:
+            if not is_lock_error(e) or attempt == LOCK_RETRIES:
+                raise
+            delay = LOCK_RETRY_BASE_DELAY * (2 ** attempt)
+            time.sleep(delay + random.uniform(0, delay))
+
+
+class RetryingCursor(sqlite3.Cursor):
+    """Cursor whose statements are retried on lock contention"""
+
+    def execute(self, sql, parameters=()):
+        return retry_on_lock(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        # Materialize so a retry can replay the parameters
+        return retry_on_lock(super().executemany, sql, list(seq_of_parameters))
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    SQLite connection owned by the pool.
+    close() hands the connection back (rolling back uncommitted work) instead of
+    closing it, so existing `conn.close()` calls in the routes keep working.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.disposed = False
+        self.file_id = None
+        # Attached month partitions, least recently used first: schema -> writable
+        self.partitions = OrderedDict()
+
+    def cursor(self, factory=RetryingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        retry_on_lock(super().commit)
+
+    def close(self):
+        if not self.disposed and self.in_transaction:
+            self.rollback()
+
+    def dispose(self):
+        """Really close the underlying connection"""
+        if not self.disposed:
+            self.disposed = True
+            super().close()
+
+
+def _file_id(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+
+def _apply_pragmas(conn: sqlite3.Connection):
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    # Only takes effect on a brand-new file; lets maintenance reclaim space without a full VACUUM
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute(f"PRAGMA synchronous = {SYNCHRONOUS}")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KIB}")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE_BYTES}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    # Deleting a candidate, application or interview cascades to its rows (migration 17)
+    conn.execute("PRAGMA foreign_keys = ON")
+
+
+class ConnectionPool:
+    """
+    Keeps one tuned connection per (thread, database path) and reuses it across requests.
+    Connections are opened lazily in WAL mode, and reopened if the database file
+    is removed or replaced underneath them.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all = weakref.WeakSet()
+
+    def open(self, path: str, query_only: bool = False) -> PooledConnection:
+        """Open a new tuned connection that is not cached in the pool"""
+        conn = sqlite3.connect(
+            path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            factory=PooledConnection,
+            check_same_thread=False,
+            # Partitions are attached with file: URIs (mode=ro)
+            uri=True,
+        )
+        # Rows come back with compressed text columns already unpacked
+        textcodec.register(conn)
+        retry_on_lock(_apply_pragmas, conn)
+        if query_only:
+            conn.execute("PRAGMA query_only = ON")
+        conn.file_id = _file_id(path)
+        with self._lock:
+            self._all.add(conn)
+        return conn
+
+    def get(self, path: str, query_only: bool = False) -> PooledConnection:
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+
+        conn = connections.get(path)
+        if conn is not None and (conn.disposed or conn.file_id != _file_id(path)):
+            conn.dispose()
+            conn = None
+        if conn is None:
+            conn = connections[path] = self.open(path, query_only)
+        elif conn.in_transaction:
+            # Leftover work from a caller that never committed or closed
+            conn.rollback()
+        return conn
+
+    def close_all(self):
+        """Dispose every pooled connection (all threads); they reopen on next use"""
+        with self._lock:
+            connections = list(self._all)
+            self._all = weakref.WeakSet()
+        for conn in connections:
+            conn.dispose()
+
+
+pool = ConnectionPool()
+
+
 def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-def init_db():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Jobs
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS jobs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        title TEXT NOT NULL,
-        location TEXT NOT NULL,
-        job_type TEXT NOT NULL,
-        experience_required TEXT NOT NULL,
-        description TEXT NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        is_active BOOLEAN DEFAULT 1
-    )
-    ''')
-    
-    # Candidates
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS candidates (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        email TEXT NOT NULL UNIQUE,
-        phone TEXT,
-        resume_path TEXT NOT NULL,
-        resume_text TEXT,
-        skills TEXT,
-        experience_years INTEGER,
-        education TEXT,
-        work_history TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
-    
-    # Applications
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS applications (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        candidate_id INTEGER NOT NULL,
-        job_id INTEGER NOT NULL,
-        match_score REAL NOT NULL,
-        match_explanation TEXT,
-        status TEXT DEFAULT 'pending',
-        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY(candidate_id) REFERENCES candidates(id),
-        FOREIGN KEY(job_id) REFERENCES jobs(id)
-    )
-    ''')
-    
-    # Interviews (existing table)
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS interview (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        candidate_name TEXT,
-        candidate_email TEXT,
-        started_at TIMESTAMP,
-        ended_at TIMESTAMP,
-        status TEXT DEFAULT 'in_progress',
-        total_score REAL,
-        notes TEXT
+    """Return this thread's pooled connection to DB_PATH"""
+    return pool.get(DB_PATH)
+
+
+def close_all_connections():
+    pool.close_all()
+
+
+# --- Month partitions ---
+# Transcript chunks and proctor events of archived interviews live in one file
+# per month (archive.py moves them there). They are reached through an ordinary
+# pooled connection: attach_partition ATTACHes a month's file on first use, as
+# schema p<YYYY>_<MM>, and it stays attached until SQLite's ATTACH limit makes
+# room for another month, least recently used first. Reads attach read-only;
+# only the archive job and deletes attach a partition writable, and detach it
+# again when done.
+
+PARTITIONED_COLUMNS = {
+    "transcript_chunk": "interview_id, answer_id, timestamp, timestamp_ms, text, is_final",
+    "proctor_event": "id, interview_id, question_id, timestamp, timestamp_ms, event_type, confidence, frame_path, notes",
+}
+# The main database's rows in the partition layout (its transcript chunks only know their answer)
+_MAIN_ROWS = {
+    "transcript_chunk": '''SELECT a.interview_id, t.answer_id, t.timestamp, t.timestamp_ms, t.text, t.is_final
+        FROM main.transcript_chunk t JOIN main.answer a ON a.id = t.answer_id''',
+    "proctor_event": f"SELECT {PARTITIONED_COLUMNS['proctor_event']} FROM main.proctor_event",
+}
+# A partition's rows; its transcript chunks are packed per answer (see archive.py),
+# so the view needs the unpack_text() of a pooled connection
+_chunk = "json_extract(c.value, '$[0]')"
+_PARTITION_ROWS = {
+    "transcript_chunk": f'''SELECT t.interview_id, t.answer_id, {_chunk} AS timestamp,
+        {migrations.epoch_ms_sql(_chunk)} AS timestamp_ms,
+        json_extract(c.value, '$[1]') AS text, json_extract(c.value, '$[2]') AS is_final
+        FROM {{schema}}.transcript_answer t, json_each(unpack_text(t.chunks)) c''',
+    "proctor_event": f"SELECT {PARTITIONED_COLUMNS['proctor_event']} FROM {{schema}}.proctor_event",
+}
+
+
+def partition_path(month: str) -> str:
+    return os.path.join(PARTITION_DIR, f"interviews-{month}.db")
+
+
+def partition_schema(month: str) -> str:
+    """Schema name a month's partition is attached as"""
+    if not re.fullmatch(r"\d{4}-\d{2}", month or ""):
+        raise ValueError(f"Invalid partition month: {month!r}")
+    return "p" + month.replace("-", "_")
+
+
+def partition_months() -> List[str]:
+    """Months that have a partition file, oldest first"""
+    if not os.path.isdir(PARTITION_DIR):
+        return []
+    return sorted(
+        name[len("interviews-"):-len(".db")] for name in os.listdir(PARTITION_DIR)
+        if re.fullmatch(r"interviews-\d{4}-\d{2}\.db", name)
     )
-    ''')
-    
-    # Add application_id column to interview table if it doesn't exist
+
+
+def max_partitions(conn) -> int:
+    """How many partitions a connection can have attached at once"""
+    # Connection.getlimit is new in Python 3.11; the image runs 3.9
+    if hasattr(conn, "getlimit"):
+        return min(MAX_ATTACHED_PARTITIONS, conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED))
+    return MAX_ATTACHED_PARTITIONS
+
+
+def _detach(conn, schema: str):
+    conn.execute(f"DETACH DATABASE {schema}")
+    del conn.partitions[schema]
+
+
+def attach_partition(conn, month: str, writable: bool = False) -> Optional[str]:
+    """
+    Attach month's partition to conn (once) and return its schema name, or None
+    when the month has no file; a writable attach creates it. Must be called
+    outside a transaction, as SQLite only attaches and detaches there.
+    """
+    schema = partition_schema(month)
+    attached = conn.partitions
+    if schema in attached:
+        if attached[schema] or not writable:
+            attached.move_to_end(schema)
+            return schema
+        _detach(conn, schema)
+
+    path = partition_path(month)
+    if writable:
+        os.makedirs(PARTITION_DIR, exist_ok=True)
+    elif not os.path.exists(path):
+        return None
+    while len(attached) >= max_partitions(conn):
+        _detach(conn, next(iter(attached)))
+    uri = f"file:{quote(path)}?mode={'rwc' if writable else 'ro'}"
+    conn.execute(f"ATTACH DATABASE ? AS {schema}", (uri,))
+    attached[schema] = writable
+    return schema
+
+
+def detach_partition(conn, month: str):
+    schema = partition_schema(month)
+    if schema in conn.partitions:
+        _detach(conn, schema)
+
+
+def partition_views(conn, months: Iterable[str], include_main: bool = True) -> List[str]:
+    """
+    (Re)create the temp views all_transcript_chunk and all_proctor_event as the
+    UNION ALL of the main tables (unless include_main is False) and the
+    partitions of months, attaching them. Reports spanning more months than
+    max_partitions() build the views once per group of months and add up the
+    results. Returns the months that have a partition.
+    """
+    months = list(dict.fromkeys(months))
+    if len(months) > max_partitions(conn):
+        raise ValueError(f"At most {max_partitions(conn)} partitions can be attached at once")
+    schemas = {month: attach_partition(conn, month) for month in months}
+    # Archive files from before partitions have no row tables until archive.upgrade_partitions runs
+    found = [
+        month for month, schema in schemas.items() if schema is not None and conn.execute(
+            f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = 'proctor_event'"
+        ).fetchone()
+    ]
+    for table in PARTITIONED_COLUMNS:
+        parts = [_MAIN_ROWS[table]] if include_main else []
+        parts += [_PARTITION_ROWS[table].format(schema=schemas[month]) for month in found]
+        if not parts:
+            # Same columns, no rows
+            parts = [f"{_MAIN_ROWS[table]} WHERE 0"]
+        conn.execute(f"DROP VIEW IF EXISTS temp.all_{table}")
+        conn.execute(f"CREATE TEMP VIEW all_{table} AS " + "\nUNION ALL\n".join(parts))
+    return found
+
+
+# --- Async access ---
+# Route handlers are `async def`; running sqlite3 calls on the event loop would
+# stall every WebSocket and request on the worker. All database work goes through
+# a small dedicated executor instead, each thread holding its own pooled connection.
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db")
+    return _executor
+
+
+def _call_with_connection(connect, func, args, kwargs):
+    conn = connect()
     try:
-        cursor.execute('ALTER TABLE interview ADD COLUMN application_id INTEGER')
-        print("Added application_id column to interview table")
-    except sqlite3.OperationalError as e:
-        if "duplicate column name" in str(e).lower():
-            print("application_id column already exists")
-        else:
-            raise
-    
-    # Questions
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS question (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        interview_id INTEGER,
-        seq INTEGER,
-        text TEXT,
-        prompt_source TEXT,
-        asked_at TIMESTAMP,
-        FOREIGN KEY(interview_id) REFERENCES interview(id)
-    )
-    ''')
-    
-    # Answers
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS answer (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        question_id INTEGER,
-        interview_id INTEGER,
-        recording_path TEXT,
-        cropped_recording_path TEXT,
-        start_time TIMESTAMP,
-        end_time TIMESTAMP,
-        duration_seconds REAL,
-        score REAL,
-        auto_score_breakdown TEXT,
-        verdict TEXT,
-        FOREIGN KEY(question_id) REFERENCES question(id),
-        FOREIGN KEY(interview_id) REFERENCES interview(id)
-    )
-    ''')
-    
-    # Transcript Chunks
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS transcript_chunk (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        answer_id INTEGER,
-        timestamp TIMESTAMP,
-        text TEXT,
-        is_final BOOLEAN,
-        FOREIGN KEY(answer_id) REFERENCES answer(id)
-    )
-    ''')
-    
-    # Proctor Events
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS proctor_event (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        interview_id INTEGER,
-        question_id INTEGER,
-        timestamp TIMESTAMP,
-        event_type TEXT,
-        confidence REAL,
-        frame_path TEXT,
-        notes TEXT,
-        FOREIGN KEY(interview_id) REFERENCES interview(id)
+        return func(conn, *args, **kwargs)
+    finally:
+        # Releases to the pool; anything left uncommitted is rolled back
+        conn.close()
+
+
+async def run_db(func, *args, **kwargs):
+    """
+    Run func(conn, *args, **kwargs) on the database executor and await its result.
+    func receives a pooled connection and must commit its own writes; exceptions
+    (including HTTPException) propagate to the awaiting coroutine.
+    """
+    return await run_with_connection(get_db_connection, func, *args, **kwargs)
+
+
+async def run_with_connection(connect, func, *args, **kwargs):
+    """run_db with the connection taken from connect() on the executor thread"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_executor(), functools.partial(_call_with_connection, connect, func, args, kwargs)
     )
-    ''')
-    
-    # Create indexes for performance
+
+
+def shutdown_executor():
+    """Wait for queued database work, then stop the executor threads"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+def init_db(background_backfill: bool = False):
+    """
+    Bring the schema up to date. When it is already current this is a single
+    version query. Pending data backfills run in small batches, either inline or
+    (for the server) on a background thread so startup is not blocked.
+    """
+    # Dedicated connection: schema setup runs once and should not stay pooled
+    conn = pool.open(DB_PATH)
     try:
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_candidate_email ON candidates(email)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_application_job ON applications(job_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_application_candidate ON applications(candidate_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_interview_application ON interview(application_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_active ON jobs(is_active)')
-        print("Created database indexes")
-    except sqlite3.OperationalError as e:
-        print(f"Index creation note: {e}")
-    
-    conn.commit()
-    conn.close()
+        if not migrations.needs_work(conn):
+            return
+        # Table rebuilds drop the old table, which must not cascade
+        conn.execute("PRAGMA foreign_keys = OFF")
+        migrations.apply_migrations(conn)
+        if not background_backfill:
+            migrations.run_backfills(conn)
+    finally:
+        conn.dispose()
+
+    if background_backfill:
+        threading.Thread(target=_run_backfills, args=(DB_PATH,), name="db-backfill", daemon=True).start()
     print("Database initialization complete")
 
+
+def _run_backfills(path: str):
+    conn = pool.open(path)
+    try:
+        migrations.run_backfills(conn)
+    except Exception as e:
+        print(f"Background backfill stopped: {e}")
+    finally:
+        conn.dispose()
+
+
 if __name__ == "__main__":
     init_db()
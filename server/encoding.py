@@ -0,0 +1,180 @@
+"""
+Response encoding
+JSON bodies are rendered with orjson (the app's default response class and the
+stored report snapshots share dumps()), and responses above COMPRESSION_MIN_BYTES
+are compressed with brotli or gzip according to the client's Accept-Encoding.
+
+brotli is optional; without it only gzip is offered.
+"""
+
+import os
+import zlib
+from typing import Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', 1024))
+GZIP_LEVEL = int(os.getenv('GZIP_LEVEL', 6))
+# 11 is brotli's archival setting and far too slow per request
+BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', 5))
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+def dumps(content) -> bytes:
+    """UTF-8 JSON, compact, like json.dumps(ensure_ascii=False, separators=(",", ":"))"""
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: orjson instead of the stdlib encoder"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int = GZIP_LEVEL):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._z.compress(data)
+
+    def finish(self) -> bytes:
+        return self._z.flush()
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self, quality: int = BROTLI_QUALITY):
+        self._b = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._b.process(data)
+
+    def finish(self) -> bytes:
+        return self._b.finish()
+
+
+def negotiate(accept_encoding: str, brotli_available: bool = brotli is not None) -> Optional[str]:
+    """Preferred coding ("br" or "gzip") the client accepts, or None for identity"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip()] = q
+    wildcard = accepted.get("*", 0.0)
+    offered = ("br", "gzip") if brotli_available else ("gzip",)
+    ranked = [(accepted.get(coding, wildcard), -i, coding) for i, coding in enumerate(offered)]
+    q, _, coding = max(ranked)
+    return coding if q > 0 else None
+
+
+def encoder_for(coding: str):
+    return BrotliEncoder() if coding == "br" else GzipEncoder()
+
+
+class CompressionMiddleware:
+    """
+    Negotiated compression for JSON and text responses. Whole bodies below the
+    size threshold are sent as-is; streamed bodies are always compressed.
+    Strong ETags become weak on compressed responses, since the bytes differ
+    per coding while If-None-Match still compares weakly.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+        coding = negotiate(accept) if accept else None
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        encoder = None
+        passthrough = False
+
+        async def compressing_send(message):
+            nonlocal start, encoder, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            if passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                headers = {k.lower(): v for k, v in start["headers"]}
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                if (b"content-encoding" in headers
+                        or not content_type.startswith(COMPRESSIBLE_TYPES)
+                        or (not more_body and len(body) < self.minimum_size)):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                encoder = encoder_for(coding)
+                start["headers"] = self._encoded_headers(start["headers"], coding)
+                if not more_body:
+                    body = encoder.compress(body) + encoder.finish()
+                    start["headers"].append((b"content-length", str(len(body)).encode()))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(start)
+
+            chunk = encoder.compress(body)
+            if not more_body:
+                chunk += encoder.finish()
+            if chunk or not more_body:
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, compressing_send)
+
+    @staticmethod
+    def _encoded_headers(headers, coding: str):
+        encoded = []
+        vary = None
+        for name, value in headers:
+            lower = name.lower()
+            if lower == b"content-length":
+                continue
+            if lower == b"etag" and not value.startswith(b"W/"):
+                value = b"W/" + value
+            if lower == b"vary":
+                vary = value
+                continue
+            encoded.append((name, value))
+        vary = b"Accept-Encoding" if vary is None else vary + b", Accept-Encoding"
+        encoded.append((b"vary", vary))
+        encoded.append((b"content-encoding", coding.encode()))
+        return encoded
@@ -0,0 +1,245 @@
+"""
+Bulk exports for offline analysis
+Candidates, applications and assessments can be exported as NDJSON, CSV or
+Parquet, filtered by job and date range. Rows are read in keyset-paged batches
+of EXPORT_BATCH_SIZE (WHERE id > last id ORDER BY id), and each batch is
+encoded and handed on before the next is read, so memory stays constant
+however many rows match. Each batch is its own short read, so a long export
+never pins a WAL snapshot or a pooled connection between batches.
+
+Parquet needs the optional pyarrow package and is written one row group per batch.
+"""
+
+import csv
+import io
+import os
+from datetime import date, datetime, time, timedelta
+from typing import Iterator, Optional
+
+import encoding
+from database import run_db
+from migrations import to_epoch_ms
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 500))
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# entity -> (SELECT ... FROM ..., id column, epoch-ms timestamp column, job filter, [(column, type)])
+EXPORTS = {
+    "candidates": (
+        '''SELECT c.id, c.name, c.email, c.phone, c.experience_years, c.skills, c.education,
+                  c.work_history, c.created_at
+           FROM candidates c''',
+        "c.id", "c.created_ms", "c.id IN (SELECT candidate_id FROM applications WHERE job_id = ?)",
+        [("id", "int"), ("name", "str"), ("email", "str"), ("phone", "str"), ("experience_years", "float"),
+         ("skills", "str"), ("education", "str"), ("work_history", "str"), ("created_at", "str")],
+    ),
+    "applications": (
+        '''SELECT a.id, a.candidate_id, c.name as candidate_name, c.email as candidate_email,
+                  a.job_id, j.title as job_title, a.match_score, a.status, a.pipeline_status, a.applied_at
+           FROM applications a
+           LEFT JOIN candidates c ON c.id = a.candidate_id
+           LEFT JOIN jobs j ON j.id = a.job_id''',
+        "a.id", "a.applied_ms", "a.job_id = ?",
+        [("id", "int"), ("candidate_id", "int"), ("candidate_name", "str"), ("candidate_email", "str"),
+         ("job_id", "int"), ("job_title", "str"), ("match_score", "float"), ("status", "str"),
+         ("pipeline_status", "str"), ("applied_at", "str")],
+    ),
+    "assessments": (
+        '''SELECT i.id, i.application_id, a.job_id, j.title as job_title,
+                  COALESCE(c.name, i.candidate_name) as candidate_name,
+                  COALESCE(c.email, i.candidate_email) as candidate_email,
+                  i.status, i.pipeline_status, i.started_at, i.ended_at, i.total_score,
+                  i.question_count, COALESCE(s.answer_count, 0) as answer_count,
+                  COALESCE(s.score_sum, 0) as score_sum
+           FROM interview i
+           LEFT JOIN applications a ON a.id = i.application_id
+           LEFT JOIN jobs j ON j.id = a.job_id
+           LEFT JOIN candidates c ON c.id = a.candidate_id
+           LEFT JOIN interview_summary s ON s.interview_id = i.id''',
+        "i.id", "i.started_ms", "i.application_id IN (SELECT id FROM applications WHERE job_id = ?)",
+        [("id", "int"), ("application_id", "int"), ("job_id", "int"), ("job_title", "str"),
+         ("candidate_name", "str"), ("candidate_email", "str"), ("status", "str"), ("pipeline_status", "str"),
+         ("started_at", "str"), ("ended_at", "str"), ("total_score", "float"), ("question_count", "int"),
+         ("answer_count", "int"), ("score_sum", "float")],
+    ),
+}
+
+
+class ExportFilter:
+    """Job and inclusive date range (YYYY-MM-DD) an export is limited to"""
+
+    def __init__(self, job_id: Optional[int] = None, start: Optional[str] = None, end: Optional[str] = None):
+        self.job_id = job_id
+        # fromisoformat raises ValueError for malformed dates
+        self.start = date.fromisoformat(start) if start else None
+        self.end = date.fromisoformat(end) if end else None
+        if self.start and self.end and self.start > self.end:
+            raise ValueError("start must not be after end")
+
+    def where(self, entity: str):
+        """(conditions, params) for entity's export query"""
+        _, _, ts_column, job_condition, _ = EXPORTS[entity]
+        conditions, params = [], []
+        if self.job_id is not None:
+            conditions.append(job_condition)
+            params.append(self.job_id)
+        if self.start:
+            conditions.append(f"{ts_column} >= ?")
+            params.append(to_epoch_ms(datetime.combine(self.start, time.min)))
+        if self.end:
+            conditions.append(f"{ts_column} < ?")
+            params.append(to_epoch_ms(datetime.combine(self.end + timedelta(days=1), time.min)))
+        return conditions, params
+
+
+def fetch_batch(conn, entity: str, export_filter: ExportFilter, after_id: int = 0,
+                limit: int = EXPORT_BATCH_SIZE) -> list:
+    """Up to limit rows of entity with id > after_id, in id order"""
+    select, id_column, _, _, _ = EXPORTS[entity]
+    conditions, params = export_filter.where(entity)
+    conditions.append(f"{id_column} > ?")
+    return conn.execute(
+        f"{select} WHERE {' AND '.join(conditions)} ORDER BY {id_column} LIMIT ?",
+        (*params, after_id, limit)
+    ).fetchall()
+
+
+def iter_batches(conn, entity: str, export_filter: ExportFilter, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[list]:
+    """Every matching row, batch by batch, on one connection (for the CLI)"""
+    after_id = 0
+    while True:
+        batch = fetch_batch(conn, entity, export_filter, after_id, batch_size)
+        if not batch:
+            return
+        yield batch
+        after_id = batch[-1]['id']
+
+
+async def stream_batches(entity: str, export_filter: ExportFilter, batch_size: int = EXPORT_BATCH_SIZE):
+    """iter_batches for the server: each batch is one run_db call"""
+    after_id = 0
+    while True:
+        batch = await run_db(fetch_batch, entity, export_filter, after_id, batch_size)
+        if not batch:
+            return
+        yield batch
+        after_id = batch[-1]['id']
+
+
+class NdjsonEncoder:
+    def __init__(self, columns):
+        self.columns = [name for name, _ in columns]
+
+    def header(self) -> bytes:
+        return b""
+
+    def rows(self, batch) -> bytes:
+        return b"".join(encoding.dumps({c: row[c] for c in self.columns}) + b"\n" for row in batch)
+
+    def footer(self) -> bytes:
+        return b""
+
+
+class CsvEncoder:
+    def __init__(self, columns):
+        self.columns = [name for name, _ in columns]
+
+    def _encode(self, rows) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+
+    def header(self) -> bytes:
+        return self._encode([self.columns])
+
+    def rows(self, batch) -> bytes:
+        return self._encode([tuple(row[c] for c in self.columns) for row in batch])
+
+    def footer(self) -> bytes:
+        return b""
+
+
+class _Drain(io.RawIOBase):
+    """Write-only sink whose bytes are taken out after every row group"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+class ParquetEncoder:
+    TYPES = {"int": "int64", "float": "float64", "str": "string"}
+
+    def __init__(self, columns):
+        self.columns = [name for name, _ in columns]
+        self.schema = pyarrow.schema([(name, self.TYPES[kind]) for name, kind in columns])
+        self._sink = _Drain()
+        self._writer = pyarrow.parquet.ParquetWriter(self._sink, self.schema)
+
+    def header(self) -> bytes:
+        return self._sink.take()
+
+    def rows(self, batch) -> bytes:
+        table = pyarrow.Table.from_pydict({c: [row[c] for row in batch] for c in self.columns}, schema=self.schema)
+        self._writer.write_table(table)
+        return self._sink.take()
+
+    def footer(self) -> bytes:
+        self._writer.close()
+        return self._sink.take()
+
+
+def encoder_for(entity: str, fmt: str):
+    """Encoder for an export; ValueError for unknown entities/formats or parquet without pyarrow"""
+    if entity not in EXPORTS:
+        raise ValueError(f"unknown export '{entity}' (expected one of {', '.join(EXPORTS)})")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"unknown format '{fmt}' (expected one of {', '.join(EXPORT_FORMATS)})")
+    if fmt == "parquet" and pyarrow is None:
+        raise ValueError("parquet export needs the optional pyarrow package, which is not installed; "
+                         "install it or use format ndjson or csv")
+    columns = EXPORTS[entity][4]
+    return {"ndjson": NdjsonEncoder, "csv": CsvEncoder, "parquet": ParquetEncoder}[fmt](columns)
+
+
+def export_chunks(conn, encoder, entity: str, export_filter: ExportFilter,
+                  batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """Encoded export, one chunk per batch (for the CLI)"""
+    yield encoder.header()
+    for batch in iter_batches(conn, entity, export_filter, batch_size):
+        yield encoder.rows(batch)
+    yield encoder.footer()
+
+
+async def stream_export(encoder, entity: str, export_filter: ExportFilter, batch_size: int = EXPORT_BATCH_SIZE):
+    """Encoded export for a StreamingResponse, one chunk per batch"""
+    yield encoder.header()
+    async for batch in stream_batches(entity, export_filter, batch_size):
+        yield encoder.rows(batch)
+    yield encoder.footer()
@@ -0,0 +1,72 @@
+"""
+Batched loaders for interview child rows
+Each loader fetches answers, transcripts or proctor events for any number of
+interviews in one query (per MAX_IDS_PER_QUERY ids) and groups them in memory,
+so report pages cost the same few queries however many questions they have.
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+# Stay well under SQLite's bound-parameter limit
+MAX_IDS_PER_QUERY = 500
+
+
+def _chunks(ids: Iterable[int]):
+    ids = list(dict.fromkeys(ids))
+    for start in range(0, len(ids), MAX_IDS_PER_QUERY):
+        yield ids[start:start + MAX_IDS_PER_QUERY]
+
+
+def _placeholders(ids) -> str:
+    return ", ".join("?" for _ in ids)
+
+
+def answers_by_question(conn, interview_ids: Iterable[int]) -> Dict[int, dict]:
+    """First answer (lowest id) of every question in the interviews, keyed by question_id"""
+    answers = {}
+    for ids in _chunks(interview_ids):
+        for row in conn.execute(
+            f"SELECT * FROM answer WHERE interview_id IN ({_placeholders(ids)}) ORDER BY id", ids
+        ):
+            answers.setdefault(row['question_id'], dict(row))
+    return answers
+
+
+def transcripts_by_answer(conn, interview_ids: Iterable[int], final_only: bool = False) -> Dict[int, List[dict]]:
+    """Transcript chunks (timestamp, text, is_final) of every answer in the interviews, in timestamp order"""
+    transcripts = defaultdict(list)
+    final = " AND t.is_final = 1" if final_only else ""
+    for ids in _chunks(interview_ids):
+        for row in conn.execute(f'''
+            SELECT t.answer_id, t.timestamp, t.text, t.is_final
+            FROM answer a
+            JOIN transcript_chunk t ON t.answer_id = a.id
+            WHERE a.interview_id IN ({_placeholders(ids)}){final}
+            ORDER BY a.id, t.timestamp_ms
+        ''', ids):
+            transcripts[row['answer_id']].append(
+                {"timestamp": row['timestamp'], "text": row['text'], "is_final": row['is_final']}
+            )
+    return dict(transcripts)
+
+
+def final_answer_texts(conn, interview_ids: Iterable[int]) -> Dict[int, str]:
+    """The final transcript of every answer in the interviews joined into one string, keyed by answer_id"""
+    return {
+        answer_id: ' '.join(chunk['text'] for chunk in chunks)
+        for answer_id, chunks in transcripts_by_answer(conn, interview_ids, final_only=True).items()
+    }
+
+
+def proctor_events_by_interview(conn, interview_ids: Iterable[int]) -> Dict[int, List[dict]]:
+    """Proctor events of the interviews in timestamp order, keyed by interview_id"""
+    events = defaultdict(list)
+    for ids in _chunks(interview_ids):
+        for row in conn.execute(f'''
+            SELECT * FROM proctor_event
+            WHERE interview_id IN ({_placeholders(ids)})
+            ORDER BY interview_id, timestamp_ms
+        ''', ids):
+            events[row['interview_id']].append(dict(row))
+    return dict(events)
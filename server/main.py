@@ -3,26 +3,85 @@ import json
 import asyncio
 import base64
 from typing import List, Optional
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, Form, HTTPException, BackgroundTasks
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, Form, HTTPException, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from datetime import datetime
-import sqlite3
-from database import get_db_connection, init_db
+from contextlib import asynccontextmanager
+from database import init_db, run_db, shutdown_executor
+from write_behind import write_buffer
+from replica import REPLICA_ENABLED, analytics_replica, run_analytics
+import archive
+import exports
+import media_gc
+import loaders
+import reports
+import rollups
+from sessions import live_sessions
+from encoding import CompressionMiddleware, FastJSONResponse
+from media_gc import media_sweeper
+import response_cache as conditional
+from response_cache import response_cache
+from migrations import ASSESSMENT_STATUSES, PIPELINE_STATUSES, utc_now
+from search import fts_match_query, index_candidate, parse_skill_filter, skill_filter_sql, unindex_candidate
+from textcodec import pack_column
+from pagination import MAX_PAGE_SIZE, clamp_limit, decode_cursor, next_cursor
 
 # Initialize DB
-init_db()
+init_db(background_backfill=True)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if REPLICA_ENABLED:
+        analytics_replica.start()
+    media_sweeper.start()
+    yield
+    media_sweeper.stop()
+    analytics_replica.stop()
+    write_buffer.stop()
+    shutdown_executor()
 
-# CORS
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+@app.middleware("http")
+async def conditional_get(request: Request, call_next):
+    """ETag / If-None-Match handling and body caching for the polled dashboard lists and details"""
+    tags = conditional.tags_for(request.url.path) if request.method == "GET" else None
+    if tags is None:
+        return await call_next(request)
+
+    key = f"{request.url.path}?{request.url.query}"
+    etag = response_cache.etag(key, tags)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if conditional.if_none_match(request.headers.get("if-none-match"), etag):
+        response_cache.not_modified()
+        return Response(status_code=304, headers=headers)
+
+    body = response_cache.lookup(key, etag)
+    if body is None:
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        if response_cache.etag(key, tags) != etag:
+            # A write landed while rendering; the body may predate it, so don't tag or keep it
+            return Response(content=body, media_type="application/json", headers={"Cache-Control": "no-cache"})
+        response_cache.store(key, etag, body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# br/gzip for large bodies, including cached ones
+app.add_middleware(CompressionMiddleware)
+
+# CORS (registered last so it is outermost and also covers 304s and cached bodies)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Ensure directories exist
@@ -96,26 +155,55 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
+def parse_cursor(cursor: Optional[str], arity: int):
+    """Decode a pagination cursor query parameter, rejecting malformed ones with 400"""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor, arity)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def table_row_count(conn, table: str) -> int:
+    """Trigger-maintained row count of candidates or interview (see migrations.COUNTED_TABLES)"""
+    return conn.execute("SELECT row_count FROM table_stats WHERE name = ?", (table,)).fetchone()[0]
+
 # --- Routes ---
 
 # Jobs Management API
+def invalidate_interview_views():
+    """Cached responses showing interview or application status and scores"""
+    response_cache.invalidate("assessments", "candidates", "candidate:*", "job:*")
+
+def release_archived_interviews(conn, interviews):
+    """Drop the archived copies of deleted interviews and queue their frames for the media sweeper"""
+    frames = []
+    for interview in interviews:
+        if interview['archive_month']:
+            frames += archive.delete_archived(conn, interview['id'], interview['archive_month'])
+    if frames:
+        media_gc.enqueue(conn, frames)
+        conn.commit()
+
 @app.post("/api/jobs")
 async def create_job(job: JobCreate):
     """Create a new job posting"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        INSERT INTO jobs (title, location, job_type, experience_required, description, is_active)
-        VALUES (?, ?, ?, ?, ?, 1)
-    ''', (job.title, job.location, job.job_type, job.experience_required, job.description))
-    
-    job_id = cursor.lastrowid
-    conn.commit()
+    def insert_job(conn):
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            INSERT INTO jobs (title, location, job_type, experience_required, description, is_active)
+            VALUES (?, ?, ?, ?, ?, 1)
+        ''', (job.title, job.location, job.job_type, job.experience_required, job.description))
+        
+        job_id = cursor.lastrowid
+        conn.commit()
+        
+        # Fetch the created job
+        return cursor.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
     
-    # Fetch the created job
-    created_job = cursor.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
-    conn.close()
+    created_job = await run_db(insert_job)
+    response_cache.invalidate("jobs")
     
     return {
         "id": created_job['id'],
@@ -131,24 +219,15 @@ async def create_job(job: JobCreate):
 @app.get("/api/jobs")
 async def get_jobs(active_only: bool = True):
     """Get all jobs with applicant counts"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    query = '''
-        SELECT 
-            j.*,
-            COUNT(DISTINCT a.id) as applicant_count
-        FROM jobs j
-        LEFT JOIN applications a ON j.id = a.job_id
-    '''
+    # applicant_count is maintained by triggers on applications
+    query = 'SELECT j.* FROM jobs j'
     
     if active_only:
         query += ' WHERE j.is_active = 1'
     
-    query += ' GROUP BY j.id ORDER BY j.created_at DESC'
+    query += ' ORDER BY j.created_ms DESC'
     
-    jobs = cursor.execute(query).fetchall()
-    conn.close()
+    jobs = await run_db(lambda conn: conn.execute(query).fetchall())
     
     return {
         "jobs": [
@@ -170,31 +249,32 @@ async def get_jobs(active_only: bool = True):
 @app.get("/api/jobs/{job_id}")
 async def get_job(job_id: int):
     """Get job details with applicants"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    job = cursor.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
-    if not job:
-        conn.close()
-        raise HTTPException(status_code=404, detail="Job not found")
-    
-    # Get applicants for this job
-    applicants = cursor.execute('''
-        SELECT 
-            a.id as application_id,
-            a.match_score,
-            a.status,
-            a.applied_at,
-            c.id as candidate_id,
-            c.name,
-            c.email
-        FROM applications a
-        JOIN candidates c ON a.candidate_id = c.id
-        WHERE a.job_id = ?
-        ORDER BY a.match_score DESC, a.applied_at DESC
-    ''', (job_id,)).fetchall()
+    def load_job(conn):
+        cursor = conn.cursor()
+        
+        job = cursor.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        # Get applicants for this job
+        applicants = cursor.execute('''
+            SELECT 
+                a.id as application_id,
+                a.match_score,
+                a.status,
+                a.applied_at,
+                c.id as candidate_id,
+                c.name,
+                c.email
+            FROM applications a
+            JOIN candidates c ON a.candidate_id = c.id
+            WHERE a.job_id = ?
+            ORDER BY a.match_score DESC, a.applied_at DESC
+        ''', (job_id,)).fetchall()
+        
+        return job, applicants
     
-    conn.close()
+    job, applicants = await run_db(load_job)
     
     return {
         "id": job['id'],
@@ -222,15 +302,6 @@ async def get_job(job_id: int):
 @app.put("/api/jobs/{job_id}")
 async def update_job(job_id: int, job_update: JobUpdate):
     """Update job details"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Check if job exists
-    existing = cursor.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
-    if not existing:
-        conn.close()
-        raise HTTPException(status_code=404, detail="Job not found")
-    
     # Build update query dynamically
     updates = []
     values = []
@@ -254,15 +325,26 @@ async def update_job(job_id: int, job_update: JobUpdate):
         updates.append('is_active = ?')
         values.append(1 if job_update.is_active else 0)
     
-    if updates:
-        values.append(job_id)
-        query = f"UPDATE jobs SET {', '.join(updates)} WHERE id = ?"
-        cursor.execute(query, values)
-        conn.commit()
+    def save_job(conn):
+        cursor = conn.cursor()
+        
+        # Check if job exists
+        existing = cursor.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if not existing:
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        if updates:
+            values.append(job_id)
+            query = f"UPDATE jobs SET {', '.join(updates)} WHERE id = ?"
+            cursor.execute(query, values)
+            conn.commit()
+        
+        # Fetch updated job
+        return cursor.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
     
-    # Fetch updated job
-    updated_job = cursor.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
-    conn.close()
+    updated_job = await run_db(save_job)
+    # Job titles also appear in the candidate and assessment lists
+    response_cache.invalidate("jobs", f"job:{job_id}", "candidates", "candidate:*", "assessments")
     
     return {
         "id": updated_job['id'],
@@ -278,36 +360,37 @@ async def update_job(job_id: int, job_update: JobUpdate):
 @app.delete("/api/jobs/{job_id}")
 async def delete_job(job_id: int, permanent: bool = False):
     """Delete a job permanently or mark as inactive"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    if permanent:
-        # Permanent delete - remove from database
-        # First check if there are applications
-        app_count = cursor.execute(
-            'SELECT COUNT(*) FROM applications WHERE job_id = ?', (job_id,)
-        ).fetchone()[0]
-        
-        if app_count > 0:
-            conn.close()
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Cannot permanently delete job with {app_count} applications. Mark as inactive instead."
-            )
+    def remove_job(conn):
+        cursor = conn.cursor()
         
-        cursor.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
-        message = "Job permanently deleted"
-    else:
-        # Soft delete - just mark as inactive
-        cursor.execute('UPDATE jobs SET is_active = 0 WHERE id = ?', (job_id,))
-        message = "Job marked as inactive"
-    
-    if cursor.rowcount == 0:
-        conn.close()
-        raise HTTPException(status_code=404, detail="Job not found")
+        if permanent:
+            # Permanent delete - remove from database
+            # First check if there are applications
+            app_count = cursor.execute(
+                'SELECT COUNT(*) FROM applications WHERE job_id = ?', (job_id,)
+            ).fetchone()[0]
+            
+            if app_count > 0:
+                raise HTTPException(
+                    status_code=400, 
+                    detail=f"Cannot permanently delete job with {app_count} applications. Mark as inactive instead."
+                )
+            
+            cursor.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
+            message = "Job permanently deleted"
+        else:
+            # Soft delete - just mark as inactive
+            cursor.execute('UPDATE jobs SET is_active = 0 WHERE id = ?', (job_id,))
+            message = "Job marked as inactive"
+        
+        if cursor.rowcount == 0:
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        conn.commit()
+        return message
     
-    conn.commit()
-    conn.close()
+    message = await run_db(remove_job)
+    response_cache.invalidate("jobs", f"job:{job_id}")
     
     return {"status": "deleted", "message": message}
 
@@ -332,12 +415,10 @@ async def submit_application(
         raise HTTPException(status_code=400, detail="Only PDF and DOCX files are accepted")
     
     # Check if job exists
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    job = cursor.execute('SELECT * FROM jobs WHERE id = ? AND is_active = 1', (job_id,)).fetchone()
+    job = await run_db(
+        lambda conn: conn.execute('SELECT * FROM jobs WHERE id = ? AND is_active = 1', (job_id,)).fetchone()
+    )
     if not job:
-        conn.close()
         raise HTTPException(status_code=404, detail="Job not found or inactive")
     
     try:
@@ -356,50 +437,58 @@ async def submit_application(
         parser = ResumeParserService()
         parsed_data = parser.parse_resume_file(file_path)
         
-        # Check if candidate exists
-        existing_candidate = cursor.execute(
-            'SELECT * FROM candidates WHERE email = ?', (email,)
-        ).fetchone()
-        
-        if existing_candidate:
-            candidate_id = existing_candidate['id']
-            # Update candidate data
-            cursor.execute('''
-                UPDATE candidates 
-                SET name = ?, phone = ?, resume_path = ?, resume_text = ?,
-                    skills = ?, experience_years = ?, education = ?, work_history = ?
-                WHERE id = ?
-            ''', (
-                parsed_data.get('name', name),
-                parsed_data.get('phone', ''),
-                file_path,
-                parsed_data.get('resume_text', ''),
-                json.dumps(parsed_data.get('skills', [])),
-                parsed_data.get('experience_years', 0),
-                json.dumps(parsed_data.get('education', [])),
-                json.dumps(parsed_data.get('work_history', [])),
-                candidate_id
-            ))
-        else:
-            # Create new candidate
-            cursor.execute('''
-                INSERT INTO candidates 
-                (name, email, phone, resume_path, resume_text, skills, experience_years, education, work_history)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                parsed_data.get('name', name),
-                email,
-                parsed_data.get('phone', ''),
-                file_path,
-                parsed_data.get('resume_text', ''),
-                json.dumps(parsed_data.get('skills', [])),
-                parsed_data.get('experience_years', 0),
-                json.dumps(parsed_data.get('education', [])),
-                json.dumps(parsed_data.get('work_history', []))
-            ))
-            candidate_id = cursor.lastrowid
+        def save_candidate(conn):
+            cursor = conn.cursor()
+            
+            # Check if candidate exists
+            existing_candidate = cursor.execute(
+                'SELECT * FROM candidates WHERE email = ?', (email,)
+            ).fetchone()
+            
+            if existing_candidate:
+                candidate_id = existing_candidate['id']
+                unindex_candidate(conn, candidate_id)
+                # Update candidate data
+                cursor.execute('''
+                    UPDATE candidates 
+                    SET name = ?, phone = ?, resume_path = ?, resume_text = ?,
+                        skills = ?, experience_years = ?, education = ?, work_history = ?
+                    WHERE id = ?
+                ''', (
+                    parsed_data.get('name', name),
+                    parsed_data.get('phone', ''),
+                    file_path,
+                    pack_column(conn, "candidates", parsed_data.get('resume_text', '')),
+                    json.dumps(parsed_data.get('skills', [])),
+                    parsed_data.get('experience_years', 0),
+                    json.dumps(parsed_data.get('education', [])),
+                    json.dumps(parsed_data.get('work_history', [])),
+                    candidate_id
+                ))
+            else:
+                # Create new candidate
+                cursor.execute('''
+                    INSERT INTO candidates 
+                    (name, email, phone, resume_path, resume_text, skills, experience_years, education, work_history)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    parsed_data.get('name', name),
+                    email,
+                    parsed_data.get('phone', ''),
+                    file_path,
+                    pack_column(conn, "candidates", parsed_data.get('resume_text', '')),
+                    json.dumps(parsed_data.get('skills', [])),
+                    parsed_data.get('experience_years', 0),
+                    json.dumps(parsed_data.get('education', [])),
+                    json.dumps(parsed_data.get('work_history', []))
+                ))
+                candidate_id = cursor.lastrowid
+            index_candidate(conn, candidate_id)
+            
+            conn.commit()
+            return candidate_id
         
-        conn.commit()
+        candidate_id = await run_db(save_candidate)
         
         # Calculate ATS match score
         ats = ATSService()
@@ -409,19 +498,23 @@ async def submit_application(
         status = 'qualified' if match_result['score'] >= 50 else 'rejected'
         
         # Create application
-        cursor.execute('''
-            INSERT INTO applications (candidate_id, job_id, match_score, match_explanation, status)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (
-            candidate_id,
-            job_id,
-            match_result['score'],
-            match_result['explanation'],
-            status
-        ))
-        application_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        def insert_application(conn):
+            cursor = conn.execute('''
+                INSERT INTO applications (candidate_id, job_id, match_score, match_explanation, status)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (
+                candidate_id,
+                job_id,
+                match_result['score'],
+                pack_column(conn, "applications", match_result['explanation']),
+                status
+            ))
+            conn.commit()
+            return cursor.lastrowid
+        
+        application_id = await run_db(insert_application)
+        # A re-applying candidate's updated name shows on their other jobs and assessments too
+        response_cache.invalidate("jobs", "job:*", "candidates", f"candidate:{candidate_id}", "assessments")
         
         return {
             "application_id": application_id,
@@ -435,7 +528,6 @@ async def submit_application(
         }
         
     except Exception as e:
-        conn.close()
         print(f"Error processing application: {e}")
         import traceback
         traceback.print_exc()
@@ -444,24 +536,18 @@ async def submit_application(
 @app.get("/api/applications/{application_id}")
 async def get_application(application_id: int):
     """Get application details"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    application = cursor.execute('''
+    application = await run_db(lambda conn: conn.execute('''
         SELECT a.*, c.name, c.email, c.phone, c.skills, c.experience_years, c.education, c.work_history,
                j.title as job_title
         FROM applications a
         JOIN candidates c ON a.candidate_id = c.id
         JOIN jobs j ON a.job_id = j.id
         WHERE a.id = ?
-    ''', (application_id,)).fetchone()
+    ''', (application_id,)).fetchone())
     
     if not application:
-        conn.close()
         raise HTTPException(status_code=404, detail="Application not found")
     
-    conn.close()
-    
     return {
         "id": application['id'],
         "candidate": {
@@ -487,23 +573,17 @@ async def get_application(application_id: int):
 @app.get("/api/applications/{application_id}/match-result")
 async def get_match_result(application_id: int):
     """Get match result for application"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    application = cursor.execute('''
+    application = await run_db(lambda conn: conn.execute('''
         SELECT a.*, c.name, j.title as job_title, j.description
         FROM applications a
         JOIN candidates c ON a.candidate_id = c.id
         JOIN jobs j ON a.job_id = j.id
         WHERE a.id = ?
-    ''', (application_id,)).fetchone()
+    ''', (application_id,)).fetchone())
     
     if not application:
-        conn.close()
         raise HTTPException(status_code=404, detail="Application not found")
     
-    conn.close()
-    
     return {
         "application_id": application['id'],
         "candidate_name": application['name'],
@@ -514,65 +594,171 @@ async def get_match_result(application_id: int):
     }
 
 @app.get("/api/metrics/overview")
-async def get_metrics_overview(range: str = "30d"):
-    """Get dashboard KPI metrics"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Count total jobs
-    total_jobs = cursor.execute("SELECT COUNT(*) FROM jobs WHERE is_active = 1").fetchone()[0]
-    
-    # Count total candidates
-    total_candidates = cursor.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
-    
-    # Count completed assessments
-    completed = cursor.execute(
-        "SELECT COUNT(*) FROM interview WHERE status = 'completed'"
-    ).fetchone()[0]
-    
-    # Calculate average score using same algorithm as assessment page
-    # Get all interviews with their answer scores
-    interviews = cursor.execute("""
-        SELECT 
-            i.id,
-            (SELECT COALESCE(SUM(score), 0) FROM answer WHERE interview_id = i.id) as calculated_score,
-            (SELECT COUNT(*) FROM answer WHERE interview_id = i.id) as answer_count
-        FROM interview i
-        WHERE i.status = 'completed'
-    """).fetchall()
-    
-    total_score = 0
-    total_max_score = 0
-    
-    for interview in interviews:
-        actual_score = interview['calculated_score'] if interview['calculated_score'] > 0 else 0.0
-        max_score = interview['answer_count'] * 5.0 if interview['answer_count'] > 0 else 5.0
-        total_score += actual_score
-        total_max_score += max_score
+async def get_metrics_overview(range: str = "30d", start: Optional[str] = None, end: Optional[str] = None):
+    """
+    Get dashboard KPI metrics for a date range (7d/30d/90d, or custom with
+    start/end as YYYY-MM-DD), with deltas against the preceding window of the
+    same length. Everything but the all-time totals comes from the daily rollups.
+    """
+    try:
+        first, last = rollups.parse_range(range, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    previous_first, previous_last = rollups.previous_window(first, last)
+    today = rollups.utc_today()
+    
+    def load_metrics(conn):
+        cursor = conn.cursor()
+        
+        # Count total jobs
+        total_jobs = cursor.execute("SELECT COUNT(*) FROM jobs WHERE is_active = 1").fetchone()[0]
+        
+        # Count total candidates
+        total_candidates = table_row_count(conn, "candidates")
+        
+        current = rollups.window_totals(conn, first, last)
+        previous = rollups.window_totals(conn, previous_first, previous_last)
+        started_today = rollups.window_totals(conn, today, today)['interviews_started']
+        by_job = rollups.job_totals(conn, first, last)
+        return total_jobs, total_candidates, current, previous, started_today, by_job
     
-    avg_score = (total_score / total_max_score * 5.0) if total_max_score > 0 else 0.0
+    total_jobs, total_candidates, current, previous, started_today, by_job = await run_analytics(load_metrics)
     
-    conn.close()
+    avg_score = rollups.average_score(current)
+    previous_avg_score = rollups.average_score(previous)
     
     return {
         "totalJobs": total_jobs,
         "totalCandidates": total_candidates,
-        "completedAssessments": completed,
+        "completedAssessments": current['interviews_completed'],
         "avgScore": round(avg_score, 2),
-        "interviewsToday": 2,
-        "deltas": {"totalCandidates": 0.12, "avgScore": 0.05}
+        "interviewsToday": started_today,
+        "range": {"start": first.isoformat(), "end": last.isoformat()},
+        "period": {
+            "newCandidates": current['candidates'],
+            "applications": current['applications'],
+            "interviewsStarted": current['interviews_started'],
+            "interviewsCompleted": current['interviews_completed'],
+        },
+        "deltas": {
+            "totalCandidates": rollups.relative_change(current['candidates'], previous['candidates']),
+            "applications": rollups.relative_change(current['applications'], previous['applications']),
+            "completedAssessments": rollups.relative_change(
+                current['interviews_completed'], previous['interviews_completed']
+            ),
+            "avgScore": rollups.relative_change(avg_score, previous_avg_score),
+        },
+        "byJob": [
+            {
+                "jobId": job['job_id'],
+                "applications": job['applications'],
+                "completedAssessments": job['interviews_completed'],
+                "avgScore": round(rollups.average_score(job), 2),
+            }
+            for job in by_job
+        ],
     }
 
-@app.get("/api/candidates")
-async def get_candidates(page: int = 1, limit: int = 20, status: str = "all", search: str = ""):
-    """Get paginated candidates list with application data"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+@app.get("/api/metrics/proctoring")
+async def get_proctoring_metrics(range: str = "30d", start: Optional[str] = None, end: Optional[str] = None):
+    """
+    Proctoring events per month and event type for a date range (as for
+    /api/metrics/overview), across live interviews and the month partitions
+    """
+    try:
+        first, last = rollups.parse_range(range, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
+    events = await run_db(archive.proctor_event_counts, first, last)
+    return {"range": {"start": first.isoformat(), "end": last.isoformat()}, "events": events}
+
+@app.get("/api/metrics/replica")
+async def get_replica_status():
+    """Age and refresh timing of the analytics snapshot used by dashboard lists"""
+    return analytics_replica.status()
+
+@app.get("/api/metrics/write-buffer")
+async def get_write_buffer_metrics():
+    """Queue depth and throughput of the transcript/proctor write-behind buffer"""
+    return write_buffer.metrics()
+
+@app.get("/api/metrics/sessions")
+async def get_session_metrics():
+    """Size and hit rate of the live interview session registry"""
+    return live_sessions.metrics()
+
+@app.get("/api/metrics/response-cache")
+async def get_response_cache_metrics():
+    """Size, hit rate and 304 count of the conditional-GET response cache"""
+    return response_cache.metrics()
+
+@app.get("/api/metrics/media-gc")
+async def get_media_gc_metrics():
+    """Files removed and bytes freed by the media sweeper, and what its last sweep left queued"""
+    return media_sweeper.status()
+
+@app.get("/api/candidates")
+async def get_candidates(page: int = 1, limit: int = 20, status: str = "all", search: str = "",
+                         cursor: Optional[str] = None, skills: str = "", skills_mode: str = "all"):
+    """
+    Get paginated candidates list with application data.
+    Pass the returned next_cursor as `cursor` for the next page; page/OFFSET
+    paging is kept for backward compatibility.
+    `skills` is a comma-separated list matched case-insensitively; skills_mode
+    "all" requires every skill, "any" at least one.
+    `status` keeps candidates with an application in that pipeline status and
+    lists only those applications.
+    """
+    if skills_mode not in ("all", "any"):
+        raise HTTPException(status_code=400, detail="skills_mode must be 'all' or 'any'")
+    if status != "all" and status not in PIPELINE_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be 'all' or one of {', '.join(PIPELINE_STATUSES)}")
+    limit = clamp_limit(limit)
     offset = (page - 1) * limit
+    match_query = fts_match_query(search)
+    after = parse_cursor(cursor, 2)
+    
+    # Filters shared by the page query and the total count
+    conditions, condition_params = [], []
+    if match_query:
+        conditions.append("candidates_fts MATCH ?")
+        condition_params.append(match_query)
+    skill_list = parse_skill_filter(skills)
+    if skill_list:
+        skill_sql, skill_params = skill_filter_sql(skill_list, skills_mode == "all")
+        conditions.append(skill_sql)
+        condition_params += skill_params
+    if status != "all":
+        conditions.append("c.id IN (SELECT candidate_id FROM applications WHERE pipeline_status = ?)")
+        condition_params.append(status)
+    
+    # Select one page of candidates first, so a candidate's applications never straddle pages
+    if match_query:
+        # Ranked full-text match over name, email, skills and resume text
+        source = "FROM candidates_fts m JOIN candidates c ON c.id = m.rowid"
+        sort_key, keyset = "m.rank", "(m.rank, c.id) > (?, ?)"
+        page_order, order_by = "m.rank, c.id", "c.sort_key, c.id"
+    else:
+        source = "FROM candidates c"
+        sort_key, keyset = "c.created_at", "(c.created_at, c.id) < (?, ?)"
+        page_order = order_by = "c.created_at DESC, c.id DESC"
+    
+    def where(extra=()):
+        clauses = conditions + list(extra)
+        return f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    
+    page_query = f"SELECT c.*, {sort_key} as sort_key {source}{where([keyset] if after else [])}"
+    params = condition_params + list(after or [])
+    page_query += f" ORDER BY {page_order} LIMIT ?"
+    params.append(limit)
+    if not after:
+        page_query += " OFFSET ?"
+        params.append(offset)
+    count_query = f"SELECT COUNT(*) {source}{where()}"
     
     # Get candidates with their latest application and interview status
-    query = """
+    query = f"""
         SELECT 
             c.id,
             c.name,
@@ -580,45 +766,39 @@ async def get_candidates(page: int = 1, limit: int = 20, status: str = "all", se
             c.phone,
             c.experience_years,
             c.created_at as createdAt,
+            c.sort_key,
             j.title as appliedRole,
             a.match_score as overallScore,
-            a.status as application_status,
             a.applied_at,
             a.id as application_id,
-            i.status as interview_status,
+            a.pipeline_status,
             i.id as interview_id
-        FROM candidates c
-        LEFT JOIN applications a ON c.id = a.candidate_id
+        FROM ({page_query}) c
+        LEFT JOIN applications a ON c.id = a.candidate_id{" AND a.pipeline_status = ?" if status != "all" else ""}
         LEFT JOIN jobs j ON a.job_id = j.id
         LEFT JOIN interview i ON a.id = i.application_id
-        WHERE 1=1
+        ORDER BY {order_by}, a.id
     """
     
-    if search:
-        query += f" AND (c.name LIKE '%{search}%' OR c.email LIKE '%{search}%')"
+    if status != "all":
+        params.append(status)
     
-    query += f" ORDER BY c.created_at DESC LIMIT {limit} OFFSET {offset}"
+    def load_candidates(conn):
+        candidates = conn.execute(query, params).fetchall()
+        # Unfiltered totals come from the maintained counter
+        if conditions:
+            total = conn.execute(count_query, condition_params).fetchone()[0]
+        else:
+            total = table_row_count(conn, "candidates")
+        return candidates, total
     
-    candidates = cursor.execute(query).fetchall()
-    total = cursor.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+    candidates, total = await run_analytics(load_candidates)
     
-    conn.close()
+    # One entry per candidate on this page, in page order
+    page_rows = list({c['id']: c for c in candidates}.values())
     
-    # Determine dynamic status
     items = []
     for c in candidates:
-        # Determine status based on application and interview
-        if c['interview_status'] == 'completed':
-            status = 'completed'
-        elif c['interview_status'] in ['in_progress', 'started']:
-            status = 'in_progress'
-        elif c['application_status'] == 'qualified':
-            status = 'passed'
-        elif c['application_status'] == 'rejected':
-            status = 'rejected'
-        else:
-            status = 'pending'
-        
         items.append({
             "id": c['id'],
             "name": c['name'],
@@ -627,7 +807,8 @@ async def get_candidates(page: int = 1, limit: int = 20, status: str = "all", se
             "appliedRole": c['appliedRole'] or 'N/A',
             "createdAt": c['createdAt'],
             "overallScore": c['overallScore'] or 0,
-            "status": status,
+            # Maintained by triggers on applications and interview; no application yet means pending
+            "status": c['pipeline_status'] or 'pending',
             "applicationId": c['application_id'],
             "interviewId": c['interview_id']
         })
@@ -636,36 +817,38 @@ async def get_candidates(page: int = 1, limit: int = 20, status: str = "all", se
         "items": items,
         "page": page,
         "limit": limit,
-        "total": total
+        "total": total,
+        "next_cursor": next_cursor(page_rows, limit, 'sort_key', 'id')
     }
 
 @app.get("/api/candidates/{candidate_id}")
 async def get_candidate_profile(candidate_id: int):
     """Get full candidate profile with resume data"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    candidate = cursor.execute('SELECT * FROM candidates WHERE id = ?', (candidate_id,)).fetchone()
-    if not candidate:
-        conn.close()
-        raise HTTPException(status_code=404, detail="Candidate not found")
-    
-    # Get applications for this candidate
-    applications = cursor.execute('''
-        SELECT a.*, j.title as job_title
-        FROM applications a
-        JOIN jobs j ON a.job_id = j.id
-        WHERE a.candidate_id = ?
-        ORDER BY a.applied_at DESC
-    ''', (candidate_id,)).fetchall()
-    
-    # Get interviews for this candidate
-    interviews = cursor.execute('''
-        SELECT * FROM interview WHERE candidate_email = ?
-        ORDER BY started_at DESC
-    ''', (candidate['email'],)).fetchall()
+    def load_profile(conn):
+        cursor = conn.cursor()
+        
+        candidate = cursor.execute('SELECT * FROM candidates WHERE id = ?', (candidate_id,)).fetchone()
+        if not candidate:
+            raise HTTPException(status_code=404, detail="Candidate not found")
+        
+        # Get applications for this candidate
+        applications = cursor.execute('''
+            SELECT a.*, j.title as job_title
+            FROM applications a
+            JOIN jobs j ON a.job_id = j.id
+            WHERE a.candidate_id = ?
+            ORDER BY a.applied_at DESC
+        ''', (candidate_id,)).fetchall()
+        
+        # Get interviews for this candidate
+        interviews = cursor.execute('''
+            SELECT * FROM interview WHERE candidate_email = ?
+            ORDER BY started_ms DESC, id DESC
+        ''', (candidate['email'],)).fetchall()
+        
+        return candidate, applications, interviews
     
-    conn.close()
+    candidate, applications, interviews = await run_db(load_profile)
     
     return {
         "id": candidate['id'],
@@ -698,20 +881,62 @@ async def get_candidate_profile(candidate_id: int):
         ]
     }
 
-@app.get("/api/assessments")
-async def get_assessments(page: int = 1, limit: int = 20, status: str = "all"):
-    """Get paginated assessments list"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+@app.delete("/api/candidates/{candidate_id}")
+async def delete_candidate(candidate_id: int):
+    """Delete a candidate with their applications and assessments"""
+    # Otherwise queued chunks/events would be inserted after the delete
+    await write_buffer.flush_async()
+    def remove_candidate(conn):
+        conn.execute("BEGIN IMMEDIATE")
+        interviews = conn.execute('''
+            SELECT i.id, i.archive_month
+            FROM applications a
+            JOIN interview i ON i.application_id = a.id
+            WHERE a.candidate_id = ?
+        ''', (candidate_id,)).fetchall()
+        # Applications and their interviews, questions, answers, transcripts and
+        # proctoring events go with it (ON DELETE CASCADE); the resume and media
+        # files are queued for the sweeper
+        unindex_candidate(conn, candidate_id)
+        if conn.execute("DELETE FROM candidates WHERE id = ?", (candidate_id,)).rowcount == 0:
+            raise HTTPException(status_code=404, detail="Candidate not found")
+        conn.commit()
+        release_archived_interviews(conn, interviews)
+        return [interview['id'] for interview in interviews]
     
+    interview_ids = await run_db(remove_candidate)
+    for interview_id in interview_ids:
+        live_sessions.invalidate(interview_id)
+    invalidate_interview_views()
+    response_cache.invalidate("jobs")
+    
+    return {
+        "status": "deleted",
+        "message": "Candidate deleted successfully",
+        "assessments_deleted": len(interview_ids)
+    }
+
+@app.get("/api/assessments")
+async def get_assessments(page: int = 1, limit: int = 20, status: str = "all", cursor: Optional[str] = None):
+    """
+    Get paginated assessments list.
+    Pass the returned next_cursor as `cursor` for the next page; page/OFFSET
+    paging is kept for backward compatibility.
+    `status` (passed, in_progress, completed) filters on the stored pipeline status.
+    """
+    if status != "all" and status not in ASSESSMENT_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be 'all' or one of {', '.join(ASSESSMENT_STATUSES)}")
+    limit = clamp_limit(limit)
     offset = (page - 1) * limit
+    after = parse_cursor(cursor, 2)
     
     # Get interviews with candidate name from candidates table (not interview table)
     query = """
         SELECT 
             i.id,
-            i.status as interview_status,
+            i.pipeline_status,
             i.started_at as createdAt,
+            i.started_ms,
             i.total_score as total_score,
             i.application_id,
             a.match_score,
@@ -719,32 +944,42 @@ async def get_assessments(page: int = 1, limit: int = 20, status: str = "all"):
             c.name as candidate_name,
             c.email as candidate_email,
             j.title as jobTitle,
-            (SELECT COUNT(*) FROM answer WHERE interview_id = i.id AND recording_path IS NOT NULL) as hasRecordings,
-            (SELECT COALESCE(SUM(score), 0) FROM answer WHERE interview_id = i.id) as calculated_score,
-            (SELECT COUNT(*) FROM answer WHERE interview_id = i.id) as answer_count
+            COALESCE(s.recording_count, 0) as hasRecordings,
+            COALESCE(s.score_sum, 0) as calculated_score,
+            COALESCE(s.answer_count, 0) as answer_count
         FROM interview i
+        LEFT JOIN interview_summary s ON s.interview_id = i.id
         LEFT JOIN applications a ON i.application_id = a.id
         LEFT JOIN candidates c ON a.candidate_id = c.id
         LEFT JOIN jobs j ON a.job_id = j.id
-        ORDER BY i.started_at DESC
-        LIMIT ? OFFSET ?
     """
+    conditions, params = [], []
+    if status != "all":
+        conditions.append("i.pipeline_status = ?")
+        params.append(status)
+    if after:
+        conditions.append("(i.started_ms, i.id) < (?, ?)")
+        params += after
+    if conditions:
+        query += f" WHERE {' AND '.join(conditions)}"
+    query += " ORDER BY i.started_ms DESC, i.id DESC LIMIT ?"
+    params.append(limit)
+    if not after:
+        query += " OFFSET ?"
+        params.append(offset)
+    
+    def load_assessments(conn):
+        interviews = conn.execute(query, params).fetchall()
+        if status != "all":
+            total = conn.execute("SELECT COUNT(*) FROM interview WHERE pipeline_status = ?", (status,)).fetchone()[0]
+        else:
+            total = table_row_count(conn, "interview")
+        return interviews, total
     
-    interviews = cursor.execute(query, (limit, offset)).fetchall()
-    total = cursor.execute("SELECT COUNT(*) FROM interview").fetchone()[0]
-    
-    conn.close()
+    interviews, total = await run_analytics(load_assessments)
     
     items = []
     for i in interviews:
-        # Determine dynamic status
-        if i['interview_status'] == 'completed':
-            status = 'completed'
-        elif i['interview_status'] in ['in_progress', 'started']:
-            status = 'in_progress'
-        else:
-            status = 'passed'  # If interview exists but not started, they passed ATS
-        
         # Use calculated score from answers, fallback to total_score
         actual_score = i['calculated_score'] if i['calculated_score'] > 0 else (i['total_score'] or 0.0)
         max_score = i['answer_count'] * 5.0 if i['answer_count'] > 0 else 5.0
@@ -759,7 +994,7 @@ async def get_assessments(page: int = 1, limit: int = 20, status: str = "all"):
             "matchScore": i['match_score'] or 0.0,
             "score": actual_score,
             "maxScore": max_score,
-            "status": status,
+            "status": i['pipeline_status'],
             "createdAt": i['createdAt'],
             "hasRecordings": bool(i['hasRecordings'])
         })
@@ -768,303 +1003,151 @@ async def get_assessments(page: int = 1, limit: int = 20, status: str = "all"):
         "items": items,
         "page": page,
         "limit": limit,
-        "total": total
+        "total": total,
+        "next_cursor": next_cursor(interviews, limit, 'started_ms', 'id')
     }
 
 @app.get("/api/assessments/{assessment_id}")
 async def get_assessment_detail(assessment_id: int):
     """Get detailed assessment data for report page"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get interview with application and job data
-    interview = cursor.execute("""
-        SELECT 
-            i.*,
-            a.match_score,
-            a.match_explanation,
-            j.title as job_title,
-            c.name as candidate_name,
-            c.email as candidate_email,
-            c.phone as candidate_phone
-        FROM interview i
-        LEFT JOIN applications a ON i.application_id = a.id
-        LEFT JOIN jobs j ON a.job_id = j.id
-        LEFT JOIN candidates c ON a.candidate_id = c.id
-        WHERE i.id = ?
-    """, (assessment_id,)).fetchone()
+    await write_buffer.flush_async()
+    # Completed reports are served from their pre-serialized snapshot
+    body = await run_db(reports.report_body, assessment_id)
     
-    if not interview:
-        conn.close()
+    if body is None:
         raise HTTPException(status_code=404, detail="Assessment not found")
     
-    # Get questions with answers and transcripts
-    questions = cursor.execute("""
-        SELECT 
-            q.id as question_id,
-            q.seq,
-            q.text as question_text,
-            a.id as answer_id,
-            a.recording_path,
-            a.cropped_recording_path,
-            a.score as answer_score,
-            a.verdict,
-            a.auto_score_breakdown
-        FROM question q
-        LEFT JOIN answer a ON q.id = a.question_id
-        WHERE q.interview_id = ?
-        ORDER BY q.seq
-    """, (assessment_id,)).fetchall()
-    
-    # Get proctoring events
-    proctor_events = cursor.execute("""
-        SELECT * FROM proctor_event 
-        WHERE interview_id = ?
-        ORDER BY timestamp
-    """, (assessment_id,)).fetchall()
-    
-    # Calculate metrics from answers
-    total_score = 0
-    max_score = 0
-    good_count = 0
-    average_count = 0
-    below_count = 0
-    
-    answers_list = []
-    for q in questions:
-        score = q['answer_score'] or 0
-        max_q_score = 5.0
-        max_score += max_q_score
-        total_score += score
-        
-        score_percent = (score / max_q_score * 100) if max_q_score > 0 else 0
-        
-        if score_percent >= 80:
-            good_count += 1
-        elif score_percent >= 40:
-            average_count += 1
-        else:
-            below_count += 1
-        
-        # Get transcript for this answer
-        transcript_segments = []
-        if q['answer_id']:
-            transcript_data = cursor.execute("""
-                SELECT timestamp, text, is_final
-                FROM transcript_chunk
-                WHERE answer_id = ?
-                ORDER BY timestamp
-            """, (q['answer_id'],)).fetchall()
-            transcript_segments = [dict(t) for t in transcript_data]
-        
-        answers_list.append({
-            "id": f"a{q['seq']}",
-            "question": q['question_text'] or '',
-            "type": "video",
-            "mediaId": q['recording_path'],
-            "scorePercent": score_percent,
-            "score": score,
-            "verdict": q['verdict'] or '',
-            "transcriptSegments": transcript_segments
-        })
-    
-    conn.close()
-    
-    overall_score = total_score
-    overall_score_percent = (total_score / max_score * 100) if max_score > 0 else 0
-    
-    # Build topic breakdown (mock for now - would need to parse auto_score_breakdown)
-    topic_breakdown = []
-    
-    # Parse feedback from notes field
-    feedback_data = {}
-    if interview['notes']:
-        try:
-            feedback_data = json.loads(interview['notes'])
-        except:
-            feedback_data = {
-                'overall_feedback': interview['notes'],
-                'detailed_feedback': interview['notes']
-            }
-    
-    # Get topic breakdown from feedback data
-    topic_breakdown = feedback_data.get('topics', [])
-    
-    return {
-        "id": assessment_id,
-        "candidate": {
-            "id": assessment_id,
-            "name": interview['candidate_name'] or interview['candidate_name'] or "Unknown",
-            "email": interview['candidate_email'] or interview['candidate_email'] or "N/A",
-            "phone": interview['candidate_phone'] or "N/A",
-            "position": interview['job_title'] or "N/A"
-        },
-        "overallScorePercent": round(overall_score_percent, 1),
-        "overallScore": round(overall_score, 1),
-        "maxScore": round(max_score, 1),
-        "topicBreakdown": topic_breakdown,
-        "metrics": {
-            "good": good_count,
-            "average": average_count,
-            "below": below_count,
-            "warnings": len(proctor_events)
-        },
-        "feedback": {
-            "aiOverall": feedback_data.get('overall_feedback', "Assessment feedback not yet generated."),
-            "detailed": feedback_data.get('detailed_feedback', "Detailed feedback not yet generated."),
-            "keyStrengths": feedback_data.get('key_strengths', []),
-            "areasForImprovement": feedback_data.get('areas_for_improvement', []),
-            "confidenceLevel": feedback_data.get('confidence_level', 'N/A'),
-            "communicationQuality": feedback_data.get('communication_quality', 'N/A'),
-            "suitabilityScore": feedback_data.get('suitability_score', overall_score_percent)
-        },
-        "answers": answers_list,
-        "proctoring": [
-            {
-                "id": e['id'],
-                "timestamp": e['timestamp'],
-                "eventType": e['event_type'],
-                "confidence": e['confidence'],
-                "framePath": e['frame_path'],
-                "notes": e['notes']
-            }
-            for e in proctor_events
-        ]
-    }
+    return Response(content=body, media_type="application/json")
 
 @app.post("/api/assessments/{assessment_id}/recompute")
 async def recompute_assessment(assessment_id: int):
     """Recompute assessment scores and feedback"""
+    await write_buffer.flush_async()
     from answer_evaluator import AnswerEvaluator
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Check if interview exists
-    interview = cursor.execute(
-        "SELECT * FROM interview WHERE id = ?", (assessment_id,)
-    ).fetchone()
-    
-    if not interview:
-        conn.close()
-        raise HTTPException(status_code=404, detail="Assessment not found")
-    
-    try:
+    def load_answers(conn):
+        cursor = conn.cursor()
+        
+        # Check if interview exists
+        interview = cursor.execute(
+            "SELECT * FROM interview WHERE id = ?", (assessment_id,)
+        ).fetchone()
+        
+        if not interview:
+            raise HTTPException(status_code=404, detail="Assessment not found")
+        
         # Get all answers with questions and transcripts
+        # (CROSS JOIN keeps question as the outer loop, so rows come out in seq order without a sort)
         answers = cursor.execute("""
             SELECT 
                 a.id as answer_id,
+                a.score,
+                a.verdict,
                 q.id as question_id,
                 q.text as question,
                 q.seq
-            FROM answer a
-            JOIN question q ON a.question_id = q.id
-            WHERE a.interview_id = ?
+            FROM question q
+            CROSS JOIN answer a ON a.question_id = q.id AND a.interview_id = q.interview_id
+            WHERE q.interview_id = ?
             ORDER BY q.seq
         """, (assessment_id,)).fetchall()
         
-        if not answers:
-            conn.close()
-            return {"status": "error", "message": "No answers found to recompute"}
+        answer_texts = {}
+        if interview['archive_month']:
+            _, archived = archive.load_archived(conn, assessment_id, interview['archive_month'])
+            for ans in answers:
+                chunks = archived.get(ans['answer_id'], [])
+                answer_texts[ans['answer_id']] = ' '.join([t['text'] for t in chunks if t['is_final']])
+            return answers, answer_texts
         
+        final_texts = loaders.final_answer_texts(conn, [assessment_id])
+        for ans in answers:
+            answer_texts[ans['answer_id']] = final_texts.get(ans['answer_id'], '')
+        
+        return answers, answer_texts
+    
+    answers, answer_texts = await run_db(load_answers)
+    
+    if not answers:
+        return {"status": "error", "message": "No answers found to recompute"}
+    
+    try:
         evaluator = AnswerEvaluator()
         
         # Re-evaluate each answer
+        evaluations = {}
         for ans in answers:
-            # Get transcript
-            transcripts = cursor.execute("""
-                SELECT text FROM transcript_chunk 
-                WHERE answer_id = ? AND is_final = 1
-                ORDER BY timestamp
-            """, (ans['answer_id'],)).fetchall()
-            
-            answer_text = ' '.join([t['text'] for t in transcripts])
+            answer_text = answer_texts[ans['answer_id']]
             
             if answer_text and len(answer_text) >= 5:
                 # Evaluate
-                evaluation = evaluator.evaluate_answer(
+                evaluations[ans['answer_id']] = evaluator.evaluate_answer(
                     question=ans['question'],
                     answer_text=answer_text
                 )
                 
-                # Update answer
-                cursor.execute("""
+                print(f"Re-evaluated answer {ans['answer_id']}: {evaluations[ans['answer_id']]['score']}/5")
+        
+        def save_evaluations(conn):
+            for answer_id, evaluation in evaluations.items():
+                conn.execute("""
                     UPDATE answer 
                     SET score = ?, verdict = ?, auto_score_breakdown = ?
                     WHERE id = ?
                 """, (
                     evaluation['score'],
                     evaluation['verdict'],
-                    json.dumps({
+                    pack_column(conn, "answer", json.dumps({
                         'strengths': evaluation['strengths'],
                         'weaknesses': evaluation['weaknesses']
-                    }),
-                    ans['answer_id']
+                    })),
+                    answer_id
                 ))
-                
-                print(f"Re-evaluated answer {ans['answer_id']}: {evaluation['score']}/5")
+            conn.commit()
         
-        conn.commit()
-        
-        # Get updated answers for overall feedback
-        updated_answers = cursor.execute("""
-            SELECT 
-                a.id as answer_id,
-                a.score,
-                a.verdict,
-                q.text as question
-            FROM answer a
-            JOIN question q ON a.question_id = q.id
-            WHERE a.interview_id = ?
-            ORDER BY q.seq
-        """, (assessment_id,)).fetchall()
+        await run_db(save_evaluations)
         
         # Prepare data for overall feedback
         answers_data = []
-        for ans in updated_answers:
-            # Get transcript
-            transcripts = cursor.execute("""
-                SELECT text FROM transcript_chunk 
-                WHERE answer_id = ? AND is_final = 1
-                ORDER BY timestamp
-            """, (ans['answer_id'],)).fetchall()
-            
-            answer_text = ' '.join([t['text'] for t in transcripts])
-            
+        for ans in answers:
+            evaluation = evaluations.get(ans['answer_id'], {})
             answers_data.append({
                 'question': ans['question'],
-                'answer_text': answer_text,
-                'score': ans['score'] or 0.0,
-                'verdict': ans['verdict'] or 'Not evaluated'
+                'answer_text': answer_texts[ans['answer_id']],
+                'score': evaluation.get('score', ans['score']) or 0.0,
+                'verdict': evaluation.get('verdict', ans['verdict']) or 'Not evaluated'
             })
         
         # Generate overall feedback
         overall_feedback = evaluator.generate_overall_feedback(answers_data)
         
         # Update interview
-        cursor.execute("""
-            UPDATE interview 
-            SET total_score = ?,
-                notes = ?
-            WHERE id = ?
-        """, (
-            overall_feedback['overall_score'],
-            json.dumps({
-                'overall_feedback': overall_feedback['overall_feedback'],
-                'detailed_feedback': overall_feedback['detailed_feedback'],
-                'overall_score_percent': overall_feedback['overall_score_percent'],
-                'topics': overall_feedback.get('topics', []),
-                'key_strengths': overall_feedback.get('key_strengths', []),
-                'areas_for_improvement': overall_feedback.get('areas_for_improvement', []),
-                'confidence_level': overall_feedback.get('confidence_level', 'N/A'),
-                'communication_quality': overall_feedback.get('communication_quality', 'N/A'),
-                'suitability_score': overall_feedback.get('suitability_score', 0)
-            }),
-            assessment_id
-        ))
+        def save_feedback(conn):
+            conn.execute("""
+                UPDATE interview 
+                SET total_score = ?,
+                    notes = ?
+                WHERE id = ?
+            """, (
+                overall_feedback['overall_score'],
+                pack_column(conn, "interview", json.dumps({
+                    'overall_feedback': overall_feedback['overall_feedback'],
+                    'detailed_feedback': overall_feedback['detailed_feedback'],
+                    'overall_score_percent': overall_feedback['overall_score_percent'],
+                    'topics': overall_feedback.get('topics', []),
+                    'key_strengths': overall_feedback.get('key_strengths', []),
+                    'areas_for_improvement': overall_feedback.get('areas_for_improvement', []),
+                    'confidence_level': overall_feedback.get('confidence_level', 'N/A'),
+                    'communication_quality': overall_feedback.get('communication_quality', 'N/A'),
+                    'suitability_score': overall_feedback.get('suitability_score', 0)
+                })),
+                assessment_id
+            ))
+            conn.commit()
         
-        conn.commit()
-        conn.close()
+        await run_db(save_feedback)
+        await run_db(reports.render_report, assessment_id)
+        invalidate_interview_views()
         
         return {
             "status": "completed",
@@ -1074,7 +1157,6 @@ async def recompute_assessment(assessment_id: int):
         }
         
     except Exception as e:
-        conn.close()
         print(f"Error recomputing assessment: {e}")
         import traceback
         traceback.print_exc()
@@ -1083,119 +1165,115 @@ async def recompute_assessment(assessment_id: int):
 @app.delete("/api/assessments/{assessment_id}")
 async def delete_assessment(assessment_id: int):
     """Delete an assessment and optionally the candidate"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get interview details
-    interview = cursor.execute(
-        "SELECT application_id FROM interview WHERE id = ?", (assessment_id,)
-    ).fetchone()
-    
-    if not interview:
-        conn.close()
-        raise HTTPException(status_code=404, detail="Assessment not found")
-    
-    try:
-        # Delete transcript chunks for this interview
-        cursor.execute("""
-            DELETE FROM transcript_chunk 
-            WHERE answer_id IN (
-                SELECT id FROM answer WHERE interview_id = ?
-            )
-        """, (assessment_id,))
-        
-        # Delete answers
-        cursor.execute("DELETE FROM answer WHERE interview_id = ?", (assessment_id,))
-        
-        # Delete questions
-        cursor.execute("DELETE FROM question WHERE interview_id = ?", (assessment_id,))
-        
-        # Delete proctoring events
-        cursor.execute("DELETE FROM proctor_event WHERE interview_id = ?", (assessment_id,))
+    # Otherwise queued chunks/events would be inserted after the delete
+    await write_buffer.flush_async()
+    def remove_assessment(conn):
+        cursor = conn.cursor()
         
-        # Delete interview
-        cursor.execute("DELETE FROM interview WHERE id = ?", (assessment_id,))
-        
-        # If there's an application, update its status
-        if interview['application_id']:
-            cursor.execute(
-                "UPDATE applications SET status = 'qualified' WHERE id = ?",
-                (interview['application_id'],)
-            )
+        # Get interview details
+        cursor.execute("BEGIN IMMEDIATE")
+        interview = cursor.execute(
+            "SELECT id, application_id, archive_month FROM interview WHERE id = ?", (assessment_id,)
+        ).fetchone()
         
-        conn.commit()
-        conn.close()
+        if not interview:
+            raise HTTPException(status_code=404, detail="Assessment not found")
         
-        return {
-            "status": "deleted",
-            "message": "Assessment deleted successfully"
-        }
-        
-    except Exception as e:
-        conn.close()
-        print(f"Error deleting assessment: {e}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Failed to delete assessment: {str(e)}")
+        try:
+            # Questions, answers, transcript chunks and proctoring events go with it
+            # (ON DELETE CASCADE); their media files are queued for the sweeper
+            cursor.execute("DELETE FROM interview WHERE id = ?", (assessment_id,))
+            
+            # If there's an application, update its status
+            if interview['application_id']:
+                cursor.execute(
+                    "UPDATE applications SET status = 'qualified' WHERE id = ?",
+                    (interview['application_id'],)
+                )
+            
+            conn.commit()
+            
+            release_archived_interviews(conn, [interview])
+            
+        except Exception as e:
+            print(f"Error deleting assessment: {e}")
+            import traceback
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail=f"Failed to delete assessment: {str(e)}")
+    
+    await run_db(remove_assessment)
+    live_sessions.invalidate(assessment_id)
+    invalidate_interview_views()
+    
+    return {
+        "status": "deleted",
+        "message": "Assessment deleted successfully"
+    }
 
 @app.post("/api/interviews")
 async def create_interview(interview: InterviewCreate):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    now = datetime.now()
-    
-    candidate_name = interview.candidate_name
-    candidate_email = interview.candidate_email
+    now = utc_now()
     
-    # If application_id is provided, get candidate info from application
-    if interview.application_id:
-        # Update application status to interviewed
-        cursor.execute(
-            "UPDATE applications SET status = 'interviewed' WHERE id = ?",
-            (interview.application_id,)
-        )
+    def insert_interview(conn):
+        cursor = conn.cursor()
         
-        # Get candidate info from application
-        app_data = cursor.execute("""
-            SELECT c.name, c.email 
-            FROM applications a 
-            JOIN candidates c ON a.candidate_id = c.id 
-            WHERE a.id = ?
-        """, (interview.application_id,)).fetchone()
+        candidate_name = interview.candidate_name
+        candidate_email = interview.candidate_email
         
-        if app_data:
+        # If application_id is provided, get candidate info from application
+        if interview.application_id:
+            # Update application status to interviewed
+            cursor.execute(
+                "UPDATE applications SET status = 'interviewed' WHERE id = ?",
+                (interview.application_id,)
+            )
+            
+            # Get candidate info from application
+            app_data = cursor.execute("""
+                SELECT c.name, c.email 
+                FROM applications a 
+                JOIN candidates c ON a.candidate_id = c.id 
+                WHERE a.id = ?
+            """, (interview.application_id,)).fetchone()
+            
+            if not app_data:
+                raise HTTPException(status_code=404, detail="Application not found")
             candidate_name = app_data['name']
             candidate_email = app_data['email']
+        
+        cursor.execute(
+            "INSERT INTO interview (candidate_name, candidate_email, started_at, status, application_id) VALUES (?, ?, ?, ?, ?)",
+            (candidate_name, candidate_email, now, "in_progress", interview.application_id)
+        )
+        interview_id = cursor.lastrowid
+        conn.commit()
+        return interview_id
     
-    cursor.execute(
-        "INSERT INTO interview (candidate_name, candidate_email, started_at, status, application_id) VALUES (?, ?, ?, ?, ?)",
-        (candidate_name, candidate_email, now, "in_progress", interview.application_id)
-    )
-    interview_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    interview_id = await run_db(insert_interview)
+    invalidate_interview_views()
     return {"interview_id": interview_id, "session_token": "dummy_token_123", "application_id": interview.application_id}
 
 @app.get("/api/interviews/{interview_id}")
 async def get_interview(interview_id: int):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    interview = cursor.execute("SELECT * FROM interview WHERE id = ?", (interview_id,)).fetchone()
-    if not interview:
-        raise HTTPException(status_code=404, detail="Interview not found")
-    
-    # Get questions with their answers
-    questions_raw = cursor.execute("SELECT * FROM question WHERE interview_id = ? ORDER BY seq", (interview_id,)).fetchall()
-    questions = []
-    
-    for q in questions_raw:
-        q_dict = dict(q)
-        # Get answer for this question
-        answer = cursor.execute("SELECT * FROM answer WHERE question_id = ?", (q['id'],)).fetchone()
-        q_dict['answer'] = dict(answer) if answer else None
-        questions.append(q_dict)
+    def load_interview(conn):
+        cursor = conn.cursor()
+        interview = cursor.execute("SELECT * FROM interview WHERE id = ?", (interview_id,)).fetchone()
+        if not interview:
+            raise HTTPException(status_code=404, detail="Interview not found")
+        
+        # Get questions with their answers
+        questions_raw = cursor.execute("SELECT * FROM question WHERE interview_id = ? ORDER BY seq", (interview_id,)).fetchall()
+        answers = loaders.answers_by_question(conn, [interview_id])
+        questions = []
+        
+        for q in questions_raw:
+            q_dict = dict(q)
+            q_dict['answer'] = answers.get(q['id'])
+            questions.append(q_dict)
+        
+        return interview, questions
     
-    conn.close()
+    interview, questions = await run_db(load_interview)
     return {
         **dict(interview),
         "questions": questions
@@ -1204,38 +1282,41 @@ async def get_interview(interview_id: int):
 @app.post("/api/interviews/{interview_id}/answers/{answer_id}/evaluate")
 async def evaluate_answer(interview_id: int, answer_id: int):
     """Evaluate a candidate's answer using AI"""
+    await write_buffer.flush_async()
     from answer_evaluator import AnswerEvaluator
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    def load_answer(conn):
+        cursor = conn.cursor()
+        
+        # Get answer with question and transcript
+        answer_data = cursor.execute("""
+            SELECT 
+                a.id as answer_id,
+                q.text as question,
+                q.id as question_id,
+                a.interview_id
+            FROM answer a
+            JOIN question q ON a.question_id = q.id
+            WHERE a.id = ? AND a.interview_id = ?
+        """, (answer_id, interview_id)).fetchone()
+        
+        if not answer_data:
+            raise HTTPException(status_code=404, detail="Answer not found")
+        
+        # Get transcript for this answer
+        transcripts = cursor.execute("""
+            SELECT text FROM transcript_chunk 
+            WHERE answer_id = ? AND is_final = 1
+            ORDER BY timestamp_ms
+        """, (answer_id,)).fetchall()
+        
+        return answer_data, transcripts
     
-    # Get answer with question and transcript
-    answer_data = cursor.execute("""
-        SELECT 
-            a.id as answer_id,
-            q.text as question,
-            q.id as question_id,
-            a.interview_id
-        FROM answer a
-        JOIN question q ON a.question_id = q.id
-        WHERE a.id = ? AND a.interview_id = ?
-    """, (answer_id, interview_id)).fetchone()
-    
-    if not answer_data:
-        conn.close()
-        raise HTTPException(status_code=404, detail="Answer not found")
-    
-    # Get transcript for this answer
-    transcripts = cursor.execute("""
-        SELECT text FROM transcript_chunk 
-        WHERE answer_id = ? AND is_final = 1
-        ORDER BY timestamp
-    """, (answer_id,)).fetchall()
+    answer_data, transcripts = await run_db(load_answer)
     
     answer_text = ' '.join([t['text'] for t in transcripts])
     
     if not answer_text or len(answer_text) < 5:
-        conn.close()
         return {
             "score": 0.0,
             "verdict": "No answer provided",
@@ -1251,95 +1332,99 @@ async def evaluate_answer(interview_id: int, answer_id: int):
     )
     
     # Store evaluation in database
-    cursor.execute("""
-        UPDATE answer 
-        SET score = ?, verdict = ?, auto_score_breakdown = ?
-        WHERE id = ?
-    """, (
-        evaluation['score'],
-        evaluation['verdict'],
-        json.dumps({
-            'strengths': evaluation['strengths'],
-            'weaknesses': evaluation['weaknesses']
-        }),
-        answer_id
-    ))
-    
-    conn.commit()
-    conn.close()
+    def save_evaluation(conn):
+        conn.execute("""
+            UPDATE answer 
+            SET score = ?, verdict = ?, auto_score_breakdown = ?
+            WHERE id = ?
+        """, (
+            evaluation['score'],
+            evaluation['verdict'],
+            pack_column(conn, "answer", json.dumps({
+                'strengths': evaluation['strengths'],
+                'weaknesses': evaluation['weaknesses']
+            })),
+            answer_id
+        ))
+        conn.commit()
+    
+    await run_db(save_evaluation)
+    invalidate_interview_views()
     
     return evaluation
 
 @app.post("/api/interviews/{interview_id}/complete")
 async def complete_interview(interview_id: int, background_tasks: BackgroundTasks):
     """Mark interview as completed and generate overall feedback"""
+    # Buffered transcript chunks and proctor events must be on disk first
+    await write_buffer.flush_async()
     from answer_evaluator import AnswerEvaluator
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get all answers with questions and transcripts
-    answers = cursor.execute("""
-        SELECT 
-            a.id as answer_id,
-            a.score,
-            a.verdict,
-            q.text as question,
-            q.seq
-        FROM answer a
-        JOIN question q ON a.question_id = q.id
-        WHERE a.interview_id = ?
-        ORDER BY q.seq
-    """, (interview_id,)).fetchall()
-    
-    # Prepare data for overall feedback
-    answers_data = []
-    for ans in answers:
-        # Get transcript for this answer
-        transcripts = cursor.execute("""
-            SELECT text FROM transcript_chunk 
-            WHERE answer_id = ? AND is_final = 1
-            ORDER BY timestamp
-        """, (ans['answer_id'],)).fetchall()
+    def load_answers(conn):
+        cursor = conn.cursor()
         
-        answer_text = ' '.join([t['text'] for t in transcripts])
+        # Get all answers with questions and transcripts
+        answers = cursor.execute("""
+            SELECT 
+                a.id as answer_id,
+                a.score,
+                a.verdict,
+                q.text as question,
+                q.seq
+            FROM question q
+            CROSS JOIN answer a ON a.question_id = q.id AND a.interview_id = q.interview_id
+            WHERE q.interview_id = ?
+            ORDER BY q.seq
+        """, (interview_id,)).fetchall()
         
-        answers_data.append({
-            'question': ans['question'],
-            'answer_text': answer_text,
-            'score': ans['score'] or 0.0,
-            'verdict': ans['verdict'] or 'Not evaluated'
-        })
+        # Prepare data for overall feedback
+        final_texts = loaders.final_answer_texts(conn, [interview_id])
+        answers_data = []
+        for ans in answers:
+            answers_data.append({
+                'question': ans['question'],
+                'answer_text': final_texts.get(ans['answer_id'], ''),
+                'score': ans['score'] or 0.0,
+                'verdict': ans['verdict'] or 'Not evaluated'
+            })
+        
+        return answers_data
+    
+    answers_data = await run_db(load_answers)
     
     # Generate overall feedback
     evaluator = AnswerEvaluator()
     overall_feedback = evaluator.generate_overall_feedback(answers_data)
     
     # Update interview with feedback and scores
-    cursor.execute("""
-        UPDATE interview 
-        SET status = 'completed', 
-            ended_at = ?,
-            total_score = ?,
-            notes = ?
-        WHERE id = ?
-    """, (
-        datetime.now(),
-        overall_feedback['overall_score'],
-        json.dumps({
-            'overall_feedback': overall_feedback['overall_feedback'],
-            'detailed_feedback': overall_feedback['detailed_feedback'],
-            'overall_score_percent': overall_feedback['overall_score_percent']
-        }),
-        interview_id
-    ))
-    
-    if cursor.rowcount == 0:
-        conn.close()
-        raise HTTPException(status_code=404, detail="Interview not found")
+    def save_completion(conn):
+        cursor = conn.execute("""
+            UPDATE interview 
+            SET status = 'completed', 
+                ended_at = ?,
+                total_score = ?,
+                notes = ?
+            WHERE id = ?
+        """, (
+            utc_now(),
+            overall_feedback['overall_score'],
+            pack_column(conn, "interview", json.dumps({
+                'overall_feedback': overall_feedback['overall_feedback'],
+                'detailed_feedback': overall_feedback['detailed_feedback'],
+                'overall_score_percent': overall_feedback['overall_score_percent']
+            })),
+            interview_id
+        ))
+        
+        if cursor.rowcount == 0:
+            raise HTTPException(status_code=404, detail="Interview not found")
+        
+        conn.commit()
     
-    conn.commit()
-    conn.close()
+    await run_db(save_completion)
+    live_sessions.invalidate(interview_id)
+    await run_db(reports.render_report, interview_id)
+    invalidate_interview_views()
     
     return {
         "status": "completed",
@@ -1353,27 +1438,14 @@ async def get_interview_greeting(interview_id: int, language: str = "English"):
     """Generate personalized greeting for interview start"""
     from gemini_service import GeminiService
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    # Candidate and job context from the live session
+    session = await run_db(live_sessions.load, interview_id)
     
-    # Get interview details with application and job info
-    interview_data = cursor.execute("""
-        SELECT 
-            i.candidate_name,
-            j.title as job_title
-        FROM interview i
-        LEFT JOIN applications a ON i.application_id = a.id
-        LEFT JOIN jobs j ON a.job_id = j.id
-        WHERE i.id = ?
-    """, (interview_id,)).fetchone()
-    
-    conn.close()
-    
-    if not interview_data:
+    if not session:
         raise HTTPException(status_code=404, detail="Interview not found")
     
-    candidate_name = interview_data['candidate_name'] or "Candidate"
-    job_title = interview_data['job_title'] or "Telesales"
+    candidate_name = session.candidate_name or "Candidate"
+    job_title = session.job_title or "Telesales"
     
     gemini = GeminiService()
     greeting_text = gemini.generate_greeting(candidate_name, job_title, language)
@@ -1394,16 +1466,10 @@ async def generate_question(interview_id: int, params: QuestionGenerate):
     
     gemini = GeminiService()
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get current question count
-    current_count = cursor.execute(
-        "SELECT COUNT(*) FROM question WHERE interview_id = ?", 
-        (interview_id,)
-    ).fetchone()[0]
+    # Questions asked so far, from the live session
+    session = await run_db(live_sessions.load, interview_id)
     
-    question_number = current_count + 1
+    question_number = (session.seq if session else 0) + 1
     
     # Get question counts from environment
     resume_count = int(os.getenv('RESUME_QUESTIONS_COUNT', 2))
@@ -1432,20 +1498,19 @@ async def generate_question(interview_id: int, params: QuestionGenerate):
     # Generate TTS audio with the selected language
     audio_base64 = gemini.text_to_speech(question_text, language=params.language)
     
-    # Get next sequence number
-    last_seq = cursor.execute(
-        "SELECT MAX(seq) FROM question WHERE interview_id = ?", 
-        (interview_id,)
-    ).fetchone()[0]
-    next_seq = (last_seq or 0) + 1
+    def insert_question(conn):
+        # Next seq is computed inside the INSERT, so concurrent requests cannot take the same one
+        row = conn.execute(
+            """INSERT INTO question (interview_id, seq, text, prompt_source, asked_at)
+               SELECT ?, COALESCE(MAX(seq), 0) + 1, ?, ?, ? FROM question WHERE interview_id = ?
+               RETURNING id, seq""",
+            (interview_id, question_text, f"{question_type}_question", utc_now(), interview_id)
+        ).fetchone()
+        conn.commit()
+        return row['id'], row['seq']
     
-    cursor.execute(
-        "INSERT INTO question (interview_id, seq, text, prompt_source, asked_at) VALUES (?, ?, ?, ?, ?)",
-        (interview_id, next_seq, question_text, f"{question_type}_question", datetime.now())
-    )
-    question_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    question_id, next_seq = await run_db(insert_question)
+    live_sessions.question_issued(interview_id, question_id, next_seq)
     
     return {
         "question": {
@@ -1480,55 +1545,50 @@ async def upload_answer(
     from media_processor import crop_video_to_face
     background_tasks.add_task(crop_video_to_face, file_location, cropped_location)
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Check if answer already exists (from transcript)
-    existing_answer = cursor.execute(
-        "SELECT id FROM answer WHERE question_id = ? AND interview_id = ?",
-        (question_id, interview_id)
-    ).fetchone()
-    
-    if existing_answer:
-        # Update existing answer with video
-        answer_id = existing_answer['id']
-        cursor.execute(
-            '''UPDATE answer 
-               SET recording_path = ?, cropped_recording_path = ?, end_time = ?, duration_seconds = ?
-               WHERE id = ?''',
-            (file_location, cropped_location, end_time, 0, answer_id)
-        )
-    else:
-        # Create new answer
-        cursor.execute(
+    def save_answer(conn):
+        # Create the answer, or attach the video to the one the transcript already created
+        answer_id = conn.execute(
             '''INSERT INTO answer 
                (question_id, interview_id, recording_path, cropped_recording_path, start_time, end_time, duration_seconds) 
-               VALUES (?, ?, ?, ?, ?, ?, ?)''',
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(question_id, interview_id) DO UPDATE SET
+                   recording_path = excluded.recording_path,
+                   cropped_recording_path = excluded.cropped_recording_path,
+                   end_time = excluded.end_time,
+                   duration_seconds = excluded.duration_seconds
+               RETURNING id''',
             (question_id, interview_id, file_location, cropped_location, start_time, end_time, 0) 
-        )
-        answer_id = cursor.lastrowid
+        ).fetchone()['id']
+        
+        conn.commit()
+        return answer_id
     
-    conn.commit()
-    conn.close()
+    answer_id = await run_db(save_answer)
+    live_sessions.answer_created(interview_id, question_id, answer_id)
+    invalidate_interview_views()
     
     # Trigger answer evaluation in background
     from answer_evaluator import AnswerEvaluator
     
     async def evaluate_answer_task():
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
+            await write_buffer.flush_async()
             
-            # Get question and transcript
-            question_data = cursor.execute(
-                "SELECT text FROM question WHERE id = ?", (question_id,)
-            ).fetchone()
+            def load_answer(conn):
+                # Get question and transcript
+                question_data = conn.execute(
+                    "SELECT text FROM question WHERE id = ?", (question_id,)
+                ).fetchone()
+                
+                transcripts = conn.execute("""
+                    SELECT text FROM transcript_chunk 
+                    WHERE answer_id = ? AND is_final = 1
+                    ORDER BY timestamp_ms
+                """, (answer_id,)).fetchall()
+                
+                return question_data, transcripts
             
-            transcripts = cursor.execute("""
-                SELECT text FROM transcript_chunk 
-                WHERE answer_id = ? AND is_final = 1
-                ORDER BY timestamp
-            """, (answer_id,)).fetchall()
+            question_data, transcripts = await run_db(load_answer)
             
             answer_text = ' '.join([t['text'] for t in transcripts])
             
@@ -1540,24 +1600,25 @@ async def upload_answer(
                 )
                 
                 # Store evaluation
-                cursor.execute("""
-                    UPDATE answer 
-                    SET score = ?, verdict = ?, auto_score_breakdown = ?
-                    WHERE id = ?
-                """, (
-                    evaluation['score'],
-                    evaluation['verdict'],
-                    json.dumps({
-                        'strengths': evaluation['strengths'],
-                        'weaknesses': evaluation['weaknesses']
-                    }),
-                    answer_id
-                ))
+                def save_evaluation(conn):
+                    conn.execute("""
+                        UPDATE answer 
+                        SET score = ?, verdict = ?, auto_score_breakdown = ?
+                        WHERE id = ?
+                    """, (
+                        evaluation['score'],
+                        evaluation['verdict'],
+                        pack_column(conn, "answer", json.dumps({
+                            'strengths': evaluation['strengths'],
+                            'weaknesses': evaluation['weaknesses']
+                        })),
+                        answer_id
+                    ))
+                    conn.commit()
                 
-                conn.commit()
+                await run_db(save_evaluation)
+                invalidate_interview_views()
                 print(f"Answer {answer_id} evaluated: {evaluation['score']}/5")
-            
-            conn.close()
         except Exception as e:
             print(f"Error in answer evaluation task: {e}")
             import traceback
@@ -1567,58 +1628,62 @@ async def upload_answer(
     
     return {"answer_id": answer_id}
 
+INSERT_TRANSCRIPT_CHUNK = '''INSERT INTO transcript_chunk (answer_id, timestamp, text, is_final)
+           VALUES (?, ?, ?, ?)'''
+
+INSERT_PROCTOR_EVENT = '''INSERT INTO proctor_event 
+           (interview_id, event_type, confidence, frame_path, notes, timestamp) 
+           VALUES (?, ?, ?, ?, ?, ?)'''
+
+def save_transcript_for_current_question(conn, interview_id: int, timestamp, text, is_final):
+    """Attach a transcript chunk to the latest question's answer. Returns the answer id, or None if no question exists yet."""
+    # The current question being answered, with its answer if one exists
+    session = live_sessions.load(conn, interview_id)
+    
+    if not session or session.question_id is None:
+        return None
+    
+    answer_id = session.answer_id
+    if answer_id is None:
+        # Create a placeholder answer; if another writer just created it, use theirs
+        created = conn.execute(
+            '''INSERT INTO answer (question_id, interview_id, start_time) 
+               VALUES (?, ?, ?)
+               ON CONFLICT(question_id, interview_id) DO NOTHING
+               RETURNING id''',
+            (session.question_id, interview_id, utc_now())
+        ).fetchone()
+        if created:
+            answer_id = created['id']
+        else:
+            answer_id = conn.execute(
+                'SELECT id FROM answer WHERE question_id = ? AND interview_id = ?',
+                (session.question_id, interview_id)
+            ).fetchone()['id']
+        conn.commit()
+        if created:
+            # A new answer row changes answer_count and maxScore on the assessment views
+            invalidate_interview_views()
+        live_sessions.answer_created(interview_id, session.question_id, answer_id)
+    
+    # The chunk itself is committed by the write-behind flusher in a batch
+    write_buffer.put(INSERT_TRANSCRIPT_CHUNK, (answer_id, timestamp, text, is_final))
+    return answer_id
+
 @app.post("/api/interviews/{interview_id}/transcript")
 async def save_transcript_chunk(interview_id: int, chunk: TranscriptChunk):
     """Save transcript chunk to database"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get the current question being answered
-    current_question = cursor.execute(
-        "SELECT id FROM question WHERE interview_id = ? ORDER BY seq DESC LIMIT 1",
-        (interview_id,)
-    ).fetchone()
-    
-    if not current_question:
-        conn.close()
-        raise HTTPException(status_code=404, detail="No active question found")
-    
-    question_id = current_question['id']
-    
-    # Get or create answer for this question
-    answer = cursor.execute(
-        "SELECT id FROM answer WHERE question_id = ? AND interview_id = ?",
-        (question_id, interview_id)
-    ).fetchone()
-    
-    if not answer:
-        # Create a placeholder answer if it doesn't exist yet
-        cursor.execute(
-            '''INSERT INTO answer (question_id, interview_id, start_time) 
-               VALUES (?, ?, ?)''',
-            (question_id, interview_id, datetime.now())
-        )
-        answer_id = cursor.lastrowid
-    else:
-        answer_id = answer['id']
-    
-    # Save transcript chunk
-    cursor.execute(
-        '''INSERT INTO transcript_chunk (answer_id, timestamp, text, is_final)
-           VALUES (?, ?, ?, ?)''',
-        (answer_id, chunk.timestamp, chunk.text, chunk.is_final)
+    answer_id = await run_db(
+        save_transcript_for_current_question, interview_id, chunk.timestamp, chunk.text, chunk.is_final
     )
     
-    conn.commit()
-    conn.close()
+    if answer_id is None:
+        raise HTTPException(status_code=404, detail="No active question found")
     
     return {"status": "ok", "answer_id": answer_id}
 
 @app.post("/api/interviews/{interview_id}/proctor/event")
 async def log_proctor_event(interview_id: int, event: ProctorEvent):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     frame_path = ""
     server_analysis_notes = ""
     
@@ -1639,46 +1704,69 @@ async def log_proctor_event(interview_id: int, event: ProctorEvent):
                 server_analysis_notes = f" [Server Verified: {', '.join([e['type'] for e in server_events])}]"
         except Exception as e:
             print(f"Frame processing error: {e}")
-            
-    cursor.execute(
-        '''INSERT INTO proctor_event 
-           (interview_id, event_type, confidence, frame_path, notes, timestamp) 
-           VALUES (?, ?, ?, ?, ?, ?)''',
-        (interview_id, event.event_type, event.confidence, frame_path, (event.notes or "") + server_analysis_notes, datetime.now())
+    
+    await write_buffer.submit(
+        INSERT_PROCTOR_EVENT,
+        (interview_id, event.event_type, event.confidence, frame_path, (event.notes or "") + server_analysis_notes, utc_now())
     )
-    conn.commit()
-    conn.close()
     return {"status": "ok"}
 
 @app.get("/api/interviews/recent")
 async def get_recent_interviews():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get interviews with question count
-    interviews = cursor.execute("""
-        SELECT i.*, COUNT(q.id) as question_count
+    # Get interviews; question_count is maintained by triggers on question
+    interviews = await run_db(lambda conn: conn.execute("""
+        SELECT i.*
         FROM interview i
-        LEFT JOIN question q ON i.id = q.interview_id
-        GROUP BY i.id
-        ORDER BY i.started_at DESC
+        ORDER BY i.started_ms DESC, i.id DESC
         LIMIT 50
-    """).fetchall()
-    
-    conn.close()
+    """).fetchall())
     
     return {
         "interviews": [dict(i) for i in interviews]
     }
 
 @app.get("/api/dashboard/interviews")
-async def list_interviews():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    interviews = cursor.execute("SELECT * FROM interview ORDER BY started_at DESC").fetchall()
-    conn.close()
+async def list_interviews(response: Response, limit: int = MAX_PAGE_SIZE, cursor: Optional[str] = None):
+    """Newest interviews first, one page at a time; the next page's cursor is sent in X-Next-Cursor"""
+    limit = clamp_limit(limit)
+    after = parse_cursor(cursor, 2)
+    
+    if after:
+        interviews = await run_db(lambda conn: conn.execute("""
+            SELECT * FROM interview
+            WHERE (started_ms, id) < (?, ?)
+            ORDER BY started_ms DESC, id DESC
+            LIMIT ?
+        """, (*after, limit)).fetchall())
+    else:
+        interviews = await run_db(lambda conn: conn.execute(
+            "SELECT * FROM interview ORDER BY started_ms DESC, id DESC LIMIT ?", (limit,)
+        ).fetchall())
+    
+    cursor_for_next = next_cursor(interviews, limit, 'started_ms', 'id')
+    if cursor_for_next:
+        response.headers["X-Next-Cursor"] = cursor_for_next
     return [dict(i) for i in interviews]
 
+@app.get("/api/exports/{entity}")
+async def export_data(entity: str, format: str = "ndjson", job_id: Optional[int] = None,
+                      start: Optional[str] = None, end: Optional[str] = None):
+    """
+    Stream every candidate, application or assessment as NDJSON, CSV or Parquet,
+    optionally limited to one job and an inclusive YYYY-MM-DD date range.
+    """
+    try:
+        export_filter = exports.ExportFilter(job_id, start, end)
+        encoder = exports.encoder_for(entity, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return StreamingResponse(
+        exports.stream_export(encoder, entity, export_filter),
+        media_type=exports.EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{entity}.{format}"'}
+    )
+
 # --- WebSocket ---
 @app.websocket("/ws/interview/{interview_id}")
 async def websocket_endpoint(websocket: WebSocket, interview_id: int):
@@ -1693,47 +1781,14 @@ async def websocket_endpoint(websocket: WebSocket, interview_id: int):
                 
                 # Handle transcript chunks from client
                 if msg.get('type') == 'transcript_chunk':
-                    conn = get_db_connection()
-                    cursor = conn.cursor()
-                    
-                    # Get the current question being answered
-                    current_question = cursor.execute(
-                        "SELECT id FROM question WHERE interview_id = ? ORDER BY seq DESC LIMIT 1",
-                        (interview_id,)
-                    ).fetchone()
+                    answer_id = await run_db(
+                        save_transcript_for_current_question,
+                        interview_id, msg.get('timestamp'), msg.get('text'), msg.get('is_final', False)
+                    )
                     
-                    if current_question:
-                        question_id = current_question['id']
-                        
-                        # Get or create answer for this question
-                        answer = cursor.execute(
-                            "SELECT id FROM answer WHERE question_id = ? AND interview_id = ?",
-                            (question_id, interview_id)
-                        ).fetchone()
-                        
-                        if not answer:
-                            # Create a placeholder answer if it doesn't exist yet
-                            cursor.execute(
-                                '''INSERT INTO answer (question_id, interview_id, start_time) 
-                                   VALUES (?, ?, ?)''',
-                                (question_id, interview_id, datetime.now())
-                            )
-                            answer_id = cursor.lastrowid
-                        else:
-                            answer_id = answer['id']
-                        
-                        # Save transcript chunk
-                        cursor.execute(
-                            '''INSERT INTO transcript_chunk (answer_id, timestamp, text, is_final)
-                               VALUES (?, ?, ?, ?)''',
-                            (answer_id, msg.get('timestamp'), msg.get('text'), msg.get('is_final', False))
-                        )
-                        
-                        conn.commit()
+                    if answer_id is not None:
                         print(f"Saved transcript chunk for answer {answer_id}: {msg.get('text')}")
                     
-                    conn.close()
-                    
             except json.JSONDecodeError:
                 print(f"Invalid JSON received: {data}")
             except Exception as e:
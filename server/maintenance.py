@@ -0,0 +1,287 @@
+"""
+Database maintenance commands
+Reconciles trigger-maintained aggregates against the source tables, moves
+old interview data to the month partitions and seals finished months. Meant to
+be run from cron. Also exports candidates, applications and assessments for
+offline analysis, retrains the compression dictionaries of the large text
+columns, removes media files no row points at any more, rebuilds the candidate
+search index after candidates were written outside the application, and backs
+up the database with its partitions.
+
+Usage:
+    python maintenance.py rebuild-summaries
+    python maintenance.py rebuild-rollups
+    python maintenance.py reconcile-counters
+    python maintenance.py reconcile-status
+    python maintenance.py archive [--days 180]
+    python maintenance.py export candidates|applications|assessments [--format ndjson|csv|parquet]
+                                 [--job-id N] [--start YYYY-MM-DD] [--end YYYY-MM-DD] [--output FILE]
+    python maintenance.py train-dictionaries [--samples 2000]
+    python maintenance.py sweep-media [--scan] [--max-seconds 60]
+    python maintenance.py reindex-search
+    python maintenance.py backup DIRECTORY
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+from typing import Tuple
+from urllib.parse import quote
+
+import archive
+import database
+import exports
+import media_gc
+import search
+import textcodec
+from database import get_db_connection, init_db
+from migrations import BACKFILL_BATCH_SIZE, seed_daily_rollups, sync_counters, sync_pipeline_status
+
+
+def rebuild_interview_summaries(conn) -> int:
+    """
+    Recompute interview_summary from the answer table and fix any drift
+    (missing rows, wrong counts, float error in score_sum).
+    Returns the number of interviews whose summary was corrected.
+    """
+    # Hold the write lock so no answer changes between the comparison and the fix
+    conn.execute("BEGIN IMMEDIATE")
+    expected = '''
+        SELECT i.id as interview_id,
+               COUNT(a.id) as answer_count,
+               COALESCE(SUM(a.score), 0) as score_sum,
+               COUNT(a.recording_path) as recording_count
+        FROM interview i
+        LEFT JOIN answer a ON a.interview_id = i.id
+        GROUP BY i.id
+    '''
+    drifted = conn.execute(f'''
+        SELECT e.*
+        FROM ({expected}) e
+        LEFT JOIN interview_summary s ON s.interview_id = e.interview_id
+        WHERE s.interview_id IS NULL
+           OR s.answer_count != e.answer_count
+           OR ABS(s.score_sum - e.score_sum) > 1e-9
+           OR s.recording_count != e.recording_count
+    ''').fetchall()
+
+    conn.executemany('''
+        INSERT INTO interview_summary (interview_id, answer_count, score_sum, recording_count)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(interview_id) DO UPDATE SET
+            answer_count = excluded.answer_count,
+            score_sum = excluded.score_sum,
+            recording_count = excluded.recording_count
+    ''', [tuple(row) for row in drifted])
+
+    # Summaries left behind by interviews that no longer exist
+    orphaned = conn.execute(
+        "DELETE FROM interview_summary WHERE interview_id NOT IN (SELECT id FROM interview)"
+    ).rowcount
+
+    conn.commit()
+    return len(drifted) + orphaned
+
+
+def rebuild_daily_rollups(conn):
+    """Recompute the dashboard's daily rollup tables from the base tables"""
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("DELETE FROM daily_job_stats")
+    conn.execute("DELETE FROM daily_candidate_stats")
+    seed_daily_rollups(conn)
+    conn.commit()
+
+
+def reconcile_counters(conn) -> int:
+    """Check the list counters (applicant/question counts, table_stats) and fix drift. Returns how many were wrong."""
+    conn.execute("BEGIN IMMEDIATE")
+    fixed = sync_counters(conn)
+    conn.commit()
+    return fixed
+
+
+def reconcile_pipeline_status(conn) -> int:
+    """Re-derive applications/interview pipeline_status and fix drift. Returns how many rows were wrong."""
+    conn.execute("BEGIN IMMEDIATE")
+    fixed = sync_pipeline_status(conn)
+    conn.commit()
+    return fixed
+
+
+def train_dictionaries(conn, samples: int = textcodec.DICTIONARY_SAMPLES):
+    """
+    Train new compression dictionaries, then repack existing rows with them one
+    short transaction per batch. Returns ({column: samples used}, id window repacked).
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    trained = textcodec.train_dictionaries(conn, samples)
+    textcodec.start_repack(conn)
+    conn.commit()
+
+    repacked = 0
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        processed = textcodec.repack_batch(conn, BACKFILL_BATCH_SIZE)
+        conn.commit()
+        if processed == 0:
+            return trained, repacked
+        repacked += processed
+
+
+def sweep_media(conn, scan: bool = False, max_seconds: float = 60.0) -> dict:
+    """
+    Remove the queued media files, first queueing unreferenced files found on
+    disk when scan is set. Returns the sweep result plus how many were found.
+    """
+    found = 0
+    if scan:
+        # The sweep checks each path again before removing it
+        found = media_gc.queue_orphans(conn)
+        conn.commit()
+    result = media_gc.sweep(conn, max_seconds=max_seconds)
+    result["found"] = found
+    return result
+
+
+def reindex_search(conn) -> int:
+    """Rebuild candidates_fts from the candidates table. Returns how many candidates were indexed."""
+    conn.execute("BEGIN IMMEDIATE")
+    indexed = search.reindex_candidates(conn, BACKFILL_BATCH_SIZE)
+    conn.commit()
+    return indexed
+
+
+def backup(conn, directory: str) -> Tuple[int, int]:
+    """
+    Copy the main database and every partition into directory with SQLite's
+    online backup. Sealed partitions never change, so one already copied (same
+    size and modification time) is skipped. Returns (files copied, skipped).
+    """
+    os.makedirs(directory, exist_ok=True)
+    target = sqlite3.connect(os.path.join(directory, os.path.basename(database.DB_PATH)))
+    try:
+        conn.backup(target)
+    finally:
+        target.close()
+
+    copied, skipped = 1, 0
+    for month in database.partition_months():
+        source = database.partition_path(month)
+        copy = os.path.join(directory, os.path.basename(source))
+        if archive.is_sealed(month):
+            stat = os.stat(source)
+            if os.path.exists(copy) and os.stat(copy).st_size == stat.st_size and os.stat(copy).st_mtime == stat.st_mtime:
+                skipped += 1
+                continue
+            if os.path.exists(copy):
+                os.remove(copy)
+            shutil.copy2(source, copy)
+        else:
+            partition = sqlite3.connect(f"file:{quote(source)}?mode=ro", uri=True)
+            target = sqlite3.connect(copy)
+            try:
+                partition.backup(target)
+            finally:
+                target.close()
+                partition.close()
+        copied += 1
+    return copied, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Database maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild-summaries", help="Recompute interview_summary from answers")
+    subparsers.add_parser("rebuild-rollups", help="Recompute the daily dashboard rollups")
+    subparsers.add_parser("reconcile-counters", help="Check and fix the maintained list counters")
+    subparsers.add_parser("reconcile-status", help="Check and fix the stored pipeline status")
+    archive_parser = subparsers.add_parser(
+        "archive", help="Move transcripts/proctor events of old completed interviews to month partitions"
+    )
+    archive_parser.add_argument("--days", type=int, default=archive.ARCHIVE_AFTER_DAYS,
+                                help="Archive interviews that ended more than this many days ago")
+    export_parser = subparsers.add_parser("export", help="Stream candidates, applications or assessments to a file")
+    export_parser.add_argument("entity", choices=list(exports.EXPORTS))
+    export_parser.add_argument("--format", choices=list(exports.EXPORT_FORMATS), default="ndjson")
+    export_parser.add_argument("--job-id", type=int, help="Only rows for this job")
+    export_parser.add_argument("--start", help="First day to include (YYYY-MM-DD)")
+    export_parser.add_argument("--end", help="Last day to include (YYYY-MM-DD)")
+    export_parser.add_argument("--output", help="File to write (default: stdout)")
+    train_parser = subparsers.add_parser(
+        "train-dictionaries", help="Retrain the text compression dictionaries and repack existing rows"
+    )
+    train_parser.add_argument("--samples", type=int, default=textcodec.DICTIONARY_SAMPLES,
+                              help="Newest rows of each column to train on")
+    backup_parser = subparsers.add_parser("backup", help="Back up the database and its month partitions")
+    backup_parser.add_argument("directory", help="Where to write the copies")
+    sweep_parser = subparsers.add_parser("sweep-media", help="Remove media files released by deletes")
+    sweep_parser.add_argument("--scan", action="store_true",
+                              help="Also queue unreferenced files found in the media directories")
+    sweep_parser.add_argument("--max-seconds", type=float, default=60.0,
+                              help="Stop after this long; what is left stays queued")
+    subparsers.add_parser("reindex-search", help="Rebuild the candidate search index from the candidates table")
+    args = parser.parse_args()
+
+    init_db()
+    conn = get_db_connection()
+
+    if args.command == "rebuild-summaries":
+        fixed = rebuild_interview_summaries(conn)
+        print(f"Rebuilt interview summaries: {fixed} corrected")
+    elif args.command == "rebuild-rollups":
+        rebuild_daily_rollups(conn)
+        print("Rebuilt daily rollups")
+    elif args.command == "reconcile-counters":
+        fixed = reconcile_counters(conn)
+        print(f"Reconciled list counters: {fixed} corrected")
+    elif args.command == "reconcile-status":
+        fixed = reconcile_pipeline_status(conn)
+        print(f"Reconciled pipeline status: {fixed} corrected")
+    elif args.command == "archive":
+        converted = archive.upgrade_partitions(conn)
+        if converted:
+            print(f"Converted {converted} archive files to partitions")
+        interviews, rows = archive.archive_interviews(conn, args.days)
+        print(f"Archived {interviews} interviews ({rows} rows)")
+        for month in archive.seal_partitions(conn, args.days):
+            print(f"Sealed partition {month}")
+        archive.compact(conn)
+        print("Analyzed and vacuumed main database")
+    elif args.command == "export":
+        try:
+            export_filter = exports.ExportFilter(args.job_id, args.start, args.end)
+            encoder = exports.encoder_for(args.entity, args.format)
+        except ValueError as e:
+            parser.error(str(e))
+        out = open(args.output, "wb") if args.output else sys.stdout.buffer
+        try:
+            for chunk in exports.export_chunks(conn, encoder, args.entity, export_filter):
+                out.write(chunk)
+        finally:
+            if args.output:
+                out.close()
+    elif args.command == "train-dictionaries":
+        trained, repacked = train_dictionaries(conn, args.samples)
+        for column, count in trained.items():
+            print(f"Trained dictionary for {column} on {count} rows")
+        print(f"Repacked compressed columns over {repacked} ids")
+    elif args.command == "backup":
+        copied, skipped = backup(conn, args.directory)
+        print(f"Backed up {copied} files to {args.directory} ({skipped} unchanged sealed partitions skipped)")
+    elif args.command == "sweep-media":
+        result = sweep_media(conn, args.scan, args.max_seconds)
+        if args.scan:
+            print(f"Queued {result['found']} unreferenced files")
+        print(f"Removed {result['files_removed']} files ({result['bytes_freed']} bytes freed), "
+              f"{result['queued']} still queued")
+    elif args.command == "reindex-search":
+        indexed = reindex_search(conn)
+        print(f"Reindexed {indexed} candidates for search")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
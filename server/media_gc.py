@@ -0,0 +1,162 @@
+"""
+Garbage collection of media files
+Answer recordings (data/media/*.webm and their cropped_ copies), proctoring
+frames (data/frames) and uploaded resumes (data/uploads) live on disk, outside
+the rows that point at them. Deleting those rows, directly or by cascade, queues
+the paths in media_gc from a trigger in the same transaction; the sweeper then
+removes the files in batches of MEDIA_GC_BATCH_SIZE and stops after
+MEDIA_GC_MAX_SECONDS, so a large delete never holds up a request or the sweep.
+A queued path that a row points at again (a resume re-uploaded under the same
+name) is dropped from the queue and the file kept.
+"""
+
+import os
+import threading
+import time
+from typing import Iterable, Optional
+
+import archive
+import database
+from migrations import MEDIA_REFERENCES
+
+MEDIA_DIRS = ("data/media", "data/frames", "data/uploads")
+SWEEP_INTERVAL_SECONDS = float(os.getenv('MEDIA_GC_INTERVAL_SECONDS', 300))
+SWEEP_BATCH_SIZE = int(os.getenv('MEDIA_GC_BATCH_SIZE', 200))
+SWEEP_MAX_SECONDS = float(os.getenv('MEDIA_GC_MAX_SECONDS', 2.0))
+# Files younger than this may belong to a row not written yet (frames are saved
+# before their buffered proctor event, recordings before their answer)
+SCAN_GRACE_SECONDS = int(os.getenv('MEDIA_GC_SCAN_GRACE_SECONDS', 3600))
+
+
+def enqueue(conn, paths: Iterable[str]) -> int:
+    """Queue files released outside the triggers (e.g. frames of a deleted archive); the caller commits"""
+    rows = [(path,) for path in paths if path]
+    conn.executemany("INSERT INTO media_gc (path) VALUES (?)", rows)
+    return len(rows)
+
+
+def is_referenced(conn, path: str) -> bool:
+    return any(
+        conn.execute(f"SELECT 1 FROM {table} WHERE {column} = ? LIMIT 1", (path,)).fetchone()
+        for table, columns in MEDIA_REFERENCES.items() for column in columns
+    )
+
+
+def sweep(conn, batch_size: int = SWEEP_BATCH_SIZE, max_seconds: float = SWEEP_MAX_SECONDS) -> dict:
+    """
+    Remove queued files batch by batch until the queue is empty or max_seconds
+    have passed (checked between batches). Returns what was done, including the
+    bytes freed and how many paths are still queued.
+    """
+    deadline = time.monotonic() + max_seconds
+    result = {"files_removed": 0, "bytes_freed": 0, "kept": 0, "missing": 0, "errors": 0}
+    while True:
+        batch = conn.execute("SELECT id, path FROM media_gc ORDER BY id LIMIT ?", (batch_size,)).fetchall()
+        done = []
+        for row in batch:
+            path = row['path']
+            if is_referenced(conn, path):
+                result["kept"] += 1
+            else:
+                try:
+                    size = os.path.getsize(path)
+                    os.remove(path)
+                    result["files_removed"] += 1
+                    result["bytes_freed"] += size
+                except FileNotFoundError:
+                    result["missing"] += 1
+                except OSError as e:
+                    # Left queued; the next sweep tries again
+                    print(f"Media sweep could not remove {path}: {e}")
+                    result["errors"] += 1
+                    continue
+            done.append((row['id'],))
+        conn.executemany("DELETE FROM media_gc WHERE id = ?", done)
+        conn.commit()
+        if len(batch) < batch_size or len(done) == 0 or time.monotonic() >= deadline:
+            break
+    result["queued"] = conn.execute("SELECT COUNT(*) FROM media_gc").fetchone()[0]
+    return result
+
+
+def queue_orphans(conn, grace_seconds: int = SCAN_GRACE_SECONDS) -> int:
+    """
+    Queue files in MEDIA_DIRS that no row or archived interview points at and
+    that are older than grace_seconds: media left behind before deletes were
+    tracked. Returns how many were queued; the caller commits. Attaches the
+    archive partitions, so it must start outside a transaction.
+    """
+    referenced = archive.archived_frame_paths(conn)
+    for table, columns in MEDIA_REFERENCES.items():
+        for column in columns:
+            referenced.update(row[0] for row in conn.execute(f"SELECT DISTINCT {column} FROM {table}"))
+    referenced.update(row[0] for row in conn.execute("SELECT path FROM media_gc"))
+
+    cutoff = time.time() - grace_seconds
+    orphans = []
+    for directory in MEDIA_DIRS:
+        if not os.path.isdir(directory):
+            continue
+        for entry in os.scandir(directory):
+            path = f"{directory}/{entry.name}"
+            if entry.is_file() and path not in referenced and entry.stat().st_mtime < cutoff:
+                orphans.append(path)
+    return enqueue(conn, orphans)
+
+
+class MediaSweeper:
+    """Daemon thread running sweep() every interval seconds"""
+
+    def __init__(self, interval: float = SWEEP_INTERVAL_SECONDS):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.sweeps = 0
+        self.totals = {"files_removed": 0, "bytes_freed": 0}
+        self.last_sweep: Optional[dict] = None
+
+    def run_once(self) -> dict:
+        conn = database.get_db_connection()
+        try:
+            started = time.monotonic()
+            result = sweep(conn)
+            result["duration_ms"] = round((time.monotonic() - started) * 1000, 3)
+        finally:
+            conn.close()
+        self.sweeps += 1
+        for key in self.totals:
+            self.totals[key] += result[key]
+        self.last_sweep = result
+        if result["files_removed"]:
+            print(f"Media sweep removed {result['files_removed']} files ({result['bytes_freed']} bytes)")
+        return result
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Media sweep failed: {e}")
+
+    def start(self):
+        if self._thread is None and self.interval > 0:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="media-gc", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+
+    def status(self) -> dict:
+        return {
+            "interval_seconds": self.interval,
+            "sweeps": self.sweeps,
+            **self.totals,
+            "last_sweep": self.last_sweep,
+        }
+
+
+media_sweeper = MediaSweeper()
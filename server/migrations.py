@@ -0,0 +1,1346 @@
+"""
+Versioned schema migrations
+Each migration runs exactly once, in order, and is recorded in the schema_version table.
+When the schema is already current, startup costs a single version query.
+"""
+
+import os
+import re
+import time
+import sqlite3
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+import textcodec
+
+BACKFILL_BATCH_SIZE = int(os.getenv('MIGRATION_BATCH_SIZE', 500))
+# Pause between backfill batches so live writers can take the lock
+BACKFILL_PAUSE_SECONDS = float(os.getenv('MIGRATION_BATCH_PAUSE', 0.01))
+
+
+class Migration:
+    """
+    A schema change plus an optional online data backfill.
+
+    apply(conn) runs inside a single transaction together with the version bump,
+    so it should only contain DDL and cheap statements. backfill(conn, batch_size)
+    processes at most batch_size rows per call and returns how many it touched;
+    it is called repeatedly (one short transaction per batch) until it returns 0,
+    so it must be resumable.
+    """
+
+    def __init__(self, version: int, description: str, apply: Callable,
+                 backfill: Optional[Callable] = None):
+        self.version = version
+        self.description = description
+        self.apply = apply
+        self.backfill = backfill
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, description: str, backfill: Optional[Callable] = None):
+    """Register the decorated function as the apply step of a migration"""
+    def register(apply):
+        MIGRATIONS.append(Migration(version, description, apply, backfill))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return apply
+    return register
+
+
+def column_exists(conn, table: str, column: str) -> bool:
+    # table_xinfo also lists generated columns, which table_info leaves out
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_xinfo({table})"))
+
+
+def schema_state(conn):
+    """Return (current_version, pending_backfills) with one query"""
+    try:
+        row = conn.execute(
+            "SELECT MAX(version), COALESCE(SUM(backfill_pending), 0) FROM schema_version"
+        ).fetchone()
+    except sqlite3.OperationalError as e:
+        if "no such table" in str(e).lower():
+            return 0, 0
+        raise
+    return (row[0] or 0), row[1]
+
+
+def latest_version(migrations: List[Migration] = None) -> int:
+    migrations = MIGRATIONS if migrations is None else migrations
+    return max((m.version for m in migrations), default=0)
+
+
+def needs_work(conn, migrations: List[Migration] = None) -> bool:
+    version, pending = schema_state(conn)
+    return version < latest_version(migrations) or pending > 0
+
+
+def apply_migrations(conn, migrations: List[Migration] = None) -> int:
+    """Apply schema steps newer than the recorded version. Returns how many ran."""
+    migrations = MIGRATIONS if migrations is None else migrations
+    version, _ = schema_state(conn)
+    pending = [m for m in migrations if m.version > version]
+    if not pending:
+        return 0
+
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description TEXT NOT NULL,
+        applied_at TIMESTAMP NOT NULL,
+        backfill_pending INTEGER NOT NULL DEFAULT 0
+    )
+    ''')
+    conn.commit()
+
+    for m in pending:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            m.apply(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, description, applied_at, backfill_pending) VALUES (?, ?, ?, ?)",
+                (m.version, m.description, datetime.now(timezone.utc), 1 if m.backfill else 0)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"Applied migration {m.version}: {m.description}")
+    return len(pending)
+
+
+def run_backfills(conn, migrations: List[Migration] = None, batch_size: int = None) -> int:
+    """
+    Run pending data backfills in small batches, committing after each one.
+    Safe to interrupt: unfinished backfills resume on the next run.
+    Returns the number of rows processed.
+    """
+    migrations = MIGRATIONS if migrations is None else migrations
+    batch_size = batch_size or BACKFILL_BATCH_SIZE
+    by_version = {m.version: m for m in migrations}
+
+    try:
+        pending = [row[0] for row in conn.execute(
+            "SELECT version FROM schema_version WHERE backfill_pending = 1 ORDER BY version"
+        )]
+    except sqlite3.OperationalError:
+        return 0
+
+    total = 0
+    for version in pending:
+        m = by_version.get(version)
+        if m is not None and m.backfill is not None:
+            while True:
+                processed = m.backfill(conn, batch_size)
+                conn.commit()
+                total += processed
+                if processed == 0:
+                    break
+                time.sleep(BACKFILL_PAUSE_SECONDS)
+        conn.execute("UPDATE schema_version SET backfill_pending = 0 WHERE version = ?", (version,))
+        conn.commit()
+        print(f"Backfill for migration {version} complete")
+    return total
+
+
+def start_id_range_backfill(conn, version: int, table: str):
+    """
+    Record the id range of `table` that a migration's backfill must cover.
+    Call from the migration's apply step, in the same transaction that installs
+    the triggers handling newer rows, so every row is covered exactly once.
+    """
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS backfill_progress (
+        version INTEGER PRIMARY KEY,
+        last_id INTEGER NOT NULL,
+        end_id INTEGER NOT NULL
+    )
+    ''')
+    conn.execute(
+        f"INSERT OR REPLACE INTO backfill_progress (version, last_id, end_id) "
+        f"SELECT ?, 0, COALESCE(MAX(id), 0) FROM {table}",
+        (version,)
+    )
+
+
+def id_range_backfill(conn, version: int, batch_size: int, apply: Callable) -> int:
+    """
+    Advance a backfill started with start_id_range_backfill by one batch.
+    apply(conn, low, high) must process ids in (low, high]. Returns the size of
+    the id window processed (0 once the recorded range is exhausted).
+    """
+    last_id, end_id = conn.execute(
+        "SELECT last_id, end_id FROM backfill_progress WHERE version = ?", (version,)
+    ).fetchone()
+    if last_id >= end_id:
+        return 0
+    high = min(last_id + batch_size, end_id)
+    apply(conn, last_id, high)
+    conn.execute("UPDATE backfill_progress SET last_id = ? WHERE version = ?", (high, version))
+    return high - last_id
+
+
+def not_yet_backfilled(version: int, id_expr: str) -> str:
+    """SQL condition, usable in trigger WHEN clauses, that is true while id_expr still awaits the backfill"""
+    return (
+        f"EXISTS (SELECT 1 FROM backfill_progress WHERE version = {version} "
+        f"AND {id_expr} > last_id AND {id_expr} <= end_id)"
+    )
+
+
+# --- Migrations ---
+
+@migration(1, "baseline schema")
+def _baseline_schema(conn):
+    # Jobs
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        location TEXT NOT NULL,
+        job_type TEXT NOT NULL,
+        experience_required TEXT NOT NULL,
+        description TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        is_active BOOLEAN DEFAULT 1
+    )
+    ''')
+
+    # Candidates
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS candidates (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        email TEXT NOT NULL UNIQUE,
+        phone TEXT,
+        resume_path TEXT NOT NULL,
+        resume_text TEXT,
+        skills TEXT,
+        experience_years INTEGER,
+        education TEXT,
+        work_history TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+    # Applications
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS applications (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        candidate_id INTEGER NOT NULL,
+        job_id INTEGER NOT NULL,
+        match_score REAL NOT NULL,
+        match_explanation TEXT,
+        status TEXT DEFAULT 'pending',
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(candidate_id) REFERENCES candidates(id),
+        FOREIGN KEY(job_id) REFERENCES jobs(id)
+    )
+    ''')
+
+    # Interviews
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS interview (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        candidate_name TEXT,
+        candidate_email TEXT,
+        started_at TIMESTAMP,
+        ended_at TIMESTAMP,
+        status TEXT DEFAULT 'in_progress',
+        total_score REAL,
+        notes TEXT
+    )
+    ''')
+
+    # Questions
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS question (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        interview_id INTEGER,
+        seq INTEGER,
+        text TEXT,
+        prompt_source TEXT,
+        asked_at TIMESTAMP,
+        FOREIGN KEY(interview_id) REFERENCES interview(id)
+    )
+    ''')
+
+    # Answers
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS answer (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        question_id INTEGER,
+        interview_id INTEGER,
+        recording_path TEXT,
+        cropped_recording_path TEXT,
+        start_time TIMESTAMP,
+        end_time TIMESTAMP,
+        duration_seconds REAL,
+        score REAL,
+        auto_score_breakdown TEXT,
+        verdict TEXT,
+        FOREIGN KEY(question_id) REFERENCES question(id),
+        FOREIGN KEY(interview_id) REFERENCES interview(id)
+    )
+    ''')
+
+    # Transcript Chunks
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS transcript_chunk (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        answer_id INTEGER,
+        timestamp TIMESTAMP,
+        text TEXT,
+        is_final BOOLEAN,
+        FOREIGN KEY(answer_id) REFERENCES answer(id)
+    )
+    ''')
+
+    # Proctor Events
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS proctor_event (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        interview_id INTEGER,
+        question_id INTEGER,
+        timestamp TIMESTAMP,
+        event_type TEXT,
+        confidence REAL,
+        frame_path TEXT,
+        notes TEXT,
+        FOREIGN KEY(interview_id) REFERENCES interview(id)
+    )
+    ''')
+
+
+@migration(2, "link interviews to applications")
+def _interview_application_id(conn):
+    # Databases created before this column existed only have the baseline table
+    if not column_exists(conn, "interview", "application_id"):
+        conn.execute('ALTER TABLE interview ADD COLUMN application_id INTEGER')
+
+
+@migration(3, "lookup indexes")
+def _lookup_indexes(conn):
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_candidate_email ON candidates(email)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_application_job ON applications(job_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_application_candidate ON applications(candidate_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_interview_application ON interview(application_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_active ON jobs(is_active)')
+
+
+def _backfill_interview_summary(conn, batch_size):
+    cursor = conn.execute('''
+        INSERT INTO interview_summary (interview_id, answer_count, score_sum, recording_count)
+        SELECT i.id, COUNT(a.id), COALESCE(SUM(a.score), 0), COUNT(a.recording_path)
+        FROM (
+            SELECT id FROM interview
+            WHERE id NOT IN (SELECT interview_id FROM interview_summary)
+            ORDER BY id
+            LIMIT ?
+        ) i
+        LEFT JOIN answer a ON a.interview_id = i.id
+        GROUP BY i.id
+    ''', (batch_size,))
+    return cursor.rowcount
+
+
+@migration(4, "trigger-maintained interview_summary", backfill=_backfill_interview_summary)
+def _interview_summary(conn):
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_answer_interview ON answer(interview_id)')
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS interview_summary (
+        interview_id INTEGER PRIMARY KEY,
+        answer_count INTEGER NOT NULL DEFAULT 0,
+        score_sum REAL NOT NULL DEFAULT 0,
+        recording_count INTEGER NOT NULL DEFAULT 0
+    )
+    ''')
+
+    # New interviews start with an empty summary; existing ones are filled by the backfill.
+    # Answer triggers only UPDATE, so an interview the backfill has not reached yet is
+    # never given a partial row.
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_interview_summary_init AFTER INSERT ON interview
+    BEGIN
+        INSERT OR IGNORE INTO interview_summary (interview_id) VALUES (new.id);
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_interview_summary_drop AFTER DELETE ON interview
+    BEGIN
+        DELETE FROM interview_summary WHERE interview_id = old.id;
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_answer_summary_insert AFTER INSERT ON answer
+    BEGIN
+        UPDATE interview_summary
+        SET answer_count = answer_count + 1,
+            score_sum = score_sum + COALESCE(new.score, 0),
+            recording_count = recording_count + (new.recording_path IS NOT NULL)
+        WHERE interview_id = new.interview_id;
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_answer_summary_update
+    AFTER UPDATE OF score, recording_path, interview_id ON answer
+    BEGIN
+        UPDATE interview_summary
+        SET answer_count = answer_count - 1,
+            score_sum = score_sum - COALESCE(old.score, 0),
+            recording_count = recording_count - (old.recording_path IS NOT NULL)
+        WHERE interview_id = old.interview_id;
+        UPDATE interview_summary
+        SET answer_count = answer_count + 1,
+            score_sum = score_sum + COALESCE(new.score, 0),
+            recording_count = recording_count + (new.recording_path IS NOT NULL)
+        WHERE interview_id = new.interview_id;
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_answer_summary_delete AFTER DELETE ON answer
+    BEGIN
+        UPDATE interview_summary
+        SET answer_count = answer_count - 1,
+            score_sum = score_sum - COALESCE(old.score, 0),
+            recording_count = recording_count - (old.recording_path IS NOT NULL)
+        WHERE interview_id = old.interview_id;
+    END
+    ''')
+
+
+def _backfill_candidates_fts(conn, batch_size):
+    return id_range_backfill(conn, 5, batch_size, lambda conn, low, high: conn.execute('''
+        INSERT INTO candidates_fts (rowid, name, email, skills, resume_text)
+        SELECT id, name, email, skills, unpack_text(resume_text) FROM candidates
+        WHERE id > ? AND id <= ? AND id NOT IN (SELECT id FROM candidates_fts_docsize)
+    ''', (low, high)))
+
+
+@migration(5, "FTS5 candidate search index", backfill=_backfill_candidates_fts)
+def _candidates_fts(conn):
+    # External-content index: the text lives only in candidates
+    conn.execute('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS candidates_fts USING fts5(
+        name, email, skills, resume_text,
+        content='candidates', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    ''')
+    # Rank name matches above email, skills and resume body
+    conn.execute("INSERT INTO candidates_fts (candidates_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 3.0, 1.0)')")
+    start_id_range_backfill(conn, 5, "candidates")
+
+    # Rows the backfill has not reached yet are not in the index, so they must not
+    # be 'delete'd from it; the backfill will pick up their current values.
+    pending = not_yet_backfilled(5, "old.id")
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_candidates_fts_insert AFTER INSERT ON candidates
+    BEGIN
+        INSERT INTO candidates_fts (rowid, name, email, skills, resume_text)
+        VALUES (new.id, new.name, new.email, new.skills, new.resume_text);
+    END
+    ''')
+    conn.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_candidates_fts_delete AFTER DELETE ON candidates
+    WHEN NOT {pending}
+    BEGIN
+        INSERT INTO candidates_fts (candidates_fts, rowid, name, email, skills, resume_text)
+        VALUES ('delete', old.id, old.name, old.email, old.skills, old.resume_text);
+    END
+    ''')
+    conn.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_candidates_fts_update
+    AFTER UPDATE OF name, email, skills, resume_text ON candidates
+    WHEN NOT {pending}
+    BEGIN
+        INSERT INTO candidates_fts (candidates_fts, rowid, name, email, skills, resume_text)
+        VALUES ('delete', old.id, old.name, old.email, old.skills, old.resume_text);
+        INSERT INTO candidates_fts (rowid, name, email, skills, resume_text)
+        VALUES (new.id, new.name, new.email, new.skills, new.resume_text);
+    END
+    ''')
+
+
+@migration(6, "keyset pagination indexes")
+def _pagination_indexes(conn):
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_candidates_created ON candidates(created_at, id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_interview_started ON interview(started_at, id)')
+
+
+# Must match search.normalize_skill
+_SKILL_NORM_SQL = "lower(trim(value))"
+
+
+def _skills_json(expr):
+    """Malformed skills JSON contributes no skills instead of failing the write"""
+    return f"CASE WHEN json_valid({expr}) THEN {expr} ELSE '[]' END"
+
+
+def _backfill_candidate_skill(conn, batch_size):
+    return id_range_backfill(conn, 7, batch_size, lambda conn, low, high: conn.execute(f'''
+        INSERT OR IGNORE INTO candidate_skill (candidate_id, skill_norm)
+        SELECT c.id, {_SKILL_NORM_SQL}
+        FROM candidates c, json_each({_skills_json('c.skills')})
+        WHERE c.id > ? AND c.id <= ? AND json_each.type = 'text' AND trim(value) != ''
+    ''', (low, high)))
+
+
+@migration(7, "normalized candidate_skill index", backfill=_backfill_candidate_skill)
+def _candidate_skill(conn):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS candidate_skill (
+        candidate_id INTEGER NOT NULL,
+        skill_norm TEXT NOT NULL,
+        PRIMARY KEY (skill_norm, candidate_id)
+    ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_candidate_skill_candidate ON candidate_skill(candidate_id)')
+    start_id_range_backfill(conn, 7, "candidates")
+
+    # candidates.skills stays the JSON source of truth; these keep the index in step
+    # with every write path (submit_application inserts and re-applications alike)
+    insert_skills = f'''
+        INSERT OR IGNORE INTO candidate_skill (candidate_id, skill_norm)
+        SELECT new.id, {_SKILL_NORM_SQL} FROM json_each({_skills_json('new.skills')})
+        WHERE json_each.type = 'text' AND trim(value) != '';
+    '''
+    conn.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_candidate_skill_insert AFTER INSERT ON candidates
+    BEGIN
+        {insert_skills}
+    END
+    ''')
+    conn.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_candidate_skill_update AFTER UPDATE OF skills ON candidates
+    BEGIN
+        DELETE FROM candidate_skill WHERE candidate_id = old.id;
+        {insert_skills}
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_candidate_skill_delete AFTER DELETE ON candidates
+    BEGIN
+        DELETE FROM candidate_skill WHERE candidate_id = old.id;
+    END
+    ''')
+
+
+@migration(8, "composite indexes for hot queries")
+def _hot_query_indexes(conn):
+    # Latest question of an interview (ORDER BY seq DESC LIMIT 1) and questions in seq order
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_question_interview_seq ON question(interview_id, seq)')
+    # Get-or-create answer for a question
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_answer_question_interview ON answer(question_id, interview_id)')
+    # Transcript of an answer in timestamp order, with or without the is_final filter, no sort
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_transcript_answer ON transcript_chunk(answer_id, timestamp, is_final)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_proctor_interview ON proctor_event(interview_id, timestamp)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_interview_candidate_email ON interview(candidate_email, started_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_interview_status ON interview(status)')
+
+    # Superseded by composites that also return rows in the order the pages need
+    conn.execute('DROP INDEX IF EXISTS idx_application_job')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_application_job_rank ON applications(job_id, match_score DESC, applied_at DESC)')
+    conn.execute('DROP INDEX IF EXISTS idx_application_candidate')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_application_candidate_applied ON applications(candidate_id, applied_at)')
+
+
+@migration(9, "interview archive tier marker")
+def _interview_archive_month(conn):
+    # Month archive (YYYY-MM) holding this interview's transcripts and proctor events, NULL while hot
+    if not column_exists(conn, "interview", "archive_month"):
+        conn.execute('ALTER TABLE interview ADD COLUMN archive_month TEXT')
+
+
+# --- Daily rollups (migration 10) ---
+# Per-interview contribution to the dashboard average, same formula as get_metrics_overview
+# used before: score is the summary's score_sum floored at 0, out of 5 per answer (5 if none).
+# A missing summary row counts like an empty one.
+def _score(summary):
+    return f"MAX(COALESCE({summary}.score_sum, 0), 0)"
+
+
+def _max_score(summary):
+    return f"(CASE WHEN COALESCE({summary}.answer_count, 0) > 0 THEN {summary}.answer_count * 5.0 ELSE 5.0 END)"
+
+
+def _job_of(application_id):
+    """Rollup job key; interviews without an application are bucketed under job 0"""
+    return f"COALESCE((SELECT job_id FROM applications WHERE id = {application_id}), 0)"
+
+
+def _bump(day, job, **deltas):
+    """Add deltas to one daily_job_stats row, creating it on first use; rows without a date are not counted"""
+    columns = ", ".join(deltas)
+    values = ", ".join(str(v) for v in deltas.values())
+    updates = ", ".join(f"{c} = {c} + excluded.{c}" for c in deltas)
+    return f'''
+        INSERT INTO daily_job_stats (day, job_id, {columns})
+        SELECT date({day}), {job}, {values} WHERE date({day}) IS NOT NULL
+        ON CONFLICT(day, job_id) DO UPDATE SET {updates};'''
+
+
+def _completed_contribution(interview, sign):
+    """Add (sign=+1) or remove (sign=-1) a completed interview from its completion day"""
+    summary = f"(SELECT * FROM interview_summary WHERE interview_id = {interview}.id)"
+    return _bump(
+        f"COALESCE({interview}.ended_at, {interview}.started_at)", _job_of(f"{interview}.application_id"),
+        interviews_completed=sign,
+        score_sum=f"{sign} * (SELECT {_score('s')} FROM (SELECT 1) LEFT JOIN {summary} s)",
+        max_score_sum=f"{sign} * (SELECT {_max_score('s')} FROM (SELECT 1) LEFT JOIN {summary} s)",
+    )
+
+
+def seed_daily_rollups(conn):
+    """
+    Compute the daily rollup rows from the base tables (tables must be empty).
+    Days are date() of the stored timestamps, as in the triggers: the UTC day,
+    with naive text taken as UTC like epoch_ms_sql does.
+    """
+    conn.execute('''
+        INSERT INTO daily_candidate_stats (day, candidates)
+        SELECT date(created_at), COUNT(*) FROM candidates WHERE date(created_at) IS NOT NULL GROUP BY 1
+    ''')
+    conn.execute('''
+        INSERT INTO daily_job_stats (day, job_id, applications)
+        SELECT date(applied_at), job_id, COUNT(*) FROM applications
+        WHERE date(applied_at) IS NOT NULL AND job_id IS NOT NULL GROUP BY 1, 2
+    ''')
+    conn.execute(f'''
+        INSERT INTO daily_job_stats (day, job_id, interviews_started)
+        SELECT date(i.started_at), {_job_of('i.application_id')}, COUNT(*) FROM interview i
+        WHERE date(i.started_at) IS NOT NULL GROUP BY 1, 2
+        ON CONFLICT(day, job_id) DO UPDATE SET interviews_started = excluded.interviews_started
+    ''')
+    conn.execute(f'''
+        INSERT INTO daily_job_stats (day, job_id, interviews_completed, score_sum, max_score_sum)
+        SELECT date(COALESCE(i.ended_at, i.started_at)), {_job_of('i.application_id')},
+               COUNT(*), SUM({_score('s')}), SUM({_max_score('s')})
+        FROM interview i
+        LEFT JOIN interview_summary s ON s.interview_id = i.id
+        WHERE i.status = 'completed' AND date(COALESCE(i.ended_at, i.started_at)) IS NOT NULL
+        GROUP BY 1, 2
+        ON CONFLICT(day, job_id) DO UPDATE SET
+            interviews_completed = excluded.interviews_completed,
+            score_sum = excluded.score_sum,
+            max_score_sum = excluded.max_score_sum
+    ''')
+
+
+@migration(10, "daily rollups for dashboard metrics")
+def _daily_rollups(conn):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS daily_job_stats (
+        day TEXT NOT NULL,
+        job_id INTEGER NOT NULL,
+        applications INTEGER NOT NULL DEFAULT 0,
+        interviews_started INTEGER NOT NULL DEFAULT 0,
+        interviews_completed INTEGER NOT NULL DEFAULT 0,
+        score_sum REAL NOT NULL DEFAULT 0,
+        max_score_sum REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, job_id)
+    ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS daily_candidate_stats (
+        day TEXT PRIMARY KEY,
+        candidates INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+    ''')
+
+    # Seeded in the same transaction the triggers are created in, so nothing is counted twice or missed
+    seed_daily_rollups(conn)
+
+    triggers = {
+        "trg_rollup_candidate_insert": f'''AFTER INSERT ON candidates WHEN date(new.created_at) IS NOT NULL BEGIN
+            INSERT INTO daily_candidate_stats (day, candidates) VALUES (date(new.created_at), 1)
+            ON CONFLICT(day) DO UPDATE SET candidates = candidates + 1;
+        END''',
+        "trg_rollup_candidate_delete": f'''AFTER DELETE ON candidates WHEN date(old.created_at) IS NOT NULL BEGIN
+            UPDATE daily_candidate_stats SET candidates = candidates - 1 WHERE day = date(old.created_at);
+        END''',
+        "trg_rollup_application_insert": f'''AFTER INSERT ON applications
+        WHEN new.job_id IS NOT NULL BEGIN
+            {_bump('new.applied_at', 'new.job_id', applications=1)}
+        END''',
+        "trg_rollup_application_delete": f'''AFTER DELETE ON applications
+        WHEN old.job_id IS NOT NULL BEGIN
+            {_bump('old.applied_at', 'old.job_id', applications=-1)}
+        END''',
+        "trg_rollup_interview_insert": f'''AFTER INSERT ON interview BEGIN
+            {_bump('new.started_at', _job_of('new.application_id'), interviews_started=1)}
+        END''',
+        "trg_rollup_interview_completed_insert": f'''AFTER INSERT ON interview WHEN new.status = 'completed' BEGIN
+            {_completed_contribution('new', 1)}
+        END''',
+        # BEFORE so the interview_summary row is still there to subtract
+        "trg_rollup_interview_delete": f'''BEFORE DELETE ON interview BEGIN
+            {_bump('old.started_at', _job_of('old.application_id'), interviews_started=-1)}
+        END''',
+        "trg_rollup_interview_completed_delete": f'''BEFORE DELETE ON interview WHEN old.status = 'completed' BEGIN
+            {_completed_contribution('old', -1)}
+        END''',
+        "trg_rollup_interview_update": f'''AFTER UPDATE OF started_at, application_id ON interview BEGIN
+            {_bump('old.started_at', _job_of('old.application_id'), interviews_started=-1)}
+            {_bump('new.started_at', _job_of('new.application_id'), interviews_started=1)}
+        END''',
+        "trg_rollup_interview_uncomplete": f'''AFTER UPDATE OF status, ended_at, started_at, application_id ON interview
+        WHEN old.status = 'completed' BEGIN
+            {_completed_contribution('old', -1)}
+        END''',
+        "trg_rollup_interview_complete": f'''AFTER UPDATE OF status, ended_at, started_at, application_id ON interview
+        WHEN new.status = 'completed' BEGIN
+            {_completed_contribution('new', 1)}
+        END''',
+    }
+
+    # Scores keep changing after completion (background evaluation, recompute)
+    interview = "(SELECT {} FROM interview WHERE id = {}.interview_id)"
+    for row, change in (("new", "insert"), ("new", "update"), ("old", "delete")):
+        day = interview.format("COALESCE(ended_at, started_at)", row)
+        job = _job_of(interview.format("application_id", row))
+        score = {"insert": f"{_score('new')}",
+                 "update": f"{_score('new')} - {_score('old')}",
+                 "delete": f"-{_score('old')}"}[change]
+        max_score = {"insert": f"{_max_score('new')} - 5.0",
+                     "update": f"{_max_score('new')} - {_max_score('old')}",
+                     "delete": f"5.0 - {_max_score('old')}"}[change]
+        triggers[f"trg_rollup_summary_{change}"] = f'''AFTER {change.upper()} ON interview_summary
+        WHEN EXISTS (SELECT 1 FROM interview WHERE id = {row}.interview_id AND status = 'completed') BEGIN
+            {_bump(day, job, score_sum=score, max_score_sum=max_score)}
+        END'''
+
+    for name, body in triggers.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+
+# Answer columns a merged duplicate may have filled in that the kept row lacks
+_ANSWER_MERGE_COLUMNS = ("recording_path", "cropped_recording_path", "end_time", "duration_seconds",
+                         "score", "auto_score_breakdown", "verdict")
+
+
+@migration(11, "unique question seq and answer per question")
+def _unique_question_answer(conn):
+    # Racing get-or-create paths may have left several answers for one question:
+    # keep the first, move the others' transcripts onto it and fill its empty columns
+    conn.execute('''
+    CREATE TEMP TABLE answer_dupes AS
+    SELECT a.id AS dupe_id, k.keep_id
+    FROM answer a
+    JOIN (SELECT question_id, interview_id, MIN(id) AS keep_id FROM answer
+          WHERE question_id IS NOT NULL AND interview_id IS NOT NULL
+          GROUP BY question_id, interview_id HAVING COUNT(*) > 1) k
+      ON a.question_id = k.question_id AND a.interview_id = k.interview_id AND a.id <> k.keep_id
+    ''')
+    conn.execute('''
+    UPDATE transcript_chunk SET answer_id = (SELECT keep_id FROM answer_dupes WHERE dupe_id = answer_id)
+    WHERE answer_id IN (SELECT dupe_id FROM answer_dupes)
+    ''')
+    fill = ", ".join(
+        f'''{column} = COALESCE({column}, (SELECT d.{column} FROM answer d JOIN answer_dupes m ON m.dupe_id = d.id
+            WHERE m.keep_id = answer.id AND d.{column} IS NOT NULL ORDER BY d.id DESC LIMIT 1))'''
+        for column in _ANSWER_MERGE_COLUMNS
+    )
+    conn.execute(f"UPDATE answer SET {fill} WHERE id IN (SELECT keep_id FROM answer_dupes)")
+    conn.execute("DELETE FROM answer WHERE id IN (SELECT dupe_id FROM answer_dupes)")
+    conn.execute("DROP TABLE answer_dupes")
+
+    # Questions that raced for the same seq: renumber those interviews 1..n in (seq, id) order
+    conn.execute('''
+    CREATE TEMP TABLE question_seq AS
+    SELECT id, ROW_NUMBER() OVER (PARTITION BY interview_id ORDER BY seq, id) AS seq
+    FROM question
+    WHERE seq IS NOT NULL AND interview_id IN (
+        SELECT interview_id FROM question WHERE seq IS NOT NULL
+        GROUP BY interview_id, seq HAVING COUNT(*) > 1)
+    ''')
+    conn.execute('''
+    UPDATE question SET seq = (SELECT seq FROM question_seq s WHERE s.id = question.id)
+    WHERE id IN (SELECT id FROM question_seq)
+    ''')
+    conn.execute("DROP TABLE question_seq")
+
+    # Same columns as the migration 8 indexes, now enforced
+    conn.execute('DROP INDEX IF EXISTS idx_question_interview_seq')
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS ux_question_interview_seq ON question(interview_id, seq)')
+    conn.execute('DROP INDEX IF EXISTS idx_answer_question_interview')
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS ux_answer_question_interview ON answer(question_id, interview_id)')
+
+
+# --- Maintained counters (migration 12) ---
+# Tables whose total row count list pages need, kept in table_stats
+COUNTED_TABLES = ("candidates", "interview")
+
+
+def sync_counters(conn) -> int:
+    """
+    Set jobs.applicant_count, interview.question_count and table_stats to their
+    true values. Returns how many counters were wrong (all of them on first run).
+    """
+    fixed = conn.execute('''
+        UPDATE jobs SET applicant_count = (SELECT COUNT(*) FROM applications a WHERE a.job_id = jobs.id)
+        WHERE applicant_count != (SELECT COUNT(*) FROM applications a WHERE a.job_id = jobs.id)
+    ''').rowcount
+    fixed += conn.execute('''
+        UPDATE interview SET question_count = (SELECT COUNT(*) FROM question q WHERE q.interview_id = interview.id)
+        WHERE question_count != (SELECT COUNT(*) FROM question q WHERE q.interview_id = interview.id)
+    ''').rowcount
+    for table in COUNTED_TABLES:
+        fixed += conn.execute(f'''
+            INSERT INTO table_stats (name, row_count) VALUES ('{table}', (SELECT COUNT(*) FROM {table}))
+            ON CONFLICT(name) DO UPDATE SET row_count = excluded.row_count
+            WHERE row_count != excluded.row_count
+        ''').rowcount
+    return fixed
+
+
+def _counter_triggers(name, table, column, parent, key):
+    """Triggers keeping parent.column equal to the number of table rows whose key points at it"""
+    return {
+        f"trg_{name}_insert": f'''AFTER INSERT ON {table} BEGIN
+            UPDATE {parent} SET {column} = {column} + 1 WHERE id = new.{key};
+        END''',
+        f"trg_{name}_delete": f'''AFTER DELETE ON {table} BEGIN
+            UPDATE {parent} SET {column} = {column} - 1 WHERE id = old.{key};
+        END''',
+        f"trg_{name}_update": f'''AFTER UPDATE OF {key} ON {table} WHEN old.{key} IS NOT new.{key} BEGIN
+            UPDATE {parent} SET {column} = {column} - 1 WHERE id = old.{key};
+            UPDATE {parent} SET {column} = {column} + 1 WHERE id = new.{key};
+        END''',
+    }
+
+
+@migration(12, "maintained list counters")
+def _list_counters(conn):
+    if not column_exists(conn, "jobs", "applicant_count"):
+        conn.execute('ALTER TABLE jobs ADD COLUMN applicant_count INTEGER NOT NULL DEFAULT 0')
+    if not column_exists(conn, "interview", "question_count"):
+        conn.execute('ALTER TABLE interview ADD COLUMN question_count INTEGER NOT NULL DEFAULT 0')
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS table_stats (
+        name TEXT PRIMARY KEY,
+        row_count INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+    ''')
+
+    triggers = {
+        **_counter_triggers("job_applicants", "applications", "applicant_count", "jobs", "job_id"),
+        **_counter_triggers("interview_questions", "question", "question_count", "interview", "interview_id"),
+    }
+    for table in COUNTED_TABLES:
+        triggers[f"trg_{table}_row_count_insert"] = f'''AFTER INSERT ON {table} BEGIN
+            UPDATE table_stats SET row_count = row_count + 1 WHERE name = '{table}';
+        END'''
+        triggers[f"trg_{table}_row_count_delete"] = f'''AFTER DELETE ON {table} BEGIN
+            UPDATE table_stats SET row_count = row_count - 1 WHERE name = '{table}';
+        END'''
+    for name, body in triggers.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+    sync_counters(conn)
+
+
+# --- Pipeline status (migration 13) ---
+# The status the candidate and assessment lists show, formerly derived per row in Python.
+# An application is completed/in_progress once any of its interviews is, otherwise it
+# follows the application's own status. An interview is completed, in_progress or passed (ATS).
+PIPELINE_STATUSES = ("pending", "passed", "rejected", "in_progress", "completed")
+ASSESSMENT_STATUSES = ("passed", "in_progress", "completed")
+
+
+def _interview_pipeline_status(interview):
+    return f'''CASE WHEN {interview}.status = 'completed' THEN 'completed'
+        WHEN {interview}.status IN ('in_progress', 'started') THEN 'in_progress'
+        ELSE 'passed' END'''
+
+
+def _application_pipeline_status(application):
+    return f'''CASE
+        WHEN EXISTS (SELECT 1 FROM interview i WHERE i.application_id = {application}.id
+                     AND i.status = 'completed') THEN 'completed'
+        WHEN EXISTS (SELECT 1 FROM interview i WHERE i.application_id = {application}.id
+                     AND i.status IN ('in_progress', 'started')) THEN 'in_progress'
+        WHEN {application}.status = 'qualified' THEN 'passed'
+        WHEN {application}.status = 'rejected' THEN 'rejected'
+        ELSE 'pending' END'''
+
+
+def sync_pipeline_status(conn) -> int:
+    """Set every pipeline_status to its derived value. Returns how many rows were wrong."""
+    fixed = conn.execute(f'''
+        UPDATE applications SET pipeline_status = {_application_pipeline_status('applications')}
+        WHERE pipeline_status IS NOT {_application_pipeline_status('applications')}
+    ''').rowcount
+    fixed += conn.execute(f'''
+        UPDATE interview SET pipeline_status = {_interview_pipeline_status('interview')}
+        WHERE pipeline_status IS NOT {_interview_pipeline_status('interview')}
+    ''').rowcount
+    return fixed
+
+
+@migration(13, "stored pipeline status for list filters")
+def _pipeline_status(conn):
+    if not column_exists(conn, "applications", "pipeline_status"):
+        conn.execute("ALTER TABLE applications ADD COLUMN pipeline_status TEXT NOT NULL DEFAULT 'pending'")
+    if not column_exists(conn, "interview", "pipeline_status"):
+        conn.execute("ALTER TABLE interview ADD COLUMN pipeline_status TEXT NOT NULL DEFAULT 'passed'")
+
+    refresh_application = f"UPDATE applications SET pipeline_status = {_application_pipeline_status('applications')}"
+    triggers = {
+        "trg_application_pipeline_insert": f'''AFTER INSERT ON applications BEGIN
+            {refresh_application} WHERE id = new.id;
+        END''',
+        "trg_application_pipeline_update": f'''AFTER UPDATE OF status ON applications BEGIN
+            {refresh_application} WHERE id = new.id;
+        END''',
+        "trg_interview_pipeline_insert": f'''AFTER INSERT ON interview BEGIN
+            UPDATE interview SET pipeline_status = {_interview_pipeline_status('new')} WHERE id = new.id;
+            {refresh_application} WHERE id = new.application_id;
+        END''',
+        "trg_interview_pipeline_update": f'''AFTER UPDATE OF status, application_id ON interview BEGIN
+            UPDATE interview SET pipeline_status = {_interview_pipeline_status('new')} WHERE id = new.id;
+            {refresh_application} WHERE id IN (old.application_id, new.application_id);
+        END''',
+        "trg_interview_pipeline_delete": f'''AFTER DELETE ON interview BEGIN
+            {refresh_application} WHERE id = old.application_id;
+        END''',
+    }
+    for name, body in triggers.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+    # Candidates list filters applications by status; assessments page interviews by status
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_application_pipeline ON applications(pipeline_status, candidate_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_interview_pipeline ON interview(pipeline_status, started_at, id)')
+
+    sync_pipeline_status(conn)
+
+
+# --- Report snapshots (migration 14) ---
+# Interviews whose report shows a column of each table, for snapshot invalidation
+_REPORT_SOURCES = {
+    "interview": ("UPDATE", "{row}.id"),
+    "question": ("INSERT OR UPDATE OR DELETE", "{row}.interview_id"),
+    "answer": ("INSERT OR UPDATE OR DELETE", "{row}.interview_id"),
+    "transcript_chunk": ("INSERT", "(SELECT interview_id FROM answer WHERE id = {row}.answer_id)"),
+    "proctor_event": ("INSERT", "{row}.interview_id"),
+}
+_REPORT_PARENTS = {
+    "applications": ("match_score, match_explanation, job_id, candidate_id",
+                     "SELECT id FROM interview WHERE application_id = new.id"),
+    "candidates": ("name, email, phone",
+                   "SELECT i.id FROM applications a JOIN interview i ON i.application_id = a.id WHERE a.candidate_id = new.id"),
+    "jobs": ("title",
+             "SELECT i.id FROM applications a JOIN interview i ON i.application_id = a.id WHERE a.job_id = new.id"),
+}
+
+
+@migration(14, "materialized assessment report snapshots")
+def _report_snapshot(conn):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS report_snapshot (
+        interview_id INTEGER PRIMARY KEY,
+        version INTEGER NOT NULL,
+        body TEXT NOT NULL,
+        built_at TIMESTAMP NOT NULL
+    )
+    ''')
+
+    # Any change to what a report shows drops its snapshot; the next view rebuilds it
+    triggers = {"trg_report_snapshot_interview_delete": '''AFTER DELETE ON interview BEGIN
+        DELETE FROM report_snapshot WHERE interview_id = old.id;
+    END'''}
+    for table, (events, interview) in _REPORT_SOURCES.items():
+        for event in events.split(" OR "):
+            rows = {"INSERT": ["new"], "UPDATE": ["old", "new"], "DELETE": ["old"]}[event]
+            deletes = "\n".join(
+                f"DELETE FROM report_snapshot WHERE interview_id = {interview.format(row=row)};" for row in rows
+            )
+            triggers[f"trg_report_snapshot_{table}_{event.lower()}"] = f"AFTER {event} ON {table} BEGIN {deletes} END"
+    for table, (columns, interviews) in _REPORT_PARENTS.items():
+        triggers[f"trg_report_snapshot_{table}_update"] = f'''AFTER UPDATE OF {columns} ON {table} BEGIN
+            DELETE FROM report_snapshot WHERE interview_id IN ({interviews});
+        END'''
+    for name, body in triggers.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+
+# --- Epoch-millisecond timestamps (migration 15) ---
+# Text timestamp columns and their integer mirrors. The text columns stay the
+# source of truth (and what the API returns); the mirrors are virtual generated
+# columns, so they need no triggers or backfill and cost nothing until indexed.
+EPOCH_MS_COLUMNS = {
+    "jobs": [("created_at", "created_ms")],
+    "candidates": [("created_at", "created_ms")],
+    "applications": [("applied_at", "applied_ms")],
+    "interview": [("started_at", "started_ms"), ("ended_at", "ended_ms")],
+    "answer": [("start_time", "start_ms"), ("end_time", "end_ms")],
+    "transcript_chunk": [("timestamp", "timestamp_ms")],
+    "proctor_event": [("timestamp", "timestamp_ms")],
+}
+
+
+def epoch_ms_sql(column: str) -> str:
+    """
+    SQL for a stored timestamp as Unix epoch milliseconds: text in any SQLite
+    date format (CURRENT_TIMESTAMP, str(datetime), ISO 8601 with 'T', 'Z' or an
+    offset), or a number of epoch seconds/milliseconds. Values without an offset
+    are taken as UTC, like CURRENT_TIMESTAMP, which is how the app writes its own
+    timestamps (utc_now). NULL when unparseable.
+    """
+    return f'''(CASE
+        WHEN typeof({column}) IN ('integer', 'real') THEN
+            CAST(CASE WHEN abs({column}) < 100000000000 THEN {column} * 1000 ELSE {column} END AS INTEGER)
+        ELSE CAST(round((julianday({column}) - 2440587.5) * 86400000) AS INTEGER)
+    END)'''
+
+
+def to_epoch_ms(value: datetime) -> int:
+    """Python counterpart of epoch_ms_sql for datetimes (naive ones are taken as UTC)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return round((value - datetime(1970, 1, 1)).total_seconds() * 1000)
+
+
+def utc_now() -> datetime:
+    """The current UTC time as a naive datetime, stored in the same text format as older rows"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@migration(15, "epoch-millisecond timestamp columns")
+def _epoch_ms_columns(conn):
+    for table, columns in EPOCH_MS_COLUMNS.items():
+        for text_column, ms_column in columns:
+            if not column_exists(conn, table, ms_column):
+                conn.execute(
+                    f"ALTER TABLE {table} ADD COLUMN {ms_column} INTEGER "
+                    f"GENERATED ALWAYS AS {epoch_ms_sql(text_column)} VIRTUAL"
+                )
+
+    # Time-ordered reads and range filters; the text-ordered indexes they replace go
+    conn.execute('DROP INDEX IF EXISTS idx_transcript_answer')
+    conn.execute('DROP INDEX IF EXISTS idx_proctor_interview')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_transcript_answer_ms ON transcript_chunk(answer_id, timestamp_ms, is_final)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_proctor_interview_ms ON proctor_event(interview_id, timestamp_ms)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_active_created_ms ON jobs(is_active, created_ms)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_application_applied_ms ON applications(applied_ms)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_interview_started_ms ON interview(started_ms)')
+
+
+def _backfill_compressed_text(conn, batch_size):
+    return textcodec.repack_batch(conn, batch_size)
+
+
+@migration(16, "compressed large text columns", backfill=_backfill_compressed_text)
+def _compressed_text(conn):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS text_dictionary (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        column_name TEXT NOT NULL,
+        codec TEXT NOT NULL,
+        digest BLOB NOT NULL UNIQUE,
+        dictionary BLOB NOT NULL,
+        sample_count INTEGER NOT NULL,
+        created_at TIMESTAMP NOT NULL
+    )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_text_dictionary_column ON text_dictionary(column_name, id)')
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS text_repack_progress (
+        table_name TEXT PRIMARY KEY,
+        last_id INTEGER NOT NULL,
+        end_id INTEGER NOT NULL
+    )
+    ''')
+    textcodec.start_repack(conn)
+
+    # candidates_fts indexes the plain resume text; a repack that only changes
+    # how a value is stored leaves the index alone
+    pending = not_yet_backfilled(5, "old.id")
+    triggers = {
+        "trg_candidates_fts_insert": '''AFTER INSERT ON candidates BEGIN
+            INSERT INTO candidates_fts (rowid, name, email, skills, resume_text)
+            VALUES (new.id, new.name, new.email, new.skills, unpack_text(new.resume_text));
+        END''',
+        "trg_candidates_fts_delete": f'''AFTER DELETE ON candidates WHEN NOT {pending} BEGIN
+            INSERT INTO candidates_fts (candidates_fts, rowid, name, email, skills, resume_text)
+            VALUES ('delete', old.id, old.name, old.email, old.skills, unpack_text(old.resume_text));
+        END''',
+        "trg_candidates_fts_update": f'''AFTER UPDATE OF name, email, skills, resume_text ON candidates
+        WHEN NOT {pending} AND (old.name IS NOT new.name OR old.email IS NOT new.email
+            OR old.skills IS NOT new.skills OR unpack_text(old.resume_text) IS NOT unpack_text(new.resume_text))
+        BEGIN
+            INSERT INTO candidates_fts (candidates_fts, rowid, name, email, skills, resume_text)
+            VALUES ('delete', old.id, old.name, old.email, old.skills, unpack_text(old.resume_text));
+            INSERT INTO candidates_fts (rowid, name, email, skills, resume_text)
+            VALUES (new.id, new.name, new.email, new.skills, unpack_text(new.resume_text));
+        END''',
+    }
+    for name, body in triggers.items():
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        conn.execute(f"CREATE TRIGGER {name} {body}")
+
+
+# --- Cascading deletes (migration 17) ---
+# child table -> [(column, parent table)], each ON DELETE CASCADE, parents before children
+CASCADE_FOREIGN_KEYS = {
+    "applications": [("candidate_id", "candidates"), ("job_id", "jobs")],
+    "interview": [("application_id", "applications")],
+    "question": [("interview_id", "interview")],
+    "answer": [("question_id", "question"), ("interview_id", "interview")],
+    "transcript_chunk": [("answer_id", "answer")],
+    "proctor_event": [("interview_id", "interview")],
+}
+
+# Media files on disk and the columns pointing at them
+MEDIA_REFERENCES = {
+    "answer": ("recording_path", "cropped_recording_path"),
+    "proctor_event": ("frame_path",),
+    "candidates": ("resume_path",),
+}
+
+
+REBUILD_TRIGGER_PREFIX = "trg_rebuild_"
+
+
+def _rebuild_columns(conn, table: str) -> str:
+    # hidden = 0 leaves out generated columns, which the new table recomputes
+    return ", ".join(row[1] for row in conn.execute(f"PRAGMA table_xinfo({table})") if row[6] == 0)
+
+
+def start_table_rebuild(conn, table: str, foreign_keys):
+    """
+    Create an empty {table}_rebuild with foreign_keys [(column, parent)] as its
+    ON DELETE CASCADE foreign keys in place of the ones table has, and the
+    triggers that keep rows already copied into it in step with live writes.
+    The rows themselves are copied in batches by rebuild_table_batch.
+    """
+    sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()[0]
+    body = re.sub(r",\s*FOREIGN KEY\s*\(\w+\)\s*REFERENCES\s+\w+\s*\(\w+\)[^,)]*", "", sql).rstrip()
+    constraints = "".join(
+        f",\n        FOREIGN KEY({column}) REFERENCES {parent}(id) ON DELETE CASCADE" for column, parent in foreign_keys
+    )
+    body = re.sub(rf'^CREATE TABLE\s+"?{table}"?', f"CREATE TABLE {table}_rebuild",
+                  body[:-1].rstrip() + constraints + "\n    )", count=1)
+    conn.execute(body)
+    conn.execute(
+        "INSERT OR REPLACE INTO rebuild_progress (name, last_id, end_id) "
+        f"SELECT ?, 0, COALESCE(MAX(id), 0) FROM {table}",
+        (table,)
+    )
+
+    # Rows above end_id are new and rows up to last_id already copied: mirror those
+    columns = _rebuild_columns(conn, table)
+    copied = (f"NOT EXISTS (SELECT 1 FROM rebuild_progress WHERE name = '{table}' "
+              f"AND new.id > last_id AND new.id <= end_id)")
+    mirror = f"INSERT OR REPLACE INTO {table}_rebuild ({columns}) SELECT {columns} FROM {table} WHERE id = new.id;"
+    triggers = {
+        f"{table}_insert": f"AFTER INSERT ON {table} WHEN {copied} BEGIN {mirror} END",
+        f"{table}_update": f"AFTER UPDATE ON {table} WHEN {copied} BEGIN {mirror} END",
+        f"{table}_delete": f"AFTER DELETE ON {table} BEGIN DELETE FROM {table}_rebuild WHERE id = old.id; END",
+    }
+    # Until the swap the old foreign keys do not cascade; deleting children first
+    # gives the routes the same single-statement deletes in the meantime
+    for column, parent in foreign_keys:
+        triggers[f"cascade_{parent}_{table}_{column}"] = (
+            f"BEFORE DELETE ON {parent} BEGIN DELETE FROM {table} WHERE {column} = old.id; END"
+        )
+    for name, trigger in triggers.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {REBUILD_TRIGGER_PREFIX}{name} {trigger}")
+
+
+def rebuild_table_batch(conn, table: str, foreign_keys, batch_size: int) -> int:
+    """
+    Copy the next id window of table into {table}_rebuild. Rows in it whose parent
+    is already gone are first removed as the cascade would have (an interview whose
+    application vanished keeps its assessment, unlinked). Returns the size of the
+    window, 0 once the table is fully copied.
+    """
+    last_id, end_id = conn.execute(
+        "SELECT last_id, end_id FROM rebuild_progress WHERE name = ?", (table,)
+    ).fetchone()
+    if last_id >= end_id:
+        return 0
+    high = min(last_id + batch_size, end_id)
+    window = "id > ? AND id <= ?"
+    for column, parent in foreign_keys:
+        orphaned = f"{window} AND {column} IS NOT NULL AND {column} NOT IN (SELECT id FROM {parent})"
+        if table == "interview":
+            conn.execute(f"UPDATE interview SET {column} = NULL WHERE {orphaned}", (last_id, high))
+        else:
+            conn.execute(f"DELETE FROM {table} WHERE {orphaned}", (last_id, high))
+    columns = _rebuild_columns(conn, table)
+    conn.execute(f"INSERT INTO {table}_rebuild ({columns}) SELECT {columns} FROM {table} WHERE {window}",
+                 (last_id, high))
+    conn.execute("UPDATE rebuild_progress SET last_id = ? WHERE name = ?", (high, table))
+    return high - last_id
+
+
+def swap_rebuilt_table(conn, table: str):
+    """
+    Replace table with its fully copied {table}_rebuild, keeping the AUTOINCREMENT
+    sequence, indexes and triggers (the rebuild's own triggers go with the old
+    table). Foreign key enforcement must be off, or dropping the old table would
+    cascade.
+    """
+    dependents = [row[0] for row in conn.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') "
+        "AND sql IS NOT NULL AND name NOT LIKE ?",
+        (table, f"{REBUILD_TRIGGER_PREFIX}%")
+    )]
+    sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+    conn.execute(f"DROP TABLE {table}")
+    # Triggers on other tables name this table, so they are dangling until the rename;
+    # the legacy rename neither checks nor rewrites them
+    conn.execute("PRAGMA legacy_alter_table = ON")
+    try:
+        conn.execute(f"ALTER TABLE {table}_rebuild RENAME TO {table}")
+    finally:
+        conn.execute("PRAGMA legacy_alter_table = OFF")
+    if sequence is not None:
+        conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (sequence[0], table))
+    for statement in dependents:
+        conn.execute(statement)
+
+
+def _backfill_cascading_deletes(conn, batch_size):
+    """
+    Copy the tables one id window per call, parents before children, then swap
+    them all in one last transaction. The swap copies no rows, but builds the
+    indexes of the new tables.
+    """
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rebuild_progress'").fetchone():
+        return 0
+    for table, foreign_keys in CASCADE_FOREIGN_KEYS.items():
+        processed = rebuild_table_batch(conn, table, foreign_keys, batch_size)
+        if processed:
+            return processed
+
+    # PRAGMA foreign_keys is a no-op inside a transaction
+    conn.commit()
+    enforced = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        for table in CASCADE_FOREIGN_KEYS:
+            swap_rebuilt_table(conn, table)
+        # Stopgap cascades on tables that are not rebuilt
+        for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE ?", (f"{REBUILD_TRIGGER_PREFIX}%",)
+        ).fetchall():
+            conn.execute(f"DROP TRIGGER {name}")
+        conn.execute("DROP TABLE rebuild_progress")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute(f"PRAGMA foreign_keys = {enforced}")
+    return 1
+
+
+@migration(17, "cascading foreign keys and media garbage collection queue", backfill=_backfill_cascading_deletes)
+def _cascading_deletes(conn):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS media_gc (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        path TEXT NOT NULL,
+        queued_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    # The sweeper checks that a queued path is not referenced again before removing it
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_answer_recording ON answer(recording_path)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_answer_cropped_recording ON answer(cropped_recording_path)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_proctor_frame ON proctor_event(frame_path)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_candidates_resume_path ON candidates(resume_path)')
+
+    # Files released by a delete (cascaded ones included) or a replaced path are
+    # queued in the same transaction. Proctor events moved to the archive tier keep
+    # their frames, so those deletes queue nothing.
+    archived = "EXISTS (SELECT 1 FROM interview WHERE id = old.interview_id AND archive_month IS NOT NULL)"
+    triggers = {}
+    for table, columns in MEDIA_REFERENCES.items():
+        condition = f" WHEN NOT {archived}" if table == "proctor_event" else ""
+        inserts = " ".join(
+            f"INSERT INTO media_gc (path) SELECT old.{column} WHERE old.{column} != '';" for column in columns
+        )
+        triggers[f"trg_media_gc_{table}_delete"] = f"AFTER DELETE ON {table}{condition} BEGIN {inserts} END"
+        for column in columns:
+            triggers[f"trg_media_gc_{table}_{column}_update"] = f'''AFTER UPDATE OF {column} ON {table}
+            WHEN old.{column} != '' AND old.{column} IS NOT new.{column} BEGIN
+                INSERT INTO media_gc (path) VALUES (old.{column});
+            END'''
+    # An application's interviews are deleted before it, while the rollup triggers
+    # can still find their job; the foreign key cascade then has nothing left to do
+    triggers["trg_applications_interview_delete"] = '''BEFORE DELETE ON applications BEGIN
+        DELETE FROM interview WHERE application_id = old.id;
+    END'''
+    for name, body in triggers.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+    # SQLite cannot add a foreign key in place, so the tables are rebuilt. Only the
+    # empty copies are created here: the backfill fills them in id windows and
+    # swaps them in at the end
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS rebuild_progress (
+        name TEXT PRIMARY KEY,
+        last_id INTEGER NOT NULL,
+        end_id INTEGER NOT NULL
+    )
+    ''')
+    for table, foreign_keys in CASCADE_FOREIGN_KEYS.items():
+        start_table_rebuild(conn, table, foreign_keys)
+
+
+def _backfill_interview_started_at(conn, batch_size):
+    # A NULL started_ms makes the (started_ms, id) < (?, ?) keyset comparison
+    # NULL, so the row would never appear on any page. Interviews with no usable
+    # start take their end time, or the epoch so they list last
+    return conn.execute(f'''
+        UPDATE interview SET started_at = CASE
+            WHEN {epoch_ms_sql('ended_at')} IS NOT NULL THEN ended_at
+            ELSE '1970-01-01 00:00:00'
+        END
+        WHERE id IN (SELECT id FROM interview WHERE started_ms IS NULL LIMIT ?)
+    ''', (batch_size,)).rowcount
+
+
+@migration(18, "interview lists ordered by started_ms", backfill=_backfill_interview_started_at)
+def _interview_started_ms_order(conn):
+    # Lists sort and keyset on (started_ms, id): started_at text mixes local and
+    # UTC-with-offset values, which do not sort by instant. id rides along as the rowid
+    conn.execute('DROP INDEX IF EXISTS idx_interview_started')
+    conn.execute('DROP INDEX IF EXISTS idx_interview_pipeline')
+    conn.execute('DROP INDEX IF EXISTS idx_interview_candidate_email')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_interview_pipeline_ms ON interview(pipeline_status, started_ms)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_interview_candidate_email_ms ON interview(candidate_email, started_ms)')
+    # Rows inserted without a usable start (older scripts, direct inserts) start now
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_interview_started_default AFTER INSERT ON interview
+    WHEN new.started_ms IS NULL
+    BEGIN
+        UPDATE interview SET started_at = CURRENT_TIMESTAMP WHERE id = new.id;
+    END
+    ''')
+
+
+@migration(19, "candidate search index maintained by the application")
+def _candidates_fts_without_triggers(conn):
+    # The migration 16 triggers called unpack_text(), which only pooled
+    # connections define, so any other writer of candidates (the sqlite3 shell,
+    # a restore script) failed. The write path now keeps candidates_fts in step
+    # (search.unindex_candidate / index_candidate) with the plain values; after
+    # writing candidates outside the application run
+    # `python maintenance.py reindex-search`.
+    for name in ("trg_candidates_fts_insert", "trg_candidates_fts_delete", "trg_candidates_fts_update"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+@migration(20, "indexes for the all-jobs list and job-filtered exports")
+def _list_and_export_indexes(conn):
+    # GET /api/jobs?active_only=false sorts every job by created_ms
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_created_ms ON jobs(created_ms)')
+    # Application exports for one job page on id (idx_application_job_rank is ordered by score)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_application_job_id ON applications(job_id, id)')
@@ -0,0 +1,50 @@
+"""
+Keyset (cursor) pagination helpers
+A cursor is the sort key of the last row on a page, serialized as opaque url-safe text.
+"""
+
+import base64
+import json
+from typing import Optional
+
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(*key) -> str:
+    """Serialize a sort key, e.g. (created_at, id), into an opaque cursor"""
+    raw = json.dumps(list(key), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _bindable(value) -> bool:
+    """A value sqlite3 can bind: a string, a 64-bit integer, a float or None"""
+    if isinstance(value, int):
+        return -2 ** 63 <= value < 2 ** 63
+    return value is None or isinstance(value, (str, float))
+
+
+def decode_cursor(cursor: str, arity: int) -> list:
+    """
+    Parse a cursor produced by encode_cursor. Raises ValueError("Invalid cursor")
+    unless it is a list of arity values that can be bound as SQL parameters.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError, RecursionError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(key, list) or len(key) != arity or not all(map(_bindable, key)):
+        raise ValueError("Invalid cursor")
+    return key
+
+
+def clamp_limit(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def next_cursor(rows: list, limit: int, *columns) -> Optional[str]:
+    """Cursor for the page after `rows`, or None when this was the last page"""
+    if len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(*(last[c] for c in columns))
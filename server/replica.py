@@ -0,0 +1,133 @@
+"""
+Read-only analytics replica
+Dashboard reads can be served from a periodic snapshot of the database made with
+the SQLite online backup API, so reporting scans never share a file with live
+interview writes. Two slot files alternate: the refresher writes the idle slot
+while readers use the active one, then the slots swap.
+
+Disabled unless ANALYTICS_REPLICA=1; without a fresh snapshot reads go to the primary.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+import database
+from response_cache import response_cache
+
+REPLICA_ENABLED = os.getenv('ANALYTICS_REPLICA', '0') == '1'
+REFRESH_SECONDS = float(os.getenv('REPLICA_REFRESH_SECONDS', 15))
+# Older snapshots are not served; reads fall back to the primary instead
+MAX_STALENESS_SECONDS = float(os.getenv('REPLICA_MAX_STALENESS_SECONDS', 60))
+# -1 copies in one step under a single read snapshot (writers are not blocked in WAL mode);
+# a positive value copies that many pages per step, restarting if the source changes
+BACKUP_PAGES = int(os.getenv('REPLICA_BACKUP_PAGES', -1))
+
+
+class AnalyticsReplica:
+    """A/B snapshot files of the primary database, refreshed with Connection.backup"""
+
+    def __init__(self, max_staleness: float = MAX_STALENESS_SECONDS,
+                 refresh_interval: float = REFRESH_SECONDS, pages: int = BACKUP_PAGES):
+        self.max_staleness = max_staleness
+        self.refresh_interval = refresh_interval
+        self.pages = pages
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._active = None          # (slot path, source path, snapshot monotonic time)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.refresh_count = 0
+        self.last_refresh_ms = 0.0
+
+    @staticmethod
+    def slot_path(source: str, slot: str) -> str:
+        return f"{source}.replica-{slot}"
+
+    def refresh(self):
+        """Copy the primary into the idle slot and make it the active snapshot"""
+        with self._refresh_lock:
+            source_path = database.DB_PATH
+            active = self._active
+            slot = "b" if active and active[0] == self.slot_path(source_path, "a") else "a"
+            target_path = self.slot_path(source_path, slot)
+
+            started = time.monotonic()
+            source = database.pool.open(source_path)
+            target = sqlite3.connect(target_path, timeout=database.BUSY_TIMEOUT_MS / 1000)
+            try:
+                source.backup(target, pages=self.pages)
+            finally:
+                target.close()
+                source.dispose()
+
+            with self._lock:
+                self._active = (target_path, source_path, started)
+            self.refresh_count += 1
+            # Cached dashboard lists rendered from the previous snapshot are now stale
+            response_cache.invalidate("replica")
+            self.last_refresh_ms = round((time.monotonic() - started) * 1000, 3)
+
+    def age(self) -> Optional[float]:
+        """Seconds since the active snapshot was taken, or None without one"""
+        active = self._active
+        return None if active is None else time.monotonic() - active[2]
+
+    def connection(self):
+        """
+        Query-only pooled connection to the active snapshot, or None when there is
+        no snapshot of the current database within the staleness bound.
+        """
+        with self._lock:
+            active = self._active
+        if active is None or active[1] != database.DB_PATH:
+            return None
+        if time.monotonic() - active[2] > self.max_staleness:
+            return None
+        return database.pool.get(active[0], query_only=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Analytics replica refresh failed: {e}")
+            self._stop.wait(self.refresh_interval)
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="analytics-replica", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+
+    def status(self) -> dict:
+        age = self.age()
+        return {
+            "enabled": REPLICA_ENABLED,
+            "refreshes": self.refresh_count,
+            "age_seconds": None if age is None else round(age, 3),
+            "max_staleness_seconds": self.max_staleness,
+            "last_refresh_ms": self.last_refresh_ms,
+        }
+
+
+analytics_replica = AnalyticsReplica()
+
+
+def analytics_connection():
+    """Replica connection when one is fresh enough, otherwise the primary"""
+    conn = analytics_replica.connection() if REPLICA_ENABLED else None
+    return conn if conn is not None else database.get_db_connection()
+
+
+async def run_analytics(func, *args, **kwargs):
+    """run_db for dashboard reads: func gets a snapshot connection when one is available"""
+    return await database.run_with_connection(analytics_connection, func, *args, **kwargs)
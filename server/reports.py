@@ -0,0 +1,208 @@
+"""
+Assessment report building and snapshots
+A completed interview's report is stored pre-serialized in report_snapshot
+(migration 14) when the interview is completed or recomputed, and served from
+there. Triggers drop a snapshot whenever something it shows changes; snapshots
+written by an older REPORT_VERSION are ignored and rebuilt on the next view.
+"""
+
+import json
+from datetime import datetime, timezone
+from typing import Optional
+
+import archive
+import encoding
+import loaders
+
+# Bump whenever build_report's output changes so existing snapshots are rebuilt
+REPORT_VERSION = 2
+
+
+def load_report_rows(conn, assessment_id: int):
+    """(interview, questions, proctor_events, transcripts) for a report, or None if the interview does not exist"""
+    cursor = conn.cursor()
+
+    # Get interview with application and job data
+    interview = cursor.execute("""
+        SELECT
+            i.*,
+            a.match_score,
+            a.match_explanation,
+            j.title as job_title,
+            c.name as candidate_name,
+            c.email as candidate_email,
+            c.phone as candidate_phone
+        FROM interview i
+        LEFT JOIN applications a ON i.application_id = a.id
+        LEFT JOIN jobs j ON a.job_id = j.id
+        LEFT JOIN candidates c ON a.candidate_id = c.id
+        WHERE i.id = ?
+    """, (assessment_id,)).fetchone()
+
+    if not interview:
+        return None
+
+    # Get questions with answers and transcripts
+    questions = cursor.execute("""
+        SELECT
+            q.id as question_id,
+            q.seq,
+            q.text as question_text,
+            a.id as answer_id,
+            a.recording_path,
+            a.cropped_recording_path,
+            a.score as answer_score,
+            a.verdict,
+            a.auto_score_breakdown
+        FROM question q
+        LEFT JOIN answer a ON q.id = a.question_id
+        WHERE q.interview_id = ?
+        ORDER BY q.seq
+    """, (assessment_id,)).fetchall()
+
+    if interview['archive_month']:
+        # Old report: transcripts and proctoring events live in the month archive
+        proctor_events, transcripts = archive.load_archived(conn, assessment_id, interview['archive_month'])
+        return interview, questions, proctor_events, transcripts
+
+    # Proctoring events and every answer's transcript, one query each
+    proctor_events = loaders.proctor_events_by_interview(conn, [assessment_id]).get(assessment_id, [])
+    transcripts = loaders.transcripts_by_answer(conn, [assessment_id])
+
+    return interview, questions, proctor_events, transcripts
+
+
+def build_report(assessment_id: int, interview, questions, proctor_events, transcripts) -> dict:
+    """The report page's JSON document"""
+    # Calculate metrics from answers
+    total_score = 0
+    max_score = 0
+    good_count = 0
+    average_count = 0
+    below_count = 0
+
+    answers_list = []
+    for q in questions:
+        score = q['answer_score'] or 0
+        max_q_score = 5.0
+        max_score += max_q_score
+        total_score += score
+
+        score_percent = (score / max_q_score * 100) if max_q_score > 0 else 0
+
+        if score_percent >= 80:
+            good_count += 1
+        elif score_percent >= 40:
+            average_count += 1
+        else:
+            below_count += 1
+
+        # Get transcript for this answer
+        transcript_segments = transcripts.get(q['answer_id'], [])
+
+        answers_list.append({
+            "id": f"a{q['seq']}",
+            "question": q['question_text'] or '',
+            "type": "video",
+            "mediaId": q['recording_path'],
+            "scorePercent": score_percent,
+            "score": score,
+            "verdict": q['verdict'] or '',
+            "transcriptSegments": transcript_segments
+        })
+
+    overall_score = total_score
+    overall_score_percent = (total_score / max_score * 100) if max_score > 0 else 0
+
+    # Parse feedback from notes field
+    feedback_data = {}
+    if interview['notes']:
+        try:
+            feedback_data = json.loads(interview['notes'])
+        except:
+            feedback_data = {
+                'overall_feedback': interview['notes'],
+                'detailed_feedback': interview['notes']
+            }
+
+    # Get topic breakdown from feedback data
+    topic_breakdown = feedback_data.get('topics', [])
+
+    return {
+        "id": assessment_id,
+        "candidate": {
+            "id": assessment_id,
+            "name": interview['candidate_name'] or "Unknown",
+            "email": interview['candidate_email'] or "N/A",
+            "phone": interview['candidate_phone'] or "N/A",
+            "position": interview['job_title'] or "N/A"
+        },
+        "overallScorePercent": round(overall_score_percent, 1),
+        "overallScore": round(overall_score, 1),
+        "maxScore": round(max_score, 1),
+        "topicBreakdown": topic_breakdown,
+        "metrics": {
+            "good": good_count,
+            "average": average_count,
+            "below": below_count,
+            "warnings": len(proctor_events)
+        },
+        "feedback": {
+            "aiOverall": feedback_data.get('overall_feedback', "Assessment feedback not yet generated."),
+            "detailed": feedback_data.get('detailed_feedback', "Detailed feedback not yet generated."),
+            "keyStrengths": feedback_data.get('key_strengths', []),
+            "areasForImprovement": feedback_data.get('areas_for_improvement', []),
+            "confidenceLevel": feedback_data.get('confidence_level', 'N/A'),
+            "communicationQuality": feedback_data.get('communication_quality', 'N/A'),
+            "suitabilityScore": feedback_data.get('suitability_score', overall_score_percent)
+        },
+        "answers": answers_list,
+        "proctoring": [
+            {
+                "id": e['id'],
+                "timestamp": e['timestamp'],
+                "eventType": e['event_type'],
+                "confidence": e['confidence'],
+                "framePath": e['frame_path'],
+                "notes": e['notes']
+            }
+            for e in proctor_events
+        ]
+    }
+
+
+def serialize(report: dict) -> str:
+    """Same encoding as the app's default response class, so snapshots and live reports are byte-identical"""
+    return encoding.dumps(report).decode()
+
+
+def read_snapshot(conn, assessment_id: int) -> Optional[str]:
+    """The stored report body, or None if there is none from the current REPORT_VERSION"""
+    row = conn.execute(
+        "SELECT body FROM report_snapshot WHERE interview_id = ? AND version = ?", (assessment_id, REPORT_VERSION)
+    ).fetchone()
+    return row['body'] if row else None
+
+
+def render_report(conn, assessment_id: int) -> Optional[str]:
+    """
+    Build the report body from the source tables. Completed interviews get
+    their snapshot (re)written. None if the interview does not exist.
+    """
+    rows = load_report_rows(conn, assessment_id)
+    if rows is None:
+        return None
+    body = serialize(build_report(assessment_id, *rows))
+    if rows[0]['status'] == 'completed':
+        conn.execute('''
+            INSERT INTO report_snapshot (interview_id, version, body, built_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(interview_id) DO UPDATE SET
+                version = excluded.version, body = excluded.body, built_at = excluded.built_at
+        ''', (assessment_id, REPORT_VERSION, body, datetime.now(timezone.utc)))
+        conn.commit()
+    return body
+
+
+def report_body(conn, assessment_id: int) -> Optional[str]:
+    """Serialized report: the snapshot if current, otherwise freshly rendered"""
+    return read_snapshot(conn, assessment_id) or render_report(conn, assessment_id)
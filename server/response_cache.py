@@ -0,0 +1,133 @@
+"""
+Conditional-GET cache for the polled dashboard routes
+Each cached route's body depends on a few version tags ("jobs", "job:5",
+"candidate:*", ...). Write routes bump the tags they affect; the ETag is a hash
+of the URL and those versions, so If-None-Match is answered with 304 without
+touching the database, and unchanged bodies are replayed from a bounded LRU.
+
+Versions live in this process only. ETags also rotate every TTL_SECONDS, which
+bounds how long writes made elsewhere (maintenance commands, other workers)
+can go unnoticed.
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_ENTRIES', 512))
+MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+TTL_SECONDS = int(os.getenv('RESPONSE_CACHE_TTL_SECONDS', 60))
+
+# Cached GET routes and the version tags their bodies depend on; lists read through
+# the analytics replica also change whenever it refreshes
+CACHED_ROUTES = [
+    (re.compile(r"^/api/jobs$"), ("jobs",)),
+    (re.compile(r"^/api/jobs/(?P<id>\d+)$"), ("job:{id}",)),
+    (re.compile(r"^/api/candidates$"), ("candidates", "replica")),
+    (re.compile(r"^/api/candidates/(?P<id>\d+)$"), ("candidate:{id}",)),
+    (re.compile(r"^/api/assessments$"), ("assessments", "replica")),
+]
+
+
+def tags_for(path: str) -> Optional[List[str]]:
+    """Version tags of a cached route, or None if the path is not cached"""
+    for pattern, tags in CACHED_ROUTES:
+        match = pattern.match(path)
+        if match:
+            return [tag.format(**match.groupdict()) for tag in tags]
+    return None
+
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches etag (weak comparison, as RFC 9110 requires for GET)"""
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or etag in (c[2:] if c.startswith("W/") else c for c in candidates)
+
+
+class ResponseCache:
+    """
+    Version counters plus an LRU of rendered bodies keyed by URL. A tag like
+    "job:5" also depends on its family tag "job:*", so invalidate("job:*")
+    covers every job at once.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES,
+                 ttl_seconds: int = TTL_SECONDS):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        # Counters restart with the process, so ETags from a previous run must not match
+        self._boot = os.urandom(8).hex()
+        self._versions = {}
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "not_modified": 0, "evictions": 0}
+
+    def etag(self, key: str, tags: List[str]) -> str:
+        """Strong ETag for key at the current versions of tags"""
+        depends_on = []
+        for tag in tags:
+            depends_on.append(tag)
+            if ":" in tag:
+                depends_on.append(tag.split(":")[0] + ":*")
+        with self._lock:
+            versions = [f"{tag}={self._versions.get(tag, 0)}" for tag in depends_on]
+        bucket = int(time.time() // self.ttl_seconds) if self.ttl_seconds > 0 else 0
+        digest = hashlib.sha1("|".join([self._boot, key, str(bucket), *versions]).encode()).hexdigest()
+        return f'"{digest[:24]}"'
+
+    def not_modified(self):
+        with self._lock:
+            self._stats["not_modified"] += 1
+
+    def lookup(self, key: str, etag: str) -> Optional[bytes]:
+        """Cached body of key if it was rendered at this ETag"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != etag:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def store(self, key: str, etag: str, body: bytes):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+            if len(body) > self.max_bytes:
+                return
+            self._entries[key] = (etag, body)
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, *tags: str):
+        """Bump the version of each tag; cached bodies and ETags depending on it become stale"""
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def clear(self):
+        """Drop every cached body; versions are kept so issued ETags stay valid"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "max_entries": self.max_entries,
+                    "max_bytes": self.max_bytes, "ttl_seconds": self.ttl_seconds, **self._stats}
+
+
+response_cache = ResponseCache()
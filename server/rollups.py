@@ -0,0 +1,92 @@
+"""
+Dashboard metrics from the daily rollup tables
+daily_job_stats and daily_candidate_stats (migration 10) are kept current by
+triggers, so any date range is answered from one row per day (and job). Days
+are UTC days, like the timestamps they are bucketed from (see
+migrations.epoch_ms_sql), whatever the server's local time zone.
+"""
+
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+_RANGE_RE = re.compile(r"^(\d{1,4})d$")
+
+
+def utc_today() -> date:
+    """The rollup day it is now"""
+    return datetime.now(timezone.utc).date()
+
+
+def parse_range(range: str, start: Optional[str] = None, end: Optional[str] = None,
+                today: Optional[date] = None) -> Tuple[date, date]:
+    """
+    Inclusive (first day, last day) for "7d", "30d", "90d" (any "<n>d" ending
+    today, UTC) or "custom" with ISO start/end dates. Raises ValueError otherwise.
+    """
+    today = today or utc_today()
+    if range == "custom":
+        if not start or not end:
+            raise ValueError("custom range needs start and end dates (YYYY-MM-DD)")
+        first, last = date.fromisoformat(start), date.fromisoformat(end)
+        if first > last:
+            raise ValueError("start must not be after end")
+        return first, last
+
+    match = _RANGE_RE.match(range or "")
+    if not match or int(match.group(1)) < 1:
+        raise ValueError("range must be like 7d, 30d, 90d or custom")
+    return today - timedelta(days=int(match.group(1)) - 1), today
+
+
+def previous_window(first: date, last: date) -> Tuple[date, date]:
+    """The window of the same length immediately before (first, last)"""
+    length = (last - first).days + 1
+    return first - timedelta(days=length), first - timedelta(days=1)
+
+
+def window_totals(conn, first: date, last: date) -> dict:
+    """Activity summed over the days first..last"""
+    totals = dict(conn.execute('''
+        SELECT COALESCE(SUM(applications), 0) as applications,
+               COALESCE(SUM(interviews_started), 0) as interviews_started,
+               COALESCE(SUM(interviews_completed), 0) as interviews_completed,
+               COALESCE(SUM(score_sum), 0) as score_sum,
+               COALESCE(SUM(max_score_sum), 0) as max_score_sum
+        FROM daily_job_stats
+        WHERE day BETWEEN ? AND ?
+    ''', (first.isoformat(), last.isoformat())).fetchone())
+    totals['candidates'] = conn.execute(
+        "SELECT COALESCE(SUM(candidates), 0) FROM daily_candidate_stats WHERE day BETWEEN ? AND ?",
+        (first.isoformat(), last.isoformat())
+    ).fetchone()[0]
+    return totals
+
+
+def job_totals(conn, first: date, last: date) -> list:
+    """Per-job activity over first..last, busiest jobs first"""
+    return [dict(row) for row in conn.execute('''
+        SELECT job_id,
+               SUM(applications) as applications,
+               SUM(interviews_completed) as interviews_completed,
+               SUM(score_sum) as score_sum,
+               SUM(max_score_sum) as max_score_sum
+        FROM daily_job_stats
+        WHERE day BETWEEN ? AND ?
+        GROUP BY job_id
+        ORDER BY applications DESC, job_id
+    ''', (first.isoformat(), last.isoformat()))]
+
+
+def average_score(totals: dict) -> float:
+    """Average answer score on the 0-5 scale used by the assessment page"""
+    if totals['max_score_sum'] <= 0:
+        return 0.0
+    return totals['score_sum'] / totals['max_score_sum'] * 5.0
+
+
+def relative_change(current: float, previous: float) -> Optional[float]:
+    """(current - previous) / previous, or None without a baseline"""
+    if not previous:
+        return None
+    return round((current - previous) / previous, 4)
@@ -0,0 +1,109 @@
+"""
+Candidate full-text search
+Turns free-form search box input into a safe FTS5 MATCH expression over candidates_fts,
+and keeps that index in step with the candidates table from the write path.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+# Letters/digits runs, matching what the unicode61 tokenizer indexes
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+MAX_SEARCH_TOKENS = 8
+
+
+def fts_match_query(search: str) -> Optional[str]:
+    """
+    Build an FTS5 query where every word of the input must match, each as a prefix
+    ("jo smi" finds "John Smith"). User text is always quoted, so FTS operators,
+    column filters and stray quotes in the input are treated as plain words.
+    Returns None when the input has no searchable words.
+    """
+    tokens = _TOKEN_RE.findall(search or "")[:MAX_SEARCH_TOKENS]
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def normalize_skill(skill: str) -> str:
+    """Canonical form stored in candidate_skill.skill_norm (see migration 7)"""
+    return skill.strip().lower()
+
+
+def parse_skill_filter(skills: str) -> List[str]:
+    """Split a comma-separated ?skills= value into distinct normalized skills"""
+    normalized = (normalize_skill(s) for s in (skills or "").split(","))
+    return list(dict.fromkeys(s for s in normalized if s))
+
+
+def skill_filter_sql(skills: List[str], match_all: bool) -> Tuple[str, list]:
+    """
+    SQL condition on c.id answering an AND (match_all) or OR skill query through
+    the candidate_skill index, plus its parameters.
+    """
+    placeholders = ", ".join("?" for _ in skills)
+    sql = f"c.id IN (SELECT candidate_id FROM candidate_skill WHERE skill_norm IN ({placeholders})"
+    params = list(skills)
+    if match_all and len(skills) > 1:
+        sql += " GROUP BY candidate_id HAVING COUNT(*) = ?"
+        params.append(len(skills))
+    return sql + ")", params
+
+
+# candidates_fts is an external-content index with no triggers (migration 19):
+# it has to be given the plain resume text, which only the application can
+# unpack. Rows the migration 5 backfill has not reached yet have no docsize
+# entry and are left to the backfill.
+_INDEXED_SQL = "SELECT 1 FROM candidates_fts_docsize WHERE id = ?"
+_INDEXED_VALUES_SQL = "SELECT id, name, email, skills, resume_text FROM candidates WHERE id = ?"
+
+
+def unindex_candidate(conn, candidate_id: int):
+    """
+    Take a candidate out of candidates_fts. Call before the row is updated or
+    deleted, on a pooled connection: the 'delete' has to repeat the plain
+    values that were indexed, which its row factory unpacks.
+    """
+    if conn.execute(_INDEXED_SQL, (candidate_id,)).fetchone() is None:
+        return
+    row = conn.execute(_INDEXED_VALUES_SQL, (candidate_id,)).fetchone()
+    if row is not None:
+        conn.execute('''
+            INSERT INTO candidates_fts (candidates_fts, rowid, name, email, skills, resume_text)
+            VALUES ('delete', ?, ?, ?, ?, ?)
+        ''', tuple(row))
+
+
+def index_candidate(conn, candidate_id: int):
+    """Add a candidate's current values to candidates_fts after it is inserted or updated"""
+    if conn.execute(_INDEXED_SQL, (candidate_id,)).fetchone() is not None:
+        return
+    row = conn.execute(_INDEXED_VALUES_SQL, (candidate_id,)).fetchone()
+    if row is not None:
+        conn.execute('''
+            INSERT INTO candidates_fts (rowid, name, email, skills, resume_text)
+            VALUES (?, ?, ?, ?, ?)
+        ''', tuple(row))
+
+
+def reindex_candidates(conn, batch_size: int) -> int:
+    """
+    Rebuild candidates_fts from the candidates table, for after rows were
+    written outside the application. Runs in the caller's transaction so
+    searches never see a half-built index. Returns how many rows were indexed.
+    """
+    conn.execute("INSERT INTO candidates_fts (candidates_fts) VALUES ('delete-all')")
+    indexed, last_id = 0, 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, name, email, skills, resume_text FROM candidates WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, batch_size)
+        ).fetchall()
+        if not rows:
+            return indexed
+        conn.executemany(
+            "INSERT INTO candidates_fts (rowid, name, email, skills, resume_text) VALUES (?, ?, ?, ?, ?)",
+            [tuple(row) for row in rows]
+        )
+        indexed += len(rows)
+        last_id = rows[-1][0]
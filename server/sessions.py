@@ -0,0 +1,168 @@
+"""
+In-memory registry of live interview sessions
+Transcript chunks arrive many times per second but the current question of an
+interview only changes when generate_question issues a new one, so the
+question/answer ids and candidate context are kept here instead of being
+re-queried per chunk. The registry is per process and bounded (least recently
+used sessions are evicted); a miss rebuilds the session with one query.
+
+It assumes one worker process serves an interview: a question issued by
+another worker is not seen here, so chunks would keep landing on the previous
+question's answer. Entries therefore expire after TTL_SECONDS, which bounds
+that window when the app runs with several workers.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import database
+
+# Live interviews kept in memory; older ones are reloaded from the database on next use
+MAX_SESSIONS = int(os.getenv('SESSION_CACHE_SIZE', 256))
+# Seconds a cached session is trusted before it is rebuilt from the database (0: no expiry)
+TTL_SECONDS = float(os.getenv('SESSION_TTL_SECONDS', 2))
+
+
+class LiveSession:
+    """Current question state and context of one interview"""
+
+    def __init__(self, interview_id: int, question_id: Optional[int] = None, seq: int = 0,
+                 answer_id: Optional[int] = None, candidate_name: Optional[str] = None,
+                 job_title: Optional[str] = None):
+        self.interview_id = interview_id
+        # Latest question issued (None before the first one) and its seq, i.e. questions asked so far
+        self.question_id = question_id
+        self.seq = seq
+        # Answer row of the latest question, None until the first chunk or upload creates it
+        self.answer_id = answer_id
+        self.candidate_name = candidate_name
+        self.job_title = job_title
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+
+class SessionRegistry:
+    """
+    Bounded LRU map of interview_id -> LiveSession, safe to use from the
+    database executor threads. Sessions returned by get()/load() are
+    snapshots; change them only through the registry methods. A session
+    loaded more than ttl_seconds ago counts as a miss and is rebuilt.
+    """
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, ttl_seconds: float = TTL_SECONDS):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[int, LiveSession]" = OrderedDict()
+        # interview_id -> time.monotonic() the session was loaded at
+        self._loaded_at = {}
+        self._lock = threading.Lock()
+        # Bumped on every change so a load racing with a change does not cache stale state
+        self._epoch = 0
+        self._db_path = database.DB_PATH
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0, "expirations": 0}
+
+    def get(self, interview_id: int) -> Optional[LiveSession]:
+        """Cached session, or None on a miss"""
+        with self._lock:
+            if self._db_path != database.DB_PATH:
+                # Switched databases (tests, tooling): nothing cached belongs to the new one
+                self._sessions.clear()
+                self._loaded_at.clear()
+                self._db_path = database.DB_PATH
+            session = self._sessions.get(interview_id)
+            if session is not None and self._expired(interview_id):
+                self._forget(interview_id)
+                self._stats["expirations"] += 1
+                session = None
+            if session is None:
+                self._stats["misses"] += 1
+                return None
+            self._sessions.move_to_end(interview_id)
+            self._stats["hits"] += 1
+            return LiveSession(**session.to_dict())
+
+    def load(self, conn, interview_id: int) -> Optional[LiveSession]:
+        """Cached session, or rebuild it from the database. None if the interview does not exist."""
+        session = self.get(interview_id)
+        if session is not None:
+            return session
+
+        with self._lock:
+            epoch = self._epoch
+        row = conn.execute('''
+            SELECT i.candidate_name, j.title AS job_title, q.id AS question_id, q.seq, a.id AS answer_id
+            FROM interview i
+            LEFT JOIN applications ap ON ap.id = i.application_id
+            LEFT JOIN jobs j ON j.id = ap.job_id
+            LEFT JOIN question q ON q.id = (
+                SELECT id FROM question WHERE interview_id = i.id ORDER BY seq DESC LIMIT 1)
+            LEFT JOIN answer a ON a.question_id = q.id AND a.interview_id = i.id
+            WHERE i.id = ?
+        ''', (interview_id,)).fetchone()
+        if row is None:
+            return None
+
+        session = LiveSession(interview_id, row['question_id'], row['seq'] or 0, row['answer_id'],
+                              row['candidate_name'], row['job_title'])
+        with self._lock:
+            if self._epoch == epoch:
+                self._store(session)
+        return LiveSession(**session.to_dict())
+
+    def _expired(self, interview_id: int) -> bool:
+        return self.ttl_seconds > 0 and time.monotonic() - self._loaded_at[interview_id] >= self.ttl_seconds
+
+    def _forget(self, interview_id: int) -> Optional[LiveSession]:
+        self._loaded_at.pop(interview_id, None)
+        return self._sessions.pop(interview_id, None)
+
+    def _store(self, session: LiveSession):
+        self._sessions[session.interview_id] = session
+        self._sessions.move_to_end(session.interview_id)
+        self._loaded_at[session.interview_id] = time.monotonic()
+        while len(self._sessions) > self.max_sessions:
+            evicted, _ = self._sessions.popitem(last=False)
+            self._loaded_at.pop(evicted, None)
+            self._stats["evictions"] += 1
+
+    def question_issued(self, interview_id: int, question_id: int, seq: int):
+        """A new question became current; its answer does not exist yet"""
+        with self._lock:
+            self._epoch += 1
+            session = self._sessions.get(interview_id)
+            # Uncached sessions are rebuilt from the database; an older seq lost a race
+            if session is not None and seq > session.seq:
+                session.question_id, session.seq, session.answer_id = question_id, seq, None
+
+    def answer_created(self, interview_id: int, question_id: int, answer_id: int):
+        """The answer row of question_id exists; ignored if another question is current by now"""
+        with self._lock:
+            self._epoch += 1
+            session = self._sessions.get(interview_id)
+            if session is not None and session.question_id == question_id:
+                session.answer_id = answer_id
+
+    def invalidate(self, interview_id: int):
+        """Forget a session (interview completed or deleted)"""
+        with self._lock:
+            self._epoch += 1
+            if self._forget(interview_id) is not None:
+                self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._sessions.clear()
+            self._loaded_at.clear()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {"sessions": len(self._sessions), "max_sessions": self.max_sessions,
+                    "ttl_seconds": self.ttl_seconds, **self._stats}
+
+
+live_sessions = SessionRegistry()
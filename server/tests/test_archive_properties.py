@@ -0,0 +1,133 @@
+"""
+Property-based tests for transcript/proctor event archival
+Feature: database-performance
+"""
+
+import pytest
+import asyncio
+import os
+import shutil
+import sys
+from datetime import datetime, timedelta
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import archive
+import database
+from database import get_db_connection
+
+# Test database path
+TEST_DB_PATH = "test_archive.db"
+TEST_ARCHIVE_DIR = "test_archive_tier"
+
+
+@pytest.fixture(scope="module")
+def main_module():
+    """Import the app against a throwaway database and archive directory"""
+    original_db_path, original_dir = database.DB_PATH, database.PARTITION_DIR
+    database.DB_PATH = TEST_DB_PATH
+    database.PARTITION_DIR = TEST_ARCHIVE_DIR
+    database.close_all_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+    shutil.rmtree(TEST_ARCHIVE_DIR, ignore_errors=True)
+    database.init_db()
+
+    import main
+
+    yield main
+
+    database.shutdown_executor()
+    database.close_all_connections()
+    database.DB_PATH, database.PARTITION_DIR = original_db_path, original_dir
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+    shutil.rmtree(TEST_ARCHIVE_DIR, ignore_errors=True)
+
+
+def add_interview(conn, ended_days_ago, status, answers):
+    ended = datetime.now() - timedelta(days=ended_days_ago)
+    interview_id = conn.execute(
+        "INSERT INTO interview (candidate_name, started_at, ended_at, status) VALUES ('Old', ?, ?, ?)",
+        (ended - timedelta(hours=1), ended, status)
+    ).lastrowid
+    for seq, chunks in enumerate(answers):
+        question_id = conn.execute(
+            "INSERT INTO question (interview_id, seq, text) VALUES (?, ?, ?)", (interview_id, seq, f"Q{seq}")
+        ).lastrowid
+        answer_id = conn.execute(
+            "INSERT INTO answer (question_id, interview_id, score) VALUES (?, ?, 3)", (question_id, interview_id)
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO transcript_chunk (answer_id, timestamp, text, is_final) VALUES (?, ?, ?, ?)",
+            [(answer_id, i, text, final) for i, (text, final) in enumerate(chunks)]
+        )
+    conn.execute(
+        "INSERT INTO proctor_event (interview_id, event_type, confidence, frame_path, notes, timestamp) VALUES (?, 'gaze', 0.9, '', 'n', ?)",
+        (interview_id, ended)
+    )
+    return interview_id
+
+
+chunk = st.tuples(st.text(max_size=20), st.booleans())
+
+
+@settings(max_examples=20, deadline=None)
+@given(answers=st.lists(st.lists(chunk, max_size=4), min_size=1, max_size=3))
+def test_archived_report_is_unchanged(main_module, answers):
+    """
+    Feature: database-performance, Property 27: Transparent archive reads
+
+    Property: Archiving an old completed interview removes its transcripts and
+    proctor events from the main database, and its assessment report is
+    identical before and after.
+    """
+    conn = get_db_connection()
+    interview_id = add_interview(conn, 400, 'completed', answers)
+    conn.commit()
+    before = asyncio.run(main_module.get_assessment_detail(interview_id)).body
+
+    archived, _ = archive.archive_interviews(conn, older_than_days=180)
+    assert archived == 1
+    assert conn.execute("SELECT COUNT(*) FROM proctor_event WHERE interview_id = ?", (interview_id,)).fetchone()[0] == 0
+    assert conn.execute(
+        "SELECT COUNT(*) FROM transcript_chunk WHERE answer_id IN (SELECT id FROM answer WHERE interview_id = ?)",
+        (interview_id,)
+    ).fetchone()[0] == 0
+    conn.close()
+
+    assert asyncio.run(main_module.get_assessment_detail(interview_id)).body == before
+
+
+def test_only_old_completed_interviews_move_and_space_is_reclaimed(main_module):
+    """
+    Feature: database-performance, Property 28: Retention cutoff and compaction
+
+    Property: Recent or unfinished interviews stay in the main database,
+    deleting an archived assessment removes its archive copy, and compaction
+    leaves the database in incremental auto-vacuum mode.
+    """
+    conn = get_db_connection()
+    recent = add_interview(conn, 10, 'completed', [[("recent", True)]])
+    unfinished = add_interview(conn, 400, 'in_progress', [[("live", True)]])
+    old = add_interview(conn, 400, 'completed', [[("old", True)]])
+    conn.commit()
+
+    archive.archive_interviews(conn, older_than_days=180)
+    months = dict(conn.execute(
+        "SELECT id, archive_month FROM interview WHERE id IN (?, ?, ?)", (recent, unfinished, old)
+    ).fetchall())
+    assert months[recent] is None and months[unfinished] is None and months[old] is not None
+
+    archive.compact(conn)
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    conn.close()
+
+    asyncio.run(main_module.delete_assessment(old))
+    conn = get_db_connection()
+    assert archive.load_archived(conn, old, months[old]) == ([], {})
+    conn.close()
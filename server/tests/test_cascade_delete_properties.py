@@ -0,0 +1,352 @@
+"""
+Property-based tests for cascading deletes and media garbage collection
+Feature: database-performance
+"""
+
+import pytest
+import os
+import random
+import shutil
+import sys
+import tempfile
+from fastapi.testclient import TestClient
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import maintenance
+import media_gc
+import migrations
+import search
+from migrations import MEDIA_REFERENCES
+
+# Test database path
+TEST_DB_PATH = "test_cascade_delete.db"
+TEST_REBUILD_DB_PATH = "test_cascade_rebuild.db"
+
+
+@pytest.fixture(scope="module")
+def client():
+    """TestClient for the app against a throwaway database, media files in a temp directory"""
+    original_db_path = database.DB_PATH
+    database.DB_PATH = TEST_DB_PATH
+    database.close_all_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+    database.init_db()
+    media_dir = tempfile.mkdtemp(prefix="media_gc_")
+
+    import main
+
+    conn = database.get_db_connection()
+    conn.execute("INSERT INTO jobs (id, title, location, job_type, experience_required, description) VALUES (1, 'Sales', 'X', 'Full-time', '1', 'd')")
+    conn.commit()
+    conn.close()
+
+    yield TestClient(main.app), media_dir
+
+    database.shutdown_executor()
+    database.close_all_connections()
+    database.DB_PATH = original_db_path
+    shutil.rmtree(media_dir, ignore_errors=True)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+
+def media_file(media_dir, name, size):
+    path = os.path.join(media_dir, name)
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+    return path
+
+
+def seed_candidate(conn, media_dir, n, interviews):
+    """A candidate with a resume and one application per interview, each with recorded answers and frames"""
+    candidate_id = conn.execute(
+        "INSERT INTO candidates (name, email, resume_path, resume_text, skills, created_at) "
+        "VALUES (?, ?, ?, 'Sales', '[\"CRM\"]', CURRENT_TIMESTAMP)",
+        (f"Person {n}", f"p{n}@example.com", media_file(media_dir, f"resume_{n}.pdf", 100))
+    ).lastrowid
+    search.index_candidate(conn, candidate_id)
+    interview_ids = []
+    for i in range(interviews):
+        application_id = conn.execute(
+            "INSERT INTO applications (candidate_id, job_id, match_score, applied_at) VALUES (?, 1, 70, CURRENT_TIMESTAMP)",
+            (candidate_id,)
+        ).lastrowid
+        interview_id = conn.execute(
+            "INSERT INTO interview (status, application_id, started_at, ended_at) "
+            "VALUES ('completed', ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)",
+            (application_id,)
+        ).lastrowid
+        for seq in (1, 2):
+            question_id = conn.execute("INSERT INTO question (interview_id, seq, text) VALUES (?, ?, 'Q')",
+                                       (interview_id, seq)).lastrowid
+            name = f"answer_{interview_id}_{seq}"
+            answer_id = conn.execute(
+                "INSERT INTO answer (question_id, interview_id, score, recording_path, cropped_recording_path) "
+                "VALUES (?, ?, 4, ?, ?)",
+                (question_id, interview_id, media_file(media_dir, f"{name}.webm", 300),
+                 media_file(media_dir, f"cropped_{name}.webm", 200))
+            ).lastrowid
+            conn.execute("INSERT INTO transcript_chunk (answer_id, text, is_final) VALUES (?, 'hello', 1)", (answer_id,))
+            conn.execute(
+                "INSERT INTO proctor_event (interview_id, question_id, event_type, confidence, frame_path) "
+                "VALUES (?, ?, 'multiple_faces', 0.9, ?)",
+                (interview_id, question_id, media_file(media_dir, f"frame_{name}.jpg", 50))
+            )
+        interview_ids.append(interview_id)
+    return candidate_id, interview_ids
+
+
+def referenced_files(conn):
+    return {
+        row[0]
+        for table, columns in MEDIA_REFERENCES.items() for column in columns
+        for row in conn.execute(f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL")
+    }
+
+
+def rollup_rows(conn):
+    """Non-empty rollup rows, with float sums rounded"""
+    return {
+        table: sorted(
+            tuple(round(value, 6) if type(value) is float else value for value in row)
+            for row in conn.execute(f"SELECT * FROM {table}") if any(value for value in tuple(row)[key:])
+        )
+        for table, key in (("daily_job_stats", 2), ("daily_candidate_stats", 1))
+    }
+
+
+@settings(max_examples=15, deadline=None)
+@given(
+    interview_counts=st.lists(st.integers(min_value=0, max_value=2), min_size=1, max_size=4),
+    deletes=st.lists(st.tuples(st.sampled_from(["candidate", "assessment"]), st.integers(min_value=0, max_value=20)),
+                     max_size=6),
+)
+def test_cascading_deletes_leave_nothing_behind(client, interview_counts, deletes):
+    """
+    Feature: database-performance, Property 53: Cascading deletes leave no orphans
+
+    Property: Deleting candidates and assessments through the API removes
+    every dependent row in one statement, leaves the trigger-maintained
+    tables (summaries, counters, pipeline status, rollups, search index)
+    exactly as a rebuild would make them, and queues the released media;
+    one sweep then leaves on disk exactly the files rows still point at.
+    """
+    api, media_dir = client
+    conn = database.get_db_connection()
+    candidates = [seed_candidate(conn, media_dir, f"{os.urandom(4).hex()}", count) for count in interview_counts]
+    conn.commit()
+
+    for kind, index in deletes:
+        candidate_id, interview_ids = candidates[index % len(candidates)]
+        if kind == "candidate":
+            expected = 200 if conn.execute("SELECT 1 FROM candidates WHERE id = ?", (candidate_id,)).fetchone() else 404
+            assert api.delete(f"/api/candidates/{candidate_id}").status_code == expected
+        elif interview_ids:
+            interview_id = interview_ids[index % len(interview_ids)]
+            expected = 200 if conn.execute("SELECT 1 FROM interview WHERE id = ?", (interview_id,)).fetchone() else 404
+            assert api.delete(f"/api/assessments/{interview_id}").status_code == expected
+
+    assert conn.execute("PRAGMA foreign_key_check").fetchall() == []
+    for table, column, parent in (("interview_summary", "interview_id", "interview"),
+                                  ("report_snapshot", "interview_id", "interview"),
+                                  ("candidate_skill", "candidate_id", "candidates")):
+        assert conn.execute(
+            f"SELECT COUNT(*) FROM {table} WHERE {column} NOT IN (SELECT id FROM {parent})").fetchone()[0] == 0
+    assert maintenance.rebuild_interview_summaries(conn) == 0
+    assert maintenance.reconcile_counters(conn) == 0
+    assert maintenance.reconcile_pipeline_status(conn) == 0
+    rollups = rollup_rows(conn)
+    maintenance.rebuild_daily_rollups(conn)
+    assert rollup_rows(conn) == rollups
+    conn.execute("INSERT INTO candidates_fts (candidates_fts) VALUES ('integrity-check')")
+    conn.commit()
+
+    referenced = referenced_files(conn)
+    queued = {row[0] for row in conn.execute("SELECT path FROM media_gc")}
+    assert not queued & referenced
+    result = media_gc.sweep(conn, batch_size=10, max_seconds=60)
+    assert result["queued"] == 0 and result["errors"] == 0
+    assert result["files_removed"] == len(queued)
+    on_disk = {os.path.join(media_dir, name) for name in os.listdir(media_dir)}
+    assert on_disk == referenced
+    conn.close()
+
+
+def test_sweep_is_bounded_and_keeps_referenced_files(client):
+    """
+    Feature: database-performance, Property 54: Bounded media sweep
+
+    Property: A sweep removes at most one batch once its time is up and
+    reports the bytes it freed; files queued by a replaced path are removed
+    unless a row points at them again, and queued paths already gone are
+    dropped without error.
+    """
+    _, media_dir = client
+    conn = database.get_db_connection()
+    paths = [media_file(media_dir, f"stale_{n}.webm", 10 + n) for n in range(30)]
+    media_gc.enqueue(conn, paths)
+    conn.commit()
+
+    result = media_gc.sweep(conn, batch_size=7, max_seconds=0)
+    assert result["files_removed"] == 7
+    assert result["bytes_freed"] == sum(10 + n for n in range(7))
+    assert result["queued"] == 23
+    assert [os.path.exists(path) for path in paths] == [False] * 7 + [True] * 23
+
+    # Replacing a resume queues the old file; a candidate pointing at a queued path keeps it
+    old_resume = media_file(media_dir, "resume_old.pdf", 40)
+    candidate_id = conn.execute(
+        "INSERT INTO candidates (name, email, resume_path, resume_text, skills) VALUES ('R', 'r@example.com', ?, 'x', '[]')",
+        (old_resume,)
+    ).lastrowid
+    conn.execute("UPDATE candidates SET resume_path = ? WHERE id = ?",
+                 (media_file(media_dir, "resume_new.pdf", 40), candidate_id))
+    conn.execute("INSERT INTO candidates (name, email, resume_path, resume_text, skills) VALUES ('S', 's@example.com', ?, 'x', '[]')",
+                 (paths[10],))
+    media_gc.enqueue(conn, [os.path.join(media_dir, "never_written.webm")])
+    conn.commit()
+
+    result = media_gc.sweep(conn, batch_size=7, max_seconds=60)
+    assert result["queued"] == 0
+    assert result["kept"] == 1 and result["missing"] == 1
+    assert result["files_removed"] == 23
+    assert not os.path.exists(old_resume)
+    assert os.path.exists(paths[10]) and os.path.exists(os.path.join(media_dir, "resume_new.pdf"))
+
+    conn.execute("DELETE FROM candidates WHERE email IN ('r@example.com', 's@example.com')")
+    conn.commit()
+    media_gc.sweep(conn)
+    assert not os.path.exists(paths[10])
+    conn.close()
+
+
+def rows(conn, table):
+    return sorted(tuple(row) for row in conn.execute(f"SELECT * FROM {table}"))
+
+
+def schema_objects(conn):
+    return sorted(tuple(row) for row in conn.execute(
+        "SELECT type, name FROM sqlite_master WHERE tbl_name IN (%s) AND name NOT LIKE 'sqlite_autoindex%%' AND name NOT LIKE '%%rebuild%%'"
+        % ", ".join("?" * len(migrations.CASCADE_FOREIGN_KEYS)), list(migrations.CASCADE_FOREIGN_KEYS)
+    ))
+
+
+@settings(max_examples=8, deadline=None)
+@given(batch_size=st.integers(min_value=1, max_value=12), seed=st.integers(min_value=0, max_value=1000))
+def test_tables_are_rebuilt_online_in_batches(batch_size, seed):
+    """
+    Feature: database-performance, Property 58: Online cascade rebuild
+
+    Property: Migration 17 applies without copying rows; its backfill copies
+    at most batch_size ids per batch while live inserts, updates and
+    single-statement deletes keep the copies in step, drops rows whose parent
+    was already gone, and finally swaps in tables with cascading foreign keys
+    that keep the rows, indexes, triggers and AUTOINCREMENT sequences.
+    """
+    rng = random.Random(seed)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_REBUILD_DB_PATH + suffix):
+            os.remove(TEST_REBUILD_DB_PATH + suffix)
+    conn = database.pool.open(TEST_REBUILD_DB_PATH)
+    live = database.pool.open(TEST_REBUILD_DB_PATH)
+    conn.execute("PRAGMA foreign_keys = OFF")
+    earlier = [m for m in migrations.MIGRATIONS if m.version < 17]
+    migrations.apply_migrations(conn, earlier)
+    migrations.run_backfills(conn, earlier)
+
+    conn.execute("INSERT INTO jobs (id, title, location, job_type, experience_required, description) VALUES (1, 'T', 'X', 'Full-time', '1', 'd')")
+
+    def seed_chain(db, n):
+        candidate_id = db.execute("INSERT INTO candidates (name, email, resume_path, resume_text, skills) VALUES (?, ?, '', 'r', '[]')",
+                                  (f"C{n}", f"c{n}@example.com")).lastrowid
+        application_id = db.execute("INSERT INTO applications (candidate_id, job_id, match_score) VALUES (?, 1, 50)",
+                                    (candidate_id,)).lastrowid
+        interview_id = db.execute("INSERT INTO interview (status, application_id) VALUES ('completed', ?)",
+                                  (application_id,)).lastrowid
+        for seq in range(rng.randint(1, 3)):
+            question_id = db.execute("INSERT INTO question (interview_id, seq, text) VALUES (?, ?, 'Q')",
+                                     (interview_id, seq)).lastrowid
+            answer_id = db.execute("INSERT INTO answer (question_id, interview_id, score) VALUES (?, ?, 3)",
+                                   (question_id, interview_id)).lastrowid
+            db.executemany("INSERT INTO transcript_chunk (answer_id, text, is_final) VALUES (?, 'w', 1)",
+                           [(answer_id,)] * rng.randint(0, 3))
+            db.execute("INSERT INTO proctor_event (interview_id, event_type, confidence) VALUES (?, 'gaze', 0.5)",
+                       (interview_id,))
+        return candidate_id, interview_id
+
+    chains = [seed_chain(conn, n) for n in range(6)]
+    # Left behind before foreign keys were enforced
+    orphan_question = conn.execute("INSERT INTO question (interview_id, seq, text) VALUES (999999, 1, 'gone')").lastrowid
+    orphan_answer = conn.execute("INSERT INTO answer (question_id, interview_id) VALUES (?, 999999)",
+                                 (orphan_question,)).lastrowid
+    conn.execute("INSERT INTO transcript_chunk (answer_id, text) VALUES (?, 'gone')", (orphan_answer,))
+    unlinked = conn.execute("INSERT INTO interview (status, application_id) VALUES ('completed', 999999)").lastrowid
+    conn.commit()
+    conn.execute("PRAGMA foreign_keys = ON")
+
+    migrations.apply_migrations(conn, [m for m in migrations.MIGRATIONS if m.version <= 17])
+    before = schema_objects(conn)
+    # The apply step copies nothing
+    for table in migrations.CASCADE_FOREIGN_KEYS:
+        assert conn.execute(f"SELECT COUNT(*) FROM {table}_rebuild").fetchone()[0] == 0
+
+    n, snapshot = 100, None
+    while True:
+        if snapshot is None and not conn.execute(
+                "SELECT COUNT(*) FROM rebuild_progress WHERE last_id < end_id").fetchone()[0]:
+            for table in migrations.CASCADE_FOREIGN_KEYS:
+                assert rows(conn, table) == rows(conn, f"{table}_rebuild")
+            snapshot = {table: rows(conn, table) for table in migrations.CASCADE_FOREIGN_KEYS}
+        processed = migrations._backfill_cascading_deletes(conn, batch_size)
+        conn.commit()
+        if processed == 0:
+            break
+        assert processed <= batch_size
+        if snapshot is not None:
+            continue
+        # Live writes between batches, through a connection of the running app
+        action = rng.choice(["insert", "update", "delete_candidate", "delete_interview"])
+        if action == "insert":
+            chains.append(seed_chain(live, n))
+            n += 1
+        elif action == "update":
+            live.execute("UPDATE transcript_chunk SET text = text || 'x' WHERE id = (SELECT MAX(id) FROM transcript_chunk)")
+            live.execute("UPDATE question SET text = 'edited' WHERE id = (SELECT MIN(id) FROM question)")
+        elif chains:
+            candidate_id, interview_id = chains.pop(rng.randrange(len(chains)))
+            if action == "delete_candidate":
+                live.execute("DELETE FROM candidates WHERE id = ?", (candidate_id,))
+            else:
+                live.execute("DELETE FROM interview WHERE id = ?", (interview_id,))
+        live.commit()
+
+    assert {table: rows(conn, table) for table in migrations.CASCADE_FOREIGN_KEYS} == snapshot
+    assert schema_objects(conn) == before
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name LIKE '%rebuild%'").fetchall() == []
+    assert conn.execute("PRAGMA foreign_key_check").fetchall() == []
+    for table, foreign_keys in migrations.CASCADE_FOREIGN_KEYS.items():
+        assert sorted((row["from"], row["table"], row["on_delete"]) for row in conn.execute(
+            f"PRAGMA foreign_key_list({table})")) == sorted((c, p, "CASCADE") for c, p in foreign_keys)
+    assert conn.execute("SELECT COUNT(*) FROM question WHERE id = ?", (orphan_question,)).fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM transcript_chunk WHERE text = 'gone'").fetchone()[0] == 0
+    assert conn.execute("SELECT application_id FROM interview WHERE id = ?", (unlinked,)).fetchone()[0] is None
+
+    # AUTOINCREMENT ids are not reused, and deletes now cascade through real foreign keys
+    top = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'transcript_chunk'").fetchone()[0]
+    conn.execute("DELETE FROM candidates")
+    assert all(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == (1 if table == "interview" else 0)
+               for table in migrations.CASCADE_FOREIGN_KEYS)
+    assert conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'transcript_chunk'").fetchone()[0] == top
+    conn.rollback()
+    live.dispose()
+    conn.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_REBUILD_DB_PATH + suffix):
+            os.remove(TEST_REBUILD_DB_PATH + suffix)
@@ -0,0 +1,129 @@
+"""
+Property-based tests for the trigger-maintained list counters
+Feature: database-performance
+"""
+
+import pytest
+import os
+import sys
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from database import get_db_connection, init_db
+from maintenance import reconcile_counters
+
+# Test database path
+TEST_DB_PATH = "test_counters.db"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_test_db():
+    """Create the schema once with two jobs"""
+    original_db_path = database.DB_PATH
+    database.DB_PATH = TEST_DB_PATH
+    database.close_all_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+    init_db()
+    conn = get_db_connection()
+    conn.executemany(
+        "INSERT INTO jobs (id, title, location, job_type, experience_required, description) VALUES (?, 'Job', 'X', 'Full-time', '1', 'd')",
+        [(1,), (2,)]
+    )
+    conn.commit()
+    conn.close()
+
+    yield
+
+    database.close_all_connections()
+    database.DB_PATH = original_db_path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+
+def pick(conn, table, i):
+    ids = [row[0] for row in conn.execute(f"SELECT id FROM {table} ORDER BY id")]
+    return ids[i % len(ids)] if ids else None
+
+
+index = st.integers(0, 20)
+operation = st.one_of(
+    st.tuples(st.just("candidate")),
+    st.tuples(st.just("apply"), index, st.sampled_from([1, 2])),
+    st.tuples(st.just("move_application"), index, st.sampled_from([1, 2])),
+    st.tuples(st.just("interview")),
+    st.tuples(st.just("question"), index),
+    st.tuples(st.just("move_question"), index, index),
+    st.tuples(st.just("delete_question"), index),
+    st.tuples(st.just("delete_application"), index),
+    st.tuples(st.just("delete_interview"), index),
+    st.tuples(st.just("delete_candidate"), index),
+)
+
+
+@settings(max_examples=60, deadline=None)
+@given(ops=st.lists(operation, max_size=30))
+def test_counters_match_counts_after_any_writes(ops):
+    """
+    Feature: database-performance, Property 37: Counter consistency
+
+    Property: After any sequence of inserts, deletes and re-parenting of
+    applications, questions, candidates and interviews, every maintained
+    counter equals the corresponding COUNT(*), so reconciliation fixes nothing.
+    """
+    conn = get_db_connection()
+    for table in ("question", "interview", "applications", "candidates"):
+        conn.execute(f"DELETE FROM {table}")
+    conn.commit()
+
+    for n, op in enumerate(ops):
+        kind = op[0]
+        if kind == "candidate":
+            conn.execute("INSERT INTO candidates (name, email, resume_path) VALUES ('C', ?, 'r')", (f"k{n}@example.com",))
+        elif kind == "apply" and (candidate_id := pick(conn, "candidates", op[1])):
+            conn.execute("INSERT INTO applications (candidate_id, job_id, match_score) VALUES (?, ?, 50)", (candidate_id, op[2]))
+        elif kind == "move_application" and (application_id := pick(conn, "applications", op[1])):
+            conn.execute("UPDATE applications SET job_id = ? WHERE id = ?", (op[2], application_id))
+        elif kind == "interview":
+            conn.execute("INSERT INTO interview (candidate_name) VALUES ('I')")
+        elif kind == "question" and (interview_id := pick(conn, "interview", op[1])):
+            conn.execute("INSERT INTO question (interview_id, seq, text) VALUES (?, ?, 'Q')", (interview_id, n))
+        elif kind == "move_question" and (question_id := pick(conn, "question", op[1])):
+            conn.execute("UPDATE question SET interview_id = ? WHERE id = ?", (pick(conn, "interview", op[2]), question_id))
+        elif kind.startswith("delete_"):
+            table = {"question": "question", "application": "applications",
+                     "interview": "interview", "candidate": "candidates"}[kind[len("delete_"):]]
+            conn.execute(f"DELETE FROM {table} WHERE id = ?", (pick(conn, table, op[1]),))
+    conn.commit()
+
+    assert reconcile_counters(conn) == 0
+    conn.close()
+
+
+def test_reconcile_repairs_drift():
+    """
+    Feature: database-performance, Property 38: Reconciliation
+
+    Property: Counters corrupted outside the triggers are reported and reset
+    by reconcile-counters, after which a second run finds nothing to fix.
+    """
+    conn = get_db_connection()
+    candidate_id = conn.execute(
+        "INSERT INTO candidates (name, email, resume_path) VALUES ('D', 'drift@example.com', 'r')"
+    ).lastrowid
+    conn.execute("INSERT INTO applications (candidate_id, job_id, match_score) VALUES (?, 1, 50)", (candidate_id,))
+    conn.execute("UPDATE jobs SET applicant_count = applicant_count + 5 WHERE id = 1")
+    conn.execute("UPDATE table_stats SET row_count = -1 WHERE name = 'candidates'")
+    conn.commit()
+
+    assert reconcile_counters(conn) == 2
+    assert reconcile_counters(conn) == 0
+    assert conn.execute("SELECT applicant_count FROM jobs WHERE id = 1").fetchone()[0] == \
+        conn.execute("SELECT COUNT(*) FROM applications WHERE job_id = 1").fetchone()[0]
+    conn.close()
@@ -0,0 +1,182 @@
+"""
+Property-based tests for the pooled SQLite connection layer
+Feature: database-performance
+"""
+
+import pytest
+import sqlite3
+import os
+import sys
+import time
+import asyncio
+import threading
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from database import get_db_connection, init_db
+
+# Test database path
+TEST_DB_PATH = "test_database_pool.db"
+
+
+@pytest.fixture(scope="function", autouse=True)
+def setup_test_db():
+    """Point the pool at a fresh test database"""
+    original_db_path = database.DB_PATH
+    database.DB_PATH = TEST_DB_PATH
+    database.close_all_connections()
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+    init_db()
+
+    yield
+
+    database.close_all_connections()
+    database.DB_PATH = original_db_path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+
+def test_connection_is_reused_per_thread():
+    """
+    Feature: database-performance, Property 1: Per-thread connection reuse
+
+    Property: Repeated get_db_connection() calls on one thread return the same
+    connection, and close() keeps it usable; other threads get their own.
+    """
+    conn = get_db_connection()
+    conn.close()
+    assert get_db_connection() is conn
+    assert conn.execute("SELECT 1").fetchone()[0] == 1
+
+    other = []
+    t = threading.Thread(target=lambda: other.append(get_db_connection()))
+    t.start()
+    t.join()
+    assert other[0] is not conn
+
+
+def test_connection_uses_wal_profile():
+    """
+    Feature: database-performance, Property 2: Tuned pragma profile
+
+    Property: Pooled connections run in WAL mode with the configured busy timeout.
+    """
+    conn = get_db_connection()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == database.BUSY_TIMEOUT_MS
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+
+@settings(max_examples=20, deadline=None)
+@given(title=st.text(min_size=1, max_size=50, alphabet=st.characters(blacklist_categories=('Cs',))))
+def test_close_discards_uncommitted_work(title):
+    """
+    Feature: database-performance, Property 3: Release rolls back
+
+    Property: Work that was not committed before close() is never visible to the
+    next user of the pooled connection.
+    """
+    conn = get_db_connection()
+    conn.execute('''
+        INSERT INTO jobs (title, location, job_type, experience_required, description)
+        VALUES (?, 'Remote', 'Full-Time', '1 year', 'desc')
+    ''', (title,))
+    conn.close()
+
+    count = get_db_connection().execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+    assert count == 0
+
+
+def test_reopens_when_database_file_replaced():
+    """
+    Feature: database-performance, Property 4: Stale connection detection
+
+    Property: If the database file is removed and recreated, the pool opens a new
+    connection to the new file instead of writing into the deleted one.
+    """
+    conn = get_db_connection()
+    database.close_all_connections()
+    os.remove(TEST_DB_PATH)
+    init_db()
+
+    fresh = get_db_connection()
+    assert fresh is not conn
+    assert fresh.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] == 0
+
+
+def test_retry_on_lock_retries_then_succeeds():
+    """
+    Feature: database-performance, Property 5: Lock contention retry
+
+    Property: Lock errors are retried; other operational errors propagate at once.
+    """
+    calls = {"n": 0}
+
+    def flaky():
+        calls["n"] += 1
+        if calls["n"] < 3:
+            raise sqlite3.OperationalError("database is locked")
+        return "ok"
+
+    assert database.retry_on_lock(flaky) == "ok"
+    assert calls["n"] == 3
+
+    def broken():
+        calls["n"] += 1
+        raise sqlite3.OperationalError("no such table: nope")
+
+    calls["n"] = 0
+    with pytest.raises(sqlite3.OperationalError):
+        database.retry_on_lock(broken)
+    assert calls["n"] == 1
+
+
+def heavy_read(conn):
+    """A deliberately slow read: ~500k-row recursive CTE"""
+    return conn.execute('''
+        WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 500000)
+        SELECT SUM(x) FROM n
+    ''').fetchone()[0]
+
+
+def test_event_loop_stays_responsive_under_heavy_reads():
+    """
+    Feature: database-performance, Property 6: Non-blocking database access
+
+    Property: While several slow queries run concurrently through run_db, the
+    event loop keeps servicing other coroutines (a 5 ms ticker is never delayed
+    by more than a small fraction of a single query's runtime).
+    """
+    async def scenario():
+        start = time.perf_counter()
+        heavy_read(get_db_connection())
+        single_query = time.perf_counter() - start
+
+        lags = []
+        done = asyncio.Event()
+
+        async def ticker():
+            while not done.is_set():
+                before = time.perf_counter()
+                await asyncio.sleep(0.005)
+                lags.append(time.perf_counter() - before - 0.005)
+
+        tick_task = asyncio.create_task(ticker())
+        results = await asyncio.gather(*[database.run_db(heavy_read) for _ in range(4)])
+        done.set()
+        await tick_task
+        return single_query, lags, results
+
+    single_query, lags, results = asyncio.run(scenario())
+    database.shutdown_executor()
+
+    assert all(r == 500000 * 500001 // 2 for r in results)
+    # The ticker kept running for the whole batch of reads
+    assert len(lags) > 10
+    assert max(lags) < max(0.05, single_query / 2), f"loop stalled for {max(lags):.3f}s"
@@ -0,0 +1,116 @@
+"""
+Property-based tests for orjson rendering and negotiated response compression
+Feature: database-performance
+"""
+
+import pytest
+import asyncio
+import gzip
+import json
+import os
+import sys
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import encoding
+from encoding import CompressionMiddleware, dumps, negotiate
+
+json_values = st.recursive(
+    st.none() | st.booleans() | st.integers(-2**53, 2**53)
+    | st.floats(allow_nan=False, allow_infinity=False) | st.text(),
+    lambda children: st.lists(children, max_size=5) | st.dictionaries(st.text(), children, max_size=5),
+    max_leaves=30,
+)
+
+
+@settings(max_examples=200, deadline=None)
+@given(value=json_values)
+def test_orjson_body_matches_stdlib_json(value):
+    """
+    Feature: database-performance, Property 45: Serialization equivalence
+
+    Property: For any JSON value, the orjson body decodes to the same value the
+    stdlib encoder produced, so switching the default response class changes
+    no payload.
+    """
+    stdlib = json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    assert json.loads(dumps(value)) == json.loads(stdlib)
+
+
+def run_app(app, accept_encoding):
+    """Drive an ASGI app once; returns (status, headers dict, body bytes)"""
+    scope = {"type": "http", "method": "GET", "path": "/", "headers":
+             [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(CompressionMiddleware(app, minimum_size=64)(scope, receive, send))
+    start = messages[0]
+    body = b"".join(m.get("body", b"") for m in messages[1:])
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}, body
+
+
+def make_app(chunks, content_type="application/json", extra_headers=()):
+    async def app(scope, receive, send):
+        headers = [(b"content-type", content_type.encode()), (b"etag", b'"v1"'), *extra_headers]
+        if len(chunks) == 1:
+            headers.append((b"content-length", str(len(chunks[0])).encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        for i, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": i < len(chunks) - 1})
+    return app
+
+
+@settings(max_examples=100, deadline=None)
+@given(
+    chunks=st.lists(st.binary(max_size=300), min_size=1, max_size=4),
+    accept=st.sampled_from(["", "gzip", "gzip, deflate, br", "identity", "br;q=1, gzip;q=0.5", "*", "gzip;q=0"]),
+    content_type=st.sampled_from(["application/json", "text/csv", "audio/mpeg"]),
+)
+def test_compression_round_trips(chunks, accept, content_type):
+    """
+    Feature: database-performance, Property 46: Lossless negotiated compression
+
+    Property: Whatever the Accept-Encoding, body size or chunking, the client
+    gets the original bytes back after decoding; only accepted codings are
+    used, small whole bodies and non-text types are left alone, and
+    compressed responses carry Vary, a correct Content-Length and a weak ETag.
+    """
+    original = b"".join(chunks)
+    status, headers, body = run_app(make_app(chunks, content_type), accept)
+    coding = headers.get("content-encoding")
+
+    if coding is None:
+        assert body == original and headers["etag"] == '"v1"'
+        assert (not accept or negotiate(accept) is None or content_type == "audio/mpeg"
+                or (len(chunks) == 1 and len(original) < 64))
+        return
+
+    assert coding == negotiate(accept) and content_type != "audio/mpeg"
+    assert headers["vary"] == "Accept-Encoding" and headers["etag"] == 'W/"v1"'
+    if coding == "gzip":
+        assert gzip.decompress(body) == original
+    else:
+        assert encoding.brotli.decompress(body) == original
+    if len(chunks) == 1:
+        assert headers["content-length"] == str(len(body))
+    else:
+        assert "content-length" not in headers
+
+
+def test_negotiation_prefers_brotli_only_when_available():
+    """
+    Test that brotli is chosen only when installed and q-values are honoured.
+    """
+    assert negotiate("gzip, br", brotli_available=True) == "br"
+    assert negotiate("gzip, br", brotli_available=False) == "gzip"
+    assert negotiate("br;q=0.1, gzip;q=0.9", brotli_available=True) == "gzip"
+    assert negotiate("identity", brotli_available=True) is None
+    assert negotiate("*;q=0, gzip", brotli_available=False) == "gzip"
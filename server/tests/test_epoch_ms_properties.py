@@ -0,0 +1,183 @@
+"""
+Property-based tests for the epoch-millisecond timestamp columns
+Feature: database-performance
+"""
+
+import pytest
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import loaders
+from database import get_db_connection, init_db
+from migrations import EPOCH_MS_COLUMNS, to_epoch_ms
+
+# Test database path
+TEST_DB_PATH = "test_epoch_ms.db"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_test_db():
+    """Create the schema once with one interview and answer"""
+    original_db_path = database.DB_PATH
+    database.DB_PATH = TEST_DB_PATH
+    database.close_all_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+    init_db()
+    conn = get_db_connection()
+    conn.execute("INSERT INTO interview (id, started_at) VALUES (1, '2025-01-01 09:00:00')")
+    conn.execute("INSERT INTO question (id, interview_id, seq, text) VALUES (1, 1, 1, 'Q')")
+    conn.execute("INSERT INTO answer (id, question_id, interview_id) VALUES (1, 1, 1)")
+    conn.commit()
+    conn.close()
+
+    yield
+
+    database.close_all_connections()
+    database.DB_PATH = original_db_path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+
+moments = st.datetimes(min_value=datetime(2000, 1, 1), max_value=datetime(2099, 12, 31))
+offsets = st.integers(-12 * 60, 14 * 60).map(lambda m: timezone(timedelta(minutes=m)))
+
+# How the app and its clients have written timestamps: (text or number, what it means)
+stored_forms = st.one_of(
+    moments.map(lambda d: (d.strftime("%Y-%m-%d %H:%M:%S"), d.replace(microsecond=0))),   # CURRENT_TIMESTAMP
+    moments.map(lambda d: (str(d), d)),                                                   # str(datetime.now())
+    moments.map(lambda d: (d.isoformat(timespec="milliseconds") + "Z", d)),               # Date.toISOString()
+    st.tuples(moments, offsets).map(lambda p: (p[0].replace(tzinfo=p[1]).isoformat(), p[0].replace(tzinfo=p[1]))),
+    moments.map(lambda d: d.replace(microsecond=0)).map(lambda d: (to_epoch_ms(d) // 1000, d)),  # epoch seconds
+    moments.map(lambda d: (to_epoch_ms(d), d)),                                           # epoch milliseconds
+)
+
+
+@settings(max_examples=200, deadline=None)
+@given(forms=st.lists(stored_forms, min_size=1, max_size=8))
+def test_epoch_columns_match_the_stored_instant(forms):
+    """
+    Feature: database-performance, Property 49: Epoch conversion
+
+    Property: Whatever format a timestamp was stored in, its _ms column holds
+    the same instant in epoch milliseconds, the text column (and so the API
+    output) is returned unchanged, and transcripts come back in true time
+    order even when formats are mixed.
+    """
+    conn = get_db_connection()
+    conn.execute("DELETE FROM transcript_chunk")
+    for n, (value, _) in enumerate(forms):
+        conn.execute("INSERT INTO transcript_chunk (answer_id, timestamp, text, is_final) VALUES (1, ?, ?, 1)",
+                     (value, str(n)))
+    conn.commit()
+
+    rows = conn.execute("SELECT timestamp, timestamp_ms, text FROM transcript_chunk ORDER BY id").fetchall()
+    for (value, instant), row in zip(forms, rows):
+        assert row['timestamp'] == value
+        assert abs(row['timestamp_ms'] - to_epoch_ms(instant)) <= 1
+
+    served = loaders.transcripts_by_answer(conn, [1])[1]
+    assert sorted(map(str, (chunk['timestamp'] for chunk in served))) == sorted(str(value) for value, _ in forms)
+    served_ms = [rows[int(chunk['text'])]['timestamp_ms'] for chunk in served]
+    assert served_ms == sorted(served_ms)
+    conn.close()
+
+
+def test_time_reads_use_the_epoch_indexes():
+    """
+    Feature: database-performance, Property 50: Indexed time ranges
+
+    Property: Every table listed in EPOCH_MS_COLUMNS has its integer columns,
+    and the time-ordered reads and range filters are answered from the
+    epoch-millisecond indexes without sorting.
+    """
+    conn = get_db_connection()
+    for table, columns in EPOCH_MS_COLUMNS.items():
+        names = {row[1] for row in conn.execute(f"PRAGMA table_xinfo({table})")}
+        assert all(ms_column in names for _, ms_column in columns)
+
+    def plan(sql, params):
+        return " | ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+
+    checks = {
+        "idx_transcript_answer_ms": ("SELECT text FROM transcript_chunk WHERE answer_id = ? AND is_final = 1 ORDER BY timestamp_ms", (1,)),
+        "idx_proctor_interview_ms": ("SELECT * FROM proctor_event WHERE interview_id = ? ORDER BY timestamp_ms", (1,)),
+        "idx_jobs_active_created_ms": ("SELECT * FROM jobs WHERE is_active = 1 ORDER BY created_ms DESC", ()),
+        "idx_interview_started_ms": ("SELECT id FROM interview WHERE started_ms BETWEEN ? AND ?", (0, 1)),
+        "idx_application_applied_ms": ("SELECT id FROM applications WHERE applied_ms >= ? ORDER BY applied_ms", (0,)),
+    }
+    for index, (sql, params) in checks.items():
+        query_plan = plan(sql, params)
+        assert index in query_plan and "TEMP B-TREE" not in query_plan, query_plan
+
+    naive = datetime(2025, 3, 1, 12, 30, 15, 250000)
+    assert to_epoch_ms(naive) == to_epoch_ms(naive.replace(tzinfo=timezone.utc)) == 1740832215250
+    assert conn.execute("SELECT started_ms FROM interview WHERE id = 1").fetchone()[0] == \
+        to_epoch_ms(datetime(2025, 1, 1, 9))
+    conn.close()
+
+
+@pytest.fixture
+def kolkata_time():
+    """Run the app with a local time zone well away from UTC"""
+    original = os.environ.get("TZ")
+    os.environ["TZ"] = "Asia/Kolkata"
+    time.tzset()
+    yield
+    if original is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = original
+    time.tzset()
+
+
+def test_app_writes_the_current_instant(kolkata_time):
+    """
+    Feature: database-performance, Property 60: Timestamps written in UTC
+
+    Property: In a non-UTC local time zone, the timestamps the app writes
+    (interview start, answer start, proctor event) and
+    CURRENT_TIMESTAMP defaults all mirror the current instant in their
+    epoch-millisecond columns.
+    """
+    from fastapi.testclient import TestClient
+    import main
+
+    try:
+        client = TestClient(main.app)
+        before = time.time() * 1000
+        interview_id = client.post("/api/interviews", json={
+            "candidate_name": "Zone", "candidate_email": "zone@example.com"}).json()["interview_id"]
+        conn = get_db_connection()
+        conn.execute("INSERT INTO question (interview_id, seq, text) VALUES (?, 1, 'Q')", (interview_id,))
+        conn.commit()
+        assert client.post(f"/api/interviews/{interview_id}/transcript", json={
+            "text": "hello", "is_final": True, "timestamp": datetime.now(timezone.utc).isoformat()}).status_code == 200
+        assert client.post(f"/api/interviews/{interview_id}/proctor/event", json={
+            "event_type": "gaze", "confidence": 0.5}).status_code == 200
+        main.write_buffer.flush()
+        after = time.time() * 1000
+
+        stamps = conn.execute('''
+            SELECT i.started_ms, a.start_ms, p.timestamp_ms, t.timestamp_ms,
+                   CAST(strftime('%s', 'now') AS INTEGER) * 1000
+            FROM interview i
+            JOIN answer a ON a.interview_id = i.id
+            JOIN proctor_event p ON p.interview_id = i.id
+            JOIN transcript_chunk t ON t.answer_id = a.id
+            WHERE i.id = ?
+        ''', (interview_id,)).fetchone()
+        assert all(before - 1000 <= stamp <= after + 1000 for stamp in stamps), (before, tuple(stamps), after)
+        conn.close()
+    finally:
+        database.shutdown_executor()
@@ -0,0 +1,219 @@
+"""
+Property-based tests for streaming bulk exports
+Feature: database-performance
+"""
+
+import pytest
+import asyncio
+import csv
+import io
+import json
+import os
+import sys
+from fastapi import HTTPException
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import exports
+from database import get_db_connection
+
+# Test database path
+TEST_DB_PATH = "test_exports.db"
+
+
+@pytest.fixture(scope="module")
+def main_module():
+    """Import the app against a throwaway database with two jobs"""
+    original_db_path = database.DB_PATH
+    database.DB_PATH = TEST_DB_PATH
+    database.close_all_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+    database.init_db()
+    conn = get_db_connection()
+    conn.executemany(
+        "INSERT INTO jobs (id, title, location, job_type, experience_required, description) VALUES (?, ?, 'X', 'Full-time', '1', 'd')",
+        [(1, "Sales"), (2, "Support")]
+    )
+    conn.commit()
+    conn.close()
+
+    import main
+
+    yield main
+
+    database.shutdown_executor()
+    database.close_all_connections()
+    database.DB_PATH = original_db_path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+
+day = st.integers(1, 9).map(lambda d: f"2025-03-0{d}")
+people = st.lists(
+    st.tuples(day, st.lists(st.tuples(st.sampled_from([1, 2]), day, st.booleans(), day), max_size=3)),
+    max_size=12,
+)
+
+
+def load(conn, candidates):
+    for table in ("interview", "applications", "candidates"):
+        conn.execute(f"DELETE FROM {table}")
+    for n, (created, applications) in enumerate(candidates):
+        candidate_id = conn.execute(
+            "INSERT INTO candidates (name, email, resume_path, created_at, skills) VALUES (?, ?, 'r', ?, ?)",
+            (f"Name, {n} \"q\"", f"e{n}@example.com", f"{created} 10:00:00", '["python"]')
+        ).lastrowid
+        for job_id, applied, interviewed, started in applications:
+            application_id = conn.execute(
+                "INSERT INTO applications (candidate_id, job_id, match_score, applied_at) VALUES (?, ?, 61.5, ?)",
+                (candidate_id, job_id, f"{applied} 09:30:00")
+            ).lastrowid
+            if interviewed:
+                conn.execute("INSERT INTO interview (application_id, status, started_at) VALUES (?, 'completed', ?)",
+                             (application_id, f"{started} 11:00:00.123456"))
+    conn.commit()
+
+
+def expected_ids(conn, entity, job_id, start, end):
+    """Matching ids, filtered in Python from unfiltered reads"""
+    if entity == "candidates":
+        rows = [(r['id'], r['created_at'], {a['job_id'] for a in conn.execute(
+            "SELECT job_id FROM applications WHERE candidate_id = ?", (r['id'],))})
+            for r in conn.execute("SELECT id, created_at FROM candidates")]
+    elif entity == "applications":
+        rows = [(r['id'], r['applied_at'], {r['job_id']}) for r in conn.execute("SELECT * FROM applications")]
+    else:
+        rows = [(r['id'], r['started_at'], {r['job_id']}) for r in conn.execute(
+            "SELECT i.id, i.started_at, a.job_id FROM interview i LEFT JOIN applications a ON a.id = i.application_id")]
+    return sorted(
+        row_id for row_id, ts, jobs in rows
+        if (job_id is None or job_id in jobs)
+        and (start is None or ts[:10] >= start) and (end is None or ts[:10] <= end)
+    )
+
+
+def parse(fmt, body: bytes):
+    text = body.decode("utf-8")
+    if fmt == "ndjson":
+        return [json.loads(line) for line in text.splitlines()]
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+@settings(max_examples=40, deadline=None)
+@given(
+    candidates=people,
+    job_id=st.sampled_from([None, 1, 2]),
+    start=st.none() | day,
+    end=st.none() | day,
+    batch_size=st.integers(1, 5),
+)
+def test_exports_contain_exactly_the_filtered_rows(main_module, candidates, job_id, start, end, batch_size):
+    """
+    Feature: database-performance, Property 47: Export completeness
+
+    Property: For any data, job filter, date range and batch size, every
+    export format contains each matching row exactly once, in id order, with
+    the same values as the database, and nothing else.
+    """
+    if start and end and start > end:
+        start, end = end, start
+    conn = get_db_connection()
+    load(conn, candidates)
+    export_filter = exports.ExportFilter(job_id, start, end)
+
+    for entity, (_, _, _, _, columns) in exports.EXPORTS.items():
+        ids = expected_ids(conn, entity, job_id, start, end)
+        for fmt in ("ndjson", "csv"):
+            encoder = exports.encoder_for(entity, fmt)
+            body = b"".join(exports.export_chunks(conn, encoder, entity, export_filter, batch_size))
+            rows = parse(fmt, body)
+            assert [int(row['id']) for row in rows] == ids
+            assert all(list(row) == [name for name, _ in columns] for row in rows)
+        if ids:
+            exported = parse("ndjson", b"".join(exports.export_chunks(
+                conn, exports.encoder_for(entity, "ndjson"), entity, export_filter, batch_size)))
+            select, id_column = exports.EXPORTS[entity][:2]
+            stored = conn.execute(f"{select} WHERE {id_column} = ?", (ids[0],)).fetchone()
+            assert exported[0] == dict(stored)
+    conn.close()
+
+
+def test_route_streams_one_bounded_batch_at_a_time(main_module, monkeypatch):
+    """
+    Feature: database-performance, Property 48: Constant-memory streaming
+
+    Property: The export response reads one batch of at most
+    EXPORT_BATCH_SIZE rows per chunk it sends, only when the previous chunk
+    has been consumed, and bad exports are rejected before streaming starts.
+    """
+    conn = get_db_connection()
+    load(conn, [("2025-03-01", [(1, "2025-03-02", False, "2025-03-02")])] * 23)
+    conn.close()
+
+    fetched = []
+    original_fetch = exports.fetch_batch
+
+    def counting_fetch(conn, entity, export_filter, after_id=0, limit=exports.EXPORT_BATCH_SIZE):
+        batch = original_fetch(conn, entity, export_filter, after_id, limit)
+        fetched.append(len(batch))
+        return batch
+
+    monkeypatch.setattr(exports, "fetch_batch", counting_fetch)
+
+    async def consume():
+        stream = exports.stream_export(exports.encoder_for("applications", "csv"), "applications",
+                                       exports.ExportFilter(job_id=1), batch_size=5)
+        header = await stream.__anext__()
+        assert fetched == [] and header.startswith(b"id,candidate_id")
+        first = await stream.__anext__()
+        assert fetched == [5] and first.count(b"\n") == 5
+        rest = [chunk async for chunk in stream]
+        return first + b"".join(rest)
+
+    body = asyncio.run(consume())
+    assert fetched == [5, 5, 5, 5, 3, 0] and body.count(b"\n") == 23
+
+    response = asyncio.run(main_module.export_data("assessments", format="ndjson"))
+    assert response.media_type == "application/x-ndjson"
+    for kwargs in ({"entity": "resumes"}, {"entity": "candidates", "format": "xlsx"},
+                   {"entity": "candidates", "start": "2025-13-01"},
+                   {"entity": "candidates", "start": "2025-03-05", "end": "2025-03-01"}):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(main_module.export_data(**kwargs))
+        assert error.value.status_code == 400
+
+    monkeypatch.setattr(exports, "pyarrow", None)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(main_module.export_data("candidates", format="parquet"))
+    assert error.value.status_code == 400 and "pyarrow" in error.value.detail
+
+
+@settings(max_examples=15, deadline=None)
+@given(candidates=people, job_id=st.sampled_from([None, 1, 2]), batch_size=st.integers(1, 5))
+def test_parquet_export_reads_back(main_module, candidates, job_id, batch_size):
+    """
+    Feature: database-performance, Property 63: Parquet round trip
+
+    Property: A Parquet export written one row group per batch reads back
+    with pyarrow as the same rows, columns and values as the NDJSON export.
+    """
+    parquet = pytest.importorskip("pyarrow.parquet")
+    conn = get_db_connection()
+    load(conn, candidates)
+    export_filter = exports.ExportFilter(job_id)
+
+    for entity, (_, _, _, _, columns) in exports.EXPORTS.items():
+        body = b"".join(exports.export_chunks(
+            conn, exports.encoder_for(entity, "parquet"), entity, export_filter, batch_size))
+        table = parquet.read_table(io.BytesIO(body))
+        assert table.column_names == [name for name, _ in columns]
+        expected = parse("ndjson", b"".join(exports.export_chunks(
+            conn, exports.encoder_for(entity, "ndjson"), entity, export_filter, batch_size)))
+        assert table.to_pylist() == expected
+    conn.close()
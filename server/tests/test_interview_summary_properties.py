@@ -0,0 +1,139 @@
+"""
+Property-based tests for the trigger-maintained interview_summary table
+Feature: database-performance
+"""
+
+import pytest
+import os
+import sys
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from database import get_db_connection, init_db
+from maintenance import rebuild_interview_summaries
+
+# Test database path
+TEST_DB_PATH = "test_interview_summary.db"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_test_db():
+    """Create the schema once; each example clears the tables it uses"""
+    original_db_path = database.DB_PATH
+    database.DB_PATH = TEST_DB_PATH
+    database.close_all_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+    init_db()
+
+    yield
+
+    database.close_all_connections()
+    database.DB_PATH = original_db_path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+
+def reset(conn):
+    conn.execute("DELETE FROM answer")
+    conn.execute("DELETE FROM interview")
+    conn.commit()
+
+
+def expected_summaries(conn):
+    return {
+        row['id']: (row['answer_count'], round(row['score_sum'], 6), row['recording_count'])
+        for row in conn.execute('''
+            SELECT i.id,
+                   (SELECT COUNT(*) FROM answer WHERE interview_id = i.id) as answer_count,
+                   (SELECT COALESCE(SUM(score), 0) FROM answer WHERE interview_id = i.id) as score_sum,
+                   (SELECT COUNT(*) FROM answer WHERE interview_id = i.id AND recording_path IS NOT NULL) as recording_count
+            FROM interview i
+        ''')
+    }
+
+
+def stored_summaries(conn):
+    return {
+        row['interview_id']: (row['answer_count'], round(row['score_sum'], 6), row['recording_count'])
+        for row in conn.execute("SELECT * FROM interview_summary")
+    }
+
+
+answer_op = st.one_of(
+    st.tuples(st.just("insert"), st.integers(0, 2),
+              st.one_of(st.none(), st.floats(0, 5)), st.booleans()),
+    st.tuples(st.just("score"), st.integers(0, 20), st.one_of(st.none(), st.floats(0, 5))),
+    st.tuples(st.just("record"), st.integers(0, 20)),
+    st.tuples(st.just("move"), st.integers(0, 20), st.integers(0, 2)),
+    st.tuples(st.just("delete"), st.integers(0, 20)),
+)
+
+
+@settings(max_examples=50, deadline=None)
+@given(ops=st.lists(answer_op, max_size=30))
+def test_summary_matches_answers_after_any_writes(ops):
+    """
+    Feature: database-performance, Property 11: Summary consistency
+
+    Property: After any sequence of answer inserts, score/recording updates,
+    moves between interviews and deletes, interview_summary equals the
+    aggregates computed directly from the answer table.
+    """
+    conn = get_db_connection()
+    reset(conn)
+    interview_ids = [
+        conn.execute("INSERT INTO interview (candidate_name) VALUES (?)", (f"c{i}",)).lastrowid
+        for i in range(3)
+    ]
+    conn.commit()
+
+    for n, op in enumerate(ops):
+        answer_ids = [row[0] for row in conn.execute("SELECT id FROM answer ORDER BY id")]
+        if op[0] == "insert":
+            _, target, score, recorded = op
+            conn.execute(
+                "INSERT INTO answer (interview_id, score, recording_path) VALUES (?, ?, ?)",
+                (interview_ids[target], score, "data/media/x.webm" if recorded else None)
+            )
+        elif answer_ids:
+            answer_id = answer_ids[op[1] % len(answer_ids)]
+            if op[0] == "score":
+                conn.execute("UPDATE answer SET score = ? WHERE id = ?", (op[2], answer_id))
+            elif op[0] == "record":
+                conn.execute("UPDATE answer SET recording_path = 'data/media/y.webm' WHERE id = ?", (answer_id,))
+            elif op[0] == "move":
+                conn.execute("UPDATE answer SET interview_id = ? WHERE id = ?", (interview_ids[op[2]], answer_id))
+            elif op[0] == "delete":
+                conn.execute("DELETE FROM answer WHERE id = ?", (answer_id,))
+    conn.commit()
+
+    assert stored_summaries(conn) == expected_summaries(conn)
+    conn.close()
+
+
+def test_rebuild_repairs_drift():
+    """
+    Feature: database-performance, Property 12: Drift reconciliation
+
+    Property: rebuild_interview_summaries restores correct aggregates after the
+    summary table has been corrupted, and reports nothing to fix afterwards.
+    """
+    conn = get_db_connection()
+    reset(conn)
+    interview_id = conn.execute("INSERT INTO interview (candidate_name) VALUES ('drift')").lastrowid
+    conn.execute("INSERT INTO answer (interview_id, score) VALUES (?, 4.0)", (interview_id,))
+    conn.execute("UPDATE interview_summary SET answer_count = 7, score_sum = 99 WHERE interview_id = ?", (interview_id,))
+    conn.execute("INSERT INTO interview_summary (interview_id) VALUES (999999)")
+    conn.commit()
+
+    assert rebuild_interview_summaries(conn) == 2
+    assert stored_summaries(conn) == expected_summaries(conn)
+    assert rebuild_interview_summaries(conn) == 0
+    conn.close()
@@ -0,0 +1,143 @@
+"""
+Property-based tests for the batched interview loaders
+Feature: database-performance
+"""
+
+import pytest
+import asyncio
+import os
+import sys
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import loaders
+from database import get_db_connection
+
+# Test database path
+TEST_DB_PATH = "test_loaders.db"
+
+
+@pytest.fixture(scope="module")
+def main_module():
+    """Import the app against a throwaway database"""
+    original_db_path = database.DB_PATH
+    database.DB_PATH = TEST_DB_PATH
+    database.close_all_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+    database.init_db()
+
+    import main
+
+    yield main
+
+    database.shutdown_executor()
+    database.close_all_connections()
+    database.DB_PATH = original_db_path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+
+def add_interview(conn, questions):
+    """questions: per question, a list of (text, is_final) chunks, or None for no answer"""
+    interview_id = conn.execute("INSERT INTO interview (candidate_name) VALUES ('L')").lastrowid
+    for seq, chunks in enumerate(questions):
+        question_id = conn.execute(
+            "INSERT INTO question (interview_id, seq, text) VALUES (?, ?, ?)", (interview_id, seq, f"Q{seq}")
+        ).lastrowid
+        if chunks is None:
+            continue
+        answer_id = conn.execute(
+            "INSERT INTO answer (question_id, interview_id) VALUES (?, ?)", (question_id, interview_id)
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO transcript_chunk (answer_id, timestamp, text, is_final) VALUES (?, ?, ?, ?)",
+            [(answer_id, i, text, final) for i, (text, final) in enumerate(chunks)]
+        )
+        conn.execute(
+            "INSERT INTO proctor_event (interview_id, event_type, timestamp) VALUES (?, 'tab_switch', ?)",
+            (interview_id, seq)
+        )
+    return interview_id
+
+
+chunks = st.one_of(st.none(), st.lists(st.tuples(st.text(max_size=8), st.booleans()), max_size=4))
+
+
+@settings(max_examples=40, deadline=None)
+@given(interviews=st.lists(st.lists(chunks, max_size=4), min_size=1, max_size=4))
+def test_batched_loaders_match_per_row_queries(main_module, interviews):
+    """
+    Feature: database-performance, Property 31: Loader equivalence
+
+    Property: For any set of interviews, the batched loaders return exactly
+    what the former per-question and per-answer queries returned.
+    """
+    conn = get_db_connection()
+    ids = [add_interview(conn, questions) for questions in interviews]
+    conn.commit()
+
+    answers = loaders.answers_by_question(conn, ids)
+    transcripts = loaders.transcripts_by_answer(conn, ids)
+    final_texts = loaders.final_answer_texts(conn, ids)
+    events = loaders.proctor_events_by_interview(conn, ids)
+
+    for interview_id in ids:
+        for question in conn.execute("SELECT id FROM question WHERE interview_id = ?", (interview_id,)).fetchall():
+            answer = conn.execute("SELECT * FROM answer WHERE question_id = ?", (question['id'],)).fetchone()
+            assert answers.get(question['id']) == (dict(answer) if answer else None)
+            if not answer:
+                continue
+            rows = conn.execute(
+                "SELECT timestamp, text, is_final FROM transcript_chunk WHERE answer_id = ? ORDER BY timestamp",
+                (answer['id'],)
+            ).fetchall()
+            assert transcripts.get(answer['id'], []) == [dict(r) for r in rows]
+            assert final_texts.get(answer['id'], '') == ' '.join(r['text'] for r in rows if r['is_final'])
+        expected_events = conn.execute(
+            "SELECT * FROM proctor_event WHERE interview_id = ? ORDER BY timestamp", (interview_id,)
+        ).fetchall()
+        assert events.get(interview_id, []) == [dict(e) for e in expected_events]
+    conn.close()
+
+
+def count_queries(coroutine):
+    """Statements the database executor runs while awaiting coroutine"""
+    statements = []
+    original_open = database.pool.open
+
+    def traced_open(path, query_only=False):
+        conn = original_open(path, query_only)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    database.close_all_connections()
+    database.pool.open = traced_open
+    try:
+        asyncio.run(coroutine)
+    finally:
+        database.pool.open = original_open
+        database.close_all_connections()
+    return len(statements)
+
+
+def test_report_query_count_is_independent_of_question_count(main_module):
+    """
+    Feature: database-performance, Property 32: Constant query count
+
+    Property: Opening an assessment report or an interview costs the same
+    number of queries with one question as with twenty.
+    """
+    conn = get_db_connection()
+    small = add_interview(conn, [[("only", True)]])
+    large = add_interview(conn, [[("word", True), ("more", False)] for _ in range(20)])
+    conn.commit()
+    conn.close()
+
+    for route in (main_module.get_assessment_detail, main_module.get_interview):
+        assert count_queries(route(small)) == count_queries(route(large))
@@ -0,0 +1,156 @@
+"""
+Property-based tests for the versioned schema migration runner
+Feature: database-performance
+"""
+
+import pytest
+import sqlite3
+import os
+import sys
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import migrations
+from database import init_db
+
+# Test database path
+TEST_DB_PATH = "test_migrations.db"
+
+
+@pytest.fixture(scope="function", autouse=True)
+def setup_test_db():
+    """Start every test from an empty database file"""
+    original_db_path = database.DB_PATH
+    database.DB_PATH = TEST_DB_PATH
+    database.close_all_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+    yield
+
+    database.close_all_connections()
+    database.DB_PATH = original_db_path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+
+def test_fresh_database_reaches_latest_version():
+    """
+    Feature: database-performance, Property 7: Migrations reach the latest version
+
+    Property: init_db on an empty file applies every migration once and records it.
+    """
+    init_db()
+
+    conn = sqlite3.connect(TEST_DB_PATH)
+    versions = [row[0] for row in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+    assert versions == [m.version for m in migrations.MIGRATIONS]
+    assert migrations.column_exists(conn, "interview", "application_id")
+    conn.close()
+
+
+def test_current_schema_costs_one_query():
+    """
+    Feature: database-performance, Property 8: Cheap startup on a current schema
+
+    Property: Once the schema is current, init_db issues a single statement.
+    """
+    init_db()
+
+    statements = []
+    original_open = database.pool.open
+
+    def traced_open(path):
+        conn = original_open(path)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    database.pool.open = traced_open
+    try:
+        init_db()
+    finally:
+        database.pool.open = original_open
+
+    assert len(statements) == 1
+    assert "schema_version" in statements[0]
+
+
+def test_legacy_database_is_upgraded_in_place():
+    """
+    Feature: database-performance, Property 9: Upgrade of pre-migration databases
+
+    Property: A database created by the old init_db (no schema_version table, no
+    interview.application_id column) keeps its rows and gains the new column.
+    """
+    conn = sqlite3.connect(TEST_DB_PATH)
+    conn.execute('''
+        CREATE TABLE interview (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            candidate_name TEXT,
+            candidate_email TEXT,
+            started_at TIMESTAMP,
+            ended_at TIMESTAMP,
+            status TEXT DEFAULT 'in_progress',
+            total_score REAL,
+            notes TEXT
+        )
+    ''')
+    conn.execute("INSERT INTO interview (candidate_name) VALUES ('Legacy')")
+    conn.commit()
+    conn.close()
+
+    init_db()
+
+    conn = sqlite3.connect(TEST_DB_PATH)
+    assert migrations.column_exists(conn, "interview", "application_id")
+    assert conn.execute("SELECT candidate_name FROM interview").fetchone()[0] == 'Legacy'
+    conn.close()
+
+
+@settings(max_examples=20, deadline=None)
+@given(
+    row_count=st.integers(min_value=0, max_value=60),
+    batch_size=st.integers(min_value=1, max_value=25)
+)
+def test_backfill_runs_in_bounded_batches(row_count, batch_size):
+    """
+    Feature: database-performance, Property 10: Online batched backfill
+
+    Property: A backfill touches every row exactly once, never more than
+    batch_size rows per transaction, and is marked done afterwards.
+    """
+    batches = []
+
+    def create(conn):
+        conn.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, value INTEGER, doubled INTEGER)")
+        conn.executemany("INSERT INTO item (value) VALUES (?)", [(i,) for i in range(row_count)])
+
+    def backfill(conn, size):
+        ids = [row[0] for row in conn.execute(
+            "SELECT id FROM item WHERE doubled IS NULL ORDER BY id LIMIT ?", (size,)
+        )]
+        conn.executemany("UPDATE item SET doubled = value * 2 WHERE id = ?", [(i,) for i in ids])
+        batches.append(len(ids))
+        return len(ids)
+
+    test_migrations = [migrations.Migration(1, "items", create, backfill)]
+
+    conn = sqlite3.connect(":memory:")
+    migrations.apply_migrations(conn, test_migrations)
+    original_pause = migrations.BACKFILL_PAUSE_SECONDS
+    migrations.BACKFILL_PAUSE_SECONDS = 0
+    try:
+        processed = migrations.run_backfills(conn, test_migrations, batch_size=batch_size)
+    finally:
+        migrations.BACKFILL_PAUSE_SECONDS = original_pause
+
+    assert processed == row_count
+    assert all(b <= batch_size for b in batches)
+    assert conn.execute("SELECT COUNT(*) FROM item WHERE doubled != value * 2 OR doubled IS NULL").fetchone()[0] == 0
+    assert not migrations.needs_work(conn, test_migrations)
+    conn.close()
@@ -0,0 +1,180 @@
+"""
+Property-based tests for keyset (cursor) pagination of list endpoints
+Feature: database-performance
+"""
+
+import pytest
+import base64
+import json
+import asyncio
+import os
+import sys
+from fastapi.testclient import TestClient
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import migrations
+from database import get_db_connection
+from pagination import encode_cursor, decode_cursor
+
+# Test database path
+TEST_DB_PATH = "test_pagination.db"
+
+
+@pytest.fixture(scope="module")
+def main_module():
+    """Import the app against a throwaway database"""
+    original_db_path = database.DB_PATH
+    database.DB_PATH = TEST_DB_PATH
+    database.close_all_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+    database.init_db()
+
+    import main
+
+    yield main
+
+    database.shutdown_executor()
+    database.close_all_connections()
+    database.DB_PATH = original_db_path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+
+@settings(max_examples=100)
+@given(key=st.tuples(st.one_of(st.text(), st.floats(allow_nan=False), st.none()),
+                     st.integers(min_value=-2 ** 63, max_value=2 ** 63 - 1)))
+def test_cursor_round_trip(key):
+    """
+    Feature: database-performance, Property 17: Opaque cursor round trip
+
+    Property: Any (sort value, id) key survives encode/decode unchanged.
+    """
+    assert decode_cursor(encode_cursor(*key), 2) == list(key)
+
+
+# Few distinct timestamps so ties on the first sort column are common
+timestamps = st.sampled_from(["2025-01-01 10:00:00", "2025-01-02 10:00:00", "2025-01-03 10:00:00"])
+# Interview start times as the app has written them: CURRENT_TIMESTAMP-style UTC and
+# datetime.now(timezone.utc) with its offset; the +05:30 value is the instant before it
+started = st.sampled_from(["2025-01-01 10:00:00", "2025-01-02 10:00:00+00:00", "2025-01-02 15:29:00+05:30",
+                           "2025-01-03T10:00:00.500000+00:00"])
+
+
+@settings(max_examples=25, deadline=None)
+@given(created=st.lists(st.tuples(timestamps, started), max_size=25), limit=st.integers(min_value=1, max_value=7))
+def test_cursor_walk_visits_every_row_once(main_module, created, limit):
+    """
+    Feature: database-performance, Property 18: Keyset walk completeness
+
+    Property: Following next_cursor from the first page returns every candidate
+    and every assessment exactly once, newest first, even with tied timestamps;
+    assessments are ordered by instant whatever format their start was written in.
+    """
+    conn = get_db_connection()
+    conn.execute("DELETE FROM candidates")
+    conn.execute("DELETE FROM interview")
+    for n, (ts, start) in enumerate(created):
+        conn.execute(
+            "INSERT INTO candidates (name, email, resume_path, created_at) VALUES (?, ?, 'x.pdf', ?)",
+            (f"c{n}", f"c{n}@example.com", ts)
+        )
+        conn.execute("INSERT INTO interview (candidate_name, started_at) VALUES (?, ?)", (f"c{n}", start))
+    conn.commit()
+    expected_candidates = [row[0] for row in conn.execute("SELECT id FROM candidates ORDER BY created_at DESC, id DESC")]
+    expected_interviews = [row[0] for row in conn.execute("SELECT id FROM interview ORDER BY started_ms DESC, id DESC")]
+    conn.close()
+
+    async def walk(route):
+        seen, cursor = [], None
+        while True:
+            page = await route(limit=limit, cursor=cursor)
+            seen += [item['id'] for item in page['items']]
+            cursor = page['next_cursor']
+            if cursor is None:
+                return seen
+
+    assert asyncio.run(walk(main_module.get_candidates)) == expected_candidates
+    assert asyncio.run(walk(main_module.get_assessments)) == expected_interviews
+
+
+def test_walk_pages_past_interviews_without_a_start(main_module):
+    """
+    Feature: database-performance, Property 68: Interviews without a start time
+
+    Property: After the migration 18 backfill no interview has a NULL
+    started_ms, so a keyset walk of /api/assessments reaches the ones whose
+    start was missing or unparseable; interviews inserted without a start get
+    the current time.
+    """
+    conn = get_db_connection()
+    conn.execute("DELETE FROM interview")
+    ids = {}
+    for start in ["2025-01-02 10:00:00", None, "2025-01-01 10:00:00", "not a date", "2025-01-03 10:00:00"]:
+        ids[start] = conn.execute("INSERT INTO interview (candidate_name, ended_at) VALUES ('c', '2025-01-04 10:00:00')").lastrowid
+        # Rows written before the migration kept whatever start they had
+        conn.execute("UPDATE interview SET started_at = ? WHERE id = ?", (start, ids[start]))
+    conn.execute("UPDATE interview SET ended_at = NULL WHERE id = ?", (ids["not a date"],))
+    conn.execute("UPDATE schema_version SET backfill_pending = 1 WHERE version = 18")
+    conn.commit()
+    migrations.run_backfills(conn)
+    assert conn.execute("SELECT COUNT(*) FROM interview WHERE started_ms IS NULL").fetchone()[0] == 0
+    expected = [row[0] for row in conn.execute("SELECT id FROM interview ORDER BY started_ms DESC, id DESC")]
+    conn.close()
+
+    seen, cursor = [], None
+    while True:
+        page = asyncio.run(main_module.get_assessments(limit=2, cursor=cursor))
+        seen += [item['id'] for item in page['items']]
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    # The NULL start took its end time and lists first; the one with nothing usable lists last
+    assert seen == expected and len(seen) == 5
+    assert seen[0] == ids[None] and seen[-1] == ids["not a date"]
+
+    conn = get_db_connection()
+    new_id = conn.execute("INSERT INTO interview (candidate_name) VALUES ('c')").lastrowid
+    conn.commit()
+    assert conn.execute("SELECT started_ms FROM interview WHERE id = ?", (new_id,)).fetchone()[0] is not None
+    conn.execute("DELETE FROM interview")
+    conn.commit()
+    conn.close()
+
+
+def raw_cursor(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).rstrip(b"=").decode()
+
+
+@settings(max_examples=40, deadline=None)
+@given(cursor=st.one_of(
+    st.sampled_from([
+        "%%%", "not-a-cursor", raw_cursor("{}"), raw_cursor('"x"'), raw_cursor("[1]"), raw_cursor("[1, 2, 3]"),
+        raw_cursor('[[1], 2]'), raw_cursor('[{"a": 1}, 2]'), raw_cursor(f"[1, {2 ** 64}]"),
+        raw_cursor("[" * 5000 + "]" * 5000),
+    ]),
+    st.tuples(st.one_of(st.lists(st.integers()), st.dictionaries(st.text(), st.integers())), st.integers())
+      .map(lambda key: raw_cursor(json.dumps(list(key)))),
+    st.text().map(raw_cursor),
+))
+def test_malformed_cursor_is_rejected(main_module, cursor):
+    """
+    Feature: database-performance, Property 61: Malformed cursors
+
+    Property: A cursor that is not a list of the expected number of strings,
+    64-bit integers, floats or nulls gets 400 "Invalid cursor" from every
+    keyset-paginated route, never a server error.
+    """
+    client = TestClient(main_module.app)
+    for route in ("/api/candidates", "/api/assessments", "/api/dashboard/interviews"):
+        response = client.get(route, params={"cursor": cursor})
+        if response.status_code != 200:
+            assert response.status_code == 400 and response.json() == {"detail": "Invalid cursor"}
+        else:
+            assert not cursor or len(decode_cursor(cursor, 2)) == 2
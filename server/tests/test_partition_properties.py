@@ -0,0 +1,278 @@
+"""
+Property-based tests for month-partitioned interview data
+Feature: database-performance
+"""
+
+import pytest
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import zlib
+from datetime import date, datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import archive
+import database
+import maintenance
+import reports
+import textcodec
+from database import get_db_connection, init_db
+
+# Test database path
+TEST_DB_PATH = "test_partitions.db"
+TEST_PARTITION_DIR = "test_partitions"
+TEST_BACKUP_DIR = "test_partitions_backup"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_test_db():
+    """Throwaway database and partition directory"""
+    original_db_path, original_dir = database.DB_PATH, database.PARTITION_DIR
+    database.DB_PATH = TEST_DB_PATH
+    database.PARTITION_DIR = TEST_PARTITION_DIR
+    database.close_all_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+    for directory in (TEST_PARTITION_DIR, TEST_BACKUP_DIR):
+        shutil.rmtree(directory, ignore_errors=True)
+    init_db()
+
+    yield
+
+    database.close_all_connections()
+    database.DB_PATH, database.PARTITION_DIR = original_db_path, original_dir
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+    for directory in (TEST_PARTITION_DIR, TEST_BACKUP_DIR):
+        for root, dirs, files in os.walk(directory):
+            for name in files:
+                os.chmod(os.path.join(root, name), 0o644)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def add_interview(conn, ended: datetime, rng: random.Random) -> int:
+    interview_id = conn.execute(
+        "INSERT INTO interview (candidate_name, started_at, ended_at, status) VALUES ('Old', ?, ?, 'completed')",
+        (ended - timedelta(hours=1), ended)
+    ).lastrowid
+    for seq in range(rng.randint(1, 3)):
+        question_id = conn.execute(
+            "INSERT INTO question (interview_id, seq, text) VALUES (?, ?, ?)", (interview_id, seq, f"Q{seq}")
+        ).lastrowid
+        answer_id = conn.execute(
+            "INSERT INTO answer (question_id, interview_id, score) VALUES (?, ?, 3)", (question_id, interview_id)
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO transcript_chunk (answer_id, timestamp, text, is_final) VALUES (?, ?, ?, ?)",
+            [(answer_id, ended - timedelta(minutes=50 - i), f"word{rng.randint(0, 99)}", rng.random() < 0.5)
+             for i in range(rng.randint(0, 4))]
+        )
+    conn.executemany(
+        "INSERT INTO proctor_event (interview_id, event_type, confidence, frame_path, notes, timestamp) VALUES (?, ?, 0.9, ?, 'n', ?)",
+        [(interview_id, rng.choice(["gaze", "multiple_faces"]), f"data/frames/{interview_id}_{i}.jpg",
+          ended - timedelta(minutes=40 - i)) for i in range(rng.randint(0, 3))]
+    )
+    return interview_id
+
+
+def report(conn, interview_id):
+    return reports.build_report(interview_id, *reports.load_report_rows(conn, interview_id))
+
+
+def test_reports_read_the_same_across_partitions():
+    """
+    Feature: database-performance, Property 55: Partition routing
+
+    Property: After old interviews move to month partitions, spanning more
+    months than one connection can attach, every report reads the same
+    through one pooled connection, the hot tables no longer hold their rows,
+    and cross-partition counts over the UNION views equal the counts taken
+    before archiving.
+    """
+    rng = random.Random(55)
+    conn = get_db_connection()
+    limit = database.max_partitions(conn)
+    now = datetime.now()
+    interview_ids = [add_interview(conn, now - timedelta(days=200 + 31 * n, hours=rng.randint(0, 48)), rng)
+                     for n in range(limit + 3) for _ in range(2)]
+    conn.commit()
+    first, last = (now - timedelta(days=200 + 31 * (limit + 4))).date(), now.date()
+    before = {interview_id: report(conn, interview_id) for interview_id in interview_ids}
+    counts = archive.proctor_event_counts(conn, first, last)
+    assert sum(row["events"] for row in counts) > 0
+    chunks = conn.execute("SELECT COUNT(*) FROM transcript_chunk").fetchone()[0]
+
+    archived, _ = archive.archive_interviews(conn, older_than_days=180, batch_size=7)
+    assert archived == len(interview_ids)
+    assert len(database.partition_months()) > limit
+    assert conn.execute("SELECT COUNT(*) FROM proctor_event").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM transcript_chunk").fetchone()[0] == 0
+
+    for _ in range(2):
+        for interview_id in rng.sample(interview_ids, len(interview_ids)):
+            assert report(conn, interview_id) == before[interview_id]
+        assert len(conn.partitions) <= limit
+    assert archive.proctor_event_counts(conn, first, last) == counts
+    months = database.partition_months()
+    archived_chunks = 0
+    for start in range(0, len(months), limit):
+        database.partition_views(conn, months[start:start + limit], include_main=False)
+        archived_chunks += conn.execute("SELECT COUNT(*) FROM all_transcript_chunk").fetchone()[0]
+    assert archived_chunks == chunks
+    conn.close()
+
+
+def test_sealed_partitions_are_read_only_and_backed_up_once():
+    """
+    Feature: database-performance, Property 56: Sealed partitions
+
+    Property: A month is sealed only once nothing in it is left to archive;
+    a sealed partition is a single read-only file that reads still reach,
+    that deleting an assessment can still remove rows from, and that a
+    second backup skips. Archive files from before partitions read the same
+    before and after their conversion.
+    """
+    rng = random.Random(56)
+    conn = get_db_connection()
+    ended = datetime(date.today().year - 4, 3, 10, 12, 0)
+    month = ended.strftime('%Y-%m')
+    first = add_interview(conn, ended, rng)
+    conn.commit()
+    archive.archive_interviews(conn, older_than_days=180)
+
+    # Completed but not archived yet: the month stays open
+    second = add_interview(conn, ended + timedelta(days=1), rng)
+    conn.commit()
+    assert month not in archive.seal_partitions(conn, older_than_days=180)
+    archive.archive_interviews(conn, older_than_days=180)
+    sealed = archive.seal_partitions(conn, older_than_days=180)
+    assert month in sealed and archive.is_sealed(month)
+    path = database.partition_path(month)
+    assert not os.path.exists(path + "-wal") and not os.path.exists(path + "-shm")
+    assert os.stat(path).st_mode & 0o777 == archive.SEALED_MODE
+
+    expected = report(conn, second)
+    schema = database.attach_partition(conn, month)
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute(f"DELETE FROM {schema}.proctor_event")
+    conn.rollback()
+
+    frames = {e["framePath"] for e in report(conn, first)["proctoring"]}
+    assert set(archive.delete_archived(conn, first, month)) == frames
+    assert archive.load_archived(conn, first, month) == ([], {})
+    assert report(conn, second) == expected
+    assert archive.is_sealed(month) and os.stat(path).st_mode & 0o777 == archive.SEALED_MODE
+
+    copied, skipped = maintenance.backup(conn, TEST_BACKUP_DIR)
+    assert copied == 1 + len(database.partition_months()) and skipped == 0
+    copied, skipped = maintenance.backup(conn, TEST_BACKUP_DIR)
+    assert skipped == sum(archive.is_sealed(m) for m in database.partition_months()) and skipped > 0
+    backup = sqlite3.connect(os.path.join(TEST_BACKUP_DIR, os.path.basename(database.DB_PATH)))
+    assert backup.execute("SELECT COUNT(*) FROM interview WHERE id = ?", (second,)).fetchone()[0] == 1
+    backup.close()
+
+    # An archive file in the old format: one compressed document per interview
+    legacy_month = f"{date.today().year - 5}-01"
+    legacy = add_interview(conn, datetime(date.today().year - 5, 1, 15, 12, 0), rng)
+    conn.commit()
+    expected = report(conn, legacy)
+    transcripts = [dict(row) for row in conn.execute('''
+        SELECT t.answer_id, t.timestamp, t.text, t.is_final FROM answer a JOIN transcript_chunk t ON t.answer_id = a.id
+        WHERE a.interview_id = ? ORDER BY t.answer_id, t.timestamp_ms''', (legacy,))]
+    events = [dict(row) for row in conn.execute("SELECT * FROM proctor_event WHERE interview_id = ?", (legacy,))]
+    old = sqlite3.connect(database.partition_path(legacy_month))
+    old.execute("CREATE TABLE archived_interview (interview_id INTEGER PRIMARY KEY, payload BLOB NOT NULL, archived_at TIMESTAMP NOT NULL)")
+    old.execute("INSERT INTO archived_interview VALUES (?, ?, ?)", (
+        legacy, zlib.compress(json.dumps({"transcripts": transcripts, "proctor_events": events}).encode()), "x"))
+    old.commit()
+    old.close()
+    conn.execute("UPDATE interview SET archive_month = ? WHERE id = ?", (legacy_month, legacy))
+    conn.execute("DELETE FROM proctor_event WHERE interview_id = ?", (legacy,))
+    conn.execute("DELETE FROM transcript_chunk WHERE answer_id IN (SELECT id FROM answer WHERE interview_id = ?)", (legacy,))
+    conn.commit()
+
+    assert report(conn, legacy) == expected
+    assert archive.upgrade_partitions(conn) == 1
+    assert report(conn, legacy) == expected
+    assert {e["framePath"] for e in expected["proctoring"]} <= archive.archived_frame_paths(conn)
+    conn.close()
+
+
+class Py39Connection(database.PooledConnection):
+    """A pooled connection as on Python < 3.11, which has no Connection.getlimit"""
+
+    @property
+    def getlimit(self):
+        raise AttributeError("getlimit")
+
+
+def test_routing_without_getlimit(monkeypatch):
+    """
+    Feature: database-performance, Property 57: Partition routing on Python < 3.11
+
+    Property: Without Connection.getlimit the routing layer falls back to
+    MAX_ATTACHED_PARTITIONS: reports and cross-partition counts spanning
+    more months than that read the same as before archiving, with no more
+    partitions attached than the setting allows.
+    """
+    monkeypatch.setattr(database, "MAX_ATTACHED_PARTITIONS", 3)
+    rng = random.Random(57)
+    conn = sqlite3.connect(TEST_DB_PATH, factory=Py39Connection, uri=True, check_same_thread=False)
+    textcodec.register(conn)
+    assert not hasattr(conn, "getlimit") and database.max_partitions(conn) == 3
+
+    start = datetime(date.today().year - 8, 1, 10, 12, 0)
+    interview_ids = [add_interview(conn, start + timedelta(days=31 * n), rng) for n in range(5)]
+    conn.commit()
+    first, last = start.date(), (start + timedelta(days=31 * 6)).date()
+    before = {interview_id: report(conn, interview_id) for interview_id in interview_ids}
+    counts = archive.proctor_event_counts(conn, first, last)
+
+    archive.archive_interviews(conn, older_than_days=180)
+    for interview_id in interview_ids:
+        assert report(conn, interview_id) == before[interview_id]
+        assert len(conn.partitions) <= 3
+    assert archive.proctor_event_counts(conn, first, last) == counts
+    assert archive.archived_frame_paths(conn) >= {e["framePath"] for r in before.values() for e in r["proctoring"]}
+    conn.dispose()
+
+
+def test_archived_transcripts_stay_compressed():
+    """
+    Feature: database-performance, Property 59: Compressed partitions
+
+    Property: An archived answer's transcript chunks are stored as one packed
+    value that takes a fraction of the chunk text, and read back unchanged.
+    """
+    conn = get_db_connection()
+    ended = datetime(date.today().year - 9, 6, 10, 12, 0)
+    interview_id = add_interview(conn, ended, random.Random(59))
+    answer_id = conn.execute("SELECT MIN(id) FROM answer WHERE interview_id = ?", (interview_id,)).fetchone()[0]
+    words = "I led the regional sales team and grew the pipeline every quarter".split() * 4
+    conn.executemany(
+        "INSERT INTO transcript_chunk (answer_id, timestamp, text, is_final) VALUES (?, ?, ?, ?)",
+        [(answer_id, ended - timedelta(minutes=30, seconds=-n), " ".join(words[:n]), n == len(words))
+         for n in range(1, len(words) + 1)]
+    )
+    conn.commit()
+    expected = report(conn, interview_id)
+    raw = conn.execute("SELECT SUM(LENGTH(text)) FROM transcript_chunk WHERE answer_id = ?", (answer_id,)).fetchone()[0]
+
+    archive.archive_interviews(conn, older_than_days=180)
+    schema = database.attach_partition(conn, ended.strftime('%Y-%m'))
+    # A cursor without the row factory sees the stored value
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    stored = cursor.execute(
+        f"SELECT chunks FROM {schema}.transcript_answer WHERE answer_id = ?", (answer_id,)
+    ).fetchone()[0]
+    assert textcodec.is_packed(stored) and len(stored) * 5 < raw
+    assert report(conn, interview_id) == expected
+    conn.close()
@@ -0,0 +1,181 @@
+"""
+Property-based tests for the stored pipeline status and SQL-side status filters
+Feature: database-performance
+"""
+
+import pytest
+import asyncio
+import os
+import sys
+from fastapi import HTTPException
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from database import get_db_connection
+from maintenance import reconcile_pipeline_status
+
+# Test database path
+TEST_DB_PATH = "test_pipeline_status.db"
+
+
+@pytest.fixture(scope="module")
+def main_module():
+    """Import the app against a throwaway database with one job"""
+    original_db_path = database.DB_PATH
+    database.DB_PATH = TEST_DB_PATH
+    database.close_all_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+    database.init_db()
+    conn = get_db_connection()
+    conn.execute(
+        "INSERT INTO jobs (id, title, location, job_type, experience_required, description) VALUES (1, 'Job', 'X', 'Full-time', '1', 'd')"
+    )
+    conn.commit()
+    conn.close()
+
+    import main
+
+    yield main
+
+    database.shutdown_executor()
+    database.close_all_connections()
+    database.DB_PATH = original_db_path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+
+def derived_status(application_status, interview_statuses):
+    """The per-row rule the list endpoints used to apply in Python"""
+    if 'completed' in interview_statuses:
+        return 'completed'
+    if any(s in ('in_progress', 'started') for s in interview_statuses):
+        return 'in_progress'
+    return {'qualified': 'passed', 'rejected': 'rejected'}.get(application_status, 'pending')
+
+
+def derived_assessment_status(interview_status):
+    """The per-row rule the assessment list used to apply in Python"""
+    if interview_status == 'completed':
+        return 'completed'
+    if interview_status in ('in_progress', 'started'):
+        return 'in_progress'
+    return 'passed'
+
+
+def pick(conn, table, i):
+    ids = [row[0] for row in conn.execute(f"SELECT id FROM {table} ORDER BY id")]
+    return ids[i % len(ids)] if ids else None
+
+
+index = st.integers(0, 20)
+application_status = st.sampled_from(['pending', 'qualified', 'rejected', 'interviewed'])
+interview_status = st.sampled_from(['in_progress', 'started', 'completed', 'cancelled', None])
+operation = st.one_of(
+    st.tuples(st.just("apply"), application_status),
+    st.tuples(st.just("set_application"), index, application_status),
+    st.tuples(st.just("interview"), index, interview_status, st.booleans()),
+    st.tuples(st.just("set_interview"), index, interview_status),
+    st.tuples(st.just("move_interview"), index, index),
+    st.tuples(st.just("delete_interview"), index),
+)
+
+
+@settings(max_examples=60, deadline=None)
+@given(ops=st.lists(operation, max_size=25))
+def test_stored_status_matches_derivation(main_module, ops):
+    """
+    Feature: database-performance, Property 39: Status maintenance
+
+    Property: After any sequence of application and interview state changes,
+    every stored pipeline_status equals the status the lists used to derive
+    per row, so reconciliation fixes nothing.
+    """
+    conn = get_db_connection()
+    for table in ("interview", "applications", "candidates"):
+        conn.execute(f"DELETE FROM {table}")
+    candidate_id = conn.execute(
+        "INSERT INTO candidates (name, email, resume_path) VALUES ('P', 'p@example.com', 'r')"
+    ).lastrowid
+
+    for op in ops:
+        kind = op[0]
+        if kind == "apply":
+            conn.execute(
+                "INSERT INTO applications (candidate_id, job_id, match_score, status) VALUES (?, 1, 50, ?)",
+                (candidate_id, op[1])
+            )
+        elif kind == "set_application" and (application_id := pick(conn, "applications", op[1])):
+            conn.execute("UPDATE applications SET status = ? WHERE id = ?", (op[2], application_id))
+        elif kind == "interview":
+            application_id = pick(conn, "applications", op[1]) if op[3] else None
+            conn.execute("INSERT INTO interview (status, application_id) VALUES (?, ?)", (op[2], application_id))
+        elif kind == "set_interview" and (interview_id := pick(conn, "interview", op[1])):
+            conn.execute("UPDATE interview SET status = ? WHERE id = ?", (op[2], interview_id))
+        elif kind == "move_interview" and (interview_id := pick(conn, "interview", op[1])):
+            conn.execute("UPDATE interview SET application_id = ? WHERE id = ?",
+                         (pick(conn, "applications", op[2]), interview_id))
+        elif kind == "delete_interview" and (interview_id := pick(conn, "interview", op[1])):
+            conn.execute("DELETE FROM interview WHERE id = ?", (interview_id,))
+    conn.commit()
+
+    for application in conn.execute("SELECT * FROM applications").fetchall():
+        interviews = [row[0] for row in conn.execute(
+            "SELECT status FROM interview WHERE application_id = ?", (application['id'],)
+        )]
+        assert application['pipeline_status'] == derived_status(application['status'], interviews)
+    for interview in conn.execute("SELECT status, pipeline_status FROM interview").fetchall():
+        assert interview['pipeline_status'] == derived_assessment_status(interview['status'])
+
+    assert reconcile_pipeline_status(conn) == 0
+    conn.close()
+
+
+def test_status_filters_and_counts_in_sql(main_module):
+    """
+    Feature: database-performance, Property 40: Filtered lists
+
+    Property: Filtering the candidate and assessment lists by status returns
+    only rows in that status, with totals counting exactly those rows, and
+    unknown statuses are rejected.
+    """
+    conn = get_db_connection()
+    for table in ("interview", "applications", "candidates"):
+        conn.execute(f"DELETE FROM {table}")
+    for n, (app_status, interview_state) in enumerate(
+        [('qualified', None), ('rejected', None), ('interviewed', 'in_progress'),
+         ('interviewed', 'completed'), ('interviewed', 'completed'), ('pending', None)]
+    ):
+        candidate_id = conn.execute(
+            "INSERT INTO candidates (name, email, resume_path, created_at) VALUES ('F', ?, 'r', ?)",
+            (f"f{n}@example.com", f"2025-01-0{n + 1}")
+        ).lastrowid
+        application_id = conn.execute(
+            "INSERT INTO applications (candidate_id, job_id, match_score, status) VALUES (?, 1, 50, ?)",
+            (candidate_id, app_status)
+        ).lastrowid
+        if interview_state:
+            conn.execute("INSERT INTO interview (status, application_id, started_at) VALUES (?, ?, ?)",
+                         (interview_state, application_id, f"2025-02-0{n + 1}"))
+    conn.commit()
+    conn.close()
+
+    expected = {'passed': 1, 'rejected': 1, 'in_progress': 1, 'completed': 2, 'pending': 1}
+    for status, count in expected.items():
+        result = asyncio.run(main_module.get_candidates(status=status, limit=1))
+        assert result['total'] == count
+        assert [item['status'] for item in result['items']] == [status]
+    for status, count in {'in_progress': 1, 'completed': 2, 'passed': 0}.items():
+        result = asyncio.run(main_module.get_assessments(status=status))
+        assert result['total'] == count == len(result['items'])
+        assert all(item['status'] == status for item in result['items'])
+
+    for route in (main_module.get_candidates, main_module.get_assessments):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(route(status="hired"))
+        assert error.value.status_code == 400
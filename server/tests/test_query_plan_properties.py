@@ -0,0 +1,283 @@
+"""
+Query plan regression tests for the SQL in main.py and the modules it reads through
+Feature: database-performance
+"""
+
+import pytest
+import ast
+import json
+import re
+import sqlite3
+import os
+import sys
+from fastapi.testclient import TestClient
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import search
+from database import get_db_connection, init_db
+from pagination import encode_cursor
+
+# Test database path
+TEST_DB_PATH = "test_query_plan.db"
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_PATH = os.path.join(SERVER_DIR, "main.py")
+# main.py and the modules its routes read through
+SQL_MODULES = ["main.py", "loaders.py", "reports.py", "sessions.py", "search.py", "rollups.py"]
+
+SQL_START = re.compile(r"\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\s", re.IGNORECASE)
+# "SCAN t" with no index is a full table scan; index, covering-index and FTS scans are fine
+FULL_SCAN = re.compile(r"^SCAN \w+$")
+
+# Statements allowed to scan or sort, keyed by a fragment of their SQL, with the reason
+ALLOWED = {
+    "ORDER BY m.rank, c.id":
+        "search results are ordered by bm25 rank, which no index provides; only the matching rows are sorted",
+    "c.sort_key, j.title as appliedRole":
+        "candidate list: one page (at most limit candidates) joined to its applications is re-sorted; status "
+        "and skill filters find their candidates through idx_application_pipeline and candidate_skill and "
+        "sort only those",
+    "GROUP BY candidate_id HAVING COUNT(*) = ?":
+        "all-skills filter counts matches among the candidate_skill rows of the requested skills",
+    "GROUP BY job_id ORDER BY applications DESC":
+        "per-job dashboard totals are grouped and ranked over the range's rollup rows, at most days x jobs",
+    "FROM all_proctor_event WHERE timestamp_ms >= ?":
+        "monthly proctoring counts: the range is read through the timestamp_ms indexes, grouped on the month",
+    "i.application_id IN (SELECT id FROM applications WHERE job_id = ?)":
+        "job-filtered assessment export: the job's interviews come through its applications, sorted per batch",
+}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_test_db():
+    """Fully migrated, empty database to plan against"""
+    original_db_path = database.DB_PATH
+    database.DB_PATH = TEST_DB_PATH
+    database.close_all_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+    init_db()
+
+    yield
+
+    if "main" in sys.modules:
+        database.shutdown_executor()
+    database.close_all_connections()
+    database.DB_PATH = original_db_path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+
+def static_sql_statements(path=MAIN_PATH):
+    """
+    Every complete SQL string literal in a module, as (line, sql).
+    Docstrings, f-string parts and prefixes that are extended with += at
+    runtime are dynamic; test_rendered_statements_are_indexed plans them as
+    the routes build them.
+    """
+    tree = ast.parse(open(path).read())
+    skipped = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Module)):
+            body = node.body
+            if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant):
+                skipped.add(id(body[0].value))
+        if isinstance(node, ast.JoinedStr):
+            skipped.update(id(part) for part in node.values)
+        if isinstance(node, ast.BinOp):
+            skipped.update((id(node.left), id(node.right)))
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            scope = list(ast.walk(node))
+            extended = {n.target.id for n in scope if isinstance(n, ast.AugAssign) and isinstance(n.target, ast.Name)}
+            for n in scope:
+                if isinstance(n, ast.AugAssign):
+                    skipped.add(id(n.value))
+                elif isinstance(n, ast.Assign) and any(getattr(t, "id", None) in extended for t in n.targets):
+                    skipped.add(id(n.value))
+
+    return [
+        (node.lineno, node.value)
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Constant) and isinstance(node.value, str)
+        and id(node) not in skipped and SQL_START.match(node.value)
+    ]
+
+
+def plan_problems(conn, sql, params=None):
+    """Full scans and temp B-tree sorts in the statement's query plan"""
+    if params is None:
+        params = [None] * sql.count("?")
+    plan = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    return [row[3] for row in plan if FULL_SCAN.match(row[3]) or "TEMP B-TREE" in row[3]]
+
+
+def unindexed(statements):
+    """(failure messages, ALLOWED fragments used) for [(where, sql, plan problems)]"""
+    failures, used = [], set()
+    for where, sql, problems in statements:
+        if not problems:
+            continue
+        allowed = [fragment for fragment in ALLOWED if fragment in " ".join(sql.split())]
+        if allowed:
+            used.update(allowed)
+            continue
+        failures.append(f"{where}: {problems}\n    {' '.join(sql.split())[:160]}")
+    return failures, used
+
+
+def module_statements(conn):
+    """Static statements of every module in SQL_MODULES, as (module:line, sql, plan problems)"""
+    return [
+        (f"{module}:{line}", sql, plan_problems(conn, sql))
+        for module in SQL_MODULES
+        for line, sql in static_sql_statements(os.path.join(SERVER_DIR, module))
+    ]
+
+
+def test_statements_are_found():
+    """
+    Feature: database-performance, Property 23: Statement discovery
+
+    Property: The extractor sees the hot statements of main.py, so a plan
+    regression cannot hide behind an empty statement list.
+    """
+    statements = " ".join(sql for _, sql in static_sql_statements())
+    assert len(static_sql_statements()) > 50
+    for fragment in ("FROM transcript_chunk", "FROM question WHERE interview_id", "INSERT INTO proctor_event"):
+        assert fragment in statements
+
+
+def test_no_full_scans_or_temp_sorts():
+    """
+    Feature: database-performance, Property 24: Indexed query plans
+
+    Property: Every static SQL statement in main.py, loaders.py, reports.py,
+    sessions.py, search.py and rollups.py is answered through an index
+    without a full table scan or a temp B-tree sort, unless allowlisted with
+    a reason.
+    """
+    conn = sqlite3.connect(TEST_DB_PATH)
+    failures, _ = unindexed(module_statements(conn))
+    conn.close()
+
+    assert not failures, "Unindexed queries:\n" + "\n".join(failures)
+
+
+def seed(conn):
+    """One of everything the list and report routes join, with ids for their URLs"""
+    job = conn.execute(
+        "INSERT INTO jobs (title, location, job_type, experience_required, description) VALUES ('Dev', 'X', 'Full-time', '1', 'd')"
+    ).lastrowid
+    candidate = conn.execute(
+        "INSERT INTO candidates (name, email, resume_path, resume_text, skills) "
+        "VALUES ('Plan Person', 'plan@example.com', 'r', 'Python and SQL', ?)", (json.dumps(["Python", "SQL"]),)
+    ).lastrowid
+    search.index_candidate(conn, candidate)
+    application = conn.execute(
+        "INSERT INTO applications (candidate_id, job_id, match_score) VALUES (?, ?, 70)", (candidate, job)
+    ).lastrowid
+    interviews = []
+    for status in ("completed", "in_progress"):
+        interview = conn.execute(
+            "INSERT INTO interview (candidate_name, candidate_email, application_id, status, started_at) "
+            "VALUES ('Plan Person', 'plan@example.com', ?, ?, '2025-03-01T10:00:00+00:00')", (application, status)
+        ).lastrowid
+        question = conn.execute("INSERT INTO question (interview_id, seq, text) VALUES (?, 1, 'Q')", (interview,)).lastrowid
+        if status == "completed":
+            answer = conn.execute("INSERT INTO answer (question_id, interview_id, score) VALUES (?, ?, 4)",
+                                  (question, interview)).lastrowid
+            conn.execute("INSERT INTO transcript_chunk (answer_id, timestamp, text, is_final) VALUES (?, '2025-03-01T10:01:00', 'hi', 1)",
+                         (answer,))
+            conn.execute("INSERT INTO proctor_event (interview_id, timestamp, event_type, confidence) VALUES (?, '2025-03-01T10:02:00', 'tab', 0.9)",
+                         (interview,))
+        interviews.append(interview)
+    conn.commit()
+    return job, candidate, application, interviews
+
+
+def route_requests(job, candidate, application, interviews):
+    """(method, path, query or body) for every route variant, filters and cursors included"""
+    completed, live = interviews
+    by_time = encode_cursor(1740823200000, completed)
+    candidate_requests = [
+        {}, {"page": 2}, {"cursor": encode_cursor("2025-03-01 10:00:00", candidate)},
+        {"search": "pyth"}, {"search": "pyth", "page": 2}, {"search": "pyth", "cursor": encode_cursor(-1.0, candidate)},
+        {"skills": "python,sql"}, {"skills": "python,sql", "skills_mode": "any"}, {"status": "completed"},
+        {"search": "plan", "skills": "sql", "status": "pending", "cursor": encode_cursor(-1.0, candidate)},
+    ]
+    requests = [
+        ("GET", "/api/jobs", {}), ("GET", "/api/jobs", {"active_only": "false"}), ("GET", f"/api/jobs/{job}", {}),
+        ("GET", f"/api/applications/{application}", {}), ("GET", f"/api/applications/{application}/match-result", {}),
+        ("GET", "/api/metrics/overview", {}),
+        ("GET", "/api/metrics/overview", {"range": "custom", "start": "2025-03-01", "end": "2025-03-31"}),
+        ("GET", "/api/metrics/proctoring", {}),
+        ("GET", f"/api/candidates/{candidate}", {}),
+        ("GET", f"/api/assessments/{completed}", {}), ("GET", f"/api/assessments/{live}", {}),
+        ("GET", f"/api/interviews/{completed}", {}),
+        ("GET", "/api/dashboard/interviews", {}), ("GET", "/api/dashboard/interviews", {"cursor": by_time}),
+        ("POST", f"/api/interviews/{live}/transcript", {"timestamp": "2025-03-01T10:05:00", "text": "t", "is_final": True}),
+    ]
+    requests += [("GET", "/api/candidates", params) for params in candidate_requests]
+    requests += [("GET", "/api/assessments", params) for params in (
+        {}, {"page": 2}, {"status": "completed"}, {"cursor": by_time}, {"status": "in_progress", "cursor": by_time},
+    )]
+    requests += [("GET", f"/api/exports/{entity}", params) for entity in ("candidates", "applications", "assessments")
+                 for params in ({}, {"job_id": job}, {"start": "2025-03-01", "end": "2025-03-31"},
+                                {"job_id": job, "start": "2025-03-01", "end": "2025-03-31"})]
+    return requests
+
+
+def test_rendered_statements_are_indexed(monkeypatch):
+    """
+    Feature: database-performance, Property 65: Rendered query plans
+
+    Property: The statements the routes actually run, with filters, search,
+    skills, status, cursors and paging rendered in, including those built in
+    f-strings or with += and those issued from loaders, reports and
+    sessions, are answered through indexes unless allowlisted with a reason;
+    allowlist entries that match no statement are reported too.
+    """
+    import main
+
+    conn = get_db_connection()
+    ids = seed(conn)
+    # Cached responses would skip their queries
+    main.live_sessions.clear()
+    main.response_cache.clear()
+
+    executed = {}
+    original_execute = database.RetryingCursor.execute
+
+    def recording_execute(self, sql, parameters=()):
+        key = " ".join(sql.split())
+        if SQL_START.match(sql) and key not in executed:
+            # Planned on the route's own connection, where its partitions and temp views exist
+            executed[key] = (current[0], sql, plan_problems(self.connection, sql, parameters))
+        return original_execute(self, sql, parameters)
+
+    monkeypatch.setattr(database.RetryingCursor, "execute", recording_execute)
+    client = TestClient(main.app)
+    current = [None]
+    for method, path, data in route_requests(*ids):
+        current[0] = f"{method} {path} {data}"
+        if method == "GET":
+            response = client.get(path, params=data)
+        else:
+            response = client.post(path, json=data)
+        assert response.status_code == 200, (current[0], response.text)
+    monkeypatch.undo()
+
+    rendered = list(executed.values())
+    assert any("candidates_fts MATCH" in sql for _, sql, _ in rendered)
+    assert any("(i.started_ms, i.id) <" in sql for _, sql, _ in rendered)
+    failures, used = unindexed(rendered)
+    _, static_used = unindexed(module_statements(conn))
+    conn.rollback()
+
+    assert not failures, "Unindexed queries:\n" + "\n".join(failures)
+    assert used | static_used == set(ALLOWED), f"Stale allowlist entries: {set(ALLOWED) - used - static_used}"
@@ -0,0 +1,117 @@
+"""
+Property-based tests for the read-only analytics replica
+Feature: database-performance
+"""
+
+import pytest
+import sqlite3
+import os
+import sys
+import asyncio
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import replica
+from database import get_db_connection, init_db
+from replica import AnalyticsReplica
+
+# Test database path
+TEST_DB_PATH = "test_replica.db"
+TEST_FILES = [TEST_DB_PATH + slot + suffix
+              for slot in ("", ".replica-a", ".replica-b")
+              for suffix in ("", "-wal", "-shm")]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_test_db():
+    """Primary schema once; replica slots are removed with it"""
+    original_db_path = database.DB_PATH
+    database.DB_PATH = TEST_DB_PATH
+    database.close_all_connections()
+    for path in TEST_FILES:
+        if os.path.exists(path):
+            os.remove(path)
+
+    init_db()
+
+    yield
+
+    database.close_all_connections()
+    database.DB_PATH = original_db_path
+    for path in TEST_FILES:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def interview_names(conn):
+    return [row[0] for row in conn.execute("SELECT candidate_name FROM interview ORDER BY id")]
+
+
+@settings(max_examples=15, deadline=None)
+@given(batches=st.lists(st.lists(st.text(min_size=1, max_size=10), max_size=5), min_size=1, max_size=4))
+def test_snapshot_matches_primary_at_refresh(batches):
+    """
+    Feature: database-performance, Property 25: Snapshot consistency
+
+    Property: After each refresh the replica holds exactly the primary's rows
+    at that moment, later primary writes are invisible until the next
+    refresh, and replica connections cannot write.
+    """
+    analytics = AnalyticsReplica(max_staleness=60)
+    conn = get_db_connection()
+    conn.execute("DELETE FROM interview")
+    conn.commit()
+
+    for names in batches:
+        conn.executemany("INSERT INTO interview (candidate_name) VALUES (?)", [(name,) for name in names])
+        conn.commit()
+        analytics.refresh()
+        expected = interview_names(conn)
+
+        conn.execute("INSERT INTO interview (candidate_name) VALUES ('after snapshot')")
+        conn.commit()
+
+        snapshot = analytics.connection()
+        assert interview_names(snapshot) == expected
+        with pytest.raises(sqlite3.OperationalError):
+            snapshot.execute("DELETE FROM interview")
+        snapshot.close()
+    conn.close()
+
+
+def test_stale_or_disabled_replica_falls_back_to_primary():
+    """
+    Feature: database-performance, Property 26: Staleness bound
+
+    Property: Dashboard reads use the snapshot only while it is enabled and
+    younger than the staleness bound; otherwise they read the primary.
+    """
+    conn = get_db_connection()
+    conn.execute("DELETE FROM interview")
+    conn.execute("INSERT INTO interview (candidate_name) VALUES ('in snapshot')")
+    conn.commit()
+    replica.analytics_replica.refresh()
+    conn.execute("INSERT INTO interview (candidate_name) VALUES ('primary only')")
+    conn.commit()
+    conn.close()
+
+    def read(conn):
+        return interview_names(conn)
+
+    original_enabled = replica.REPLICA_ENABLED
+    original_staleness = replica.analytics_replica.max_staleness
+    try:
+        replica.REPLICA_ENABLED = False
+        assert asyncio.run(replica.run_analytics(read)) == ['in snapshot', 'primary only']
+
+        replica.REPLICA_ENABLED = True
+        assert asyncio.run(replica.run_analytics(read)) == ['in snapshot']
+
+        replica.analytics_replica.max_staleness = 0
+        assert asyncio.run(replica.run_analytics(read)) == ['in snapshot', 'primary only']
+    finally:
+        replica.REPLICA_ENABLED = original_enabled
+        replica.analytics_replica.max_staleness = original_staleness
@@ -0,0 +1,149 @@
+"""
+Property-based tests for materialized assessment report snapshots
+Feature: database-performance
+"""
+
+import pytest
+import asyncio
+import itertools
+import os
+import sys
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import reports
+from database import get_db_connection
+
+# Test database path
+TEST_DB_PATH = "test_reports.db"
+
+
+@pytest.fixture(scope="module")
+def main_module():
+    """Import the app against a throwaway database with one job"""
+    original_db_path = database.DB_PATH
+    database.DB_PATH = TEST_DB_PATH
+    database.close_all_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+    database.init_db()
+    conn = get_db_connection()
+    conn.execute(
+        "INSERT INTO jobs (id, title, location, job_type, experience_required, description) VALUES (1, 'Job', 'X', 'Full-time', '1', 'd')"
+    )
+    conn.commit()
+    conn.close()
+
+    import main
+
+    yield main
+
+    database.shutdown_executor()
+    database.close_all_connections()
+    database.DB_PATH = original_db_path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+
+_candidate_numbers = itertools.count()
+
+
+def add_completed_interview(conn):
+    n = next(_candidate_numbers)
+    candidate_id = conn.execute(
+        "INSERT INTO candidates (name, email, resume_path) VALUES ('R', ?, 'r')", (f"r{n}@example.com",)
+    ).lastrowid
+    application_id = conn.execute(
+        "INSERT INTO applications (candidate_id, job_id, match_score) VALUES (?, 1, 70)", (candidate_id,)
+    ).lastrowid
+    interview_id = conn.execute(
+        "INSERT INTO interview (status, application_id, notes) VALUES ('completed', ?, '{\"overall_feedback\": \"ok\"}')",
+        (application_id,)
+    ).lastrowid
+    question_id = conn.execute(
+        "INSERT INTO question (interview_id, seq, text) VALUES (?, 1, 'Q1')", (interview_id,)
+    ).lastrowid
+    answer_id = conn.execute(
+        "INSERT INTO answer (question_id, interview_id, score) VALUES (?, ?, 3)", (question_id, interview_id)
+    ).lastrowid
+    conn.execute("INSERT INTO transcript_chunk (answer_id, timestamp, text, is_final) VALUES (?, 0, 'hi', 1)", (answer_id,))
+    conn.commit()
+    return interview_id, candidate_id, application_id, answer_id
+
+
+def fresh_body(conn, interview_id):
+    return reports.serialize(reports.build_report(interview_id, *reports.load_report_rows(conn, interview_id)))
+
+
+edit = st.sampled_from([
+    "UPDATE answer SET score = score + 1 WHERE id = :answer",
+    "UPDATE answer SET verdict = 'Good' WHERE id = :answer",
+    "INSERT INTO transcript_chunk (answer_id, timestamp, text, is_final) VALUES (:answer, 9, 'late', 1)",
+    "INSERT INTO proctor_event (interview_id, event_type, timestamp) VALUES (:interview, 'gaze', 1)",
+    "INSERT INTO question (interview_id, seq, text) VALUES (:interview, (SELECT MAX(seq) + 1 FROM question WHERE interview_id = :interview), 'Q')",
+    "UPDATE interview SET notes = 'plain text' WHERE id = :interview",
+    "UPDATE candidates SET name = name || 'x' WHERE id = :candidate",
+    "UPDATE applications SET match_score = match_score + 1 WHERE id = :application",
+    "UPDATE jobs SET title = title || 'y' WHERE id = 1",
+])
+
+
+@settings(max_examples=40, deadline=None)
+@given(edits=st.lists(edit, max_size=6))
+def test_served_report_always_matches_a_fresh_build(main_module, edits):
+    """
+    Feature: database-performance, Property 41: Snapshot freshness
+
+    Property: After a completed report has been snapshotted, any edit to what
+    it shows (scores, transcripts, proctor events, questions, feedback,
+    candidate, application or job) makes the next view equal a fresh build.
+    """
+    conn = get_db_connection()
+    interview_id, candidate_id, application_id, answer_id = add_completed_interview(conn)
+    keys = {"interview": interview_id, "candidate": candidate_id, "application": application_id, "answer": answer_id}
+
+    asyncio.run(main_module.get_assessment_detail(interview_id))
+    assert reports.read_snapshot(conn, interview_id) is not None
+    for statement in edits:
+        conn.execute(statement, keys)
+        conn.commit()
+        served = asyncio.run(main_module.get_assessment_detail(interview_id)).body.decode()
+        assert served == fresh_body(conn, interview_id)
+    conn.close()
+
+
+def test_snapshot_hits_cost_one_query_and_old_versions_rebuild(main_module):
+    """
+    Feature: database-performance, Property 42: Versioned snapshot serving
+
+    Property: A current snapshot is served with a single query, a snapshot
+    from an older REPORT_VERSION is rebuilt, and deleting the interview
+    deletes its snapshot.
+    """
+    conn = get_db_connection()
+    interview_id = add_completed_interview(conn)[0]
+    body = reports.report_body(conn, interview_id)
+
+    statements = []
+    conn.set_trace_callback(statements.append)
+    assert reports.report_body(conn, interview_id) == body
+    conn.set_trace_callback(None)
+    assert len(statements) == 1
+
+    conn.execute("UPDATE report_snapshot SET version = ?, body = '{}' WHERE interview_id = ?",
+                 (reports.REPORT_VERSION - 1, interview_id))
+    conn.commit()
+    assert reports.report_body(conn, interview_id) == body
+    assert reports.read_snapshot(conn, interview_id) == body
+
+    conn.execute("DELETE FROM answer WHERE interview_id = ?", (interview_id,))
+    conn.execute("DELETE FROM question WHERE interview_id = ?", (interview_id,))
+    conn.execute("DELETE FROM interview WHERE id = ?", (interview_id,))
+    conn.commit()
+    assert conn.execute("SELECT COUNT(*) FROM report_snapshot WHERE interview_id = ?", (interview_id,)).fetchone()[0] == 0
+    conn.close()
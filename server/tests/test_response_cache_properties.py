@@ -0,0 +1,178 @@
+"""
+Property-based tests for the conditional-GET response cache
+Feature: database-performance
+"""
+
+import pytest
+import os
+import sys
+from fastapi.testclient import TestClient
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from response_cache import ResponseCache, if_none_match, response_cache
+
+# Test database path
+TEST_DB_PATH = "test_response_cache.db"
+
+
+@pytest.fixture(scope="module")
+def client():
+    """TestClient for the app against a throwaway database"""
+    original_db_path = database.DB_PATH
+    database.DB_PATH = TEST_DB_PATH
+    database.close_all_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+    database.init_db()
+    # A TTL bucket rolling over mid-example would change ETags on its own
+    ttl_seconds, response_cache.ttl_seconds = response_cache.ttl_seconds, 0
+
+    import main
+
+    yield TestClient(main.app)
+
+    response_cache.ttl_seconds = ttl_seconds
+    database.shutdown_executor()
+    database.close_all_connections()
+    database.DB_PATH = original_db_path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+
+JOB = dict(title="Dev", location="X", job_type="Full-time", experience_required="1", description="python")
+
+write = st.sampled_from(["create_job", "update_job", "deactivate_job", "interview"])
+
+
+def apply_write(client, kind, job_id):
+    if kind == "create_job":
+        return client.post("/api/jobs", json=JOB).json()["id"]
+    if kind == "update_job":
+        client.put(f"/api/jobs/{job_id}", json={"title": "Renamed"})
+    elif kind == "deactivate_job":
+        client.delete(f"/api/jobs/{job_id}")
+    elif kind == "interview":
+        client.post("/api/interviews", json=dict(candidate_name="A", candidate_email="a@example.com"))
+    return job_id
+
+
+@settings(max_examples=25, deadline=None)
+@given(writes=st.lists(write, min_size=1, max_size=5))
+def test_revalidation_matches_fresh_responses(client, writes):
+    """
+    Feature: database-performance, Property 43: Conditional GET correctness
+
+    Property: Revalidating with the last ETag returns 304 while nothing was
+    written, and after any write route the dashboard GETs return a new ETag
+    with the same body an uncached request gets.
+    """
+    job_id = client.post("/api/jobs", json=JOB).json()["id"]
+    paths = ["/api/jobs", f"/api/jobs/{job_id}", "/api/assessments", "/api/candidates?limit=5"]
+
+    for kind in writes:
+        etags = {}
+        for path in paths:
+            first = client.get(path)
+            assert first.status_code == 200
+            etags[path] = first.headers["etag"]
+            again = client.get(path, headers={"If-None-Match": etags[path]})
+            # Compressed 200s carry the weak form of the same validator
+            assert again.status_code == 304 and again.headers["etag"] == etags[path].removeprefix("W/")
+
+        job_id = apply_write(client, kind, job_id)
+
+        for path in paths:
+            current = client.get(path, headers={"If-None-Match": etags[path]})
+            if current.status_code == 304:
+                continue
+            assert current.status_code == 200 and current.headers["etag"] != etags[path]
+            response_cache.clear()
+            assert current.content == client.get(path).content
+        listed = client.get("/api/jobs?active_only=false").json()["jobs"]
+        assert any(job["id"] == job_id for job in listed)
+
+
+def test_cached_hits_skip_the_database_and_stay_bounded(client):
+    """
+    Feature: database-performance, Property 44: Bounded body cache
+
+    Property: A repeated GET with no write in between is served from the cache
+    without running SQL, and the cache never holds more than its entry or byte
+    limit.
+    """
+    client.post("/api/jobs", json=JOB)
+    client.get("/api/jobs")
+
+    statements = []
+    original_open = database.pool.open
+
+    def traced_open(*args, **kwargs):
+        conn = original_open(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    database.close_all_connections()
+    database.pool.open = traced_open
+    try:
+        hits = response_cache.metrics()["hits"]
+        assert client.get("/api/jobs").status_code == 200
+        assert response_cache.metrics()["hits"] == hits + 1
+        assert statements == []
+    finally:
+        database.pool.open = original_open
+        database.close_all_connections()
+
+    cache = ResponseCache(max_entries=3, max_bytes=10, ttl_seconds=60)
+    for n in range(20):
+        key = f"/api/jobs/{n}?"
+        etag = cache.etag(key, [f"job:{n}"])
+        cache.store(key, etag, b"x" * (n % 6))
+        metrics = cache.metrics()
+        assert metrics["entries"] <= 3 and metrics["bytes"] <= 10
+        assert cache.lookup(key, etag) == b"x" * (n % 6)
+
+    before = cache.etag("/api/jobs/1?", ["job:1"])
+    cache.invalidate("job:*")
+    assert cache.etag("/api/jobs/1?", ["job:1"]) != before
+    assert if_none_match(f'W/{before}, "other"', before) and if_none_match("*", before)
+    assert not if_none_match('"other"', before)
+
+
+def test_placeholder_answers_refresh_assessments(client):
+    """
+    Feature: database-performance, Property 67: Placeholder answers invalidate assessments
+
+    Property: The first transcript chunk for a question creates its answer row
+    and gives /api/assessments a new ETag; later chunks for the same answer do
+    not.
+    """
+    interview_id = client.post(
+        "/api/interviews", json=dict(candidate_name="T", candidate_email="t@example.com")
+    ).json()["interview_id"]
+    conn = database.get_db_connection()
+    conn.execute("INSERT INTO question (interview_id, seq, text) VALUES (?, 1, 'Q1')", (interview_id,))
+    conn.commit()
+
+    etag = client.get("/api/assessments").headers["etag"]
+    chunk = dict(timestamp="00:01", text="hello", is_final=True)
+
+    first = client.post(f"/api/interviews/{interview_id}/transcript", json=chunk)
+    assert first.status_code == 200
+    fresh = client.get("/api/assessments", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200 and fresh.headers["etag"] != etag
+    etag = fresh.headers["etag"]
+    response_cache.clear()
+    assert fresh.content == client.get("/api/assessments").content
+
+    again = client.post(f"/api/interviews/{interview_id}/transcript", json=chunk)
+    assert again.json()["answer_id"] == first.json()["answer_id"]
+    assert client.get("/api/assessments", headers={"If-None-Match": etag}).status_code == 304
+
+    import main
+    main.write_buffer.flush()
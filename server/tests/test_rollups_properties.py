@@ -0,0 +1,215 @@
+"""
+Property-based tests for the daily dashboard rollups
+Feature: database-performance
+"""
+
+import pytest
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import rollups
+from database import get_db_connection, init_db
+from maintenance import rebuild_daily_rollups
+
+# Test database path
+TEST_DB_PATH = "test_rollups.db"
+
+DAYS = ["2025-03-01 09:00:00", "2025-03-01 18:30:00", "2025-03-02 10:00:00", "2025-03-09 12:00:00"]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_test_db():
+    """Create the schema once; each example clears the tables it uses"""
+    original_db_path = database.DB_PATH
+    database.DB_PATH = TEST_DB_PATH
+    database.close_all_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+    init_db()
+    conn = get_db_connection()
+    conn.executemany(
+        "INSERT INTO jobs (id, title, location, job_type, experience_required, description) VALUES (?, 'Job', 'X', 'Full-time', '1', 'd')",
+        [(1,), (2,)]
+    )
+    conn.commit()
+    conn.close()
+
+    yield
+
+    database.close_all_connections()
+    database.DB_PATH = original_db_path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+
+def reset(conn):
+    for table in ("answer", "interview", "applications", "candidates"):
+        conn.execute(f"DELETE FROM {table}")
+    conn.execute("DELETE FROM daily_job_stats")
+    conn.execute("DELETE FROM daily_candidate_stats")
+    conn.commit()
+
+
+def rollup_rows(conn):
+    """Non-empty rollup rows, with float sums rounded"""
+    jobs = {
+        (row['day'], row['job_id']): (row['applications'], row['interviews_started'], row['interviews_completed'],
+                                      round(row['score_sum'], 6), round(row['max_score_sum'], 6))
+        for row in conn.execute("SELECT * FROM daily_job_stats")
+    }
+    candidates = {row['day']: row['candidates'] for row in conn.execute("SELECT * FROM daily_candidate_stats")}
+    return (
+        {key: value for key, value in jobs.items() if any(value)},
+        {key: value for key, value in candidates.items() if value},
+    )
+
+
+index = st.integers(0, 20)
+day = st.sampled_from(DAYS)
+score = st.one_of(st.none(), st.floats(-1, 5))
+operation = st.one_of(
+    st.tuples(st.just("apply"), day, st.sampled_from([1, 2])),
+    st.tuples(st.just("start"), day, index, st.booleans()),
+    st.tuples(st.just("complete"), day, index),
+    st.tuples(st.just("reopen"), index),
+    st.tuples(st.just("answer"), index, score),
+    st.tuples(st.just("rescore"), index, score),
+    st.tuples(st.just("delete_interview"), index),
+    st.tuples(st.just("delete_application"), index),
+)
+
+
+def pick(conn, table, i):
+    ids = [row[0] for row in conn.execute(f"SELECT id FROM {table} ORDER BY id")]
+    return ids[i % len(ids)] if ids else None
+
+
+@settings(max_examples=60, deadline=None)
+@given(ops=st.lists(operation, max_size=25))
+def test_rollups_match_base_tables_after_any_events(ops):
+    """
+    Feature: database-performance, Property 29: Rollup consistency
+
+    Property: After any mix of applications, interview starts, completions,
+    reopenings, answer (re)scoring and deletes, the trigger-maintained daily
+    rollups equal a from-scratch recomputation over the base tables.
+    """
+    conn = get_db_connection()
+    reset(conn)
+    for n, op in enumerate(ops):
+        kind = op[0]
+        if kind == "apply":
+            candidate_id = conn.execute(
+                "INSERT INTO candidates (name, email, resume_path, created_at) VALUES ('C', ?, 'r', ?)",
+                (f"c{n}@example.com", op[1])
+            ).lastrowid
+            conn.execute(
+                "INSERT INTO applications (candidate_id, job_id, match_score, applied_at) VALUES (?, ?, 50, ?)",
+                (candidate_id, op[2], op[1])
+            )
+        elif kind == "start":
+            application_id = pick(conn, "applications", op[2]) if op[3] else None
+            conn.execute("INSERT INTO interview (started_at, application_id) VALUES (?, ?)", (op[1], application_id))
+        elif kind == "complete" and (interview_id := pick(conn, "interview", op[2])):
+            conn.execute("UPDATE interview SET status = 'completed', ended_at = ? WHERE id = ?", (op[1], interview_id))
+        elif kind == "reopen" and (interview_id := pick(conn, "interview", op[1])):
+            conn.execute("UPDATE interview SET status = 'in_progress' WHERE id = ?", (interview_id,))
+        elif kind == "answer" and (interview_id := pick(conn, "interview", op[1])):
+            conn.execute("INSERT INTO answer (interview_id, score) VALUES (?, ?)", (interview_id, op[2]))
+        elif kind == "rescore" and (answer_id := pick(conn, "answer", op[1])):
+            conn.execute("UPDATE answer SET score = ? WHERE id = ?", (op[2], answer_id))
+        elif kind == "delete_interview" and (interview_id := pick(conn, "interview", op[1])):
+            conn.execute("DELETE FROM answer WHERE interview_id = ?", (interview_id,))
+            conn.execute("DELETE FROM interview WHERE id = ?", (interview_id,))
+        elif kind == "delete_application" and (application_id := pick(conn, "applications", op[1])):
+            # Detach its interviews first so the triggers can still see which job they move from
+            conn.execute("UPDATE interview SET application_id = NULL WHERE application_id = ?", (application_id,))
+            conn.execute("DELETE FROM applications WHERE id = ?", (application_id,))
+    conn.commit()
+
+    maintained = rollup_rows(conn)
+    rebuild_daily_rollups(conn)
+    assert maintained == rollup_rows(conn)
+    conn.close()
+
+
+@settings(max_examples=100)
+@given(days=st.integers(min_value=1, max_value=400), today=st.dates(min_value=date(2000, 1, 1)))
+def test_range_windows(days, today):
+    """
+    Feature: database-performance, Property 30: Range windows
+
+    Property: "<n>d" covers exactly n days ending today, the previous window
+    has the same length and ends the day before, and custom ranges round-trip.
+    """
+    first, last = rollups.parse_range(f"{days}d", today=today)
+    assert last == today and (last - first).days + 1 == days
+
+    previous_first, previous_last = rollups.previous_window(first, last)
+    assert previous_last == first - timedelta(days=1)
+    assert (previous_last - previous_first) == (last - first)
+
+    assert rollups.parse_range("custom", first.isoformat(), last.isoformat()) == (first, last)
+    for bad in ("0d", "month", ""):
+        with pytest.raises(ValueError):
+            rollups.parse_range(bad, today=today)
+    with pytest.raises(ValueError):
+        rollups.parse_range("custom", last.isoformat(), (last - timedelta(days=1)).isoformat())
+
+
+@pytest.fixture
+def off_day_time_zone():
+    """A local time zone whose calendar day is not the UTC day right now"""
+    original = os.environ.get("TZ")
+    # POSIX offsets count west: UTC-14 is fourteen hours ahead of UTC
+    os.environ["TZ"] = "UTC-14" if datetime.now(timezone.utc).hour >= 10 else "UTC+12"
+    time.tzset()
+    yield
+    if original is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = original
+    time.tzset()
+
+
+def test_rollup_days_are_utc_days(off_day_time_zone):
+    """
+    Feature: database-performance, Property 64: UTC rollup days
+
+    Property: Rows written now, whether by a column default, an app UTC
+    timestamp or a local time with its offset, land on the UTC day in both
+    the triggers and the seed, and "<n>d" ranges end on that same day.
+    """
+    today = datetime.now(timezone.utc).date()
+    assert date.today() != today
+    assert rollups.parse_range("1d") == (today, today)
+
+    conn = get_db_connection()
+    reset(conn)
+    candidate_id = conn.execute(
+        "INSERT INTO candidates (name, email, resume_path) VALUES ('U', 'utc@example.com', 'r')"
+    ).lastrowid
+    application_id = conn.execute(
+        "INSERT INTO applications (candidate_id, job_id, match_score, applied_at) VALUES (?, 1, 50, ?)",
+        (candidate_id, datetime.now(timezone.utc).isoformat())
+    ).lastrowid
+    conn.execute("INSERT INTO interview (application_id, status, started_at) VALUES (?, 'in_progress', ?)",
+                 (application_id, datetime.now().astimezone().isoformat()))
+    conn.commit()
+
+    first, last = rollups.parse_range("1d")
+    maintained = rollups.window_totals(conn, first, last)
+    assert (maintained['candidates'], maintained['applications'], maintained['interviews_started']) == (1, 1, 1)
+    rebuild_daily_rollups(conn)
+    assert rollups.window_totals(conn, first, last) == maintained
+    conn.close()
@@ -0,0 +1,278 @@
+"""
+Property-based tests for FTS5 candidate search and the candidate_skill index
+Feature: database-performance
+"""
+
+import pytest
+import json
+import os
+import sqlite3
+import sys
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import maintenance
+import migrations
+from database import get_db_connection, init_db
+from search import (fts_match_query, index_candidate, normalize_skill, parse_skill_filter,
+                    skill_filter_sql, unindex_candidate)
+from textcodec import pack_column
+
+# Test database path
+TEST_DB_PATH = "test_search.db"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_test_db():
+    """Create the schema once; tests clear candidates themselves"""
+    original_db_path = database.DB_PATH
+    database.DB_PATH = TEST_DB_PATH
+    database.close_all_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+    init_db()
+
+    yield
+
+    database.close_all_connections()
+    database.DB_PATH = original_db_path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+
+def add_candidate(conn, name, email, skills=(), resume_text=""):
+    candidate_id = conn.execute('''
+        INSERT INTO candidates (name, email, resume_path, resume_text, skills)
+        VALUES (?, ?, 'data/uploads/x.pdf', ?, ?)
+    ''', (name, email, pack_column(conn, "candidates", resume_text), json.dumps(list(skills)))).lastrowid
+    index_candidate(conn, candidate_id)
+    return candidate_id
+
+
+def clear_candidates(conn):
+    conn.execute("DELETE FROM candidates")
+    conn.execute("INSERT INTO candidates_fts (candidates_fts) VALUES ('delete-all')")
+
+
+def search_ids(conn, text):
+    match = fts_match_query(text)
+    if match is None:
+        return []
+    return [row[0] for row in conn.execute(
+        "SELECT rowid FROM candidates_fts WHERE candidates_fts MATCH ? ORDER BY rank", (match,)
+    )]
+
+
+@settings(max_examples=200)
+@given(search=st.text(max_size=60))
+def test_any_search_text_is_a_valid_match_query(search):
+    """
+    Feature: database-performance, Property 13: Search input safety
+
+    Property: Arbitrary user input (quotes, FTS operators, column filters,
+    unicode) never produces an FTS5 syntax error.
+    """
+    conn = get_db_connection()
+    search_ids(conn, search)
+    conn.close()
+
+
+def test_prefix_search_over_all_columns_ranks_name_first():
+    """
+    Feature: database-performance, Property 14: Ranked prefix matching
+
+    Property: Word prefixes match name, email, skills and resume text, and a
+    name match ranks above a resume-only match.
+    """
+    conn = get_db_connection()
+    clear_candidates(conn)
+    resume_only = add_candidate(conn, "Asha Rao", "asha@example.com", ["Excel"], "Worked with Kubernetes clusters")
+    by_name = add_candidate(conn, "Kuber Singh", "ks@example.com", ["Sales"])
+    by_skill = add_candidate(conn, "Ravi Kumar", "ravi@example.com", ["Python", "AWS"])
+    conn.commit()
+
+    assert search_ids(conn, "kube") == [by_name, resume_only]
+    assert search_ids(conn, "pyth aws") == [by_skill]
+    assert search_ids(conn, "ravi@example") == [by_skill]
+    assert search_ids(conn, "nobody") == []
+    conn.close()
+
+
+def test_index_follows_updates_and_deletes():
+    """
+    Feature: database-performance, Property 15: Index synchronisation
+
+    Property: After a candidate is updated or deleted through the write path
+    the index reflects the current row only, compressed resume included.
+    """
+    conn = get_db_connection()
+    clear_candidates(conn)
+    resume = "Built payroll ledgers for retail chains. " * 20
+    candidate_id = add_candidate(conn, "Meera Iyer", "meera@example.com", ["Java"], resume)
+    conn.commit()
+
+    unindex_candidate(conn, candidate_id)
+    conn.execute("UPDATE candidates SET skills = ?, resume_text = ? WHERE id = ?",
+                 (json.dumps(["Golang"]), pack_column(conn, "candidates", resume + "Audited warehouses."), candidate_id))
+    index_candidate(conn, candidate_id)
+    conn.commit()
+    assert search_ids(conn, "java") == []
+    assert search_ids(conn, "golang") == [candidate_id]
+    assert search_ids(conn, "warehouses") == [candidate_id]
+
+    unindex_candidate(conn, candidate_id)
+    conn.execute("DELETE FROM candidates WHERE id = ?", (candidate_id,))
+    conn.commit()
+    assert search_ids(conn, "meera") == []
+    conn.execute("INSERT INTO candidates_fts (candidates_fts) VALUES ('integrity-check')")
+    conn.close()
+
+
+def test_batched_backfill_indexes_existing_rows_once():
+    """
+    Feature: database-performance, Property 16: Online index backfill
+
+    Property: Candidates that existed before the index was created are indexed
+    by the batched backfill, and rows updated mid-backfill are indexed once
+    with their current values.
+    """
+    conn = get_db_connection()
+    clear_candidates(conn)
+    ids = [add_candidate(conn, f"Legacy {i}", f"legacy{i}@example.com", ["Cobol"]) for i in range(10)]
+    # Simulate an index that has not been backfilled yet for these rows
+    conn.execute("INSERT INTO candidates_fts (candidates_fts) VALUES ('delete-all')")
+    conn.execute("UPDATE backfill_progress SET last_id = ?, end_id = ? WHERE version = 5", (ids[0] - 1, ids[-1]))
+    conn.commit()
+
+    migration = next(m for m in migrations.MIGRATIONS if m.version == 5)
+    migration.backfill(conn, 3)
+    conn.commit()
+    # Row not reached yet: the write path indexes it and the backfill skips it
+    unindex_candidate(conn, ids[-1])
+    conn.execute("UPDATE candidates SET name = 'Renamed Later' WHERE id = ?", (ids[-1],))
+    index_candidate(conn, ids[-1])
+    conn.commit()
+    while migration.backfill(conn, 3):
+        conn.commit()
+    conn.commit()
+
+    assert sorted(search_ids(conn, "cobol")) == ids
+    assert search_ids(conn, "renamed") == [ids[-1]]
+    conn.execute("INSERT INTO candidates_fts (candidates_fts) VALUES ('integrity-check')")
+    conn.close()
+
+
+def test_candidates_writable_without_the_application():
+    """
+    Feature: database-performance, Property 62: Plain connections can write candidates
+
+    Property: A connection without the pool's row factory or unpack_text()
+    (the sqlite3 shell, a restore script) can insert, update and delete
+    candidates, and reindex-search brings the index back to the table.
+    """
+    conn = get_db_connection()
+    clear_candidates(conn)
+    kept = add_candidate(conn, "Kept Row", "kept@example.com", ["Rust"], "Maintained ledger services. " * 20)
+    edited = add_candidate(conn, "Edited Row", "edited@example.com", ["Java"])
+    removed = add_candidate(conn, "Removed Row", "removed@example.com", ["Perl"])
+    conn.commit()
+
+    plain = sqlite3.connect(TEST_DB_PATH)
+    plain.execute("INSERT INTO candidates (name, email, resume_path, resume_text, skills) "
+                  "VALUES ('Restored Row', 'restored@example.com', 'r', 'Scheduled freight', '[]')")
+    plain.execute("UPDATE candidates SET skills = '[\"Scala\"]' WHERE id = ?", (edited,))
+    plain.execute("DELETE FROM candidates WHERE id = ?", (removed,))
+    plain.commit()
+    plain.close()
+
+    assert maintenance.reindex_search(conn) == 3
+    restored = conn.execute("SELECT id FROM candidates WHERE email = 'restored@example.com'").fetchone()[0]
+    assert search_ids(conn, "freight") == [restored]
+    assert search_ids(conn, "ledger") == [kept]
+    assert search_ids(conn, "scala") == [edited]
+    assert search_ids(conn, "java") == []
+    assert search_ids(conn, "perl") == []
+    conn.execute("INSERT INTO candidates_fts (candidates_fts) VALUES ('integrity-check')")
+    conn.close()
+
+
+def skill_filter_ids(conn, skills, match_all):
+    skill_list = parse_skill_filter(skills)
+    sql, params = skill_filter_sql(skill_list, match_all)
+    return [row[0] for row in conn.execute(f"SELECT c.id FROM candidates c WHERE {sql} ORDER BY c.id", params)]
+
+
+SKILL_POOL = ["Python", "python ", "AWS", "aws", " Docker", "SQL", "Go"]
+
+
+@settings(max_examples=50, deadline=None)
+@given(
+    profiles=st.lists(st.lists(st.sampled_from(SKILL_POOL), max_size=4), max_size=8),
+    query=st.lists(st.sampled_from(SKILL_POOL), min_size=1, max_size=3),
+    match_all=st.booleans(),
+    edits=st.lists(st.tuples(st.integers(0, 7), st.lists(st.sampled_from(SKILL_POOL), max_size=3)), max_size=3)
+)
+def test_skill_filter_matches_json_skills(profiles, query, match_all, edits):
+    """
+    Feature: database-performance, Property 19: Skill filter correctness
+
+    Property: After inserts and skill updates, an AND/OR skill query through
+    candidate_skill returns exactly the candidates whose JSON skills match
+    case- and whitespace-insensitively.
+    """
+    conn = get_db_connection()
+    conn.execute("DELETE FROM candidates")
+    ids = [add_candidate(conn, f"P{i}", f"p{i}@example.com", skills) for i, skills in enumerate(profiles)]
+    for index, skills in edits:
+        if ids:
+            conn.execute("UPDATE candidates SET skills = ? WHERE id = ?",
+                         (json.dumps(skills), ids[index % len(ids)]))
+    conn.commit()
+
+    wanted = {normalize_skill(s) for s in query}
+    expected = []
+    for row in conn.execute("SELECT id, skills FROM candidates ORDER BY id"):
+        have = {normalize_skill(s) for s in json.loads(row['skills'])}
+        if (wanted <= have) if match_all else (wanted & have):
+            expected.append(row['id'])
+
+    assert skill_filter_ids(conn, ",".join(query), match_all) == expected
+    conn.close()
+
+
+def test_skill_backfill_and_delete():
+    """
+    Feature: database-performance, Property 20: Skill index backfill
+
+    Property: Candidates that predate the skill index are picked up by the
+    batched backfill, malformed JSON is skipped, and deleting a candidate
+    removes its skills.
+    """
+    conn = get_db_connection()
+    conn.execute("DELETE FROM candidates")
+    ids = [add_candidate(conn, f"Old {i}", f"old{i}@example.com", ["Fortran", f"Skill{i}"]) for i in range(7)]
+    broken = add_candidate(conn, "Broken", "broken@example.com")
+    conn.execute("UPDATE candidates SET skills = 'not json' WHERE id = ?", (broken,))
+    conn.execute("DELETE FROM candidate_skill")
+    conn.execute("UPDATE backfill_progress SET last_id = ?, end_id = ? WHERE version = 7", (ids[0] - 1, broken))
+    conn.commit()
+
+    migration = next(m for m in migrations.MIGRATIONS if m.version == 7)
+    while migration.backfill(conn, 3):
+        conn.commit()
+    conn.commit()
+
+    assert skill_filter_ids(conn, "FORTRAN", True) == ids
+    assert skill_filter_ids(conn, "fortran, skill3", True) == [ids[3]]
+    assert skill_filter_ids(conn, "skill1,skill2", False) == [ids[1], ids[2]]
+
+    conn.execute("DELETE FROM candidates WHERE id = ?", (ids[0],))
+    conn.commit()
+    assert conn.execute("SELECT COUNT(*) FROM candidate_skill WHERE candidate_id = ?", (ids[0],)).fetchone()[0] == 0
+    conn.close()
@@ -0,0 +1,168 @@
+"""
+Property-based tests for the live interview session registry
+Feature: database-performance
+"""
+
+import pytest
+import os
+import sys
+import time
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from database import get_db_connection
+from sessions import SessionRegistry, live_sessions
+
+# Test database path
+TEST_DB_PATH = "test_sessions.db"
+
+
+@pytest.fixture(scope="module")
+def main_module():
+    """Import the app against a throwaway database"""
+    original_db_path = database.DB_PATH
+    database.DB_PATH = TEST_DB_PATH
+    database.close_all_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+    database.init_db()
+
+    import main
+
+    yield main
+
+    database.shutdown_executor()
+    database.close_all_connections()
+    database.DB_PATH = original_db_path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+
+def issue_question(conn, interview_id):
+    """What generate_question does once the question text is ready"""
+    row = conn.execute(
+        """INSERT INTO question (interview_id, seq, text)
+           SELECT ?, COALESCE(MAX(seq), 0) + 1, 'Q' FROM question WHERE interview_id = ?
+           RETURNING id, seq""",
+        (interview_id, interview_id)
+    ).fetchone()
+    conn.commit()
+    live_sessions.question_issued(interview_id, row['id'], row['seq'])
+
+
+operation = st.one_of(
+    st.tuples(st.just("question"), st.integers(0, 2)),
+    st.tuples(st.just("chunk"), st.integers(0, 2)),
+    st.tuples(st.just("invalidate"), st.integers(0, 2)),
+)
+
+
+@settings(max_examples=60, deadline=None)
+@given(ops=st.lists(operation, max_size=20), capacity=st.integers(1, 3))
+def test_cached_sessions_match_the_database(main_module, ops, capacity):
+    """
+    Feature: database-performance, Property 35: Session coherence
+
+    Property: After any mix of new questions, transcript chunks, invalidations
+    and evictions, every chunk lands on the answer of the latest question and
+    each cached session equals one rebuilt from the database.
+    """
+    original_capacity = live_sessions.max_sessions
+    live_sessions.max_sessions = capacity
+    live_sessions.clear()
+    conn = get_db_connection()
+    try:
+        interviews = [
+            conn.execute("INSERT INTO interview (candidate_name) VALUES (?)", (f"S{i}",)).lastrowid
+            for i in range(3)
+        ]
+        conn.commit()
+        for kind, target in ops:
+            interview_id = interviews[target]
+            if kind == "question":
+                issue_question(conn, interview_id)
+            elif kind == "chunk":
+                answer_id = main_module.save_transcript_for_current_question(conn, interview_id, 0, "t", True)
+                latest = conn.execute(
+                    "SELECT id FROM question WHERE interview_id = ? ORDER BY seq DESC LIMIT 1", (interview_id,)
+                ).fetchone()
+                if latest is None:
+                    assert answer_id is None
+                else:
+                    assert answer_id == conn.execute(
+                        "SELECT id FROM answer WHERE question_id = ?", (latest['id'],)
+                    ).fetchone()['id']
+            else:
+                live_sessions.invalidate(interview_id)
+            assert live_sessions.metrics()["sessions"] <= capacity
+
+        fresh = SessionRegistry()
+        for interview_id in interviews:
+            cached = live_sessions.get(interview_id)
+            if cached is not None:
+                assert cached.to_dict() == fresh.load(conn, interview_id).to_dict()
+    finally:
+        main_module.write_buffer.flush()
+        live_sessions.max_sessions = original_capacity
+        conn.close()
+
+
+def test_cached_transcript_path_issues_no_reads(main_module):
+    """
+    Feature: database-performance, Property 36: Query-free session hits
+
+    Property: Once an interview's session and answer are cached, attaching a
+    transcript chunk runs no SQL on the request connection, and the greeting
+    context comes from the same session.
+    """
+    conn = get_db_connection()
+    interview_id = conn.execute("INSERT INTO interview (candidate_name) VALUES ('Hit')").lastrowid
+    conn.commit()
+    issue_question(conn, interview_id)
+    answer_id = main_module.save_transcript_for_current_question(conn, interview_id, 0, "first", True)
+
+    statements = []
+    conn.set_trace_callback(statements.append)
+    for i in range(5):
+        assert main_module.save_transcript_for_current_question(conn, interview_id, i, "again", True) == answer_id
+    conn.set_trace_callback(None)
+    assert statements == []
+
+    session = live_sessions.load(conn, interview_id)
+    assert (session.candidate_name, session.seq, session.answer_id) == ("Hit", 1, answer_id)
+    main_module.write_buffer.flush()
+    conn.close()
+
+
+def test_sessions_expire_so_other_workers_questions_are_seen(main_module, monkeypatch):
+    """
+    Feature: database-performance, Property 66: Session expiry
+
+    Property: A question issued by another worker process (which cannot
+    notify this registry) is picked up once the cached session is older than
+    ttl_seconds, so chunks then land on the new question's answer.
+    """
+    monkeypatch.setattr(live_sessions, "ttl_seconds", 0.2)
+    conn = get_db_connection()
+    interview_id = conn.execute("INSERT INTO interview (candidate_name) VALUES ('Workers')").lastrowid
+    conn.commit()
+    issue_question(conn, interview_id)
+    first_answer = main_module.save_transcript_for_current_question(conn, interview_id, 0, "first", True)
+
+    # The other worker's generate_question: the row only, no question_issued() here
+    second = conn.execute("INSERT INTO question (interview_id, seq, text) VALUES (?, 2, 'Q2') RETURNING id",
+                          (interview_id,)).fetchone()['id']
+    conn.commit()
+    time.sleep(0.3)
+
+    answer_id = main_module.save_transcript_for_current_question(conn, interview_id, 1, "second", True)
+    assert answer_id != first_answer
+    assert answer_id == conn.execute("SELECT id FROM answer WHERE question_id = ?", (second,)).fetchone()['id']
+    assert live_sessions.metrics()["expirations"] >= 1
+    main_module.write_buffer.flush()
+    conn.close()
@@ -0,0 +1,166 @@
+"""
+Property-based tests for compressed text columns
+Feature: database-performance
+"""
+
+import pytest
+import json
+import os
+import sys
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import maintenance
+import migrations
+import reports
+import search
+import textcodec
+from database import get_db_connection, init_db
+
+# Test database path
+TEST_DB_PATH = "test_text_compression.db"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_test_db():
+    """Create the schema once with a job"""
+    original_db_path = database.DB_PATH
+    database.DB_PATH = TEST_DB_PATH
+    database.close_all_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+    init_db()
+    conn = get_db_connection()
+    conn.execute("INSERT INTO jobs (id, title, location, job_type, experience_required, description) VALUES (1, 'Sales', 'X', 'Full-time', '1', 'd')")
+    conn.commit()
+    conn.close()
+
+    yield
+
+    database.close_all_connections()
+    database.DB_PATH = original_db_path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+
+@settings(max_examples=200, deadline=None)
+@given(
+    text=st.text(max_size=2000) | st.text(alphabet="abc ,.\n", min_size=200, max_size=3000),
+    corpus=st.lists(st.text(alphabet="abcdef \n{}\":,", min_size=1, max_size=300), max_size=10),
+)
+def test_packed_values_unpack_to_the_original(text, corpus):
+    """
+    Feature: database-performance, Property 51: Lossless text packing
+
+    Property: Any text packed with or without a dictionary unpacks to itself;
+    it is packed only when at least COMPRESS_MIN_BYTES long and smaller that
+    way, and values that are not packed (old text rows, NULL, other BLOBs)
+    are returned unchanged.
+    """
+    _, dictionary = textcodec.train_dictionary(corpus) if corpus else ("zlib", None)
+    for codec_dictionary in (None, dictionary or None):
+        packed = textcodec.pack(text, "zlib", codec_dictionary)
+        if type(packed) is bytes:
+            assert len(text) >= textcodec.COMPRESS_MIN_BYTES and len(packed) < len(text.encode("utf-8"))
+            assert textcodec.is_packed(packed)
+        else:
+            assert packed == text
+        assert textcodec.unpack(packed, lambda key: codec_dictionary) == text
+
+    for value in (None, 42, text, b"\x78\x9c not ours"):
+        assert textcodec.unpack(value) == value
+
+
+def stored(conn, table, row_id):
+    column = textcodec.COMPRESSED_COLUMNS[table]
+    return conn.execute(f"SELECT typeof({column}) FROM {table} WHERE id = ?", (row_id,)).fetchone()[0]
+
+
+def test_columns_read_back_unchanged_through_every_stage():
+    """
+    Feature: database-performance, Property 52: Transparent column compression
+
+    Property: Old text rows, rows written with pack_column and rows repacked
+    with trained dictionaries all read back as the original text through
+    pooled connections, long values end up stored as BLOBs, and the resume
+    search index keeps matching the plain text.
+    """
+    resume = "Inside sales executive at Zoho, handled 80 outbound calls a day. " * 12
+    notes = json.dumps({"overall_feedback": "Clear and confident. " * 20, "detailed_feedback": "Good.",
+                        "overall_score_percent": 72})
+    breakdown = json.dumps({"strengths": ["Concrete example with numbers"] * 10, "weaknesses": ["Pace"]})
+    explanation = "The candidate lists CRM and cold calling which match the job. " * 8
+
+    conn = get_db_connection()
+    rows = {}
+    for n in range(25):
+        legacy = n % 2 == 0
+        pack = (lambda table, text: text) if legacy else (lambda table, text: textcodec.pack_column(conn, table, text))
+        candidate_id = conn.execute(
+            "INSERT INTO candidates (name, email, resume_path, resume_text, skills) VALUES (?, ?, 'r', ?, '[]')",
+            (f"Person {n}", f"p{n}@example.com", pack("candidates", f"{resume} ledger{n}"))
+        ).lastrowid
+        search.index_candidate(conn, candidate_id)
+        application_id = conn.execute(
+            "INSERT INTO applications (candidate_id, job_id, match_score, match_explanation) VALUES (?, 1, 60, ?)",
+            (candidate_id, pack("applications", explanation))
+        ).lastrowid
+        interview_id = conn.execute(
+            "INSERT INTO interview (status, application_id, notes) VALUES ('completed', ?, ?)",
+            (application_id, pack("interview", notes))
+        ).lastrowid
+        question_id = conn.execute("INSERT INTO question (interview_id, seq, text) VALUES (?, 1, 'Q')",
+                                   (interview_id,)).lastrowid
+        answer_id = conn.execute(
+            "INSERT INTO answer (question_id, interview_id, score, auto_score_breakdown) VALUES (?, ?, 4, ?)",
+            (question_id, interview_id, pack("answer", breakdown))
+        ).lastrowid
+        rows[n] = {"candidates": candidate_id, "applications": application_id,
+                   "interview": interview_id, "answer": answer_id}
+        assert stored(conn, "candidates", candidate_id) == ("text" if legacy else "blob")
+    conn.commit()
+
+    expected = {"applications": explanation, "interview": notes, "answer": breakdown}
+
+    def check():
+        for n, ids in rows.items():
+            for table, row_id in ids.items():
+                column = textcodec.COMPRESSED_COLUMNS[table]
+                value = conn.execute(f"SELECT * FROM {table} WHERE id = ?", (row_id,)).fetchone()[column]
+                assert value == expected.get(table, f"{resume} ledger{n}")
+            assert [r[0] for r in conn.execute(
+                "SELECT rowid FROM candidates_fts WHERE candidates_fts MATCH ?", (f"ledger{n}",))] == [ids["candidates"]]
+        conn.execute("INSERT INTO candidates_fts (candidates_fts) VALUES ('integrity-check')")
+        conn.commit()
+
+    check()
+    # The migration backfill packs old rows with plain zlib
+    textcodec.start_repack(conn)
+    while migrations._backfill_compressed_text(conn, 7):
+        conn.commit()
+    conn.commit()
+    assert all(stored(conn, table, row_id) == "blob" for ids in rows.values() for table, row_id in ids.items())
+    check()
+
+    trained, repacked = maintenance.train_dictionaries(conn)
+    assert set(trained) == {textcodec.column_key(table) for table in textcodec.COMPRESSED_COLUMNS}
+    assert repacked > 0
+    check()
+    digests = {row[0] for row in conn.execute("SELECT digest FROM text_dictionary")}
+    headers = {bytes.fromhex(row[0])[3:] for row in conn.execute(
+        "SELECT hex(substr(resume_text, 1, 7)) FROM candidates")}
+    assert headers <= digests and len(headers) == 1
+
+    # Dictionaries are looked up again from the database in a fresh process
+    textcodec._dictionaries.clear()
+    interview_id = rows[0]["interview"]
+    report = reports.build_report(interview_id, *reports.load_report_rows(conn, interview_id))
+    assert report["feedback"]["aiOverall"] == json.loads(notes)["overall_feedback"]
+    check()
+    conn.close()
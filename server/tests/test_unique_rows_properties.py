@@ -0,0 +1,144 @@
+"""
+Property-based tests for unique question/answer rows and atomic get-or-create
+Feature: database-performance
+"""
+
+import pytest
+import sqlite3
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import migrations
+from database import get_db_connection
+
+# Test database path
+TEST_DB_PATH = "test_unique_rows.db"
+
+
+@pytest.fixture(scope="module")
+def main_module():
+    """Import the app against a throwaway database"""
+    original_db_path = database.DB_PATH
+    database.DB_PATH = TEST_DB_PATH
+    database.close_all_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+    database.init_db()
+
+    import main
+
+    yield main
+
+    database.shutdown_executor()
+    database.close_all_connections()
+    database.DB_PATH = original_db_path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+
+# Per question: its seq, then per answer row: (recording_path set, transcript chunk count)
+question = st.tuples(
+    st.integers(1, 3),
+    st.lists(st.tuples(st.booleans(), st.integers(0, 3)), max_size=3),
+)
+
+
+@settings(max_examples=50, deadline=None)
+@given(questions=st.lists(question, max_size=6))
+def test_migration_merges_duplicates_without_losing_rows(questions):
+    """
+    Feature: database-performance, Property 33: Lossless deduplication
+
+    Property: Upgrading a database holding duplicate question seqs and
+    duplicate answers keeps every question in its original order, leaves one
+    answer per question with all transcript chunks and the recording attached.
+    """
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    migrations.apply_migrations(conn, [m for m in migrations.MIGRATIONS if m.version < 11])
+
+    interview_id = conn.execute("INSERT INTO interview (candidate_name) VALUES ('D')").lastrowid
+    recorded = set()
+    for seq, answers in questions:
+        question_id = conn.execute(
+            "INSERT INTO question (interview_id, seq, text) VALUES (?, ?, 'Q')", (interview_id, seq)
+        ).lastrowid
+        for has_recording, chunk_count in answers:
+            answer_id = conn.execute(
+                "INSERT INTO answer (question_id, interview_id, recording_path) VALUES (?, ?, ?)",
+                (question_id, interview_id, "data/media/a.webm" if has_recording else None)
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO transcript_chunk (answer_id, timestamp, text, is_final) VALUES (?, ?, 't', 1)",
+                [(answer_id, i) for i in range(chunk_count)]
+            )
+            if has_recording:
+                recorded.add(question_id)
+    conn.commit()
+    order_before = [row[0] for row in conn.execute("SELECT id FROM question ORDER BY seq, id")]
+    chunks_by_question = dict(conn.execute('''
+        SELECT a.question_id, COUNT(t.id) FROM answer a LEFT JOIN transcript_chunk t ON t.answer_id = a.id
+        GROUP BY a.question_id
+    ''').fetchall())
+
+    migrations.apply_migrations(conn)
+
+    seqs = conn.execute("SELECT id, seq FROM question ORDER BY seq").fetchall()
+    assert [row['id'] for row in seqs] == order_before
+    assert len({row['seq'] for row in seqs}) == len(seqs)
+
+    answers = conn.execute('''
+        SELECT a.question_id, a.recording_path, COUNT(t.id) AS chunks
+        FROM answer a LEFT JOIN transcript_chunk t ON t.answer_id = a.id
+        GROUP BY a.id
+    ''').fetchall()
+    assert len(answers) == len({row['question_id'] for row in answers}) == len(chunks_by_question)
+    for row in answers:
+        assert row['chunks'] == chunks_by_question[row['question_id']]
+        assert (row['recording_path'] is not None) == (row['question_id'] in recorded)
+
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.executemany("INSERT INTO question (interview_id, seq) VALUES (?, 99)", [(interview_id,), (interview_id,)])
+    conn.close()
+
+
+@pytest.mark.parametrize("writers", [2, 8])
+def test_concurrent_transcript_writers_share_one_answer(main_module, writers):
+    """
+    Feature: database-performance, Property 34: Atomic get-or-create
+
+    Property: Any number of transcript writers racing on a fresh question all
+    get the same answer id, and exactly one answer row exists for it.
+    """
+    conn = get_db_connection()
+    interview_id = conn.execute("INSERT INTO interview (candidate_name) VALUES ('R')").lastrowid
+    question_id = conn.execute(
+        "INSERT INTO question (interview_id, seq, text) VALUES (?, 1, 'Q')", (interview_id,)
+    ).lastrowid
+    conn.commit()
+
+    def write(i):
+        writer_conn = get_db_connection()
+        try:
+            return main_module.save_transcript_for_current_question(writer_conn, interview_id, i, f"w{i}", True)
+        finally:
+            writer_conn.close()
+
+    with ThreadPoolExecutor(max_workers=writers) as executor:
+        answer_ids = set(executor.map(write, range(writers)))
+    main_module.write_buffer.flush()
+
+    assert len(answer_ids) == 1
+    assert conn.execute("SELECT COUNT(*) FROM answer WHERE question_id = ?", (question_id,)).fetchone()[0] == 1
+    assert conn.execute(
+        "SELECT COUNT(*) FROM transcript_chunk WHERE answer_id = ?", (answer_ids.pop(),)
+    ).fetchone()[0] == writers
+    conn.close()
@@ -0,0 +1,127 @@
+"""
+Property-based tests for the write-behind insert buffer
+Feature: database-performance
+"""
+
+import pytest
+import sqlite3
+import os
+import sys
+import threading
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from write_behind import WriteBehindBuffer
+
+# Test database path
+TEST_DB_PATH = "test_write_behind.db"
+
+INSERT_EVENT = "INSERT INTO event (producer, seq, payload) VALUES (?, ?, ?)"
+
+
+@pytest.fixture(scope="function", autouse=True)
+def setup_test_db():
+    """Fresh event table for every test"""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+    conn = sqlite3.connect(TEST_DB_PATH)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE event (id INTEGER PRIMARY KEY, producer INTEGER, seq INTEGER NOT NULL, payload TEXT)")
+    conn.close()
+
+    yield
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB_PATH + suffix):
+            os.remove(TEST_DB_PATH + suffix)
+
+
+def connect():
+    return sqlite3.connect(TEST_DB_PATH, check_same_thread=False)
+
+
+def clear():
+    conn = connect()
+    conn.execute("DELETE FROM event")
+    conn.commit()
+    conn.close()
+
+
+@settings(max_examples=25, deadline=None)
+@given(
+    producers=st.integers(min_value=1, max_value=4),
+    rows_each=st.integers(min_value=0, max_value=120),
+    flush_rows=st.integers(min_value=1, max_value=50),
+    max_rows=st.integers(min_value=1, max_value=40)
+)
+def test_every_row_written_once_in_order(producers, rows_each, flush_rows, max_rows):
+    """
+    Feature: database-performance, Property 21: Write-behind durability
+
+    Property: With concurrent producers and a memory budget small enough to
+    force backpressure, flush() returns only after every queued row is
+    committed exactly once, each producer's rows keep their order, and the
+    buffer never holds more than its budget.
+    """
+    clear()
+    buffer = WriteBehindBuffer(flush_rows=flush_rows, flush_ms=5, max_rows=max_rows, connect=connect)
+
+    def produce(producer):
+        for seq in range(rows_each):
+            buffer.put(INSERT_EVENT, (producer, seq, "x" * 10))
+            assert buffer.metrics()["pending_rows"] <= max_rows
+
+    threads = [threading.Thread(target=produce, args=(p,)) for p in range(producers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    buffer.flush()
+
+    conn = connect()
+    for producer in range(producers):
+        seqs = [row[0] for row in conn.execute(
+            "SELECT seq FROM event WHERE producer = ? ORDER BY id", (producer,)
+        )]
+        assert seqs == list(range(rows_each))
+    conn.close()
+
+    metrics = buffer.metrics()
+    assert metrics["rows_written"] == metrics["rows_enqueued"] == producers * rows_each
+    assert metrics["pending_rows"] == 0
+    assert metrics["max_batch_rows"] <= max(max_rows, flush_rows)
+    assert (metrics["rows_per_flush_second"] > 0) == (metrics["rows_written"] > 0)
+    buffer.stop()
+
+
+def test_bad_rows_are_dropped_and_stop_drains_queue():
+    """
+    Feature: database-performance, Property 22: Batch failure isolation
+
+    Property: A row that violates a constraint is dropped without losing the
+    rest of its batch, many rows share one commit, and stop() writes
+    everything still queued.
+    """
+    clear()
+    buffer = WriteBehindBuffer(flush_rows=1000, flush_ms=60000, connect=connect)
+    for seq in range(50):
+        buffer.put(INSERT_EVENT, (0, None if seq == 25 else seq, "payload"))
+    buffer.stop()
+
+    conn = connect()
+    assert conn.execute("SELECT COUNT(*) FROM event").fetchone()[0] == 49
+    conn.close()
+
+    metrics = buffer.metrics()
+    assert metrics["rows_dropped"] == 1
+    assert metrics["batches"] == 1
+    assert metrics["pending_rows"] == 0
+
+    # The flusher restarts on demand after stop()
+    buffer.put(INSERT_EVENT, (1, 0, "after stop"))
+    buffer.flush()
+    assert buffer.metrics()["rows_written"] == 50
+    buffer.stop()
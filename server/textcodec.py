@@ -0,0 +1,281 @@
+"""
+Transparent compression for the large text columns
+candidates.resume_text, interview.notes, applications.match_explanation and
+answer.auto_score_breakdown make up most of the database file. Values of at
+least COMPRESS_MIN_BYTES are stored as a BLOB:
+
+    MAGIC (2 bytes) | codec (1 byte) | dictionary digest (4 bytes) | compressed UTF-8
+
+Rows written before compression are TEXT and come back unchanged, so old and
+new rows mix freely. Pooled connections unpack values in their row factory and
+provide unpack_text() to SQL that needs the plain text; no trigger uses it, so
+any connection can write these tables. Writers pack with pack_column, and the
+candidates_fts index is given the plain resume text by the write path (search.py).
+
+Each column gets its own dictionary trained on its rows (`python maintenance.py
+train-dictionaries`): a zstd dictionary when the optional zstandard package is
+installed, otherwise a zlib preset dictionary of the phrases most rows share.
+Dictionaries are kept in text_dictionary and never modified, so a value can
+always be read with the one it names.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', 256))
+ZLIB_LEVEL = int(os.getenv('COMPRESS_ZLIB_LEVEL', 6))
+ZSTD_LEVEL = int(os.getenv('COMPRESS_ZSTD_LEVEL', 6))
+# zlib cannot use more than its 32 KiB window
+DICTIONARY_BYTES = int(os.getenv('COMPRESS_DICTIONARY_BYTES', 32 * 1024))
+DICTIONARY_SAMPLES = int(os.getenv('COMPRESS_DICTIONARY_SAMPLES', 2000))
+DICTIONARY_MIN_SAMPLES = int(os.getenv('COMPRESS_DICTIONARY_MIN_SAMPLES', 20))
+
+# table -> its compressed column
+COMPRESSED_COLUMNS = {
+    "candidates": "resume_text",
+    "interview": "notes",
+    "applications": "match_explanation",
+    "answer": "auto_score_breakdown",
+}
+
+# 0xff never occurs in UTF-8, so no stored text can be mistaken for a packed value
+MAGIC = b"\xffT"
+CODECS = {"zlib": b"z", "zstd": b"s"}
+NO_DICTIONARY = bytes(4)
+HEADER_BYTES = 7
+
+# digest -> dictionary; digests identify a dictionary in any database
+_dictionaries: Dict[bytes, bytes] = {}
+
+
+def is_packed(value) -> bool:
+    return type(value) is bytes and value[:2] == MAGIC
+
+
+def digest(dictionary: bytes) -> bytes:
+    return hashlib.sha1(dictionary).digest()[:4]
+
+
+def pack(text, codec: str = "zlib", dictionary: Optional[bytes] = None):
+    """
+    text as a packed BLOB; returned unchanged when it is not a str, shorter than
+    COMPRESS_MIN_BYTES, or would not get smaller
+    """
+    if type(text) is not str or len(text) < COMPRESS_MIN_BYTES:
+        return text
+    raw = text.encode("utf-8")
+    if codec == "zstd":
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        body = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dict_data).compress(raw)
+    else:
+        options = {"zdict": dictionary} if dictionary else {}
+        compressor = zlib.compressobj(ZLIB_LEVEL, **options)
+        body = compressor.compress(raw) + compressor.flush()
+    packed = MAGIC + CODECS[codec] + (digest(dictionary) if dictionary else NO_DICTIONARY) + body
+    return packed if len(packed) < len(raw) else text
+
+
+def unpack(value, load=None):
+    """
+    Plain text of a stored value (anything not packed is returned as is).
+    load(digest) fetches a dictionary that has not been cached yet.
+    """
+    if not is_packed(value):
+        return value
+    codec, key, body = value[2:3], value[3:HEADER_BYTES], value[HEADER_BYTES:]
+    dictionary = None
+    if key != NO_DICTIONARY:
+        dictionary = _dictionaries.get(key)
+        if dictionary is None:
+            dictionary = load(key) if load is not None else None
+            if dictionary is None:
+                raise LookupError(f"compression dictionary {key.hex()} not found")
+            _dictionaries[key] = dictionary
+    if codec == CODECS["zstd"]:
+        if zstandard is None:
+            raise RuntimeError("value is zstd-compressed but the zstandard package is not installed")
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        raw = zstandard.ZstdDecompressor(dict_data=dict_data).decompress(body)
+    else:
+        options = {"zdict": dictionary} if dictionary else {}
+        decompressor = zlib.decompressobj(**options)
+        raw = decompressor.decompress(body) + decompressor.flush()
+    return raw.decode("utf-8")
+
+
+def _loader(conn):
+    def load(key: bytes):
+        row = conn.execute("SELECT dictionary FROM text_dictionary WHERE digest = ?", (key,)).fetchone()
+        return row[0] if row else None
+    return load
+
+
+def decoding_row(cursor, row):
+    """Row factory: sqlite3.Row with packed values unpacked"""
+    if bytes in map(type, row):
+        load = _loader(cursor.connection)
+        row = tuple(unpack(value, load) for value in row)
+    return sqlite3.Row(cursor, row)
+
+
+def register(conn):
+    """Install the row factory and the unpack_text() SQL function on a connection"""
+    conn.row_factory = decoding_row
+    load = _loader(conn)
+    conn.create_function("unpack_text", 1, lambda value: unpack(value, load), deterministic=True)
+
+
+def column_key(table: str) -> str:
+    return f"{table}.{COMPRESSED_COLUMNS[table]}"
+
+
+def current_dictionary(conn, table: str) -> Tuple[str, Optional[bytes]]:
+    """(codec, dictionary) new values of table's compressed column are packed with"""
+    row = conn.execute(
+        "SELECT codec, digest FROM text_dictionary WHERE column_name = ? ORDER BY id DESC LIMIT 1",
+        (column_key(table),)
+    ).fetchone()
+    if row is None or (row[0] == "zstd" and zstandard is None):
+        return "zlib", None
+    dictionary = _dictionaries.get(row[1])
+    if dictionary is None:
+        dictionary = _dictionaries[row[1]] = _loader(conn)(row[1])
+    return row[0], dictionary
+
+
+def pack_column(conn, table: str, text):
+    """text packed for table's compressed column with that column's newest dictionary"""
+    if type(text) is not str or len(text) < COMPRESS_MIN_BYTES:
+        return text
+    return pack(text, *current_dictionary(conn, table))
+
+
+# --- Dictionary training ---
+_TOKEN = re.compile(r"\w+|[^\w\s]+|\s+")
+_PHRASE_TOKENS = 6
+
+
+def _phrase_dictionary(samples: List[str], size: int) -> bytes:
+    """
+    zlib preset dictionary: the phrases (up to _PHRASE_TOKENS tokens) that occur
+    in the most samples, weighted by length. The most valuable go last, where
+    zlib reaches them with the shortest distances.
+    """
+    spread = Counter()
+    for text in samples:
+        tokens = _TOKEN.findall(text)
+        phrases = set()
+        for n in range(1, _PHRASE_TOKENS + 1):
+            for i in range(len(tokens) - n + 1):
+                phrases.add("".join(tokens[i:i + n]))
+        spread.update(phrases)
+
+    scored = sorted(
+        ((count * len(phrase.encode("utf-8")), phrase) for phrase, count in spread.items()
+         if count > 1 and len(phrase.strip()) > 2),
+        reverse=True,
+    )
+    chosen, total = [], 0
+    for _, phrase in scored:
+        if total >= size:
+            break
+        if any(phrase in longer for longer in chosen):
+            continue
+        chosen.append(phrase)
+        total += len(phrase.encode("utf-8"))
+    return "".join(reversed(chosen)).encode("utf-8")[-size:]
+
+
+def train_dictionary(samples: List[str], size: int = DICTIONARY_BYTES) -> Tuple[str, bytes]:
+    """(codec, dictionary) trained on samples of one column"""
+    if zstandard is not None:
+        try:
+            return "zstd", zstandard.train_dictionary(size, [s.encode("utf-8") for s in samples]).as_bytes()
+        except zstandard.ZstdError as e:
+            print(f"zstd dictionary training failed ({e}); using a zlib dictionary")
+    return "zlib", _phrase_dictionary(samples, size)
+
+
+def train_dictionaries(conn, sample_count: int = DICTIONARY_SAMPLES) -> Dict[str, int]:
+    """
+    Train and store a new dictionary for every compressed column with at least
+    DICTIONARY_MIN_SAMPLES rows worth compressing, sampling the newest rows.
+    New writes use it at once; existing rows change with repack_batch.
+    Returns {column: samples used}.
+    """
+    trained = {}
+    for table, column in COMPRESSED_COLUMNS.items():
+        samples = [row[0] for row in conn.execute(
+            f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL ORDER BY id DESC LIMIT ?",
+            (sample_count,)
+        ) if type(row[0]) is str and len(row[0]) >= COMPRESS_MIN_BYTES]
+        if len(samples) < DICTIONARY_MIN_SAMPLES:
+            continue
+        codec, dictionary = train_dictionary(samples)
+        if not dictionary:
+            continue
+        conn.execute(
+            "INSERT OR IGNORE INTO text_dictionary (column_name, codec, digest, dictionary, sample_count, created_at) "
+            "VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)",
+            (column_key(table), codec, digest(dictionary), dictionary, len(samples))
+        )
+        trained[column_key(table)] = len(samples)
+    return trained
+
+
+# --- Repacking existing rows ---
+
+def start_repack(conn):
+    """Record the id ranges repack_batch must go over (on migration, or after training)"""
+    for table in COMPRESSED_COLUMNS:
+        conn.execute(
+            f"INSERT OR REPLACE INTO text_repack_progress (table_name, last_id, end_id) "
+            f"SELECT ?, 0, COALESCE(MAX(id), 0) FROM {table}",
+            (table,)
+        )
+
+
+def repack_batch(conn, batch_size: int) -> int:
+    """
+    Pack the next batch_size ids of the first unfinished table with its newest
+    dictionary, leaving rows that already are. Returns the size of the id window
+    processed (0 once every table is done); the caller commits.
+    """
+    progress = conn.execute(
+        "SELECT table_name, last_id, end_id FROM text_repack_progress WHERE last_id < end_id "
+        "ORDER BY table_name LIMIT 1"
+    ).fetchone()
+    if progress is None:
+        return 0
+    table, last_id, end_id = progress
+    column = COMPRESSED_COLUMNS[table]
+    high = min(last_id + batch_size, end_id)
+    codec, dictionary = current_dictionary(conn, table)
+
+    updates = []
+    # The row factory unpacks the value; the header shows how it is stored now
+    for row_id, text, header in conn.execute(
+        f"SELECT id, {column}, hex(substr({column}, 1, {HEADER_BYTES})) FROM {table} "
+        f"WHERE id > ? AND id <= ? AND {column} IS NOT NULL",
+        (last_id, high)
+    ):
+        packed = pack(text, codec, dictionary)
+        stored_packed = header.startswith(MAGIC.hex().upper())
+        if type(packed) is bytes:
+            if header != packed[:HEADER_BYTES].hex().upper():
+                updates.append((packed, row_id))
+        elif stored_packed:
+            updates.append((packed, row_id))
+    conn.executemany(f"UPDATE {table} SET {column} = ? WHERE id = ?", updates)
+    conn.execute("UPDATE text_repack_progress SET last_id = ? WHERE table_name = ?", (high, table))
+    return high - last_id
@@ -0,0 +1,223 @@
+"""
+Write-behind buffer for high-volume append-only inserts
+Transcript chunks and proctor events are queued in memory and written by a
+background thread in groups (executemany + one commit per flush) instead of
+one connect/insert/commit per row.
+"""
+
+import asyncio
+import itertools
+import os
+import threading
+import time
+from typing import Optional, Sequence
+
+import database
+
+# A flush happens once FLUSH_ROWS rows are queued or the oldest queued row is FLUSH_MS old
+FLUSH_ROWS = int(os.getenv('WRITE_BUFFER_FLUSH_ROWS', 200))
+FLUSH_MS = int(os.getenv('WRITE_BUFFER_FLUSH_MS', 50))
+# Memory budget: producers wait for the flusher once either limit is reached
+MAX_PENDING_ROWS = int(os.getenv('WRITE_BUFFER_MAX_ROWS', 10000))
+MAX_PENDING_BYTES = int(os.getenv('WRITE_BUFFER_MAX_BYTES', 8 * 1024 * 1024))
+
+
+def _row_size(params: Sequence) -> int:
+    """Rough in-memory cost of a queued row"""
+    return 64 + sum(len(p) if isinstance(p, (str, bytes)) else 8 for p in params)
+
+
+class WriteBehindBuffer:
+    """
+    Queue of (sql, params) inserts committed in groups by a daemon thread.
+    Rows are written in the order they were queued. Callers that read the
+    buffered tables must flush() first to see their own writes.
+    """
+
+    def __init__(self, flush_rows: int = FLUSH_ROWS, flush_ms: int = FLUSH_MS,
+                 max_rows: int = MAX_PENDING_ROWS, max_bytes: int = MAX_PENDING_BYTES,
+                 connect=None):
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_ms / 1000
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self._connect = connect or database.get_db_connection
+        self._cond = threading.Condition()
+        self._pending = []
+        self._pending_bytes = 0
+        self._oldest = 0.0
+        # Sequence numbers: rows queued so far, rows written (or dropped) so far
+        self._enqueued = 0
+        self._written = 0
+        self._flush_target = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._stats = {
+            "rows_written": 0,
+            "rows_dropped": 0,
+            "batches": 0,
+            "max_batch_rows": 0,
+            "backpressure_waits": 0,
+            "flush_seconds": 0.0,
+            "last_flush_ms": 0.0,
+        }
+
+    def _is_full(self, size: int) -> bool:
+        in_flight = self._enqueued - self._written
+        # A single oversized row is still accepted into an empty buffer
+        return in_flight > 0 and (in_flight >= self.max_rows or self._pending_bytes + size > self.max_bytes)
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+
+    def put(self, sql: str, params: Sequence, block: bool = True) -> bool:
+        """
+        Queue one insert. When the memory budget is used up this waits for the
+        flusher (or returns False if block is False).
+        """
+        params = tuple(params)
+        size = _row_size(params)
+        with self._cond:
+            while self._is_full(size):
+                if not block:
+                    return False
+                self._stats["backpressure_waits"] += 1
+                self._ensure_thread()
+                self._cond.notify_all()
+                self._cond.wait()
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append((sql, params, size))
+            self._pending_bytes += size
+            self._enqueued += 1
+            self._ensure_thread()
+            if len(self._pending) >= self.flush_rows or len(self._pending) == 1:
+                self._cond.notify_all()
+        return True
+
+    async def submit(self, sql: str, params: Sequence):
+        """put() for async handlers: only leaves the event loop when the buffer is full"""
+        if not self.put(sql, params, block=False):
+            await asyncio.to_thread(self.put, sql, params)
+
+    def flush(self):
+        """Block until every row queued before this call is committed"""
+        with self._cond:
+            target = self._enqueued
+            if self._written >= target:
+                return
+            self._flush_target = max(self._flush_target, target)
+            self._ensure_thread()
+            self._cond.notify_all()
+            while self._written < target:
+                self._cond.wait()
+
+    async def flush_async(self):
+        """flush() for async handlers; free when nothing is queued"""
+        if self._written < self._enqueued:
+            await asyncio.to_thread(self.flush)
+
+    def stop(self):
+        """Write everything still queued and stop the flusher thread"""
+        with self._cond:
+            thread = self._thread
+            self._stopping = True
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join()
+
+    def _next_batch(self):
+        """Wait until a flush is due and take the queued rows (None once stopped)"""
+        with self._cond:
+            while True:
+                if self._pending:
+                    due = (len(self._pending) >= self.flush_rows
+                           or self._flush_target > self._written
+                           or self._stopping
+                           or self._is_full(0))
+                    remaining = self._oldest + self.flush_interval - time.monotonic()
+                    if due or remaining <= 0:
+                        batch, self._pending = self._pending, []
+                        return batch
+                    self._cond.wait(remaining)
+                elif self._stopping:
+                    self._thread = None
+                    self._stopping = False
+                    return None
+                else:
+                    self._cond.wait()
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            start = time.perf_counter()
+            dropped = self._write(batch)
+            elapsed = time.perf_counter() - start
+            with self._cond:
+                self._written += len(batch)
+                self._pending_bytes -= sum(size for _, _, size in batch)
+                stats = self._stats
+                stats["rows_written"] += len(batch) - dropped
+                stats["rows_dropped"] += dropped
+                stats["batches"] += 1
+                stats["max_batch_rows"] = max(stats["max_batch_rows"], len(batch))
+                stats["flush_seconds"] += elapsed
+                stats["last_flush_ms"] = round(elapsed * 1000, 3)
+                self._cond.notify_all()
+
+    def _write(self, batch) -> int:
+        """Insert a batch in one transaction; returns the number of rows that had to be dropped"""
+        conn = self._connect()
+        try:
+            try:
+                for sql, group in itertools.groupby(batch, key=lambda row: row[0]):
+                    conn.executemany(sql, [params for _, params, _ in group])
+                conn.commit()
+                return 0
+            except Exception as e:
+                conn.rollback()
+                print(f"Write-behind batch failed, retrying row by row: {e}")
+
+            # A failing statement only undoes itself, so the good rows still share one commit
+            dropped = 0
+            for sql, params, _ in batch:
+                try:
+                    conn.execute(sql, params)
+                except Exception as e:
+                    dropped += 1
+                    print(f"Write-behind dropped row for '{sql.split('(')[0].strip()}': {e}")
+            try:
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"Write-behind commit failed, {len(batch)} rows lost: {e}")
+                return len(batch)
+            return dropped
+        finally:
+            conn.close()
+
+    def metrics(self) -> dict:
+        """
+        Queue depth and write throughput since startup. rows_per_flush_second
+        is the insert rate while flushing (rows over time spent in flushes),
+        not the arrival rate over wall-clock time.
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats["rows_enqueued"] = self._enqueued
+            stats["pending_rows"] = self._enqueued - self._written
+            stats["pending_bytes"] = self._pending_bytes
+        stats["avg_batch_rows"] = round(stats["rows_written"] / stats["batches"], 2) if stats["batches"] else 0
+        stats["rows_per_flush_second"] = (
+            round(stats["rows_written"] / stats["flush_seconds"], 1) if stats["flush_seconds"] else 0
+        )
+        stats["flush_seconds"] = round(stats["flush_seconds"], 3)
+        return stats
+
+
+write_buffer = WriteBehindBuffer()